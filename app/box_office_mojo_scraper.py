@@ -2,6 +2,7 @@ import re
 import httpx
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from app.rate_limiter import get_rate_limiter
 
 class BoxOfficeMojoScraper:
     """
@@ -62,6 +63,7 @@ class BoxOfficeMojoScraper:
         }
 
         try:
+            get_rate_limiter().wait(schedule_url)
             with httpx.Client(headers=headers, follow_redirects=True) as client:
                 response = client.get(schedule_url)
                 response.raise_for_status()
@@ -114,6 +116,7 @@ class BoxOfficeMojoScraper:
         }
 
         try:
+            get_rate_limiter().wait(search_url)
             with httpx.Client(headers=headers, follow_redirects=True) as client:
                 response = client.get(search_url)
                 response.raise_for_status()
@@ -152,6 +155,7 @@ class BoxOfficeMojoScraper:
         }
 
         try:
+            await get_rate_limiter().acquire(search_url)
             async with httpx.AsyncClient(headers=headers, follow_redirects=True) as client:
                 response = await client.get(search_url)
                 response.raise_for_status()
@@ -188,6 +192,7 @@ class BoxOfficeMojoScraper:
         }
 
         try:
+            get_rate_limiter().wait(bom_url)
             response = httpx.get(bom_url, headers=headers, follow_redirects=True, timeout=15.0)
             response.raise_for_status()
             soup = BeautifulSoup(response.content.decode('utf-8'), 'html.parser')
@@ -223,6 +228,7 @@ class BoxOfficeMojoScraper:
         }
 
         try:
+            await get_rate_limiter().acquire(bom_url)
             async with httpx.AsyncClient(headers=headers, follow_redirects=True, timeout=15.0) as client:
                 response = await client.get(bom_url)
                 response.raise_for_status()
@@ -0,0 +1,250 @@
+"""
+Shared Playwright browser pool for all Scraper entry points.
+
+Launching Chromium costs 1-2 seconds, so instead of every scraper coroutine running
+its own `async_playwright()` / `chromium.launch()`, they lease pages from a pool that
+keeps one browser alive per event loop. Browser contexts are recycled after a number
+of navigations or when the renderer's JS heap grows past a threshold, and the whole
+pool is shut down explicitly (or at interpreter exit for the shared loop).
+"""
+import asyncio
+import atexit
+import contextlib
+import logging
+import threading
+import weakref
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+
+
+class _PooledContext:
+    """Book-keeping for one browser context owned by the pool."""
+
+    def __init__(self, context):
+        self.context = context
+        self.navigations = 0
+        self.active_pages = 0
+        self.retired = False
+
+
+class BrowserPool:
+    """
+    A long-lived Chromium instance that hands out pages from shared browser contexts.
+
+    Pages are leased with `async with pool.page() as page:`. Each lease counts as one
+    navigation, which matches how every scraper method uses its page. Once a context
+    has served `navigations_per_context` leases, or its JS heap exceeds
+    `memory_threshold_mb`, it is retired: new leases go to a fresh context and the old
+    one is closed as soon as its last page is returned.
+    """
+
+    def __init__(self, headless=True, devtools=False, navigations_per_context=200,
+                 memory_threshold_mb=768, memory_check_interval=10, user_agent=DEFAULT_USER_AGENT):
+        self.headless = headless
+        self.devtools = devtools
+        self.navigations_per_context = navigations_per_context
+        self.memory_threshold_mb = memory_threshold_mb
+        self.memory_check_interval = memory_check_interval
+        self.user_agent = user_agent
+
+        self._exit_stack = None
+        self._playwright = None
+        self._browser = None
+        self._current = None
+        self._retiring = []
+        self._lock = None
+        self._closed = False
+        self.stats = {"launches": 0, "contexts_created": 0, "contexts_recycled": 0, "pages_leased": 0}
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None
+
+    async def _ensure_browser(self):
+        """Launches Playwright and Chromium the first time a page is requested."""
+        if self._browser is not None:
+            return
+        exit_stack = contextlib.AsyncExitStack()
+        try:
+            playwright = await exit_stack.enter_async_context(async_playwright())
+            launch_options = {"headless": self.headless}
+            if self.devtools: # Only passed when requested; newer Playwright releases reject the option
+                launch_options["devtools"] = True
+            browser = await playwright.chromium.launch(**launch_options)
+        except BaseException:
+            await exit_stack.aclose() # Don't leak the Playwright driver if Chromium fails to start
+            raise
+        self._exit_stack, self._playwright, self._browser = exit_stack, playwright, browser
+        self.stats["launches"] += 1
+        logger.info(f"[BrowserPool] Launched Chromium (headless={self.headless}, devtools={self.devtools}).")
+
+    async def _acquire_context(self) -> _PooledContext:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("BrowserPool has been shut down.")
+            await self._ensure_browser()
+            if self._current is None or self._current.retired:
+                context = await self._browser.new_context(user_agent=self.user_agent)
+                self._current = _PooledContext(context)
+                self.stats["contexts_created"] += 1
+            return self._current
+
+    def _retire(self, pooled: _PooledContext, reason: str):
+        if pooled.retired:
+            return
+        pooled.retired = True
+        self._retiring.append(pooled)
+        self.stats["contexts_recycled"] += 1
+        logger.info(f"[BrowserPool] Recycling browser context after {pooled.navigations} navigations ({reason}).")
+
+    async def _js_heap_mb(self, page) -> float | None:
+        """Returns the renderer's used JS heap in MB, or None if it can't be measured."""
+        try:
+            used = await page.evaluate("() => (performance.memory && performance.memory.usedJSHeapSize) || 0")
+        except Exception:
+            return None
+        if isinstance(used, (int, float)):
+            return used / (1024 * 1024)
+        return None
+
+    async def _close_retired(self):
+        for pooled in [p for p in self._retiring if p.active_pages == 0]:
+            self._retiring.remove(pooled)
+            try:
+                await pooled.context.close()
+            except Exception as e:
+                logger.warning(f"[BrowserPool] Failed to close retired context: {e}")
+
+    @contextlib.asynccontextmanager
+    async def page(self):
+        """Leases a fresh page from the current context and closes it when done."""
+        pooled = await self._acquire_context()
+        pooled.active_pages += 1
+        pooled.navigations += 1
+        self.stats["pages_leased"] += 1
+        page = None
+        try:
+            page = await pooled.context.new_page()
+            yield page
+        finally:
+            if page is not None:
+                if (self.memory_threshold_mb and not pooled.retired
+                        and pooled.navigations % self.memory_check_interval == 0):
+                    heap_mb = await self._js_heap_mb(page)
+                    if heap_mb is not None and heap_mb > self.memory_threshold_mb:
+                        self._retire(pooled, f"JS heap {heap_mb:.0f} MB")
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            pooled.active_pages -= 1
+            if not pooled.retired and pooled.navigations >= self.navigations_per_context:
+                self._retire(pooled, "navigation limit")
+            await self._close_retired()
+
+    async def close(self):
+        """Closes every context, the browser and the Playwright driver."""
+        self._closed = True
+        contexts = self._retiring + ([self._current] if self._current and not self._current.retired else [])
+        self._retiring, self._current = [], None
+        for pooled in contexts:
+            try:
+                await pooled.context.close()
+            except Exception:
+                pass
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.warning(f"[BrowserPool] Error while closing browser: {e}")
+        if self._exit_stack is not None:
+            try:
+                await self._exit_stack.aclose()
+            except Exception:
+                pass
+        self._browser = self._playwright = self._exit_stack = None
+        logger.info(f"[BrowserPool] Shut down. Stats: {self.stats}")
+
+
+# --- Pool registry: Playwright objects are bound to the event loop that created them ---
+_pools_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def get_browser_pool(headless=True, devtools=False) -> BrowserPool:
+    """Returns the pool for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    pools = _pools_by_loop.setdefault(loop, {})
+    key = (headless, devtools)
+    pool = pools.get(key)
+    if pool is None or pool._closed:
+        pool = BrowserPool(headless=headless, devtools=devtools)
+        pools[key] = pool
+    return pool
+
+
+async def shutdown_browser_pools():
+    """Closes every pool bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    pools = _pools_by_loop.pop(loop, {})
+    for pool in pools.values():
+        await pool.close()
+
+
+async def shutdown_scraper_resources():
+    """Closes the browser pools and HTTP clients bound to the running event loop."""
+    from app.price_fetcher import close_price_fetchers # Local import to avoid circular dependency
+    await shutdown_browser_pools()
+    await close_price_fetchers()
+
+
+# --- Shared background loop so Streamlit reruns keep reusing the same browser ---
+_shared_loop = None
+_shared_loop_lock = threading.Lock()
+
+
+def get_shared_event_loop() -> asyncio.AbstractEventLoop:
+    """Returns a process-wide event loop running in a daemon thread."""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None or _shared_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="scraper-event-loop", daemon=True)
+            thread.start()
+            _shared_loop = loop
+    return _shared_loop
+
+
+def run_on_shared_loop(coro):
+    """Runs a coroutine on the shared loop from synchronous code and returns its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_shared_event_loop()).result()
+
+
+def run_with_scraper_resources(coro):
+    """
+    Runs a coroutine in its own `asyncio.run()` loop and closes the browser pool and HTTP
+    clients it leased before that loop ends. For callers whose coroutine (or its callbacks)
+    touches Streamlit, which only works from the script thread, so `run_on_shared_loop` can't be used.
+    """
+    async def _run():
+        try:
+            return await coro
+        finally:
+            await shutdown_scraper_resources()
+    return asyncio.run(_run())
+
+
+@atexit.register
+def _shutdown_shared_loop():
+    loop = _shared_loop
+    if loop is None or loop.is_closed() or not loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(shutdown_scraper_resources(), loop).result(timeout=15)
+    except Exception:
+        pass
+    loop.call_soon_threadsafe(loop.stop)
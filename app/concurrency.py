@@ -0,0 +1,204 @@
+"""
+Adaptive (AIMD) concurrency control shared by the scraper's discovery and price phases.
+
+Instead of fixed `CONCURRENCY` constants, workers take a slot from an
+`AdaptiveConcurrencyLimiter`. The limit grows by one after a full window of healthy
+completions (additive increase) and is cut by `backoff_factor` on a timeout, a
+429/403 response or a latency spike (multiplicative decrease). Code deep inside a
+worker flags those signals with `report_throttled()` / `report_timeout()`; the slot it
+is running under is tracked in a context variable, so nothing has to be threaded
+through call signatures.
+
+A slot's latency sample is the time spent inside its `timed_request()` sections (the
+HTTP request or page navigation itself), not waits on the host rate limiter, and code
+that switches to a slower path re-labels the slot with `set_slot_kind()` so it is judged
+against that path's own baseline.
+"""
+import asyncio
+import collections
+import contextlib
+import contextvars
+import logging
+import time
+from app import config
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = frozenset({403, 429})
+
+_current_slot: contextvars.ContextVar["_Slot | None"] = contextvars.ContextVar("scrape_concurrency_slot", default=None)
+
+
+class _Slot:
+    """One in-flight unit of work and the congestion signal it ended with, if any."""
+
+    def __init__(self, kind: str, epoch: int):
+        self.kind = kind
+        self.epoch = epoch
+        self.signal = None
+        self.started = time.monotonic()
+        self.timed = None # Seconds inside timed_request() sections; None means time the whole slot
+        self._timing = 0
+        self._timing_since = 0.0
+
+    def latency(self) -> float:
+        return time.monotonic() - self.started if self.timed is None else self.timed
+
+
+def report_throttled(status: int | None = None):
+    """Marks the current slot as throttled (e.g. an HTTP 429/403 from the site)."""
+    slot = _current_slot.get()
+    if slot is not None and (status is None or status in THROTTLE_STATUSES):
+        slot.signal = f"HTTP {status}" if status else "throttled"
+
+
+def report_timeout():
+    """Marks the current slot as having timed out."""
+    slot = _current_slot.get()
+    if slot is not None and slot.signal is None:
+        slot.signal = "timeout"
+
+
+def set_slot_kind(kind: str):
+    """Re-labels the current slot, e.g. when a price scrape falls back from HTTP to the browser."""
+    slot = _current_slot.get()
+    if slot is not None:
+        slot.kind = kind
+
+
+@contextlib.contextmanager
+def timed_request():
+    """
+    Times a request or navigation as part of the current slot's latency sample. Overlapping
+    sections (a hedged navigation racing its primary) count their wall-clock union once.
+    """
+    slot = _current_slot.get()
+    if slot is None:
+        yield
+        return
+    if slot._timing == 0:
+        slot._timing_since = time.monotonic()
+    slot._timing += 1
+    try:
+        yield
+    finally:
+        slot._timing -= 1
+        if slot._timing == 0:
+            slot.timed = (slot.timed or 0.0) + time.monotonic() - slot._timing_since
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit with telemetry.
+
+    `limit` is the number of slots currently allowed and `history` records every change
+    as a dict with `time`, `limit` and `reason`. Latency is judged per `kind` of work
+    against an EWMA of that kind's healthy latencies, so slow-but-normal page loads
+    don't get confused with fast HTTP fetches.
+    """
+
+    def __init__(self, initial_limit=None, min_limit=None, max_limit=None, backoff_factor=0.5,
+                 latency_tolerance=2.5, latency_warmup=5, ewma_alpha=0.2, history_size=500):
+        self.min_limit = min_limit or config.SCRAPE_CONCURRENCY_MIN
+        self.max_limit = max_limit or config.SCRAPE_CONCURRENCY_MAX
+        initial = initial_limit or config.SCRAPE_CONCURRENCY_INITIAL
+        self._limit = max(self.min_limit, min(self.max_limit, initial))
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_warmup = latency_warmup
+        self.ewma_alpha = ewma_alpha
+
+        self.in_flight = 0
+        self._epoch = 0 # Bumped on every decrease; slots started before it can't trigger another one
+        self._successes = 0
+        self._baseline_latency = {}
+        self._samples = collections.Counter()
+        self.history = collections.deque(maxlen=history_size)
+        self.stats = collections.Counter()
+        self._record(self._limit, "initial")
+
+        self._condition = None
+        self._loop = None
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def _record(self, limit: int, reason: str):
+        self.history.append({"time": time.time(), "limit": limit, "reason": reason})
+
+    def _get_condition(self) -> asyncio.Condition:
+        # asyncio primitives are bound to one loop; the limiter outlives individual asyncio.run() calls.
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._condition
+
+    @contextlib.asynccontextmanager
+    async def slot(self, kind: str = "default"):
+        """Waits for a free slot, runs the body under it, and feeds the outcome back into the limit."""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self._limit)
+            self.in_flight += 1
+        slot = _Slot(kind, self._epoch)
+        token = _current_slot.set(slot)
+        try:
+            yield slot
+        except (asyncio.TimeoutError, TimeoutError):
+            slot.signal = slot.signal or "timeout"
+            raise
+        finally:
+            _current_slot.reset(token)
+            self._on_complete(slot, slot.latency())
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def _on_complete(self, slot: _Slot, latency: float):
+        signal = slot.signal
+        baseline = self._baseline_latency.get(slot.kind)
+        if signal is None and baseline is not None and self._samples[slot.kind] >= self.latency_warmup \
+                and latency > baseline * self.latency_tolerance:
+            signal = f"latency {latency:.1f}s > {self.latency_tolerance:g}x baseline {baseline:.1f}s"
+
+        if signal is not None:
+            self.stats["congested"] += 1
+            self._decrease(slot, signal)
+            return
+
+        self.stats["healthy"] += 1
+        self._samples[slot.kind] += 1
+        self._baseline_latency[slot.kind] = latency if baseline is None else \
+            (1 - self.ewma_alpha) * baseline + self.ewma_alpha * latency
+        self._successes += 1
+        if self._successes >= self._limit and self._limit < self.max_limit:
+            self._successes = 0
+            self._limit += 1
+            self._record(self._limit, "increase")
+
+    def _decrease(self, slot: _Slot, reason: str):
+        if slot.epoch != self._epoch:
+            return # Already backed off for this burst
+        self._epoch += 1
+        self._successes = 0
+        new_limit = max(self.min_limit, int(self._limit * self.backoff_factor))
+        if new_limit != self._limit:
+            logger.warning(f"[Concurrency] Backing off {self._limit} -> {new_limit} ({reason}).")
+            self._limit = new_limit
+            self._record(self._limit, f"decrease: {reason}")
+
+    def snapshot(self) -> dict:
+        """Current state for telemetry."""
+        return {
+            "limit": self._limit,
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "baseline_latency": dict(self._baseline_latency),
+            "healthy": self.stats["healthy"],
+            "congested": self.stats["congested"],
+            "history": list(self.history),
+        }
@@ -16,3 +16,62 @@ DB_FILE = None
 REPORTS_DIR = None
 RUNTIME_LOG_FILE = None
 SCHEDULED_TASKS_DIR = None
+
+# --- Pooled SQLite connections to the company database (see app/db_pool.py) ---
+DB_JOURNAL_MODE = "WAL" # Readers and the writer don't block each other
+DB_SYNCHRONOUS = "NORMAL" # Safe with WAL; fsyncs at checkpoints instead of every commit
+DB_BUSY_TIMEOUT_MS = 30000 # How long a connection waits on a concurrent writer before "database is locked"
+DB_CACHE_SIZE_KB = 65536 # Page cache per connection
+DB_MMAP_SIZE = 256 * 1024 * 1024 # Bytes of the database file read through memory mapping
+
+# --- Price storage (see database.save_prices) ---
+PRICE_INTERVALS = True # Extend a showing's unchanged (ticket type, price, capacity) across runs instead of storing a row per run
+
+# --- Scraper concurrency (adaptive; see app/concurrency.py) ---
+SCRAPE_CONCURRENCY_INITIAL = 6
+SCRAPE_CONCURRENCY_MIN = 1
+SCRAPE_CONCURRENCY_MAX = 24
+
+# --- Sharded scraping (see app/sharded_scrape.py) ---
+# Runs over at least SHARDED_SCRAPE_MIN_THEATERS theaters are split across SCRAPE_PROCESSES worker processes.
+SCRAPE_PROCESSES = max(1, min(4, (os.cpu_count() or 1) - 1))
+SHARDED_SCRAPE_MIN_THEATERS = 20
+
+# --- Outbound request pacing (see app/rate_limiter.py): host -> (sustained requests/sec, burst) ---
+RATE_LIMITS = {
+    "fandango.com": (8.0, 16),
+    "omdbapi.com": (5.0, 10),
+    "boxofficemojo.com": (2.0, 4),
+    "imdb.com": (2.0, 4),
+}
+RATE_LIMIT_DEFAULT = (5.0, 10)
+
+# --- Retries and per-theater circuit breaking (see app/retry_policy.py) ---
+SCRAPE_RETRY_ATTEMPTS = 3 # Total attempts per page, including the first
+SCRAPE_RETRY_BASE_DELAY = 1.0 # Seconds; backoff doubles per attempt, with full jitter
+SCRAPE_RETRY_MAX_DELAY = 10.0
+CIRCUIT_BREAKER_THRESHOLD = 3 # Consecutive pages that failed every attempt before a theater is skipped for the rest of the run
+
+# --- Hedged browser navigations for the price phase (see app/hedging.py) ---
+HEDGE_NAVIGATIONS = True
+HEDGE_BUDGET = 0.05 # At most this many duplicate navigations per primary navigation
+HEDGE_PERCENTILE = 0.9 # A navigation slower than this percentile of the run so far is hedged
+HEDGE_MIN_SAMPLES = 20 # Navigations timed before hedging starts
+
+# --- Scrape planning (see app/scrape_planner.py) ---
+SCRAPE_LONGEST_FIRST = True # Start the work with the longest predicted latency first
+SCRAPE_DEFAULT_PAGE_SECONDS = 6.0 # Predicted theater page latency when there's no history
+SCRAPE_DEFAULT_SHOWING_SECONDS = 4.0 # Predicted ticketing page latency when there's no history
+SCRAPE_DEADLINE_MARGIN = 0.9 # Share of the time left before the cutoff that a deadline plan may use
+
+# --- Representative-showtime price inference (see app/price_inference.py) ---
+PRICE_INFERENCE = False # Scrape one showing per price class and infer its siblings
+PRICE_INFERENCE_SPOT_CHECK_RATE = 0.1 # Share of inferable showings scraped anyway to detect divergence
+
+# --- Learned price rules for scheduled scrapes (see app/price_rules.py) ---
+PRICE_RULES = True # Verify theaters with stable price rules from a sample instead of scraping every showing
+PRICE_RULES_LOOKBACK_DAYS = 28 # Play dates of scrape history the rules are learned from
+PRICE_RULES_MIN_OBSERVED_DAYS = 5 # Scraped play dates a rule needs before it is trusted
+PRICE_RULES_MIN_CONFIDENCE = 0.95 # Share of the window's scraped prices that must agree with the rule
+PRICE_RULES_MAX_AGE_DAYS = 7 # A rule not verified by a scrape for this long is scraped in full again
+PRICE_RULES_SAMPLE_RATE = 0.1 # Share of covered showings scraped on top of one per (theater, daypart, format)
@@ -8,6 +8,7 @@ import datetime
 import glob
 import tempfile
 from app.scraper import Scraper
+from app.browser_pool import run_on_shared_loop, run_with_scraper_resources
 from app.utils import run_async_in_thread, get_error_message
 from app import database, config
 from app.box_office_mojo_scraper import BoxOfficeMojoScraper
@@ -99,7 +100,7 @@ def render_failed_film_matcher(session_state_key):
                     log_container.code("\n".join(log_messages))
 
                 with st.spinner(f"Searching Fandango for '{fandango_search_term}'... See log below."):
-                    search_results = asyncio.run(scraper.search_fandango_for_film_url(fandango_search_term, log_callback=log_to_streamlit))
+                    search_results = run_with_scraper_resources(scraper.search_fandango_for_film_url(fandango_search_term, log_callback=log_to_streamlit))
                     if search_results:
                         st.session_state[results_key] = search_results
                         log_container.empty() # Clear the log on success
@@ -120,7 +121,7 @@ def render_failed_film_matcher(session_state_key):
                     for result in st.session_state[results_key]:
                         if st.button(result['title'], key=f"fandango_result_{i}_{result['url']}"):
                             with st.spinner(f"Scraping details for '{result['title']}'..."):
-                                fandango_details = asyncio.run(scraper.get_film_details_from_fandango_url(result['url']))
+                                fandango_details = run_on_shared_loop(scraper.get_film_details_from_fandango_url(result['url']))
                                 if fandango_details:
                                     st.session_state[preview_key] = fandango_details
                                     st.rerun()
@@ -316,16 +317,15 @@ def merge_external_db(uploaded_file):
                 
                 # Get a list of tables in the source DB to handle different schema versions
                 source_cursor = source_conn.cursor()
-                source_cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+                source_cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view');") # prices is a view over price_facts
                 source_tables = [row[0] for row in source_cursor.fetchall()]
                 
                 # 1. Merge all showings from source to master first.
                 if 'showings' in source_tables:
                     showings_df = pd.read_sql_query("SELECT * FROM showings", source_conn)
                     if not showings_df.empty:
-                        if 'showing_id' in showings_df.columns:
-                            showings_df = showings_df.drop(columns=['showing_id'])
-                        
+                        showing_columns = ['play_date', 'theater_name', 'film_title', 'showtime', 'format', 'daypart', 'ticket_url']
+                        showings_df = showings_df.reindex(columns=showing_columns) # Newer DBs also carry is_plf and dimension keys
                         showings_to_insert = showings_df.to_records(index=False).tolist()
                         master_cursor.executemany("""
                             INSERT OR IGNORE INTO showings 
@@ -415,16 +415,16 @@ async def discover_and_add_new_films_from_fandango():
     failed_films = []
 
     for title in discovered_titles:
-        if database.check_film_exists(title):
+        if await asyncio.to_thread(database.check_film_exists, title):
             existing_films.append(title)
         else:
-            film_details = omdb_client.get_film_details(title)
+            film_details = await asyncio.to_thread(omdb_client.get_film_details, title)
             if film_details:
                 film_details['film_title'] = title
-                database.upsert_film_details(film_details)
+                await asyncio.to_thread(database.upsert_film_details, film_details)
                 new_films.append(title)
             else:
-                database.log_unmatched_film(title)
+                await asyncio.to_thread(database.log_unmatched_film, title)
                 failed_films.append({"Title": title, "Error": "Could not find match on OMDb."})
     return new_films, existing_films, failed_films
 
@@ -653,6 +653,7 @@ def _render_database_tools():
     
     db_path = config.DB_FILE
     if db_path and os.path.exists(db_path):
+        database.checkpoint_database() # With WAL journaling, recent writes may not be in the main file yet
         with open(db_path, "rb") as fp:
             st.download_button(
                 label=f"Download {st.session_state.get('selected_company', 'current')} Database",
@@ -737,6 +738,16 @@ def _render_database_tools():
                 else:
                     st.info("No ticket types needed consolidation.")
 
+        st.subheader("Daily Price Summary")
+        st.info(
+            "Analysis reports read prices from a daily summary that each scrape keeps up to date. Rebuild it after "
+            "changing the ticket type mappings above, so the reports group prices under the new canonical names."
+        )
+        if st.button("Rebuild Daily Price Summary", use_container_width=True):
+            with st.spinner("Rebuilding the daily price summary..."):
+                row_count = database.rebuild_daily_prices()
+                st.success(f"Rebuilt the daily price summary: {row_count} rows.")
+
     with st.expander("Backfill Film Data"):
         st.write("Run processes to fill in missing data for films already in the database.")
         
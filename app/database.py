@@ -1,17 +1,35 @@
 import sqlite3
+import numpy as np
 import pandas as pd
 import datetime
 import asyncio
+import json
+import os
 from app import config
+from app.db_pool import get_pool
 from app.omdb_client import OMDbClient
 
 def _get_db_connection():
     """
-    Gets a connection to the database, ensuring DB_FILE is set.
-    This is a helper to centralize the connection logic and satisfy static analysis.
+    Gets the calling thread's pooled connection to the database, ensuring DB_FILE is set.
+    Use it as `with _get_db_connection() as conn:`, which commits or rolls back but leaves the
+    connection open for the next helper (see app/db_pool.py).
+
+    Every call in a thread returns the same connection. A helper called inside another helper's
+    `with` block while it has uncommitted writes runs in a savepoint of that transaction. Its
+    `commit()` only ends the savepoint, and the work becomes durable when the outer block commits.
     """
     assert config.DB_FILE is not None, "Database path (DB_FILE) has not been configured. It should be set by the main app."
-    return sqlite3.connect(config.DB_FILE)
+    return get_pool().connection(config.DB_FILE)
+
+def close_db_connections():
+    """Closes the calling thread's pooled database connection."""
+    get_pool().close_thread_connection()
+
+def checkpoint_database():
+    """Folds the write-ahead log into the main database file, so a copy of the file alone is complete."""
+    with _get_db_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
 
 def init_database():
     """Initializes the SQLite database and creates tables if they don't exist."""
@@ -38,19 +56,6 @@ def init_database():
                 UNIQUE(play_date, theater_name, film_title, showtime, format)
             )
         ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS prices (
-                price_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                run_id INTEGER,
-                showing_id INTEGER,
-                ticket_type TEXT NOT NULL,
-                price REAL NOT NULL,
-                capacity TEXT,
-                play_date DATE,
-                FOREIGN KEY (run_id) REFERENCES scrape_runs (run_id),
-                FOREIGN KEY (showing_id) REFERENCES showings (showing_id)
-            )
-        ''')
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS films (
                 film_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -89,6 +94,8 @@ def init_database():
                 showtime TEXT,
                 format TEXT,
                 play_date DATE,
+                occurrences INTEGER NOT NULL DEFAULT 1,
+                last_seen DATETIME,
                 UNIQUE(unmatched_part, theater_name, film_title, play_date)
             )
         ''')
@@ -111,13 +118,16 @@ def init_database():
                 film_title TEXT NOT NULL UNIQUE
             )
         ''')
+        _create_scrape_journal_table(cursor)
+        _create_scrape_latency_table(cursor)
+        _create_price_rules_table(cursor)
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_operating_hours_theater_date ON operating_hours (theater_name, scrape_date);')
         # --- OPTIMIZATION: Add indexes for faster queries ---
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_showings_theater_date ON showings (theater_name, play_date);')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_showings_film_title ON showings (film_title);')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_prices_showing_id ON prices (showing_id);')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_prices_run_id ON prices (run_id);')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_films_title ON films (film_title);')
+        _create_dimension_tables(cursor) # Also creates price_facts and the prices view
+        _create_daily_prices_table(cursor)
 
         conn.commit()
 
@@ -198,6 +208,10 @@ def update_database_schema():
             print("  [DB] Adding 'run_context' column to scrape_runs table.")
             cursor.execute('ALTER TABLE scrape_runs ADD COLUMN run_context TEXT')
             conn.commit()
+        if 'cutoff_at' not in columns:
+            print("  [DB] Adding 'cutoff_at' column to scrape_runs table.")
+            cursor.execute('ALTER TABLE scrape_runs ADD COLUMN cutoff_at DATETIME')
+            conn.commit()
         
         cursor.execute("PRAGMA table_info(prices)")
         prices_columns = [info[1] for info in cursor.fetchall()]
@@ -206,6 +220,11 @@ def update_database_schema():
             cursor.execute('ALTER TABLE prices ADD COLUMN play_date DATE')
             conn.commit()
         
+        if 'inferred' not in prices_columns:
+            print("  [DB] Adding 'inferred' column to prices table.")
+            cursor.execute('ALTER TABLE prices ADD COLUMN inferred BOOLEAN DEFAULT 0')
+            conn.commit()
+
         cursor.execute("PRAGMA table_info(prices)")
         prices_columns = [info[1] for info in cursor.fetchall()]
         if 'showing_id' not in prices_columns:
@@ -250,6 +269,15 @@ def update_database_schema():
         # Drop UNIQUE constraint on unmatched_part if it exists to replace it with a composite one
         # This is complex in SQLite, so for now we rely on the CREATE TABLE statement for new DBs
         # and accept that old DBs might have the old constraint. The INSERT OR IGNORE will still work.
+        for col, col_type in [('occurrences', 'INTEGER NOT NULL DEFAULT 1'), ('last_seen', 'DATETIME')]:
+            if col not in unmatched_columns:
+                print(f"  [DB] Adding '{col}' column to unmatched_ticket_types table.")
+                cursor.execute(f'ALTER TABLE unmatched_ticket_types ADD COLUMN {col} {col_type}')
+        # Old DBs lack the composite key; the index lets log_unmatched_ticket_types upsert on it.
+        try:
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_unmatched_ticket_types_key ON unmatched_ticket_types (unmatched_part, theater_name, film_title, play_date)')
+        except sqlite3.IntegrityError as e:
+            print(f"  [DB-WARN] Could not add unique key to unmatched_ticket_types: {e}")
 
         cursor.execute("PRAGMA table_info(showings)")
         showings_columns = [info[1] for info in cursor.fetchall()]
@@ -257,6 +285,12 @@ def update_database_schema():
             print("  [DB] Adding 'is_plf' column to showings table.")
             cursor.execute('ALTER TABLE showings ADD COLUMN is_plf BOOLEAN DEFAULT 0')
 
+        _create_scrape_journal_table(cursor)
+        _create_scrape_latency_table(cursor)
+        _create_price_rules_table(cursor)
+        _create_dimension_tables(cursor)
+        _create_daily_prices_table(cursor)
+
 def create_scrape_run(mode: str, context: str) -> int:
     """Creates a new entry in the scrape_runs table and returns the run_id."""
     with _get_db_connection() as conn:
@@ -268,94 +302,944 @@ def create_scrape_run(mode: str, context: str) -> int:
         conn.commit()
         return run_id
 
+# --- Dimension tables: each theater, film title, format and ticket type stored once under an integer key ---
+# Dimension table -> (key column, text column)
+_DIMENSIONS = {
+    'theaters': ('theater_id', 'theater_name'),
+    'film_titles': ('film_title_id', 'film_title'),
+    'formats': ('format_id', 'format'),
+    'ticket_types': ('ticket_type_id', 'ticket_type'),
+}
+# Table -> the dimension keys it carries next to its text columns, kept current by triggers
+_DIMENSION_KEYS = {
+    'showings': ['theaters', 'film_titles', 'formats'],
+    'operating_hours': ['theaters'],
+    'films': ['film_titles'],
+}
+_DIMENSION_KEY_INDEXES = {
+    'idx_showings_theater_id_date': 'showings (theater_id, play_date)',
+    'idx_showings_film_title_id': 'showings (film_title_id)',
+    'idx_films_film_title_id': 'films (film_title_id)',
+    'idx_operating_hours_theater_id_date': 'operating_hours (theater_id, scrape_date)',
+}
+
+def _table_type(cursor, name: str) -> str | None:
+    """'table', 'view' or None."""
+    row = cursor.execute("SELECT type FROM sqlite_master WHERE name = ? AND type IN ('table', 'view')", (name,)).fetchone()
+    return row[0] if row else None
+
+def _dimension_key_trigger(table: str, dimensions: list[str], event: str) -> str:
+    """A trigger that adds the row's text values to their dimensions and sets its keys from them."""
+    key_inserts, assignments = [], []
+    for dim in dimensions:
+        key, text = _DIMENSIONS[dim]
+        key_inserts.append(f"INSERT OR IGNORE INTO {dim} ({text}) SELECT NEW.{text} WHERE NEW.{text} IS NOT NULL;")
+        assignments.append(f"{key} = (SELECT {key} FROM {dim} WHERE {text} = NEW.{text})")
+    name = f"{table}_dimension_keys_{'insert' if event == 'INSERT' else 'update'}"
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table}
+        BEGIN
+            {' '.join(key_inserts)}
+            UPDATE {table} SET {', '.join(assignments)} WHERE rowid = NEW.rowid;
+        END
+    '''
+
+# One row per run that scraped the showing, for each price interval spanning the run: the rows readers expect
+_PRICES_VIEW = '''CREATE VIEW prices AS
+        SELECT p.price_id, o.run_id, p.showing_id, t.ticket_type, p.price, p.capacity, p.play_date, p.inferred
+        FROM price_facts p
+        JOIN showing_runs o ON o.showing_id = p.showing_id AND o.run_id BETWEEN p.first_seen_run AND p.last_seen_run
+        JOIN ticket_types t ON t.ticket_type_id = p.ticket_type_id'''
+
+def _create_price_facts(cursor):
+    """
+    Price rows live in `price_facts` as intervals: a showing's (ticket type, price, capacity)
+    as seen from `first_seen_run` through `last_seen_run`, with an integer `ticket_type_id`.
+    `showing_runs` records which runs scraped each showing. The `prices` view joins the two
+    back into one row per run, with the text `ticket_type`. INSTEAD OF triggers keep direct
+    writers working. A row inserted through the view is a single-run interval; updating or
+    deleting a row through it changes its whole interval.
+
+    A legacy `prices` table, or `price_facts` with a row per run, is moved in as single-run
+    intervals. A pre-showings `prices` table is left for `migrate_schema`.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS price_facts (
+            price_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_seen_run INTEGER,
+            last_seen_run INTEGER,
+            showing_id INTEGER,
+            ticket_type_id INTEGER NOT NULL,
+            price REAL NOT NULL,
+            capacity TEXT,
+            play_date DATE,
+            inferred BOOLEAN DEFAULT 0,
+            FOREIGN KEY (first_seen_run) REFERENCES scrape_runs (run_id),
+            FOREIGN KEY (last_seen_run) REFERENCES scrape_runs (run_id),
+            FOREIGN KEY (showing_id) REFERENCES showings (showing_id),
+            FOREIGN KEY (ticket_type_id) REFERENCES ticket_types (ticket_type_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS showing_runs (
+            showing_id INTEGER NOT NULL,
+            run_id INTEGER NOT NULL,
+            PRIMARY KEY (showing_id, run_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_showing_runs_run_id ON showing_runs (run_id);')
+
+    columns = [info[1] for info in cursor.execute("PRAGMA table_info(price_facts)").fetchall()]
+    if 'run_id' in columns:
+        print("  [DB] Converting price_facts rows to single-run price intervals.")
+        cursor.execute("DROP VIEW IF EXISTS prices")
+        cursor.execute("DROP INDEX IF EXISTS idx_price_facts_run_id")
+        cursor.execute("ALTER TABLE price_facts RENAME COLUMN run_id TO first_seen_run")
+        cursor.execute("ALTER TABLE price_facts ADD COLUMN last_seen_run INTEGER REFERENCES scrape_runs (run_id)")
+        cursor.execute("UPDATE price_facts SET last_seen_run = first_seen_run")
+        cursor.execute('''
+            INSERT OR IGNORE INTO showing_runs (showing_id, run_id)
+            SELECT DISTINCT showing_id, first_seen_run FROM price_facts WHERE showing_id IS NOT NULL AND first_seen_run IS NOT NULL
+        ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_facts_showing_id ON price_facts (showing_id);')
+
+    if _table_type(cursor, 'prices') == 'table':
+        columns = [info[1] for info in cursor.execute("PRAGMA table_info(prices)").fetchall()]
+        if 'showing_id' not in columns:
+            return
+        count = cursor.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+        print(f"  [DB] Moving {count} price records to the integer-keyed price_facts table.")
+        cursor.execute("INSERT OR IGNORE INTO ticket_types (ticket_type) SELECT DISTINCT ticket_type FROM prices WHERE ticket_type IS NOT NULL")
+        play_date = 'p.play_date' if 'play_date' in columns else 'NULL'
+        inferred = 'COALESCE(p.inferred, 0)' if 'inferred' in columns else '0'
+        cursor.execute(f'''
+            INSERT INTO price_facts (price_id, first_seen_run, last_seen_run, showing_id, ticket_type_id, price, capacity, play_date, inferred)
+            SELECT p.price_id, p.run_id, p.run_id, p.showing_id, t.ticket_type_id, p.price, p.capacity, {play_date}, {inferred}
+            FROM prices p JOIN ticket_types t ON t.ticket_type = p.ticket_type
+            ORDER BY p.price_id
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO showing_runs (showing_id, run_id)
+            SELECT DISTINCT showing_id, run_id FROM prices WHERE showing_id IS NOT NULL AND run_id IS NOT NULL
+        ''')
+        cursor.execute("DROP TABLE prices")
+
+    view = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'prices'").fetchone()
+    if view is not None and view[0] == _PRICES_VIEW:
+        return
+    cursor.execute("DROP VIEW IF EXISTS prices") # Its triggers go with it
+    cursor.execute(_PRICES_VIEW)
+    cursor.execute('''
+        CREATE TRIGGER prices_insert INSTEAD OF INSERT ON prices
+        BEGIN
+            INSERT OR IGNORE INTO ticket_types (ticket_type) SELECT NEW.ticket_type WHERE NEW.ticket_type IS NOT NULL;
+            INSERT INTO price_facts (price_id, first_seen_run, last_seen_run, showing_id, ticket_type_id, price, capacity, play_date, inferred)
+            VALUES (NEW.price_id, NEW.run_id, NEW.run_id, NEW.showing_id,
+                    (SELECT ticket_type_id FROM ticket_types WHERE ticket_type = NEW.ticket_type),
+                    NEW.price, NEW.capacity, NEW.play_date, COALESCE(NEW.inferred, 0));
+            INSERT OR IGNORE INTO showing_runs (showing_id, run_id)
+            SELECT NEW.showing_id, NEW.run_id WHERE NEW.showing_id IS NOT NULL AND NEW.run_id IS NOT NULL;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER prices_update INSTEAD OF UPDATE ON prices
+        BEGIN
+            INSERT OR IGNORE INTO ticket_types (ticket_type) SELECT NEW.ticket_type WHERE NEW.ticket_type IS NOT NULL;
+            UPDATE price_facts SET
+                price_id = NEW.price_id, showing_id = NEW.showing_id,
+                first_seen_run = CASE WHEN NEW.run_id IS OLD.run_id THEN first_seen_run ELSE NEW.run_id END,
+                last_seen_run = CASE WHEN NEW.run_id IS OLD.run_id THEN last_seen_run ELSE NEW.run_id END,
+                ticket_type_id = (SELECT ticket_type_id FROM ticket_types WHERE ticket_type = NEW.ticket_type),
+                price = NEW.price, capacity = NEW.capacity, play_date = NEW.play_date, inferred = NEW.inferred
+            WHERE price_id = OLD.price_id;
+            INSERT OR IGNORE INTO showing_runs (showing_id, run_id)
+            SELECT NEW.showing_id, NEW.run_id WHERE NEW.showing_id IS NOT NULL AND NEW.run_id IS NOT NULL;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER prices_delete INSTEAD OF DELETE ON prices
+        BEGIN
+            DELETE FROM price_facts WHERE price_id = OLD.price_id;
+        END
+    ''')
+
+def _create_dimension_tables(cursor):
+    """
+    Creates the dimension tables and moves prices into `price_facts` intervals (see `_create_price_facts`).
+    `showings`, `operating_hours` and `films` keep their text columns, so every existing writer
+    and query works unchanged. Triggers keep their integer keys current. The keys are backfilled
+    once, when they're added to an existing database.
+    """
+    for dim, (key, text) in _DIMENSIONS.items():
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {dim} ({key} INTEGER PRIMARY KEY, {text} TEXT NOT NULL UNIQUE)")
+
+    for table, dimensions in _DIMENSION_KEYS.items():
+        if _table_type(cursor, table) != 'table':
+            continue
+        columns = [info[1] for info in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+        missing = [dim for dim in dimensions if _DIMENSIONS[dim][0] not in columns]
+        for dim in missing:
+            key, text = _DIMENSIONS[dim]
+            print(f"  [DB] Adding '{key}' column to {table} table.")
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {key} INTEGER REFERENCES {dim} ({key})")
+            cursor.execute(f"INSERT OR IGNORE INTO {dim} ({text}) SELECT DISTINCT {text} FROM {table} WHERE {text} IS NOT NULL")
+            cursor.execute(f"UPDATE {table} SET {key} = (SELECT d.{key} FROM {dim} d WHERE d.{text} = {table}.{text})")
+        cursor.execute(_dimension_key_trigger(table, dimensions, 'INSERT'))
+        text_columns = ', '.join(_DIMENSIONS[dim][1] for dim in dimensions)
+        cursor.execute(_dimension_key_trigger(table, dimensions, f'UPDATE OF {text_columns}'))
+
+    for name, target in _DIMENSION_KEY_INDEXES.items():
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {target};')
+    _create_price_facts(cursor)
+
+def _lookup_column(conn, keys: pd.Series, table: str, key: str, column: str) -> pd.Series:
+    """
+    `table.column` for each of `keys`, None where there's no match. Each distinct key is read
+    once and decoded with one array take, instead of joining the table and decoding its text
+    for every row of a large result.
+    """
+    distinct = [int(k) for k in keys.dropna().unique()]
+    values = np.full(max(distinct, default=0) + 2, None, dtype=object) # The last slot stays None for missing keys
+    for start in range(0, len(distinct), 500):
+        chunk = distinct[start:start + 500]
+        for k, value in conn.execute(f"SELECT {key}, {column} FROM {table} WHERE {key} IN ({','.join(['?'] * len(chunk))})", chunk):
+            values[k] = value
+    codes = keys.fillna(-1).to_numpy(dtype=np.int64)
+    return pd.Series(values[codes], index=keys.index, dtype=object)
+
+def _dimension_filter(key_column: str, dimension: str, values: list) -> tuple[str, list]:
+    """` AND <key_column> IN (...)` for the dimension rows named by `values`, so filters use the integer-keyed indexes."""
+    key, text = _DIMENSIONS[dimension]
+    return (f" AND {key_column} IN (SELECT {key} FROM {dimension} WHERE {text} IN ({','.join(['?'] * len(values))}))",
+            list(values))
+
+# --- Daily price summary: prices aggregated per (play date, theater, film, format, daypart, canonical ticket type) ---
+def _ticket_type_reverse_map() -> dict[str, str]:
+    """Lowercased ticket type -> its canonical name in ticket_types.json's base_type_map ({} if the file can't be read)."""
+    try:
+        with open(os.path.join(os.path.dirname(__file__), 'ticket_types.json'), 'r') as f:
+            base_type_map = json.load(f).get('base_type_map', {})
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"  [DB-WARN] Could not consolidate ticket types. File missing or corrupt. Error: {e}")
+        return {}
+    reverse_map = {}
+    for canonical, variations in base_type_map.items():
+        reverse_map[canonical.lower()] = canonical
+        for variation in variations:
+            reverse_map[variation.lower()] = canonical
+    return reverse_map
+
+def _create_daily_prices_table(cursor):
+    """
+    `daily_prices` holds one row per (play_date, theater_id, film_title_id, format_id, daypart,
+    canonical ticket_type_id): the min, max, sum and count of that day's prices over every run
+    (the rows of the `prices` view), how many were sold out, the distinct prices and the latest
+    run. Reports read it instead of aggregating raw price rows on every render.
+
+    save_prices refreshes the days it touches. Writes through the `prices` view, and changes to
+    a priced showing, mark their day stale in `daily_prices_stale` instead; readers refresh stale
+    days first. `rebuild_daily_prices` recomputes everything, e.g. after ticket type mappings change.
+    """
+    showings_columns = [info[1] for info in cursor.execute("PRAGMA table_info(showings)").fetchall()]
+    if _table_type(cursor, 'prices') != 'view' or 'is_plf' not in showings_columns:
+        return # Created once migrate_schema and update_database_schema have brought prices and showings up to date
+    created = _table_type(cursor, 'daily_prices') is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_prices (
+            play_date DATE NOT NULL,
+            theater_id INTEGER REFERENCES theaters (theater_id),
+            film_title_id INTEGER REFERENCES film_titles (film_title_id),
+            format_id INTEGER REFERENCES formats (format_id),
+            daypart TEXT,
+            ticket_type_id INTEGER NOT NULL REFERENCES ticket_types (ticket_type_id),
+            is_plf BOOLEAN,
+            min_price REAL NOT NULL,
+            max_price REAL NOT NULL,
+            price_sum REAL NOT NULL,
+            price_count INTEGER NOT NULL,
+            sold_out_count INTEGER NOT NULL,
+            distinct_prices TEXT NOT NULL,
+            last_run_id INTEGER REFERENCES scrape_runs (run_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_daily_prices_theater_id_date ON daily_prices (theater_id, play_date, film_title_id);')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_daily_prices_film_title_id ON daily_prices (film_title_id);')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_prices_stale (
+            play_date DATE NOT NULL,
+            theater_id INTEGER NOT NULL,
+            film_title_id INTEGER NOT NULL,
+            PRIMARY KEY (play_date, theater_id, film_title_id)
+        ) WITHOUT ROWID
+    ''')
+
+    mark_stale = ("INSERT OR IGNORE INTO daily_prices_stale (play_date, theater_id, film_title_id) "
+                  "SELECT play_date, theater_id, film_title_id FROM showings WHERE showing_id = {row}.showing_id "
+                  "AND theater_id IS NOT NULL AND film_title_id IS NOT NULL;")
+    for event, rows in (('INSERT', ['NEW']), ('UPDATE', ['OLD', 'NEW']), ('DELETE', ['OLD'])):
+        statements = ' '.join(mark_stale.format(row=row) for row in rows)
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS prices_daily_prices_{event.lower()} INSTEAD OF {event} ON prices "
+                       f"BEGIN {statements} END")
+    stale_day = ("INSERT OR IGNORE INTO daily_prices_stale (play_date, theater_id, film_title_id) "
+                 "SELECT {row}.play_date, {row}.theater_id, {row}.film_title_id "
+                 "WHERE {row}.theater_id IS NOT NULL AND {row}.film_title_id IS NOT NULL "
+                 "AND EXISTS (SELECT 1 FROM price_facts WHERE showing_id = {row}.showing_id);")
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS showings_daily_prices_update
+        AFTER UPDATE OF play_date, daypart, is_plf, theater_id, film_title_id, format_id ON showings
+        BEGIN {stale_day.format(row='OLD')} {stale_day.format(row='NEW')} END
+    ''')
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS showings_daily_prices_delete AFTER DELETE ON showings "
+                   f"BEGIN {stale_day.format(row='OLD')} END")
+
+    if created and cursor.execute("SELECT EXISTS (SELECT 1 FROM price_facts)").fetchone()[0]:
+        print("  [DB] Building the daily price summary from existing prices.")
+        _refresh_daily_prices(cursor, rebuild=True)
+
+def _create_canonical_ticket_types(cursor):
+    """TEMP `canonical_ticket_types`: each ticket_types key -> the key of its canonical name, added to ticket_types if new."""
+    reverse_map = _ticket_type_reverse_map()
+    names = [row[0] for row in cursor.execute("SELECT ticket_type FROM ticket_types")]
+    canonical = {name: reverse_map.get(name.lower(), name) for name in names}
+    cursor.executemany("INSERT OR IGNORE INTO ticket_types (ticket_type) VALUES (?)", [(name,) for name in set(canonical.values())])
+    ids = dict(cursor.execute("SELECT ticket_type, ticket_type_id FROM ticket_types").fetchall())
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS canonical_ticket_types (ticket_type_id INTEGER PRIMARY KEY, canonical_id INTEGER NOT NULL)")
+    cursor.execute("DELETE FROM canonical_ticket_types")
+    cursor.executemany("INSERT INTO canonical_ticket_types (ticket_type_id, canonical_id) VALUES (?, ?)",
+                       [(ids[name], ids[canonical_name]) for name, canonical_name in canonical.items()])
+
+def _refresh_daily_prices(cursor, rebuild: bool = False) -> int:
+    """
+    Recomputes the `daily_prices` rows of every day in `daily_prices_stale` (of every day with
+    prices, if `rebuild`) and clears it. Returns the number of summary rows written.
+    """
+    _create_canonical_ticket_types(cursor)
+    if rebuild:
+        cursor.execute("DELETE FROM daily_prices")
+        showings = "showings s"
+    else:
+        cursor.execute('''
+            DELETE FROM daily_prices WHERE rowid IN (
+                SELECT d.rowid FROM daily_prices_stale x
+                JOIN daily_prices d ON d.theater_id = x.theater_id AND d.play_date = x.play_date AND d.film_title_id = x.film_title_id)
+        ''')
+        showings = ("daily_prices_stale x JOIN showings s "
+                    "ON s.theater_id = x.theater_id AND s.play_date = x.play_date AND s.film_title_id = x.film_title_id")
+    cursor.execute(f'''
+        INSERT INTO daily_prices (play_date, theater_id, film_title_id, format_id, daypart, ticket_type_id, is_plf,
+                                  min_price, max_price, price_sum, price_count, sold_out_count, distinct_prices, last_run_id)
+        SELECT s.play_date, s.theater_id, s.film_title_id, s.format_id, s.daypart, c.canonical_id, MAX(s.is_plf),
+               MIN(p.price), MAX(p.price), SUM(p.price), COUNT(*), COUNT(CASE WHEN p.capacity = 'Sold Out' THEN 1 END), GROUP_CONCAT(DISTINCT p.price), MAX(o.run_id)
+        FROM {showings}
+        JOIN price_facts p ON p.showing_id = s.showing_id
+        JOIN showing_runs o ON o.showing_id = p.showing_id AND o.run_id BETWEEN p.first_seen_run AND p.last_seen_run
+        JOIN canonical_ticket_types c ON c.ticket_type_id = p.ticket_type_id
+        WHERE +o.run_id IN (SELECT run_id FROM scrape_runs) -- A filter, not where the join starts
+        GROUP BY s.play_date, s.theater_id, s.film_title_id, s.format_id, s.daypart, c.canonical_id
+    ''')
+    written = cursor.rowcount
+    cursor.execute("DELETE FROM daily_prices_stale")
+    return written
+
+def _refresh_stale_daily_prices(conn):
+    """Brings `daily_prices` up to date with writes that only marked their days stale, before it's read."""
+    if conn.execute("SELECT EXISTS (SELECT 1 FROM daily_prices_stale)").fetchone()[0]:
+        _refresh_daily_prices(conn.cursor())
+        conn.commit()
+
+def rebuild_daily_prices() -> int:
+    """Recomputes the whole daily price summary, e.g. after the ticket type mappings change. Returns its row count."""
+    with _get_db_connection() as conn:
+        written = _refresh_daily_prices(conn.cursor(), rebuild=True)
+        conn.commit()
+    print(f"  [DB] Rebuilt the daily price summary: {written} rows.")
+    return written
+
+def get_daily_price_summary(start_date, end_date, theaters=None, films=None, genres=None) -> pd.DataFrame:
+    """
+    The daily price summary rows with play dates in [start_date, end_date], with optional
+    theater, film and genre filters. `avg_price` is price_sum / price_count and `prices` the
+    sorted distinct prices; sum the counts and sums to aggregate over several rows.
+    """
+    with _get_db_connection() as conn:
+        _refresh_stale_daily_prices(conn)
+        query = '''
+            SELECT play_date, theater_id, film_title_id, format_id, daypart, ticket_type_id, is_plf, min_price, max_price,
+                   price_sum, price_count, sold_out_count, distinct_prices, last_run_id
+            FROM daily_prices
+            WHERE play_date BETWEEN ? AND ?
+        '''
+        params = [str(start_date), str(end_date)]
+        if theaters:
+            clause, clause_params = _dimension_filter('theater_id', 'theaters', theaters)
+            query += clause
+            params.extend(clause_params)
+        if films:
+            clause, clause_params = _dimension_filter('film_title_id', 'film_titles', films)
+            query += clause
+            params.extend(clause_params)
+        if genres:
+            query += f" AND film_title_id IN (SELECT f.film_title_id FROM films f WHERE {' OR '.join(['f.genre LIKE ?'] * len(genres))})"
+            params.extend([f"%{g}%" for g in genres])
+
+        keyed = pd.read_sql_query(query, conn, params=params)
+        df = pd.DataFrame({
+            'play_date': keyed['play_date'],
+            'theater_name': _lookup_column(conn, keyed['theater_id'], 'theaters', 'theater_id', 'theater_name'),
+            'film_title': _lookup_column(conn, keyed['film_title_id'], 'film_titles', 'film_title_id', 'film_title'),
+            'release_date': _lookup_column(conn, keyed['film_title_id'], 'films', 'film_title_id', 'release_date'),
+            'format': _lookup_column(conn, keyed['format_id'], 'formats', 'format_id', 'format'),
+            'daypart': keyed['daypart'],
+            'ticket_type': _lookup_column(conn, keyed['ticket_type_id'], 'ticket_types', 'ticket_type_id', 'ticket_type'),
+            'is_plf': keyed['is_plf'],
+            'min_price': keyed['min_price'],
+            'max_price': keyed['max_price'],
+            'avg_price': keyed['price_sum'] / keyed['price_count'],
+            'price_sum': keyed['price_sum'],
+            'price_count': keyed['price_count'],
+            'sold_out_count': keyed['sold_out_count'],
+            'prices': [sorted(float(price) for price in prices.split(',')) for prices in keyed['distinct_prices']],
+            'run_timestamp': _lookup_column(conn, keyed['last_run_id'], 'scrape_runs', 'run_id', 'run_timestamp'),
+        })
+    return df
+
+def get_showing_counts(start_date, end_date, genres=None) -> pd.DataFrame:
+    """Distinct showtimes per (play_date, theater_name, film_title) in [start_date, end_date], priced or not, as `showings`."""
+    with _get_db_connection() as conn:
+        query = '''
+            SELECT play_date, theater_name, film_title, COUNT(DISTINCT showtime) AS showings
+            FROM showings
+            WHERE play_date BETWEEN ? AND ?
+        '''
+        params = [str(start_date), str(end_date)]
+        if genres:
+            query += f" AND film_title_id IN (SELECT f.film_title_id FROM films f WHERE {' OR '.join(['f.genre LIKE ?'] * len(genres))})"
+            params.extend([f"%{g}%" for g in genres])
+        query += " GROUP BY play_date, theater_name, film_title"
+        return pd.read_sql_query(query, conn, params=params)
+
+# --- Scrape journal: per-showing checkpoints so an interrupted run can resume ---
+JOURNAL_DISCOVERED = 'discovered'
+JOURNAL_ATTEMPTED = 'attempted'
+JOURNAL_SUCCEEDED = 'succeeded'
+JOURNAL_FAILED = 'failed'
+JOURNAL_SKIPPED = 'skipped' # Deliberately not scraped (deferred by a deadline plan or cut off); never resumed
+
+def _create_scrape_journal_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scrape_journal (
+            run_id INTEGER NOT NULL,
+            ticket_url TEXT NOT NULL,
+            theater_name TEXT,
+            film_title TEXT,
+            showtime TEXT,
+            play_date DATE,
+            showing_json TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (run_id, ticket_url),
+            FOREIGN KEY (run_id) REFERENCES scrape_runs (run_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_scrape_journal_status ON scrape_journal (run_id, status);')
+
+def journal_discovered_showings(run_id: int, showings: list[dict]):
+    """Records the showings a run intends to scrape. Showings already journaled for the run are left as-is."""
+    now = datetime.datetime.now()
+    rows = [
+        (run_id, s['ticket_url'], s.get('theater_name'), s.get('film_title'), s.get('showtime'), s.get('play_date'),
+         json.dumps(s, default=str), JOURNAL_DISCOVERED, now)
+        for s in showings if s.get('ticket_url')
+    ]
+    if not rows:
+        return
+    with _get_db_connection() as conn:
+        conn.executemany('''
+            INSERT OR IGNORE INTO scrape_journal
+                (run_id, ticket_url, theater_name, film_title, showtime, play_date, showing_json, status, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+
+def update_journal_status(run_id: int, ticket_urls: list[str], status: str, error: str | None = None):
+    """Moves journaled showings to a new status; moving to 'attempted' also counts an attempt."""
+    if not ticket_urls:
+        return
+    attempt_increment = 1 if status == JOURNAL_ATTEMPTED else 0
+    now = datetime.datetime.now()
+    with _get_db_connection() as conn:
+        conn.executemany(
+            "UPDATE scrape_journal SET status = ?, error = ?, attempts = attempts + ?, updated_at = ? WHERE run_id = ? AND ticket_url = ?",
+            [(status, error, attempt_increment, now, run_id, url) for url in ticket_urls]
+        )
+        conn.commit()
+
+def get_journal_remainder(run_id: int, max_attempts: int = 2) -> list[dict]:
+    """
+    Returns the showings of a run that still need scraping: never finished, or failed
+    with attempts to spare. Showings are returned as they were journaled.
+    """
+    with _get_db_connection() as conn:
+        cursor = conn.execute(
+            "SELECT showing_json FROM scrape_journal WHERE run_id = ? AND (status IN (?, ?) OR (status = ? AND attempts < ?))",
+            (run_id, JOURNAL_DISCOVERED, JOURNAL_ATTEMPTED, JOURNAL_FAILED, max_attempts)
+        )
+        return [json.loads(row[0]) for row in cursor.fetchall()]
+
+def get_journal_summary(run_id: int) -> dict:
+    """Returns {status: count} for a run's journal."""
+    with _get_db_connection() as conn:
+        cursor = conn.execute("SELECT status, COUNT(*) FROM scrape_journal WHERE run_id = ? GROUP BY status", (run_id,))
+        return dict(cursor.fetchall())
+
+def set_scrape_run_cutoff(run_id: int, cutoff_at: datetime.datetime):
+    """Records the time after which a run must not take new showings, so it isn't resumed past it."""
+    with _get_db_connection() as conn:
+        conn.execute("UPDATE scrape_runs SET cutoff_at = ? WHERE run_id = ?", (cutoff_at, run_id))
+        conn.commit()
+
+def find_resumable_scrape_run(mode: str, context: str | None = None, since: datetime.datetime | None = None,
+                              ticket_urls: set | None = None, max_attempts: int = 2) -> int | None:
+    """
+    Finds the most recent run of `mode` (and `context`, if given) started after `since`
+    whose journal still has unfinished showings and whose cutoff, if it has one, hasn't
+    passed. If `ticket_urls` is given, the run's journal must cover exactly those
+    showings, so a different selection starts fresh.
+    """
+    query = "SELECT run_id FROM scrape_runs WHERE mode = ? AND (cutoff_at IS NULL OR cutoff_at > ?)"
+    params = [mode, datetime.datetime.now()]
+    if context is not None:
+        query += " AND run_context = ?"
+        params.append(context)
+    if since is not None:
+        query += " AND run_timestamp >= ?"
+        params.append(since)
+    query += " ORDER BY run_id DESC LIMIT 5"
+
+    with _get_db_connection() as conn:
+        for (run_id,) in conn.execute(query, params).fetchall():
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM scrape_journal WHERE run_id = ? AND (status IN (?, ?) OR (status = ? AND attempts < ?))",
+                (run_id, JOURNAL_DISCOVERED, JOURNAL_ATTEMPTED, JOURNAL_FAILED, max_attempts)
+            ).fetchone()[0]
+            if not pending:
+                continue
+            if ticket_urls is not None:
+                journaled = {row[0] for row in conn.execute("SELECT ticket_url FROM scrape_journal WHERE run_id = ?", (run_id,))}
+                if journaled != set(ticket_urls):
+                    continue
+            return run_id
+    return None
+
+# --- Scrape latency history: per-theater seconds per page, used to plan and estimate runs ---
+LATENCY_HISTORY_WEIGHT = 200 # Samples the stored average counts as when a new run is folded in
+
+def _create_scrape_latency_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scrape_latency (
+            theater_name TEXT NOT NULL,
+            phase TEXT NOT NULL,
+            samples INTEGER NOT NULL,
+            avg_seconds REAL NOT NULL,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (theater_name, phase)
+        )
+    ''')
+
+def record_scrape_latencies(phase: str, samples: dict[str, tuple[int, float]]):
+    """
+    Folds one run's `{theater_name: (pages, total_seconds)}` for `phase` ("showtimes" or "prices")
+    into the stored per-theater averages. Older history is capped at LATENCY_HISTORY_WEIGHT samples,
+    so the average follows a theater whose site gets faster or slower.
+    """
+    rows = [(name, count, total) for name, (count, total) in samples.items() if count > 0]
+    if not rows:
+        return
+    now = datetime.datetime.now()
+    with _get_db_connection() as conn:
+        stored = {row[0]: (row[1], row[2]) for row in conn.execute(
+            "SELECT theater_name, samples, avg_seconds FROM scrape_latency WHERE phase = ?", (phase,))}
+        updates = []
+        for name, count, total in rows:
+            old_samples, old_avg = stored.get(name, (0, 0.0))
+            weight = min(old_samples, LATENCY_HISTORY_WEIGHT)
+            updates.append((name, phase, old_samples + count, (old_avg * weight + total) / (weight + count), now))
+        conn.executemany('''
+            INSERT INTO scrape_latency (theater_name, phase, samples, avg_seconds, updated_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(theater_name, phase) DO UPDATE SET
+                samples = excluded.samples, avg_seconds = excluded.avg_seconds, updated_at = excluded.updated_at
+        ''', updates)
+        conn.commit()
+
+def get_scrape_latencies(phase: str) -> dict[str, float]:
+    """Returns {theater_name: average seconds per page} for `phase`."""
+    with _get_db_connection() as conn:
+        return dict(conn.execute("SELECT theater_name, avg_seconds FROM scrape_latency WHERE phase = ?", (phase,)).fetchall())
+
+def get_showings_per_day(theater_list: list[str] | None = None) -> dict[str, float]:
+    """Returns {theater_name: average showings per play date} from the showings history."""
+    query = "SELECT theater_name, COUNT(*) * 1.0 / COUNT(DISTINCT play_date) FROM showings"
+    params = []
+    if theater_list:
+        query += f" WHERE theater_name IN ({','.join(['?'] * len(theater_list))})"
+        params = list(theater_list)
+    query += " GROUP BY theater_name"
+    with _get_db_connection() as conn:
+        return dict(conn.execute(query, params).fetchall())
+
+# --- Learned price rules: (theater, ticket type, daypart, format) -> price, see app/price_rules.py ---
+def _create_price_rules_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS price_rules (
+            theater_name TEXT NOT NULL,
+            ticket_type TEXT NOT NULL,
+            daypart TEXT NOT NULL,
+            format TEXT NOT NULL,
+            price REAL NOT NULL,
+            confidence REAL NOT NULL,
+            observed_days INTEGER NOT NULL,
+            last_verified DATE NOT NULL,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (theater_name, ticket_type, daypart, format)
+        )
+    ''')
+
+def refresh_price_rules(theater_list: list[str] | None = None, lookback_days: int | None = None,
+                        today: datetime.date | None = None) -> int:
+    """
+    Re-derives the price rules of `theater_list` (every theater if None) from the scraped prices of the
+    last `lookback_days` play dates. A rule's price is the most common price on its latest scraped play
+    date, which is also its last verified date; its confidence is the share of the window's price points
+    at that price. Inferred prices are ignored, so rules only learn from pages that were actually loaded.
+    Returns the number of rules stored.
+    """
+    lookback_days = lookback_days or config.PRICE_RULES_LOOKBACK_DAYS
+    today = today or datetime.date.today()
+    query = """
+        SELECT s.theater_name, p.ticket_type, COALESCE(s.daypart, ''), COALESCE(s.format, '2D'), s.play_date,
+               ROUND(p.price, 2), COUNT(*)
+        FROM prices p JOIN showings s ON p.showing_id = s.showing_id
+        WHERE COALESCE(p.inferred, 0) = 0 AND s.play_date BETWEEN ? AND ?
+    """
+    params = [(today - datetime.timedelta(days=lookback_days)).isoformat(), today.isoformat()]
+    placeholders = ','.join(['?'] * len(theater_list or []))
+    if theater_list:
+        query += f" AND s.theater_name IN ({placeholders})"
+        params += list(theater_list)
+    query += " GROUP BY 1, 2, 3, 4, 5, 6"
+
+    with _get_db_connection() as conn:
+        history = {}
+        for theater, ticket_type, daypart, fmt, play_date, price, count in conn.execute(query, params):
+            history.setdefault((theater, ticket_type, daypart, fmt), []).append((str(play_date)[:10], price, count))
+
+        now = datetime.datetime.now()
+        rules = []
+        for key, observations in history.items():
+            latest = max(play_date for play_date, _, _ in observations)
+            latest_counts = {}
+            for play_date, price, count in observations:
+                if play_date == latest:
+                    latest_counts[price] = latest_counts.get(price, 0) + count
+            rule_price = max(latest_counts, key=latest_counts.get)
+            agreeing = sum(count for _, price, count in observations if price == rule_price)
+            total = sum(count for _, _, count in observations)
+            observed_days = len({play_date for play_date, _, _ in observations})
+            rules.append(key + (rule_price, agreeing / total, observed_days, latest, now))
+
+        if theater_list:
+            conn.execute(f"DELETE FROM price_rules WHERE theater_name IN ({placeholders})", list(theater_list))
+        else:
+            conn.execute("DELETE FROM price_rules")
+        conn.executemany('''
+            INSERT INTO price_rules (theater_name, ticket_type, daypart, format, price, confidence, observed_days,
+                                     last_verified, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rules)
+        conn.commit()
+    return len(rules)
+
+def get_price_rules(theater_list: list[str] | None = None) -> list[dict]:
+    """Returns the stored price rules of `theater_list` (every theater if None) as dicts."""
+    query = "SELECT theater_name, ticket_type, daypart, format, price, confidence, observed_days, last_verified FROM price_rules"
+    params = []
+    if theater_list:
+        query += f" WHERE theater_name IN ({','.join(['?'] * len(theater_list))})"
+        params = list(theater_list)
+    with _get_db_connection() as conn:
+        return pd.read_sql_query(query, conn, params=params).to_dict('records')
+
+# The showing key save_prices matches price rows on, as frame columns and as staging columns
+_SHOWING_KEY_COLUMNS = {'play_date': 'play_date', 'Theater Name': 'theater_name', 'Film Title': 'film_title',
+                        'Showtime': 'showtime', 'Format': 'format'}
+
+def _create_price_staging_tables(cursor):
+    """TEMP tables are per connection, so the pooled connection creates them once and save_prices clears them."""
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS staged_showings (
+            key_id INTEGER PRIMARY KEY,
+            play_date TEXT NOT NULL,
+            theater_name TEXT NOT NULL,
+            film_title TEXT NOT NULL,
+            showtime TEXT NOT NULL,
+            format TEXT NOT NULL,
+            showing_id INTEGER
+        )
+    ''')
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS staged_prices (
+            seq INTEGER PRIMARY KEY,
+            key_id INTEGER NOT NULL,
+            ticket_type TEXT NOT NULL,
+            price REAL NOT NULL,
+            capacity TEXT,
+            inferred INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS format_fallback (
+            showing_id INTEGER PRIMARY KEY,
+            play_date TEXT NOT NULL,
+            theater_name TEXT NOT NULL,
+            film_title TEXT NOT NULL,
+            showtime TEXT NOT NULL,
+            new_format TEXT NOT NULL,
+            UNIQUE (play_date, theater_name, film_title, showtime)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS staged_values (
+            showing_id INTEGER NOT NULL,
+            ticket_type_id INTEGER NOT NULL,
+            price REAL NOT NULL,
+            capacity TEXT,
+            inferred INTEGER NOT NULL,
+            seq INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS temp.idx_staged_values_showing_id ON staged_values (showing_id, ticket_type_id);')
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS staged_runs (
+            showing_id INTEGER PRIMARY KEY,
+            prev_run INTEGER,
+            next_run INTEGER,
+            seen INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE TEMP TABLE IF NOT EXISTS split_facts (price_id INTEGER PRIMARY KEY, next_run INTEGER NOT NULL)')
+
+def _clear_price_staging_tables(cursor):
+    for table in ('staged_showings', 'staged_prices', 'format_fallback', 'staged_values', 'staged_runs', 'split_facts'):
+        cursor.execute(f"DELETE FROM {table}")
+
+def _stage_price_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Splits the price frame into its distinct showing keys and its price rows, which refer to
+    them by `key_id`. Everything is column-wise; there's no per-row Python.
+    """
+    staged = df[list(_SHOWING_KEY_COLUMNS)].rename(columns=_SHOWING_KEY_COLUMNS)
+    staged['ticket_type'] = df['Ticket Type'] if 'Ticket Type' in df.columns else None
+    prices = df['Price'] if 'Price' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    staged['price'] = pd.to_numeric(prices.astype(str).str.replace('$', '', regex=False).str.strip(), errors='coerce')
+    staged['capacity'] = df['Capacity'] if 'Capacity' in df.columns else None
+    staged['inferred'] = df['Inferred'].eq(True).astype(int) if 'Inferred' in df.columns else 0
+    staged = staged.dropna(subset=list(_SHOWING_KEY_COLUMNS.values())) # Rows without a full showing key never matched a showing
+    staged['play_date'] = staged['play_date'].astype(str)
+
+    invalid = staged['price'].isna() | staged['ticket_type'].isna()
+    if invalid.any():
+        print(f"  [DB] [WARN] Skipping {int(invalid.sum())} price records with a missing ticket type or unparseable price, "
+              f"e.g. {df.loc[staged.index[invalid][:3]].to_dict('records')}")
+    staged = staged[~invalid]
+
+    key_columns = list(_SHOWING_KEY_COLUMNS.values())
+    staged['key_id'] = staged.groupby(key_columns, sort=False).ngroup()
+    staged['seq'] = range(len(staged))
+    showings = staged.drop_duplicates('key_id')[['key_id'] + key_columns]
+    return showings, staged[['seq', 'key_id', 'ticket_type', 'price', 'capacity', 'inferred']]
+
+def _bulk_insert(cursor, table: str, frame: pd.DataFrame):
+    columns = [frame[column].tolist() for column in frame.columns] # Python scalars, which sqlite3 binds directly
+    cursor.executemany(f"INSERT INTO {table} ({', '.join(frame.columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                       zip(*columns))
+
 def save_prices(run_id: int, df: pd.DataFrame):
-    """Saves a DataFrame of scraped prices to the database for a given run_id."""
+    """
+    Saves a DataFrame of scraped prices to the database for a given run_id.
+
+    The frame is bulk-loaded into TEMP staging tables (its distinct showings, and its price rows
+    keyed to them). Every step after that is a set-based statement against `showings`:
+    1. Each staged showing is matched on (play_date, theater, film, showtime, format).
+    2. A showing whose format didn't match falls back to the 2D showing at the same time. That
+       showing's format is rewritten to the scraped formats, as the ticketing page knows better.
+    3. The price rows of matched showings are written to `price_facts` (see `_save_staged_prices`):
+       with `config.PRICE_INTERVALS`, an unchanged price extends its interval instead of adding a row.
+    4. The `daily_prices` rows of the days those showings play are recomputed.
+    """
+    df = df.loc[:, ~df.columns.duplicated()] # Frames read back from a joined query can repeat play_date
     if 'play_date' not in df.columns or df['play_date'].isnull().all():
         print("  [DB] [ERROR] save_prices was called with a DataFrame missing 'play_date' data. Aborting save.")
         return
 
+    staged_showings, staged_prices = _stage_price_frame(df)
+    if staged_showings.empty:
+        print("  [DB] No valid showings in the DataFrame to save prices for.")
+        return
+
     with _get_db_connection() as conn:
-        # --- OPTIMIZATION: Fetch all showing_ids in one go to avoid N+1 queries ---
-        unique_showings_df = df[['play_date', 'Theater Name', 'Film Title', 'Showtime', 'Format']].drop_duplicates().dropna()
-        if unique_showings_df.empty:
-            print("  [DB] No valid showings in the DataFrame to save prices for.")
-            return
+        cursor = conn.cursor()
+        _create_price_staging_tables(cursor)
+        _clear_price_staging_tables(cursor)
+        _bulk_insert(cursor, 'staged_showings', staged_showings)
+        _bulk_insert(cursor, 'staged_prices', staged_prices)
 
-        # Build a single large query to fetch all relevant showing_ids
-        conditions = " OR ".join(["(play_date = ? AND theater_name = ? AND film_title = ? AND showtime = ? AND format = ?)" for _ in range(len(unique_showings_df))])
-        params = [item for sublist in unique_showings_df.to_numpy() for item in sublist]
-        query = f"SELECT showing_id, play_date, theater_name, film_title, showtime, format FROM showings WHERE {conditions}"
-        
-        db_showings_df = pd.read_sql_query(query, conn, params=params)
-
-        # Create a lookup map from a tuple of showing details to its showing_id
-        db_showings_df['lookup_key'] = db_showings_df.apply(lambda row: (row['play_date'], row['theater_name'], row['film_title'], row['showtime'], row['format']), axis=1)
-        showing_id_map = db_showings_df.set_index('lookup_key')['showing_id'].to_dict()
-
-        # --- NEW: Logic to update formats for unmatched showings ---
-        df['lookup_key_with_format'] = df.apply(lambda row: (row['play_date'], row['Theater Name'], row['Film Title'], row['Showtime'], row['Format']), axis=1)
-        unmatched_mask = ~df['lookup_key_with_format'].isin(showing_id_map.keys())
-
-        if unmatched_mask.any():
-            unmatched_df = df[unmatched_mask].copy()
-            unmatched_keys_no_format = unmatched_df[['play_date', 'Theater Name', 'Film Title', 'Showtime']].drop_duplicates()
-
-            if not unmatched_keys_no_format.empty:
-                conditions = " OR ".join(["(play_date = ? AND theater_name = ? AND film_title = ? AND showtime = ?)" for _ in range(len(unmatched_keys_no_format))])
-                params = [item for sublist in unmatched_keys_no_format.to_numpy() for item in sublist]
-                
-                query = f"SELECT showing_id, play_date, theater_name, film_title, showtime FROM showings WHERE format = '2D' AND ({conditions})"
-                updatable_showings_df = pd.read_sql_query(query, conn, params=params)
-
-                if not updatable_showings_df.empty:
-                    new_format_map = unmatched_df.groupby(['play_date', 'Theater Name', 'Film Title', 'Showtime'])['Format'].apply(lambda x: ", ".join(sorted(list(set(x))))).to_dict()
-                    
-                    updates_to_make = {}
-                    for _, db_row in updatable_showings_df.iterrows():
-                        key = (db_row['play_date'], db_row['theater_name'], db_row['film_title'], db_row['showtime'])
-                        new_format = new_format_map.get(key)
-                        
-                        if new_format and new_format != '2D':
-                            updates_to_make[db_row['showing_id']] = new_format
-                            
-                            unmatched_formats_for_key = unmatched_df[(unmatched_df['play_date'] == key[0]) & (unmatched_df['Theater Name'] == key[1]) & (unmatched_df['Film Title'] == key[2]) & (unmatched_df['Showtime'] == key[3])]['Format'].unique()
-                            for fmt in unmatched_formats_for_key:
-                                showing_id_map[(key[0], key[1], key[2], key[3], fmt)] = db_row['showing_id']
-
-                    if updates_to_make:
-                        unique_updates = [(fmt, sid) for sid, fmt in updates_to_make.items()]
-                        cursor = conn.cursor()
-                        cursor.executemany("UPDATE showings SET format = ? WHERE showing_id = ?", unique_updates)
-                        conn.commit()
-                        print(f"  [DB] Updated format for {cursor.rowcount} showings from price scrape data.")
-
-        df.drop(columns=['lookup_key_with_format'], inplace=True, errors='ignore')
-
-        # Prepare the data for bulk insertion
-        prices_to_insert = []
-        for _, row in df.iterrows():
-            lookup_key = (row['play_date'], row['Theater Name'], row['Film Title'], row['Showtime'], row['Format'])
-            showing_id = showing_id_map.get(lookup_key)
-            
-            if showing_id:
-                try:
-                    prices_to_insert.append((
-                        run_id,
-                        showing_id,
-                        row['Ticket Type'],
-                        float(row['Price'].replace('$', '')),
-                        row['Capacity']
-                    ))
-                except (ValueError, KeyError) as e:
-                    print(f"  [DB] [WARN] Skipping price record due to missing data: {row}. Error: {e}")
-
-        total_inserted = 0
-        if prices_to_insert:
-            cursor = conn.cursor()
-            cursor.executemany("INSERT INTO prices (run_id, showing_id, ticket_type, price, capacity) VALUES (?, ?, ?, ?, ?)", prices_to_insert)
-            total_inserted = cursor.rowcount
+        # 1. Exact matches, through the showings UNIQUE(play_date, theater_name, film_title, showtime, format) index
+        cursor.execute('''
+            UPDATE staged_showings SET showing_id = (
+                SELECT s.showing_id FROM showings s
+                WHERE s.play_date = staged_showings.play_date AND s.theater_name = staged_showings.theater_name
+                  AND s.film_title = staged_showings.film_title AND s.showtime = staged_showings.showtime
+                  AND s.format = staged_showings.format)
+        ''')
+
+        # 2. Format fallback: an unmatched showing time whose 2D showing exists takes the scraped formats
+        cursor.execute('''
+            INSERT INTO format_fallback (play_date, theater_name, film_title, showtime, showing_id, new_format)
+            SELECT u.play_date, u.theater_name, u.film_title, u.showtime, s.showing_id, GROUP_CONCAT(u.format, ', ')
+            FROM (SELECT play_date, theater_name, film_title, showtime, format FROM staged_showings
+                  WHERE showing_id IS NULL ORDER BY play_date, theater_name, film_title, showtime, format) u
+            JOIN showings s ON s.play_date = u.play_date AND s.theater_name = u.theater_name
+                           AND s.film_title = u.film_title AND s.showtime = u.showtime AND s.format = '2D'
+            GROUP BY u.play_date, u.theater_name, u.film_title, u.showtime
+            HAVING GROUP_CONCAT(u.format, ', ') != '2D'
+        ''')
+        if cursor.rowcount > 0:
+            cursor.execute('''
+                UPDATE showings SET format = (SELECT f.new_format FROM format_fallback f WHERE f.showing_id = showings.showing_id)
+                WHERE showing_id IN (SELECT showing_id FROM format_fallback)
+            ''')
+            print(f"  [DB] Updated format for {cursor.rowcount} showings from price scrape data.")
+            cursor.execute('''
+                UPDATE staged_showings SET showing_id = (
+                    SELECT f.showing_id FROM format_fallback f
+                    WHERE f.play_date = staged_showings.play_date AND f.theater_name = staged_showings.theater_name
+                      AND f.film_title = staged_showings.film_title AND f.showtime = staged_showings.showtime)
+                WHERE showing_id IS NULL
+            ''')
+
+        # 3. Set-based writes of the matched price rows into price_facts intervals, in the frame's row order
+        cursor.execute("INSERT OR IGNORE INTO ticket_types (ticket_type) SELECT DISTINCT ticket_type FROM staged_prices")
+        saved, opened, extended = _save_staged_prices(cursor, run_id, config.PRICE_INTERVALS)
+
+        # 4. Refresh the daily price summary for the days these showings play
+        cursor.execute('''
+            INSERT OR IGNORE INTO daily_prices_stale (play_date, theater_id, film_title_id)
+            SELECT DISTINCT s.play_date, s.theater_id, s.film_title_id FROM staged_runs r JOIN showings s ON s.showing_id = r.showing_id
+        ''')
+        _refresh_daily_prices(cursor)
+        _clear_price_staging_tables(cursor)
         conn.commit()
-        print(f"  [DB] Saved {total_inserted} price records to database for run ID {run_id}.")
+        print(f"  [DB] Saved {saved} price records to database for run ID {run_id} "
+              f"({opened} new price intervals, {extended} extended).")
+
+# A price_facts row `f` holding the same (ticket type, price, capacity, inferred) as a staged value `v`
+_SAME_PRICE_VALUE = ("f.ticket_type_id = v.ticket_type_id AND f.price = v.price "
+                     "AND f.capacity IS v.capacity AND f.inferred IS v.inferred")
+
+def _save_staged_prices(cursor, run_id: int, intervals: bool) -> tuple[int, int, int]:
+    """
+    Writes the staged price rows of matched showings as run `run_id`, returning how many price
+    records the run saved, how many intervals it opened and how many it extended.
+
+    With `intervals`, a value a showing still has since the last run that scraped it extends that
+    interval to this run (or, for a run saved late, back from the next run that scraped it), and
+    only changed values open a new one. Identical rows in one run are
+    one value. Without it, every row opens a single-run interval, one row per run as before.
+
+    Runs can be saved out of order. A showing this run is the first to save, inside an interval
+    whose value it doesn't have (any interval, without `intervals`), splits that interval around
+    the run so the `prices` view doesn't repeat the old value for it.
+    """
+    cursor.execute('''
+        INSERT INTO staged_values (showing_id, ticket_type_id, price, capacity, inferred, seq)
+        SELECT k.showing_id, t.ticket_type_id, p.price, p.capacity, p.inferred, MIN(p.seq)
+        FROM staged_prices p JOIN staged_showings k ON k.key_id = p.key_id
+        JOIN ticket_types t ON t.ticket_type = p.ticket_type
+        WHERE k.showing_id IS NOT NULL
+        GROUP BY k.showing_id, t.ticket_type_id, p.price, p.capacity, p.inferred
+    ''')
+    cursor.execute('''
+        INSERT INTO staged_runs (showing_id, prev_run, next_run, seen)
+        SELECT v.showing_id,
+               (SELECT MAX(o.run_id) FROM showing_runs o WHERE o.showing_id = v.showing_id AND o.run_id < :run),
+               (SELECT MIN(o.run_id) FROM showing_runs o WHERE o.showing_id = v.showing_id AND o.run_id > :run),
+               EXISTS (SELECT 1 FROM showing_runs o WHERE o.showing_id = v.showing_id AND o.run_id = :run)
+        FROM (SELECT DISTINCT showing_id FROM staged_values) v
+    ''', {'run': run_id})
+
+    # Split intervals spanning a run that is now seen with other values
+    unchanged = f"AND NOT EXISTS (SELECT 1 FROM staged_values v WHERE v.showing_id = f.showing_id AND {_SAME_PRICE_VALUE})"
+    cursor.execute(f'''
+        INSERT INTO split_facts (price_id, next_run)
+        SELECT f.price_id, r.next_run FROM price_facts f JOIN staged_runs r ON r.showing_id = f.showing_id
+        WHERE NOT r.seen AND f.first_seen_run < :run AND f.last_seen_run > :run {unchanged if intervals else ''}
+    ''', {'run': run_id})
+    if cursor.rowcount > 0:
+        cursor.execute('''
+            INSERT INTO price_facts (first_seen_run, last_seen_run, showing_id, ticket_type_id, price, capacity, play_date, inferred)
+            SELECT s.next_run, f.last_seen_run, f.showing_id, f.ticket_type_id, f.price, f.capacity, f.play_date, f.inferred
+            FROM split_facts s JOIN price_facts f ON f.price_id = s.price_id ORDER BY f.price_id
+        ''')
+        cursor.execute('''
+            UPDATE price_facts SET last_seen_run = (SELECT r.prev_run FROM staged_runs r WHERE r.showing_id = price_facts.showing_id)
+            WHERE price_id IN (SELECT price_id FROM split_facts)
+        ''')
+
+    if intervals:
+        covered = (f"EXISTS (SELECT 1 FROM price_facts f WHERE f.showing_id = v.showing_id AND {_SAME_PRICE_VALUE} "
+                   f"AND :run BETWEEN f.first_seen_run AND f.last_seen_run)")
+        saved = cursor.execute("SELECT COUNT(*) FROM staged_values").fetchone()[0]
+        cursor.execute(f'''
+            UPDATE price_facts SET last_seen_run = :run
+            WHERE price_id IN (
+                SELECT MIN(f.price_id) FROM staged_values v
+                JOIN staged_runs r ON r.showing_id = v.showing_id
+                JOIN price_facts f ON f.showing_id = v.showing_id AND f.last_seen_run = r.prev_run AND {_SAME_PRICE_VALUE}
+                WHERE NOT {covered}
+                GROUP BY v.showing_id, v.ticket_type_id, v.price, v.capacity, v.inferred)
+        ''', {'run': run_id})
+        extended = cursor.rowcount
+        cursor.execute(f'''
+            UPDATE price_facts SET first_seen_run = :run
+            WHERE price_id IN (
+                SELECT MIN(f.price_id) FROM staged_values v
+                JOIN staged_runs r ON r.showing_id = v.showing_id
+                JOIN price_facts f ON f.showing_id = v.showing_id AND f.first_seen_run = r.next_run AND {_SAME_PRICE_VALUE}
+                WHERE NOT {covered}
+                GROUP BY v.showing_id, v.ticket_type_id, v.price, v.capacity, v.inferred)
+        ''', {'run': run_id})
+        extended += cursor.rowcount
+        cursor.execute(f'''
+            INSERT INTO price_facts (first_seen_run, last_seen_run, showing_id, ticket_type_id, price, capacity, inferred)
+            SELECT :run, :run, v.showing_id, v.ticket_type_id, v.price, v.capacity, v.inferred
+            FROM staged_values v WHERE NOT {covered} ORDER BY v.seq
+        ''', {'run': run_id})
+        opened = cursor.rowcount
+    else:
+        cursor.execute('''
+            INSERT INTO price_facts (first_seen_run, last_seen_run, showing_id, ticket_type_id, price, capacity, inferred)
+            SELECT :run, :run, k.showing_id, t.ticket_type_id, p.price, p.capacity, p.inferred
+            FROM staged_prices p JOIN staged_showings k ON k.key_id = p.key_id
+            JOIN ticket_types t ON t.ticket_type = p.ticket_type
+            WHERE k.showing_id IS NOT NULL ORDER BY p.seq
+        ''', {'run': run_id})
+        saved = opened = cursor.rowcount
+        extended = 0
+
+    cursor.execute("INSERT OR IGNORE INTO showing_runs (showing_id, run_id) SELECT showing_id, :run FROM staged_runs", {'run': run_id})
+    return saved, opened, extended
 
 def get_scrape_runs():
     """Fetches all historical scrape runs from the database."""
@@ -380,37 +1264,52 @@ def query_historical_data(start_date, end_date, theaters=None, films=None, genre
     with _get_db_connection() as conn:
         query = '''
             SELECT 
-                s.theater_name, s.film_title, s.showtime, s.daypart, s.format, 
-                p.ticket_type, p.price, p.capacity, s.play_date, r.run_timestamp
+                s.theater_id, s.film_title_id, s.showtime, s.daypart, s.format_id, 
+                p.ticket_type_id, p.price, p.capacity, s.play_date, o.run_id
             FROM showings s
-            LEFT JOIN prices p ON s.showing_id = p.showing_id
-            LEFT JOIN scrape_runs r ON p.run_id = r.run_id
+            LEFT JOIN price_facts p ON s.showing_id = p.showing_id
+            LEFT JOIN showing_runs o ON o.showing_id = p.showing_id AND o.run_id BETWEEN p.first_seen_run AND p.last_seen_run
+            WHERE s.play_date BETWEEN ? AND ?
         '''
-        if genres or ratings:
-            query += " JOIN films f ON s.film_title = f.film_title"
-
-        query += " WHERE s.play_date BETWEEN ? AND ?"
         params = [start_date, end_date]
 
         if theaters:
-            query += f" AND s.theater_name IN ({','.join(['?']*len(theaters))})"
-            params.extend(theaters)
+            clause, clause_params = _dimension_filter('s.theater_id', 'theaters', theaters)
+            query += clause
+            params.extend(clause_params)
         if films:
-            query += f" AND s.film_title IN ({','.join(['?']*len(films))})"
-            params.extend(films)
+            clause, clause_params = _dimension_filter('s.film_title_id', 'film_titles', films)
+            query += clause
+            params.extend(clause_params)
+        # Genre and rating filters pick films once, rather than joining films to every price row
+        film_filters = []
         if genres:
             genre_clauses = " OR ".join([f"f.genre LIKE ?" for _ in genres])
             if genre_clauses:
-                query += f" AND ({genre_clauses})"
+                film_filters.append(f"({genre_clauses})")
                 params.extend([f"%{g}%" for g in genres])
         if ratings:
             if len(ratings) > 0:
-                query += f" AND f.mpaa_rating IN ({','.join(['?']*len(ratings))})"
+                film_filters.append(f"f.mpaa_rating IN ({','.join(['?']*len(ratings))})")
                 params.extend(ratings)
-
-        query += " ORDER BY r.run_timestamp DESC, s.theater_name, s.film_title"
-        df = pd.read_sql_query(query, conn, params=params)
-    return df
+        if film_filters:
+            query += f" AND s.film_title_id IN (SELECT f.film_title_id FROM films f WHERE {' AND '.join(film_filters)})"
+
+        keyed = pd.read_sql_query(query, conn, params=params)
+        df = pd.DataFrame({
+            'theater_name': _lookup_column(conn, keyed['theater_id'], 'theaters', 'theater_id', 'theater_name'),
+            'film_title': _lookup_column(conn, keyed['film_title_id'], 'film_titles', 'film_title_id', 'film_title'),
+            'showtime': keyed['showtime'],
+            'daypart': keyed['daypart'],
+            'format': _lookup_column(conn, keyed['format_id'], 'formats', 'format_id', 'format'),
+            'ticket_type': _lookup_column(conn, keyed['ticket_type_id'], 'ticket_types', 'ticket_type_id', 'ticket_type'),
+            'price': keyed['price'],
+            'capacity': keyed['capacity'],
+            'play_date': keyed['play_date'],
+            'run_timestamp': _lookup_column(conn, keyed['run_id'], 'scrape_runs', 'run_id', 'run_timestamp'),
+        })
+    return df.sort_values(['run_timestamp', 'theater_name', 'film_title'], ascending=[False, True, True],
+                          kind='stable', na_position='last').reset_index(drop=True)
 
 def get_unique_column_values(column_name):
     """Gets all unique values from a column in the prices table."""
@@ -734,17 +1633,21 @@ def backfill_play_dates():
     """
     with _get_db_connection() as conn:
         cursor = conn.cursor()
+        if _table_type(cursor, 'prices') == 'table': # Legacy table during migrate_schema
+            table, run_column = 'prices', 'run_id'
+        else:
+            table, run_column = 'price_facts', 'first_seen_run'
 
         # First, count how many records need updating for user feedback.
-        count_query = "SELECT COUNT(*) FROM prices WHERE play_date IS NULL"
+        count_query = f"SELECT COUNT(*) FROM {table} WHERE play_date IS NULL"
         initial_null_count = cursor.execute(count_query).fetchone()[0]
 
         if initial_null_count == 0:
             return 0, 0 # No records to update
 
         # This single UPDATE statement is more efficient and robust.
-        update_query = """
-            UPDATE prices
+        update_query = f"""
+            UPDATE {table}
             SET play_date = (
                 SELECT 
                     CASE 
@@ -752,7 +1655,7 @@ def backfill_play_dates():
                         ELSE DATE(r.run_timestamp, '+1 day')
                     END
                 FROM scrape_runs r
-                WHERE r.run_id = prices.run_id
+                WHERE r.run_id = {table}.{run_column}
             )
             WHERE play_date IS NULL
         """
@@ -907,6 +1810,31 @@ def log_unmatched_ticket_type(original_description: str, unmatched_part: str, sh
               context.get('showtime'), context.get('format'), context.get('play_date')))
         conn.commit()
 
+def log_unmatched_ticket_types(entries: list[dict]):
+    """
+    Logs a batch of unmatched ticket type parts with one `executemany`. Each entry carries
+    `occurrences`; a part already logged for the same theater, film and date has its count
+    increased instead of being inserted again.
+    """
+    if not entries:
+        return
+    rows = [
+        (e['original_description'], e['unmatched_part'], e['first_seen'], e.get('theater_name'), e.get('film_title'),
+         e.get('showtime'), e.get('format'), e.get('play_date'), e.get('occurrences', 1), e.get('last_seen') or e['first_seen'])
+        for e in entries
+    ]
+    with _get_db_connection() as conn:
+        # OR IGNORE still covers old DBs whose table has a UNIQUE constraint on unmatched_part alone.
+        conn.executemany("""
+            INSERT OR IGNORE INTO unmatched_ticket_types
+            (original_description, unmatched_part, first_seen, theater_name, film_title, showtime, format, play_date, occurrences, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(unmatched_part, theater_name, film_title, play_date) DO UPDATE SET
+                occurrences = occurrences + excluded.occurrences,
+                last_seen = excluded.last_seen
+        """, rows)
+        conn.commit()
+
 def get_unmatched_ticket_types() -> pd.DataFrame:
     """Fetches all unmatched ticket types from the database."""
     with _get_db_connection() as conn:
@@ -976,18 +1904,20 @@ def get_comparable_films(film_title: str, film_genres: list[str]) -> pd.DataFram
         return pd.DataFrame()
 
     with _get_db_connection() as conn:
+        _refresh_stale_daily_prices(conn)
         genre_clauses = " OR ".join(["f.genre LIKE ?" for _ in film_genres])
+        # Prices come from the daily price summary; showings are those any run saved prices for
         query = f"""
             SELECT
                 f.film_title AS "Film Title",
                 f.domestic_gross AS "Box Office",
                 f.genre AS "Genre(s)",
                 f.imdb_rating AS "IMDb Rating",
-                AVG(p.price) as "Average Price",
-                COUNT(DISTINCT s.showing_id) as "Total Showings"
+                SUM(d.price_sum) / SUM(d.price_count) as "Average Price",
+                (SELECT COUNT(*) FROM showings s WHERE s.film_title_id = f.film_title_id
+                 AND s.showing_id IN (SELECT showing_id FROM showing_runs)) as "Total Showings"
             FROM films f
-            JOIN showings s ON f.film_title = s.film_title
-            JOIN prices p ON s.showing_id = p.showing_id
+            JOIN daily_prices d ON d.film_title_id = f.film_title_id
             WHERE ({genre_clauses}) AND f.film_title != ?
             GROUP BY f.film_title
             ORDER BY "Total Showings" DESC
@@ -1053,7 +1983,6 @@ def get_theater_comparison_summary(theater_list, start_date, end_date):
                 COUNT(DISTINCT s.film_title) as "Unique Films",
                 GROUP_CONCAT(DISTINCT s.format) as all_formats
             FROM showings s
-            LEFT JOIN prices p ON s.showing_id = p.showing_id
             WHERE s.theater_name IN ({placeholders})
             AND s.play_date BETWEEN ? AND ?
             GROUP BY s.theater_name
@@ -1061,15 +1990,16 @@ def get_theater_comparison_summary(theater_list, start_date, end_date):
         params = theater_list + [start_date, end_date]
         df = pd.read_sql_query(query, conn, params=params)
 
-        # --- NEW: Calculate average price separately with filtering ---
+        # --- Average core ticket price, from the daily price summary ---
+        _refresh_stale_daily_prices(conn)
         avg_price_query = f"""
-            SELECT s.theater_name, AVG(p.price) as "Overall Avg. Price"
-            FROM showings s
-            JOIN prices p ON s.showing_id = p.showing_id
-            WHERE s.theater_name IN ({placeholders})
-            AND s.play_date BETWEEN ? AND ?
-            AND p.ticket_type IN ('Adult', 'Senior', 'Child')
-            GROUP BY s.theater_name
+            SELECT t.theater_name, SUM(d.price_sum) / SUM(d.price_count) as "Overall Avg. Price"
+            FROM daily_prices d
+            JOIN theaters t ON t.theater_id = d.theater_id
+            WHERE t.theater_name IN ({placeholders})
+            AND d.play_date BETWEEN ? AND ?
+            AND d.ticket_type_id IN (SELECT ticket_type_id FROM ticket_types WHERE ticket_type IN ('Adult', 'Senior', 'Child'))
+            GROUP BY t.theater_name
         """
         avg_price_df = pd.read_sql_query(avg_price_query, conn, params=params)
 
@@ -1104,74 +2034,21 @@ def get_theater_comparison_summary(theater_list, start_date, end_date):
 def get_market_at_a_glance_data(theater_list: list[str], start_date: datetime.date, end_date: datetime.date, films: list[str] | None = None) -> tuple[pd.DataFrame, datetime.date | None]:
     """
     Fetches data for the 'Market At a Glance' report.
-    - Gets data from the specified date range.
-    - Joins showings and prices to get all necessary details.
-    - Returns the DataFrame and the most recent scrape date found.
+    - Reads the daily price summary for the specified date range, with canonical ticket types.
+    - Returns one row per distinct price of each (day, theater, film, format, daypart, ticket type),
+      and the most recent scrape date found.
     """
     if not theater_list:
         return pd.DataFrame(), None
 
-    start_date_str = start_date.strftime('%Y-%m-%d')
-    end_date_str = end_date.strftime('%Y-%m-%d')
-    with _get_db_connection() as conn:
-        placeholders = ",".join(["?"] * len(theater_list))
-
-        query = f"""
-            SELECT
-                s.theater_name,
-                s.film_title,
-                s.daypart,
-                f.release_date,
-                s.format,
-                s.is_plf,
-                p.ticket_type,
-                p.price,
-                r.run_timestamp
-            FROM prices p
-            JOIN showings s ON p.showing_id = s.showing_id
-            LEFT JOIN films f ON s.film_title = f.film_title
-            JOIN scrape_runs r ON p.run_id = r.run_id
-            WHERE s.theater_name IN ({placeholders})
-            AND s.play_date BETWEEN ? AND ?
-        """
-        params = theater_list + [start_date_str, end_date_str]
-
-        # --- NEW: Add film filter if provided ---
-        if films:
-            film_placeholders = ",".join(["?"] * len(films))
-            query += f" AND s.film_title IN ({film_placeholders})"
-            params.extend(films)
-
-        df = pd.read_sql_query(query, conn, params=params)
+    summary = get_daily_price_summary(start_date, end_date, theaters=theater_list, films=films)
+    df = summary.explode('prices').rename(columns={'prices': 'price'}).reset_index(drop=True)
+    df = df[['theater_name', 'film_title', 'daypart', 'release_date', 'format', 'is_plf', 'ticket_type', 'price', 'run_timestamp']]
+    df['price'] = df['price'].astype(float)
 
     latest_scrape_date = None
-    if not df.empty and 'run_timestamp' in df.columns:
-        latest_scrape_date = pd.to_datetime(df['run_timestamp']).max().date()
-
-    # --- NEW: Consolidate ticket types in memory for accurate reporting ---
     if not df.empty:
-        import json
-        import os
-        try:
-            ticket_types_path = os.path.join(os.path.dirname(__file__), 'ticket_types.json')
-            with open(ticket_types_path, 'r') as f:
-                ticket_types_data = json.load(f)
-            base_type_map = ticket_types_data.get('base_type_map', {})
-            
-            # Create a reverse map from variation to canonical name
-            reverse_map = {}
-            for canonical, variations in base_type_map.items():
-                reverse_map[canonical.lower()] = canonical
-                for variation in variations:
-                    reverse_map[variation.lower()] = canonical
-
-            # Apply the mapping. If a type isn't in the map, it keeps its original name.
-            df['ticket_type'] = df['ticket_type'].str.lower().map(reverse_map).fillna(df['ticket_type'])
-
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"  [DB-WARN] Could not consolidate ticket types for glance report. File missing or corrupt. Error: {e}")
-            # Continue with unconsolidated data if the mapping file is missing
-
+        latest_scrape_date = pd.to_datetime(df['run_timestamp']).max().date()
     return df, latest_scrape_date
 
 def _get_canonical_mystery_movie_name(title: str) -> str | None:
@@ -1244,6 +2121,7 @@ def upsert_showings(all_showings, play_date):
 
         omdb_client = OMDbClient()
         from app.scraper import Scraper # Local import to avoid circular dependency
+        from app.browser_pool import run_on_shared_loop
         for title in new_films_to_enrich:
             # --- NEW: Proactively check for and handle Mystery Movie patterns ---
             canonical_name = _get_canonical_mystery_movie_name(title)
@@ -1285,7 +2163,7 @@ def upsert_showings(all_showings, play_date):
                 # --- NEW: Fandango Search Fallback ---
                 print(f"  [Fandango Fallback] OMDb failed for '{title}'. Attempting Fandango search...")
                 scraper = Scraper()
-                fandango_search_results = asyncio.run(scraper.search_fandango_for_film_url(title))
+                fandango_search_results = run_on_shared_loop(scraper.search_fandango_for_film_url(title))
 
                 # Use the first result if it's a high-confidence match
                 if fandango_search_results:
@@ -1294,7 +2172,7 @@ def upsert_showings(all_showings, play_date):
                     # Use a high threshold to avoid incorrect matches
                     if fuzz.ratio(title.lower(), best_match['title'].lower()) > 85:
                         print(f"  [Fandango Fallback] Found match: '{best_match['title']}'. Scraping details...")
-                        fandango_details = asyncio.run(scraper.get_film_details_from_fandango_url(best_match['url']))
+                        fandango_details = run_on_shared_loop(scraper.get_film_details_from_fandango_url(best_match['url']))
                         if fandango_details:
                             fandango_details['film_title'] = title # Use original title as key
                             upsert_film_details(fandango_details)
@@ -1351,6 +2229,10 @@ def migrate_schema():
         # 1. Backfill play_dates in the old table first
         backfill_play_dates()
 
+        # One transaction from the rename to the drop, so a failure leaves the old table in place.
+        # init_database() runs inside it as a savepoint (see _get_db_connection).
+        cursor.execute("BEGIN")
+
         # 2. Rename old table
         cursor.execute("ALTER TABLE prices RENAME TO prices_old")
 
@@ -1386,6 +2268,7 @@ def migrate_schema():
 def consolidate_ticket_types() -> int:
     """
     Updates ticket types in the prices table to their canonical names based on ticket_types.json.
+    Rows are repointed at the canonical name's ticket_types key in price_facts.
     For example, if 'Child' is the canonical name for ['children', 'kid'], this function
     will update all records where ticket_type is 'children' or 'kid' to be 'Child'.
     Returns the number of rows updated.
@@ -1413,7 +2296,11 @@ def consolidate_ticket_types() -> int:
             variations_to_update = [v for v in variations if v != canonical_name]
             if variations_to_update:
                 placeholders = ','.join(['?'] * len(variations_to_update))
-                cursor.execute(f"UPDATE prices SET ticket_type = ? WHERE ticket_type IN ({placeholders})", [canonical_name] + variations_to_update)
+                cursor.execute("INSERT OR IGNORE INTO ticket_types (ticket_type) VALUES (?)", (canonical_name,))
+                cursor.execute(f"""
+                    UPDATE price_facts SET ticket_type_id = (SELECT ticket_type_id FROM ticket_types WHERE ticket_type = ?)
+                    WHERE ticket_type_id IN (SELECT ticket_type_id FROM ticket_types WHERE ticket_type IN ({placeholders}))
+                """, [canonical_name] + variations_to_update)
                 total_updated_count += cursor.rowcount
         conn.commit()
     return total_updated_count
@@ -0,0 +1,173 @@
+"""
+Per-thread pooled SQLite connections for the company database.
+
+`database._get_db_connection()` used to open a new connection on every call, and
+`with conn:` only commits, so every helper paid the connect cost and left its handle for
+the garbage collector. In the default rollback-journal mode, Streamlit readers also
+blocked the scraper's writes. `SQLiteConnectionPool` replaces that:
+
+- Each thread keeps one open connection and reuses it. The connection is reopened when
+  `config.DB_FILE` changes (switching company), after a fork, or if it was closed.
+- A new connection is configured with these PRAGMAs:
+  - WAL journaling, so readers and the writer don't block each other.
+  - `synchronous=NORMAL`, which is safe under WAL and skips an fsync per commit.
+  - A page cache and memory-mapped reads, sized by `DB_CACHE_SIZE_KB` and `DB_MMAP_SIZE`.
+  - A busy timeout, so a concurrent writer waits instead of raising "database is locked".
+- `with conn:` still commits or rolls back exactly as before; it just doesn't close the
+  pooled connection.
+- Nested use shares one connection. Before pooling, each `with _get_db_connection()` had its
+  own connection and transaction. Now a helper called inside another helper's `with` block
+  gets the same connection, so its `commit()` would commit the caller's unfinished work. See
+  `PooledConnection` for how nested blocks are kept apart.
+- `close_thread_connection()` closes the calling thread's connection. `close_all()`
+  closes every pooled connection and also runs at interpreter exit.
+"""
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from app import config
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    The pooled connection. A `with` block entered while the connection is already in a
+    transaction (a helper called from inside another helper's block) runs in a SAVEPOINT:
+
+    - `commit()` and a clean exit release the savepoint. The outer block's commit makes the
+      work durable.
+    - `rollback()` and an exception roll back only to the savepoint, so the caller's work is
+      kept.
+
+    Outermost blocks, and nested blocks entered outside a transaction, commit and roll back as
+    a plain connection does.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._savepoints = [] # One entry per open `with` block: its savepoint name, or None
+
+    def _savepoint(self) -> str | None:
+        return self._savepoints[-1] if self._savepoints else None
+
+    def __enter__(self):
+        name = None
+        if self._savepoints and self.in_transaction:
+            name = f"pooled_block_{len(self._savepoints)}"
+            self.execute(f"SAVEPOINT {name}")
+        self._savepoints.append(name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        name = self._savepoints.pop()
+        if name is None:
+            return super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            self.execute(f"ROLLBACK TO {name}")
+        self.execute(f"RELEASE {name}")
+        return False
+
+    def commit(self):
+        name = self._savepoint()
+        if name is None:
+            return super().commit()
+        self.execute(f"RELEASE {name}")
+        self.execute(f"SAVEPOINT {name}") # The block may keep writing after committing part of its work
+
+    def rollback(self):
+        name = self._savepoint()
+        if name is None:
+            return super().rollback()
+        self.execute(f"ROLLBACK TO {name}")
+
+
+class SQLiteConnectionPool:
+    """One reusable, tuned SQLite connection per thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {} # Thread ident -> connection, so close_all() reaches every thread's
+        self.stats = {"opened": 0, "reused": 0, "closed": 0}
+
+    def _configure(self, conn: sqlite3.Connection):
+        conn.execute(f"PRAGMA busy_timeout = {int(config.DB_BUSY_TIMEOUT_MS)}")
+        mode = conn.execute(f"PRAGMA journal_mode = {config.DB_JOURNAL_MODE}").fetchone()[0]
+        if mode.upper() != config.DB_JOURNAL_MODE.upper():
+            logger.warning(f"[DB] Could not switch to {config.DB_JOURNAL_MODE} journaling; using {mode}.")
+        conn.execute(f"PRAGMA synchronous = {config.DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size = {-int(config.DB_CACHE_SIZE_KB)}") # Negative: size in KiB, not pages
+        conn.execute(f"PRAGMA mmap_size = {int(config.DB_MMAP_SIZE)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+    def _usable(self, path: str) -> bool:
+        local = self._local
+        if getattr(local, 'conn', None) is None or local.path != path or local.pid != os.getpid():
+            return False
+        try:
+            local.conn.total_changes # Raises if the connection was closed
+        except sqlite3.ProgrammingError:
+            return False
+        return True
+
+    def connection(self, path: str) -> sqlite3.Connection:
+        """The calling thread's connection to `path`, opened and configured on first use."""
+        local = self._local
+        if self._usable(path):
+            local.conn.row_factory = None # A helper that set sqlite3.Row must not change what the next caller gets
+            self.stats["reused"] += 1
+            return local.conn
+
+        if getattr(local, 'conn', None) is not None and local.pid == os.getpid():
+            self.close_thread_connection()
+        conn = sqlite3.connect(path, timeout=config.DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                               factory=PooledConnection)
+        self._configure(conn)
+        local.conn, local.path, local.pid = conn, path, os.getpid()
+        with self._lock:
+            self._close_dead_threads()
+            self._connections[threading.get_ident()] = conn
+        self.stats["opened"] += 1
+        return conn
+
+    def _close_dead_threads(self):
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._close(self._connections.pop(ident))
+
+    def _close(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+            self.stats["closed"] += 1
+        except sqlite3.Error as e:
+            logger.warning(f"[DB] Error closing pooled connection: {e}")
+
+    def close_thread_connection(self):
+        """Closes the calling thread's pooled connection, if it has one."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            if self._connections.get(threading.get_ident()) is conn:
+                del self._connections[threading.get_ident()]
+        self._close(conn)
+
+    def close_all(self):
+        """Closes every thread's pooled connection. Only call it when no thread is mid-query, e.g. at shutdown."""
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+        for conn in connections:
+            self._close(conn)
+        self._local.conn = None
+
+
+_pool = SQLiteConnectionPool()
+atexit.register(_pool.close_all)
+
+
+def get_pool() -> SQLiteConnectionPool:
+    return _pool
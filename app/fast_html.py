@@ -0,0 +1,110 @@
+"""
+lxml-backed stand-in for the slice of BeautifulSoup the showtime parser uses.
+
+Most of the time spent parsing a theater page goes to BeautifulSoup's tree builder
+and soupsieve matching CSS selectors node by node in Python. `parse_html` builds the
+tree with lxml instead and exposes the same small API (`select`, `select_one`,
+`find`, `find_all`, `get_text`, `get`, `has_attr`, `[]`), translating the simple
+selectors the scraper uses (`tag.class`, `.class`, `tag[attr]`, descendant
+combinators and `,` lists) into compiled XPath. Without lxml installed it falls back
+to `BeautifulSoup(html, 'html.parser')`, so callers work unchanged either way.
+"""
+import re
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.etree
+    import lxml.html
+    HTML_BACKEND = "lxml"
+except ImportError:
+    HTML_BACKEND = "html.parser"
+
+_SIMPLE_SELECTOR_RE = re.compile(r'^([a-zA-Z][\w-]*|\*)?((?:\.[\w-]+)*)((?:\[[\w-]+\])*)$')
+_NON_TEXT_TAGS = frozenset({"script", "style"}) # BeautifulSoup leaves these out of get_text()
+_xpath_cache = {}
+
+
+def _css_to_xpath(css: str) -> str:
+    alternatives = []
+    for selector in css.split(','):
+        steps = []
+        for token in selector.split():
+            match = _SIMPLE_SELECTOR_RE.match(token)
+            if not match:
+                raise ValueError(f"Unsupported selector for the lxml backend: {css!r}")
+            tag, classes, attrs = match.groups()
+            step = tag.lower() if tag and tag != '*' else '*'
+            for cls in classes.split('.')[1:]:
+                step += f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+            for attr in re.findall(r'\[([\w-]+)\]', attrs):
+                step += f"[@{attr}]"
+            steps.append(step)
+        if not steps:
+            raise ValueError(f"Empty selector: {css!r}")
+        alternatives.append('.//' + '//'.join(steps))
+    return ' | '.join(alternatives)
+
+
+def _compiled_xpath(css: str):
+    xpath = _xpath_cache.get(css)
+    if xpath is None:
+        xpath = _xpath_cache[css] = lxml.etree.XPath(_css_to_xpath(css))
+    return xpath
+
+
+def _strings(element):
+    if element.text and isinstance(element.tag, str) and element.tag not in _NON_TEXT_TAGS:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str): # Comments and processing instructions contribute only their tail
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+class LxmlNode:
+    """Wraps an lxml element with the BeautifulSoup Tag methods the scraper relies on."""
+
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        self.element = element
+
+    def select(self, css: str) -> list:
+        return [LxmlNode(e) for e in _compiled_xpath(css)(self.element)]
+
+    def select_one(self, css: str):
+        matches = _compiled_xpath(css)(self.element)
+        return LxmlNode(matches[0]) if matches else None
+
+    def find_all(self, name: str) -> list:
+        return [LxmlNode(e) for e in self.element.iterdescendants(name)]
+
+    def find(self, name: str):
+        return next((LxmlNode(e) for e in self.element.iterdescendants(name)), None)
+
+    def get_text(self, separator: str = "", strip: bool = False) -> str:
+        strings = _strings(self.element)
+        if strip:
+            strings = (s.strip() for s in strings)
+            return separator.join(s for s in strings if s)
+        return separator.join(strings)
+
+    def get(self, key: str, default=None):
+        return self.element.get(key, default)
+
+    def has_attr(self, key: str) -> bool:
+        return key in self.element.attrib
+
+    def __getitem__(self, key: str):
+        return self.element.attrib[key]
+
+
+def parse_html(html: str):
+    """Parses a page into an object with BeautifulSoup's select/get_text API, using lxml when available."""
+    if HTML_BACKEND == "lxml" and html and html.strip():
+        try:
+            return LxmlNode(lxml.html.document_fromstring(html))
+        except (lxml.etree.ParserError, ValueError):
+            pass # Fall through to BeautifulSoup, which tolerates anything
+    return BeautifulSoup(html, 'html.parser')
@@ -0,0 +1,139 @@
+"""
+Hedged navigations for the browser price path.
+
+Most ticketing pages load in a few seconds, but a slow one can hold a worker until
+the 60 s `page.goto` timeout. With hedging, a `NavigationHedger` times each browser
+price scrape:
+
+- Until `min_samples` latencies have been seen, nothing is hedged.
+- After that, a scrape still running past the observed `percentile` latency (p90 by
+  default) gets a duplicate on a spare page. Whichever copy succeeds first wins and the
+  other is cancelled.
+- Hedges are capped at `budget` extra requests per primary request (5% by default),
+  so a site that is slow everywhere doesn't get twice the traffic.
+
+`stats()` is the run telemetry: primaries, hedges issued, hedges that won, and the
+hedge delay in effect.
+"""
+import asyncio
+import collections
+import logging
+import threading
+import time
+from app import config
+
+logger = logging.getLogger(__name__)
+
+
+class NavigationHedger:
+    """Latency percentile tracking and a hedge budget for one run of a scrape phase."""
+
+    def __init__(self, budget: float | None = None, percentile: float | None = None, min_samples: int | None = None,
+                 window: int = 500):
+        self.budget = config.HEDGE_BUDGET if budget is None else budget
+        self.percentile = percentile or config.HEDGE_PERCENTILE
+        self.min_samples = config.HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.primaries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> float | None:
+        """The latency past which a navigation is hedged, or None while there are too few samples."""
+        with self._lock:
+            if len(self._samples) < max(1, self.min_samples):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def _take_hedge(self) -> bool:
+        """Spends one hedge from the budget if there's any left."""
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.primaries:
+                return False
+            self.hedges += 1
+            return True
+
+    async def run(self, primary, hedge, succeeded=lambda result: True):
+        """
+        Awaits `primary()` and, if it outlasts the hedge delay and the budget allows, also
+        `hedge()`. Returns the first result that `succeeded`, else the primary's result.
+        """
+        with self._lock:
+            self.primaries += 1
+        delay = self.hedge_delay()
+        started = time.monotonic()
+        primary_task = asyncio.ensure_future(primary())
+        try:
+            if delay is None:
+                result = await primary_task
+                self.record_latency(time.monotonic() - started)
+                return result
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done or not self._take_hedge():
+                result = await primary_task
+                self.record_latency(time.monotonic() - started)
+                return result
+            return await self._race(primary_task, asyncio.ensure_future(hedge()), started, delay, succeeded)
+        finally:
+            if not primary_task.done():
+                primary_task.cancel()
+                await asyncio.gather(primary_task, return_exceptions=True)
+
+    async def _race(self, primary_task, hedge_task, started: float, delay: float, succeeded):
+        pending = {primary_task, hedge_task}
+        primary_result = None
+        primary_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is primary_task:
+                        self.record_latency(time.monotonic() - started)
+                    if task.exception() is not None:
+                        if task is primary_task:
+                            primary_error = task.exception()
+                        continue
+                    result = task.result()
+                    if task is primary_task:
+                        primary_result = result
+                    if succeeded(result):
+                        if task is hedge_task:
+                            with self._lock:
+                                self.hedge_wins += 1
+                            logger.info(f"[Hedge] Duplicate navigation won after {time.monotonic() - started:.1f}s (hedged at {delay:.1f}s).")
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        if primary_error is not None:
+            raise primary_error
+        return primary_result
+
+    def merge(self, stats: dict):
+        """Adds counts reported elsewhere (e.g. by a worker process) to this run's telemetry."""
+        with self._lock:
+            self.primaries += stats.get("primaries", 0)
+            self.hedges += stats.get("hedges", 0)
+            self.hedge_wins += stats.get("hedge_wins", 0)
+
+    def stats(self) -> dict:
+        delay = self.hedge_delay()
+        with self._lock:
+            return {"primaries": self.primaries, "hedges": self.hedges, "hedge_wins": self.hedge_wins,
+                    "hedge_rate": round(self.hedges / self.primaries, 4) if self.primaries else 0.0,
+                    "budget": self.budget, "hedge_delay": round(delay, 2) if delay is not None else None}
+
+    def summary(self) -> str:
+        stats = self.stats()
+        delay = f"{stats['hedge_delay']:.1f}s" if stats["hedge_delay"] is not None else "n/a"
+        return (f"{stats['hedges']} of {stats['primaries']} browser navigations hedged "
+                f"({stats['hedge_rate']:.1%} of a {self.budget:.0%} budget, p{self.percentile * 100:.0f} delay {delay}); "
+                f"{stats['hedge_wins']} hedges finished first")
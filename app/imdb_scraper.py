@@ -3,6 +3,7 @@ import httpx
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import datetime
+from app.rate_limiter import get_rate_limiter
 
 class IMDbScraper:
     """
@@ -32,6 +33,7 @@ class IMDbScraper:
         }
 
         try:
+            get_rate_limiter().wait(calendar_url)
             with httpx.Client(headers=headers, follow_redirects=True) as client:
                 response = client.get(calendar_url)
                 response.raise_for_status()
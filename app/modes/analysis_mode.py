@@ -43,26 +43,28 @@ def render_film_analysis(cache_data):
             start_date, end_date = st.session_state.film_analysis_date_range_start, st.session_state.film_analysis_date_range_end
             
             with st.spinner("Querying and analyzing film data..."):
-                all_data = database.query_historical_data(start_date, end_date, genres=selected_genres)
+                # Showing counts come from showings; prices from the daily price summary
+                showing_counts = database.get_showing_counts(start_date, end_date, genres=selected_genres)
+                price_summary = database.get_daily_price_summary(start_date, end_date, genres=selected_genres)
 
-                if all_data.empty:
+                if showing_counts.empty:
                     st.warning("No film data found for the selected date range.")
                     st.session_state.film_summary_df = pd.DataFrame()
                     st.session_state.film_detail_data = pd.DataFrame()
+                    st.session_state.film_showing_counts = pd.DataFrame()
                 else:
                     # --- NEW: Filter for films that have price data ---
                     # This ensures that films only scraped for operating hours are excluded.
-                    priced_data = all_data.dropna(subset=['price'])
-                    if priced_data.empty:
+                    if price_summary.empty:
                         st.warning("No films with price data were found for the selected criteria.")
                         return
 
-                    unique_showtimes = all_data.drop_duplicates(subset=['play_date', 'theater_name', 'film_title', 'showtime'])
-                    summary = unique_showtimes.groupby('film_title').agg(
-                        total_showings=('showtime', 'size'),
+                    summary = showing_counts.groupby('film_title').agg(
+                        total_showings=('showings', 'sum'),
                         num_theaters=('theater_name', 'nunique')
                     ).reset_index()
-                    avg_prices = priced_data.groupby('film_title')['price'].mean().reset_index()
+                    film_prices = price_summary.groupby('film_title')[['price_sum', 'price_count']].sum()
+                    avg_prices = (film_prices['price_sum'] / film_prices['price_count']).rename('price').reset_index()
                     summary = pd.merge(summary, avg_prices, on='film_title', how='left')
                     
                     summary = summary.rename(columns={
@@ -72,7 +74,8 @@ def render_film_analysis(cache_data):
                     summary['Average Price'] = summary['Average Price'].apply(lambda x: f'${x:,.2f}' if pd.notna(x) else 'N/A')
 
                     st.session_state.film_summary_df = summary
-                    st.session_state.film_detail_data = priced_data
+                    st.session_state.film_detail_data = price_summary
+                    st.session_state.film_showing_counts = showing_counts
         else:
             st.error("Please select a valid date range.")
 
@@ -87,12 +90,10 @@ def render_film_analysis(cache_data):
         total_films = len(summary_df)
         total_showings = summary_df['Total Showings'].sum()
         
-        # Calculate weighted average price
+        # Average over every price row, from the summary's per-day sums and counts
         detail_df = st.session_state.film_detail_data
-        # The previous weighted average calculation was flawed. A simple mean correctly ignores NaN values.
-        average_price = detail_df['price'].mean()
-        if pd.isna(average_price):
-            average_price = 0.0 # Default to 0 if no price data exists at all
+        price_count = detail_df['price_count'].sum()
+        average_price = detail_df['price_sum'].sum() / price_count if price_count else 0.0
 
         top_film = summary_df.iloc[0] # Already sorted by Total Showings
 
@@ -110,11 +111,12 @@ def render_film_analysis(cache_data):
         # Insight 1: Weekend vs. Weekday Pricing
         with insights_col1:
             st.markdown("##### Weekend vs. Weekday Pricing")
-            df_price_analysis = detail_df.dropna(subset=['price']).copy()
+            df_price_analysis = detail_df.copy()
             df_price_analysis['day_type'] = pd.to_datetime(df_price_analysis['play_date']).dt.dayofweek.apply(
                 lambda x: 'Weekend' if x >= 4 else 'Weekday' # Friday, Saturday, Sunday are weekend
             )
-            price_by_day_type = df_price_analysis.groupby('day_type')['price'].mean().reindex(['Weekday', 'Weekend'])
+            day_type_prices = df_price_analysis.groupby('day_type')[['price_sum', 'price_count']].sum()
+            price_by_day_type = (day_type_prices['price_sum'] / day_type_prices['price_count']).reindex(['Weekday', 'Weekend'])
             
             if not price_by_day_type.dropna().empty:
                 st.bar_chart(price_by_day_type)
@@ -136,29 +138,19 @@ def render_film_analysis(cache_data):
         # Insight 2: Sold-Out Performance
         with insights_col2:
             st.markdown("##### Sold-Out Performance")
-            if 'capacity' in detail_df.columns and not detail_df['capacity'].dropna().empty:
-                sold_out_df = detail_df[detail_df['capacity'] == 'Sold Out']
-                if not sold_out_df.empty:
-                    # Calculate total showings for each of the top 5 films
-                    top_5_films = summary_df['Film Title'].head(5).tolist()
-                    total_showings_top_5 = detail_df[detail_df['film_title'].isin(top_5_films)].groupby('film_title').size()
-                    
-                    # Calculate sold-out showings for the top 5
-                    sold_out_counts = sold_out_df[sold_out_df['film_title'].isin(top_5_films)].groupby('film_title').size()
-                    
-                    # Calculate percentage
-                    sold_out_percentage = (sold_out_counts / total_showings_top_5 * 100).fillna(0).reset_index(name='percentage')
-                    sold_out_percentage = sold_out_percentage.set_index('film_title')
-
-                    st.bar_chart(sold_out_percentage, y='percentage')
-                    
-                    most_sold_out = sold_out_percentage['percentage'].idxmax()
-                    st.info(f"**'{most_sold_out}'** has the highest percentage of sold-out showings among the top 5 films.")
-
-                else:
-                    st.info("No sold-out showings were recorded in this period.")
+            if detail_df['sold_out_count'].sum() > 0:
+                # Share of each top 5 film's price rows that were sold out
+                top_5_films = summary_df['Film Title'].head(5).tolist()
+                top_5_counts = detail_df[detail_df['film_title'].isin(top_5_films)].groupby('film_title')[['sold_out_count', 'price_count']].sum()
+                sold_out_percentage = (top_5_counts['sold_out_count'] / top_5_counts['price_count'] * 100).fillna(0).reset_index(name='percentage')
+                sold_out_percentage = sold_out_percentage.set_index('film_title')
+
+                st.bar_chart(sold_out_percentage, y='percentage')
+                
+                most_sold_out = sold_out_percentage['percentage'].idxmax()
+                st.info(f"**'{most_sold_out}'** has the highest percentage of sold-out showings among the top 5 films.")
             else:
-                st.info("No capacity data available to analyze sold-out performance.")
+                st.info("No sold-out showings were recorded in this period.")
 
 
         st.divider()
@@ -186,15 +178,16 @@ def render_film_analysis(cache_data):
                 st.divider()
 
             film_data = st.session_state.film_detail_data[st.session_state.film_detail_data['film_title'] == selected_film].copy()
+            film_counts = st.session_state.film_showing_counts[st.session_state.film_showing_counts['film_title'] == selected_film].copy()
 
             # --- NEW: Add market data for market-level comparisons ---
-            if 'market' not in film_data.columns:
-                theater_to_market_map = {}
-                if cache_data and "markets" in cache_data:
-                    for market_name, market_info in cache_data["markets"].items():
-                        for theater in market_info.get("theaters", []):
-                            theater_to_market_map[theater['name']] = market_name
-                film_data['market'] = film_data['theater_name'].map(theater_to_market_map).fillna('Unknown')
+            theater_to_market_map = {}
+            if cache_data and "markets" in cache_data:
+                for market_name, market_info in cache_data["markets"].items():
+                    for theater in market_info.get("theaters", []):
+                        theater_to_market_map[theater['name']] = market_name
+            film_data['market'] = film_data['theater_name'].map(theater_to_market_map).fillna('Unknown')
+            film_counts['market'] = film_counts['theater_name'].map(theater_to_market_map).fillna('Unknown')
 
             if not film_data.empty:
                 # --- NEW: Grouping logic ---
@@ -206,9 +199,9 @@ def render_film_analysis(cache_data):
                 )
                 grouping_column_film = 'theater_name' if group_by_film == "Theater" else 'market'
 
-                unique_showtimes_film = film_data.drop_duplicates(subset=['play_date', 'theater_name', 'showtime'])
-                theater_summary = unique_showtimes_film.groupby(grouping_column_film).agg(showings_count=('showtime', 'size')).reset_index()
-                avg_prices_theater = film_data.groupby(grouping_column_film)['price'].mean().reset_index()
+                theater_summary = film_counts.groupby(grouping_column_film).agg(showings_count=('showings', 'sum')).reset_index()
+                theater_prices = film_data.groupby(grouping_column_film)[['price_sum', 'price_count']].sum()
+                avg_prices_theater = (theater_prices['price_sum'] / theater_prices['price_count']).rename('price').reset_index()
                 theater_summary = pd.merge(theater_summary, avg_prices_theater, on=grouping_column_film, how='left')
                 
                 theater_summary = theater_summary.rename(columns={
@@ -1090,6 +1083,7 @@ def render_analysis_mode(markets_data, cache_data):
     # New state for film analysis
     if 'film_summary_df' not in st.session_state: st.session_state.film_summary_df = pd.DataFrame()
     if 'film_detail_data' not in st.session_state: st.session_state.film_detail_data = pd.DataFrame()
+    if 'film_showing_counts' not in st.session_state: st.session_state.film_showing_counts = pd.DataFrame()
     if 'film_analysis_genres' not in st.session_state: st.session_state.film_analysis_genres = []
     if 'analysis_director_select' not in st.session_state: st.session_state.analysis_director_select = None
     if 'analysis_market_select' not in st.session_state: st.session_state.analysis_market_select = None
@@ -1114,6 +1108,7 @@ def render_analysis_mode(markets_data, cache_data):
             st.session_state['analysis_capacity_filter'] = []
             st.session_state['film_summary_df'] = pd.DataFrame()
             st.session_state['film_detail_data'] = pd.DataFrame()
+            st.session_state['film_showing_counts'] = pd.DataFrame()
             st.session_state['analysis_genres'] = []
             st.session_state['analysis_ratings'] = []
             st.rerun()
@@ -224,15 +224,19 @@ def render_market_mode(scout, markets_data, cache_data, IS_DISABLED, parent_comp
             failed_theaters = set() # Use a set to avoid duplicate names
             
             with st.spinner("Finding all available films and showtimes for the selected date range..."):
-                for date in pd.date_range(start_date, end_date):
+                # One run for the whole range, so large selections start their worker processes once.
+                scrape_dates = list(pd.date_range(start_date, end_date))
+                thread, get_results = run_async_in_thread(scout.get_all_showings_for_theaters, theaters_to_scrape,
+                                                          [date.strftime('%Y-%m-%d') for date in scrape_dates])
+                thread.join()
+                status, results_by_date, log, duration = get_results()
+                st.session_state.last_run_log += log
+                if duration: total_duration += duration
+
+                for date in scrape_dates:
                     date_str = date.strftime('%Y-%m-%d')
-                    thread, get_results = run_async_in_thread(scout.get_all_showings_for_theaters, theaters_to_scrape, date_str)
-                    thread.join()
-                    status, result, log, duration = get_results()
-                    st.session_state.last_run_log += log
-                    if duration: total_duration += duration
-
                     if status == 'success':
+                        result = results_by_date.get(date_str, {})
                         all_showings_by_date[date_str] = result
                         database.upsert_showings(result, date.date())
                         # Check for theaters that returned no showings on this date
@@ -240,7 +244,7 @@ def render_market_mode(scout, markets_data, cache_data, IS_DISABLED, parent_comp
                             if not result.get(theater_obj['name']):
                                 failed_theaters.add(theater_obj['name'])
                     else:
-                        # If the entire scrape for a date fails, all theaters are considered failed for that date
+                        # If the entire scrape fails, all theaters are considered failed
                         for theater_obj in theaters_to_scrape:
                             failed_theaters.add(theater_obj['name'])
                 
@@ -251,6 +255,9 @@ def render_market_mode(scout, markets_data, cache_data, IS_DISABLED, parent_comp
 
                 if failed_theaters:
                     st.warning(f"**Could not find showtimes for the following theaters:** {', '.join(sorted(list(failed_theaters)))}. Their URLs may be stale. Please go to **Data Management** mode to re-match them or rebuild the theater cache.")
+                open_circuits = scout.open_circuits("showtimes")
+                if isinstance(open_circuits, dict) and open_circuits:
+                    st.warning(f"**Stopped retrying after repeated timeouts:** {', '.join(sorted(open_circuits))}. These theaters were skipped for the rest of the search.")
                 
                 st.info(f"Film search completed in {total_duration:.2f} seconds.")
                 st.session_state.all_showings = all_showings_by_date
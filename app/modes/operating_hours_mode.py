@@ -125,14 +125,14 @@ def generate_weekly_report_data(scout, cache_data, all_theaters, selected_compan
         previous_thursday = this_thursday - datetime.timedelta(days=7)
         end_of_previous_week = next_thursday - datetime.timedelta(days=7)
 
+        # One concurrent discovery run covers every (theater, date) pair of the week.
+        scrape_dates = [date.strftime('%Y-%m-%d') for date in scrape_date_range]
+        thread, result_func = run_async_in_thread(scout.get_all_showings_for_theaters, all_theaters, scrape_dates)
+        thread.join()
+        status, result, _, _ = result_func()
         all_current_results = {}
-        for date in scrape_date_range:
-            date_str = date.strftime('%Y-%m-%d')
-            thread, result_func = run_async_in_thread(scout.get_all_showings_for_theaters, all_theaters, date_str)
-            thread.join()
-            status, result, _, _ = result_func()
-            if status == 'success' and result:
-                all_current_results[date_str] = result
+        if status == 'success' and result:
+            all_current_results = {date_str: theaters for date_str, theaters in result.items() if theaters}
         
         for date_str, theaters in all_current_results.items():
             for theater_name, showings in theaters.items():
@@ -828,14 +828,19 @@ def render_operating_hours_mode(scout, markets_data, cache_data, IS_DISABLED, pr
             all_results = {}
             total_duration = 0
             st.session_state.weekly_op_hours_total_duration = 0 # Initialize for logging
-            for date in pd.date_range(start_date, end_date):
-                date_str = date.strftime('%Y-%m-%d')
-                thread, result_func = run_async_in_thread(scout.get_all_showings_for_theaters, theaters_to_process, date_str)
-                thread.join()
-                status, result, log, duration = result_func()
-                if status == 'success' and result:
-                    if duration: total_duration += duration
-                    st.session_state.weekly_op_hours_total_duration += duration
+            scrape_dates = [date.strftime('%Y-%m-%d') for date in pd.date_range(start_date, end_date)]
+            # All dates are discovered in one concurrent run over the shared browser.
+            thread, result_func = run_async_in_thread(scout.get_all_showings_for_theaters, theaters_to_process, scrape_dates)
+            thread.join()
+            status, results_by_date, log, duration = result_func()
+            if status == 'success' and results_by_date:
+                if duration: total_duration += duration
+                st.session_state.weekly_op_hours_total_duration += duration or 0
+            else:
+                results_by_date = {}
+            for date_str in scrape_dates:
+                result = results_by_date.get(date_str)
+                if result:
                     for theater_name, showings in result.items():
                         for market_theater in theaters_to_process_with_market:
                             if market_theater['theater']['name'] == theater_name:
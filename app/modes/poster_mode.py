@@ -105,14 +105,14 @@ def enrich_all_films_with_bom():
             financials = await bom_scraper.get_film_financials_async(bom_url)
             if financials.get('opening_weekend_domestic') or financials.get('domestic_gross'):
                 film.update(financials)
-                database.upsert_film_details(film) # Save back to DB
+                await asyncio.to_thread(database.upsert_film_details, film) # Save back to DB
                 return True
         return False
 
     async def main_enrichment():
         """Main async function to run all enrichments concurrently."""
         bom_scraper = BoxOfficeMojoScraper()
-        films_in_db = database.get_all_films_for_enrichment()
+        films_in_db = await asyncio.to_thread(database.get_all_films_for_enrichment)
         if not films_in_db:
             st.warning("No films in the database to enrich.")
             return 0
@@ -143,7 +143,7 @@ def discover_and_enrich_from_imdb(and_select=False):
     
     async def main_imdb_discovery():
         with st.spinner("Discovering upcoming releases from IMDb Calendar..."):
-            films = imdb_scraper.discover_upcoming_releases()
+            films = await asyncio.to_thread(imdb_scraper.discover_upcoming_releases)
 
         if not films:
             st.warning("Could not discover any upcoming films from IMDb.")
@@ -154,7 +154,7 @@ def discover_and_enrich_from_imdb(and_select=False):
 
         async def enrich_and_save(film):
             title = film['title']
-            if not database.check_film_exists(title):
+            if not await asyncio.to_thread(database.check_film_exists, title):
                 year = film.get('release_date', '').split('-')[0] if film.get('release_date') else None
                 omdb_details = await omdb_client.get_film_details_async(title, year=year)
                 
@@ -166,7 +166,7 @@ def discover_and_enrich_from_imdb(and_select=False):
                     film.update(omdb_details) # Update with enriched data
 
                 film['film_title'] = title
-                database.upsert_film_details(film)
+                await asyncio.to_thread(database.upsert_film_details, film)
                 return title
             return None
 
@@ -211,7 +211,7 @@ def discover_and_enrich_films_from_fandango(and_select=False):
             if not title:
                 return None
             
-            if not database.check_film_exists(title):
+            if not await asyncio.to_thread(database.check_film_exists, title):
                 omdb_details = await omdb_client.get_film_details_async(title)
                 if omdb_details:
                     for key, value in omdb_details.items():
@@ -219,7 +219,7 @@ def discover_and_enrich_films_from_fandango(and_select=False):
                             film[key] = value
                 
                 film['film_title'] = title
-                database.upsert_film_details(film)
+                await asyncio.to_thread(database.upsert_film_details, film)
                 return title
             return None
 
@@ -4,6 +4,7 @@ import httpx
 from datetime import datetime
 import re
 from thefuzz import fuzz
+from app.rate_limiter import get_rate_limiter
 
 class OMDbClient:
     """
@@ -100,6 +101,7 @@ class OMDbClient:
             params["y"] = final_year
 
         try:
+            get_rate_limiter().wait(self.API_URL)
             response = requests.get(self.API_URL, params=params, timeout=10)
             response.raise_for_status()
             return response.json()
@@ -121,6 +123,7 @@ class OMDbClient:
             params["y"] = final_year
 
         try:
+            await get_rate_limiter().acquire(self.API_URL)
             response = await client.get(self.API_URL, params=params, timeout=10)
             response.raise_for_status()
             return response.json()
@@ -148,6 +151,7 @@ class OMDbClient:
             "plot": "full"
         }
         try:
+            get_rate_limiter().wait(self.API_URL)
             response = requests.get(self.API_URL, params=params, timeout=10)
             response.raise_for_status()
             return response.json()
@@ -161,6 +165,7 @@ class OMDbClient:
         if year:
             params["y"] = year
         try:
+            get_rate_limiter().wait(self.API_URL)
             response = requests.get(self.API_URL, params=params, timeout=10)
             response.raise_for_status()
             search_results = response.json()
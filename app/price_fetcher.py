@@ -0,0 +1,139 @@
+"""
+Direct HTTP fetching of Fandango ticketing pages.
+
+The ticketing page (`jump.aspx`) embeds its pricing as an inline
+`window.Commerce.models = {...}` script, so for most showings we don't need a
+browser at all: we fetch the raw HTML over a pooled httpx client and decode the
+JSON straight out of it. Callers fall back to the Playwright path when the payload
+is missing (e.g. a bot challenge page); there `evaluate_commerce_models` reads the
+object from the live page in a single round-trip.
+"""
+import asyncio
+import json
+import logging
+import re
+import weakref
+import httpx
+from app.browser_pool import DEFAULT_USER_AGENT
+from app.concurrency import report_throttled, report_timeout, timed_request
+from app.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+COMMERCE_MODELS_RE = re.compile(r'window\.Commerce\.models\s*=\s*')
+_json_decoder = json.JSONDecoder()
+
+
+def extract_commerce_models(html: str) -> dict | None:
+    """
+    Extracts the `window.Commerce.models` object from raw page HTML.
+    Uses `JSONDecoder.raw_decode` so the object's end is found by the JSON parser itself.
+    """
+    if not html:
+        return None
+    for match in COMMERCE_MODELS_RE.finditer(html):
+        json_start = html.find('{', match.end())
+        if json_start == -1:
+            continue
+        try:
+            data, _ = _json_decoder.raw_decode(html, json_start)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+# Serialized in the page so the payload crosses the Playwright connection as one JSON string.
+COMMERCE_MODELS_JS = """() => {
+    const models = window.Commerce && window.Commerce.models;
+    if (!models || typeof models !== 'object') return null;
+    try { return JSON.stringify(models); } catch (e) { return null; }
+}"""
+
+
+async def evaluate_commerce_models(page) -> dict | None:
+    """Reads `window.Commerce.models` from a loaded Playwright page with one `page.evaluate` call."""
+    try:
+        payload = await page.evaluate(COMMERCE_MODELS_JS)
+    except Exception as e:
+        logger.debug(f"[Commerce] page.evaluate failed: {e}")
+        return None
+    if not isinstance(payload, str):
+        return None
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class CommercePriceFetcher:
+    """Fetches ticketing pages over a shared, connection-pooled httpx client."""
+
+    def __init__(self, max_connections: int = 20, timeout: float = 15.0, user_agent: str = DEFAULT_USER_AGENT):
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": user_agent, "Accept": "text/html,application/xhtml+xml"},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+            follow_redirects=True,
+        )
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "errors": 0}
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def fetch_html(self, url: str) -> str | None:
+        """Returns the page HTML, or None on a non-200 response or network error."""
+        self.stats["requests"] += 1
+        await get_rate_limiter().acquire(url)
+        try:
+            with timed_request():
+                response = await self._client.get(url)
+        except httpx.HTTPError as e:
+            self.stats["errors"] += 1
+            if isinstance(e, httpx.TimeoutException):
+                report_timeout()
+            logger.debug(f"[HTTP Prices] Request failed for {url}: {e}")
+            return None
+        if response.status_code != 200:
+            self.stats["errors"] += 1
+            report_throttled(response.status_code)
+            logger.debug(f"[HTTP Prices] {url} returned HTTP {response.status_code}")
+            return None
+        return response.text
+
+    async def fetch_commerce_models(self, url: str) -> dict | None:
+        """Fetches a ticketing URL and returns its Commerce models, or None if unavailable."""
+        html = await self.fetch_html(url)
+        data = extract_commerce_models(html) if html else None
+        if data is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return data
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+# --- httpx clients are bound to the event loop that created them ---
+_fetchers_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CommercePriceFetcher]" = weakref.WeakKeyDictionary()
+
+
+def get_price_fetcher() -> CommercePriceFetcher:
+    """Returns the fetcher for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    fetcher = _fetchers_by_loop.get(loop)
+    if fetcher is None or fetcher.is_closed:
+        fetcher = CommercePriceFetcher()
+        _fetchers_by_loop[loop] = fetcher
+    return fetcher
+
+
+async def close_price_fetchers():
+    """Closes the fetcher bound to the running event loop, if any."""
+    fetcher = _fetchers_by_loop.pop(asyncio.get_running_loop(), None)
+    if fetcher is not None:
+        await fetcher.aclose()
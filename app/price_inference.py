@@ -0,0 +1,121 @@
+"""
+Representative-showtime price inference.
+
+Within a theater and play date, prices almost always depend only on the film, format,
+daypart and ticket type, so scraping every showtime loads many identical ticketing
+pages. In inference mode `infer_price_stream` does the following:
+
+1. Scrapes one representative showing per price class (play date, theater, film,
+   format, daypart), plus a random `spot_check_rate` sample of the other showings.
+2. Checks each class's spot checks against its representative. If any (ticket type,
+   price) set differs, the class is divergent and its remaining showings are scraped.
+   So is every class whose representative failed.
+3. Copies the representative's rows for the remaining showings of every other class.
+   Those rows are marked `"Inferred": True`, with capacity "N/A", and saved to
+   `prices.inferred`.
+
+It wraps any `(showing, rows)` stream, so in-process and sharded scrapes both work,
+and yields in the same shape, so callers don't change.
+"""
+import logging
+import math
+import random
+from app import config
+from app.scrape_planner import price_class
+
+logger = logging.getLogger(__name__)
+
+
+def inference_class(showing: dict) -> tuple:
+    return (showing.get('play_date'),) + price_class(showing)
+
+
+def _price_signature(rows: list) -> frozenset:
+    return frozenset((row.get("Ticket Type"), row.get("Price")) for row in rows)
+
+
+def infer_rows(rows: list, showing: dict) -> list:
+    """The representative's `rows` rewritten for sibling `showing`."""
+    return [{**row, "Showtime": showing['showtime'], "Daypart": showing.get('daypart', row.get("Daypart")),
+             "Capacity": "N/A", "Inferred": True} for row in rows]
+
+
+class InferenceStats:
+    """What an inference run scraped, inferred and found divergent."""
+
+    def __init__(self):
+        self.classes = 0
+        self.scraped = 0
+        self.spot_checks = 0
+        self.inferred = 0
+        self.divergent = []
+
+    def as_dict(self) -> dict:
+        return {"classes": self.classes, "scraped": self.scraped, "spot_checks": self.spot_checks,
+                "inferred": self.inferred, "divergent_classes": len(self.divergent)}
+
+    def summary(self) -> str:
+        total = self.scraped + self.inferred
+        return (f"Loaded {self.scraped} of {total} ticketing pages for {self.classes} price classes; "
+                f"inferred {self.inferred}, {self.spot_checks} spot checks, {len(self.divergent)} divergent classes")
+
+
+def select_showings(showings: list, spot_check_rate: float, rng: random.Random) -> tuple[dict, list, list]:
+    """
+    Returns `({class: [showings]}, representatives, spot_checks)`. The representative of a class
+    is its first showing; spot checks are a `spot_check_rate` sample of the others (at least one
+    if the rate is above zero and there is anything to check).
+    """
+    classes = {}
+    for showing in showings:
+        classes.setdefault(inference_class(showing), []).append(showing)
+    representatives = [members[0] for members in classes.values()]
+    siblings = [s for members in classes.values() for s in members[1:]]
+    sample_size = min(len(siblings), math.ceil(spot_check_rate * len(siblings))) if spot_check_rate > 0 else 0
+    return classes, representatives, rng.sample(siblings, sample_size)
+
+
+async def infer_price_stream(showings: list, scrape_stream, spot_check_rate: float | None = None,
+                             stats: InferenceStats | None = None, rng=None):
+    """
+    Yields `(showing, rows)` for every showing in `showings`, scraping only representatives,
+    spot checks and the showings of divergent classes. `scrape_stream(showings)` must return an
+    async iterator of `(showing, rows)` as `Scraper.scrape_showings_stream` does.
+    """
+    spot_check_rate = config.PRICE_INFERENCE_SPOT_CHECK_RATE if spot_check_rate is None else spot_check_rate
+    stats = stats if stats is not None else InferenceStats()
+    classes, representatives, spot_checks = select_showings(showings, spot_check_rate, rng or random.Random())
+    stats.classes = len(classes)
+    stats.spot_checks = len(spot_checks)
+
+    scraped_rows = {}
+    first_pass = representatives + spot_checks
+    async for showing, rows in scrape_stream(first_pass):
+        scraped_rows[id(showing)] = rows
+        stats.scraped += 1
+        yield showing, rows
+
+    to_scrape = []
+    for key, members in classes.items():
+        representative_rows = scraped_rows.get(id(members[0]))
+        remaining = [s for s in members[1:] if id(s) not in scraped_rows]
+        if not remaining:
+            continue
+        checks = [scraped_rows[id(s)] for s in members[1:] if scraped_rows.get(id(s))]
+        if not representative_rows:
+            to_scrape.extend(remaining) # Nothing to infer from: the representative failed, sold out or was skipped
+            continue
+        signature = _price_signature(representative_rows)
+        if any(_price_signature(rows) != signature for rows in checks):
+            stats.divergent.append(key)
+            logger.warning(f"[Inference] Spot check disagreed for {key}; scraping its {len(remaining)} other showings.")
+            to_scrape.extend(remaining)
+            continue
+        for showing in remaining:
+            stats.inferred += 1
+            yield showing, infer_rows(representative_rows, showing)
+
+    if to_scrape:
+        async for showing, rows in scrape_stream(to_scrape):
+            stats.scraped += 1
+            yield showing, rows
@@ -0,0 +1,170 @@
+"""
+Learned per-theater price rules for scheduled scrapes.
+
+Most theaters change their price grid rarely, yet a scheduled scrape used to load every
+ticketing page every day. `database.refresh_price_rules` distills the scrape history into
+rules stored in the company database's `price_rules` table:
+
+    (theater, ticket type, daypart, format) -> price, confidence, observed days, last verified
+
+`PriceRuleBook` loads them and `price_rule_stream` uses them during a run:
+
+1. A showing is *covered* when every rule for its (theater, daypart, format) is stable:
+   enough observed days, high confidence and verified recently. Showings that aren't
+   covered are scraped as usual.
+2. One covered showing per (theater, daypart, format) is scraped to verify its rules, plus a
+   random `PRICE_RULES_SAMPLE_RATE` share of the others.
+3. When every verification sample of a theater agrees with its rules, the theater's other
+   covered showings get rows built from the rules. Those rows are marked `"Inferred": True`
+   with capacity "N/A".
+4. When any sample disagrees, the whole theater escalates to a full scrape.
+
+Inferred rows never feed back into the rules, so each refresh learns only from prices that
+were actually scraped, and a changed price lowers the rule's confidence until it is stable
+again.
+"""
+import datetime
+import logging
+import math
+import random
+from app import config, database
+
+logger = logging.getLogger(__name__)
+
+
+def rule_class(showing: dict) -> tuple:
+    """The (theater, daypart, format) whose rules price a showing."""
+    return (showing.get('theater_name'), showing.get('daypart') or '', showing.get('format') or '2D')
+
+
+def _parse_price(price) -> float | None:
+    try:
+        return round(float(str(price).replace('$', '')), 2)
+    except ValueError:
+        return None
+
+
+class PriceRuleBook:
+    """Price rules by (theater, daypart, format), each a {ticket_type: rule} dict."""
+
+    def __init__(self, rules: list[dict] | None = None, today: datetime.date | None = None):
+        self.today = today or datetime.date.today()
+        self.rules = {}
+        for rule in rules or []:
+            key = (rule['theater_name'], rule['daypart'], rule['format'])
+            self.rules.setdefault(key, {})[rule['ticket_type']] = rule
+
+    @classmethod
+    def from_database(cls, theater_names: list[str] | None = None) -> "PriceRuleBook":
+        """Loads the rules from the company database; an unconfigured or unreadable database gives no rules."""
+        if config.DB_FILE is None:
+            return cls()
+        try:
+            return cls(database.get_price_rules(theater_names))
+        except Exception as e:
+            logger.warning(f"[PriceRules] Could not load price rules, scraping every showing: {e}")
+            return cls()
+
+    def _is_stable_rule(self, rule: dict) -> bool:
+        last_verified = datetime.date.fromisoformat(str(rule['last_verified'])[:10])
+        return (rule['observed_days'] >= config.PRICE_RULES_MIN_OBSERVED_DAYS
+                and rule['confidence'] >= config.PRICE_RULES_MIN_CONFIDENCE
+                and (self.today - last_verified).days <= config.PRICE_RULES_MAX_AGE_DAYS)
+
+    def is_stable(self, key: tuple) -> bool:
+        rules = self.rules.get(key)
+        return bool(rules) and all(self._is_stable_rule(rule) for rule in rules.values())
+
+    def agrees(self, showing: dict, rows: list | None) -> bool:
+        """Whether scraped `rows` show exactly the ticket types and prices the rules predict for `showing`."""
+        if not rows:
+            return False # A failed or empty scrape verifies nothing
+        observed = {row.get("Ticket Type"): _parse_price(row.get("Price")) for row in rows}
+        expected = {ticket_type: round(rule['price'], 2) for ticket_type, rule in self.rules.get(rule_class(showing), {}).items()}
+        return observed == expected
+
+    def rows_for(self, showing: dict) -> list[dict]:
+        """Price rows for `showing` built from its rules, in the shape the scraper produces."""
+        _, _, fmt = rule_class(showing)
+        return [{
+            "Theater Name": showing['theater_name'], "Film Title": showing['film_title'],
+            "Format": fmt, "Is PLF": "Yes" if showing.get('is_plf') else "No",
+            "Showtime": showing['showtime'], "Daypart": showing.get('daypart'),
+            "Ticket Type": ticket_type, "Price": f"${rule['price']:.2f}", "Capacity": "N/A",
+            "play_date": showing.get('play_date'), "Market": showing.get('market', 'N/A'), "Inferred": True,
+        } for ticket_type, rule in sorted(self.rules.get(rule_class(showing), {}).items())]
+
+
+class PriceRuleStats:
+    """What a rule-verified run scraped, filled in from rules and escalated."""
+
+    def __init__(self):
+        self.covered = 0
+        self.samples = 0
+        self.scraped = 0
+        self.inferred = 0
+        self.escalated = []
+
+    def as_dict(self) -> dict:
+        return {"covered": self.covered, "samples": self.samples, "scraped": self.scraped,
+                "inferred": self.inferred, "escalated_theaters": len(self.escalated)}
+
+    def summary(self) -> str:
+        return (f"{self.covered} showings covered by stable rules, {self.samples} verification samples; "
+                f"scraped {self.scraped}, filled in {self.inferred} from rules, "
+                f"{len(self.escalated)} theaters escalated to a full scrape")
+
+
+async def price_rule_stream(showings: list, scrape_stream, book: PriceRuleBook, sample_rate: float | None = None,
+                            stats: PriceRuleStats | None = None, rng=None):
+    """
+    Yields `(showing, rows)` for every showing in `showings`, scraping uncovered showings and
+    verification samples first, then either filling in each theater's covered showings from its
+    rules or scraping them when a sample disagreed. `scrape_stream(showings)` must return an async
+    iterator of `(showing, rows)` as `Scraper.scrape_showings_stream` does.
+    """
+    sample_rate = config.PRICE_RULES_SAMPLE_RATE if sample_rate is None else sample_rate
+    stats = stats if stats is not None else PriceRuleStats()
+    rng = rng or random.Random()
+
+    covered, uncovered = {}, []
+    for showing in showings:
+        key = rule_class(showing)
+        if book.is_stable(key):
+            covered.setdefault(key, []).append(showing)
+        else:
+            uncovered.append(showing)
+    samples = [members[0] for members in covered.values()]
+    others = [s for members in covered.values() for s in members[1:]]
+    samples += rng.sample(others, min(len(others), math.ceil(sample_rate * len(others)))) if sample_rate > 0 else []
+    stats.covered = sum(len(members) for members in covered.values())
+    stats.samples = len(samples)
+
+    sampled = {id(s) for s in samples}
+    escalated = set()
+    first_pass = samples + uncovered
+    if first_pass:
+        async for showing, rows in scrape_stream(first_pass):
+            stats.scraped += 1
+            if id(showing) in sampled and not book.agrees(showing, rows):
+                escalated.add(showing.get('theater_name'))
+            yield showing, rows
+
+    to_scrape = []
+    for (theater_name, _, _), members in covered.items():
+        remaining = [s for s in members if id(s) not in sampled]
+        if theater_name in escalated:
+            to_scrape.extend(remaining)
+            continue
+        for showing in remaining:
+            stats.inferred += 1
+            yield showing, book.rows_for(showing)
+
+    stats.escalated = sorted(escalated, key=str)
+    if escalated:
+        logger.warning(f"[PriceRules] Verification samples disagreed with the rules for {', '.join(map(str, stats.escalated))}; "
+                       f"scraping their {len(to_scrape)} other showings.")
+    if to_scrape:
+        async for showing, rows in scrape_stream(to_scrape):
+            stats.scraped += 1
+            yield showing, rows
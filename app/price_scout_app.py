@@ -11,6 +11,8 @@ import asyncio
 import time
 import json
 import sqlite3
+import threading
+from queue import Queue
 import glob
 import pytz
 from app import theming
@@ -293,7 +295,13 @@ def handle_scrape_confirmation():
                 for showings_at_time in film_selections.values():
                     showtime_count += len(showings_at_time)
 
-    estimated_time = estimate_scrape_time(showtime_count, mode_filter='price')
+    showings = [{**showing, "theater_name": theater_name}
+                for daily_selections in selected_showtimes.values()
+                for theater_name, theater_selections in daily_selections.items()
+                for film_selections in theater_selections.values()
+                for showings_at_time in film_selections.values()
+                for showing in showings_at_time]
+    estimated_time = estimate_scrape_time(showtime_count, mode_filter='price', showings=showings)
 
     if estimated_time != -1 and estimated_time < 30:
         st.session_state.report_running = True
@@ -337,16 +345,21 @@ def _render_scrape_progress():
         header_text += f" for {queue[0]['name']}" if num_theaters == 1 else f" for {num_theaters} selected theaters"
     st.header(header_text)
 
+    # Theaters are scraped in parallel, so progress and the estimate are based on showings, not theaters.
+    theater_progress = st.session_state.get('scrape_theater_progress', {})
+    showings_total = sum(p["total"] for p in theater_progress.values())
+    showings_done = sum(p["done"] for p in theater_progress.values())
     time_remaining_str = ""
-    if current_index > 0 and 'scrape_total_duration' in st.session_state:
-        avg_time_per_theater = st.session_state.scrape_total_duration / current_index
-        theaters_remaining = len(queue) - current_index
-        time_remaining_str = f" (est. {format_time_to_human_readable(avg_time_per_theater * theaters_remaining)} remaining)"
+    if showings_done > 0 and 'scrape_started_at' in st.session_state:
+        elapsed = time.time() - st.session_state.scrape_started_at
+        time_remaining_str = f" (est. {format_time_to_human_readable(elapsed / showings_done * (showings_total - showings_done))} remaining)"
 
-    progress_text = f"Processing theater {current_index} of {len(queue)}...{time_remaining_str}"
-    st.progress(current_index / len(queue) if queue else 0, text=progress_text)
+    progress_text = f"{current_index} of {len(queue)} theaters complete, {showings_done} of {showings_total} showings scraped...{time_remaining_str}"
+    st.progress(showings_done / showings_total if showings_total else 0, text=progress_text)
     if st.button("Cancel Scrape", type="primary"):
         st.session_state.cancel_scrape = True
+        if 'scrape_cancel_event' in st.session_state:
+            st.session_state.scrape_cancel_event.set()
         st.warning("Cancellation requested. The scrape will stop.")
         st.rerun()
 
@@ -356,6 +369,7 @@ def _finalize_scrape_session():
     # The report function can handle an empty dataframe.
     if st.session_state.get('scrape_results') is not None:
         st.session_state.last_run_duration = st.session_state.get('scrape_total_duration', 0)
+        st.session_state.last_run_open_circuits = st.session_state.get('scrape_open_circuits', {})
         df_current = pd.DataFrame(st.session_state.scrape_results)
         log_runtime(st.session_state.search_mode, st.session_state.scrape_current_index, len(st.session_state.scraped_showings), st.session_state.scrape_total_duration)
         st.session_state.final_df = df_current
@@ -372,13 +386,15 @@ def _finalize_scrape_session():
         st.session_state.stage = 'ready_for_input'
 
     # Clean up session state keys related to the scrape run
-    for key in ['scrape_queue', 'scrape_results', 'scraped_showings', 'scrape_total_duration', 'scrape_current_index', 'cancel_scrape', 'report_running', 'scrape_run_context', 'scrape_run_id', 'scrape_thread', 'get_scrape_results', 'scrape_status_container']:
+    for key in ['scrape_queue', 'scrape_results', 'scraped_showings', 'scrape_total_duration', 'scrape_current_index', 'cancel_scrape', 'report_running', 'scrape_run_context', 'scrape_run_id', 'scrape_thread', 'get_scrape_results', 'scrape_status_container',
+                'scrape_theater_progress', 'scrape_completed_theaters', 'scrape_cancel_event', 'scrape_started_at', 'scrape_batch_done', 'scrape_selected_showtimes',
+                'scrape_open_circuits']:
         if key in st.session_state:
             del st.session_state[key]
     st.rerun()
 
-def _initialize_scrape_session():
-    """Initializes the session state for a new scrape run."""
+def _initialize_scrape_session(scout):
+    """Initializes the session state for a new scrape run, resuming an interrupted run of the same selection."""
     theaters_to_scrape = []
     if st.session_state.search_mode == "Market Mode":
         # In Market Mode, selected_theaters is a list of names. We need the full objects.
@@ -398,22 +414,97 @@ def _initialize_scrape_session():
     st.session_state.scrape_results = []
     st.session_state.scraped_showings = []
     st.session_state.scrape_total_duration = 0
-    st.session_state.scrape_current_index = 0
+    st.session_state.scrape_current_index = 0 # Number of theaters whose prices have been saved
     st.session_state.cancel_scrape = False
+    st.session_state.scrape_theater_progress = {}
+    st.session_state.scrape_completed_theaters = Queue() # Filled from the scrape thread, drained by the UI
+    st.session_state.scrape_cancel_event = threading.Event()
     st.session_state.scrape_run_context = f"Mode: {st.session_state.search_mode}, Theaters: {len(theaters_to_scrape)}"
-    st.session_state.scrape_run_id = database.create_scrape_run(st.session_state.search_mode, st.session_state.scrape_run_context)
-
-def _process_single_theater_scrape(scout):
-    """Manages the async task of scraping a single theater and updating the UI."""
-    theater = st.session_state.scrape_queue[st.session_state.scrape_current_index]
 
+    # Journal the selection so a run interrupted today (crash, closed tab) picks up where it left off.
+    selected_showtimes = st.session_state.get('selected_showtimes', {})
+    showings = scout.flatten_selected_showtimes(theaters_to_scrape, selected_showtimes)
+    ticket_urls = {s['ticket_url'] for s in showings if s.get('ticket_url')}
+    today_start = datetime.datetime.combine(datetime.date.today(), datetime.time.min)
+    resumable_run_id = database.find_resumable_scrape_run(st.session_state.search_mode, since=today_start, ticket_urls=ticket_urls) if ticket_urls else None
+    if resumable_run_id:
+        remaining_urls = {s['ticket_url'] for s in database.get_journal_remainder(resumable_run_id)}
+        st.session_state.scrape_run_id = resumable_run_id
+        st.session_state.scrape_selected_showtimes = _filter_selected_showtimes(selected_showtimes, remaining_urls)
+        st.session_state.scrape_queue = [t for t in theaters_to_scrape if any(
+            s.get('ticket_url') in remaining_urls for s in showings if s['theater_name'] == t['name'])]
+        st.info(f"Resuming interrupted run #{resumable_run_id}: {len(ticket_urls) - len(remaining_urls)} of {len(ticket_urls)} showings were already saved, "
+                f"scraping the remaining {len(remaining_urls)}. Earlier prices stay in that run's history.")
+    else:
+        st.session_state.scrape_run_id = database.create_scrape_run(st.session_state.search_mode, st.session_state.scrape_run_context)
+        st.session_state.scrape_selected_showtimes = selected_showtimes
+        database.journal_discovered_showings(st.session_state.scrape_run_id, showings)
+
+def _filter_selected_showtimes(selected_showtimes: dict, ticket_urls: set) -> dict:
+    """Returns the nested showtime selection reduced to showings whose ticket URL is in `ticket_urls`."""
+    filtered = {}
+    for date_str, daily_selections in selected_showtimes.items():
+        for theater_name, films in daily_selections.items():
+            for film, times in films.items():
+                for time_str, showing_list in times.items():
+                    kept = [s for s in showing_list if s.get('ticket_url') in ticket_urls]
+                    if kept:
+                        filtered.setdefault(date_str, {}).setdefault(theater_name, {}).setdefault(film, {})[time_str] = kept
+    return filtered
+
+def _journal_theater_result(theater_name: str, showing_results: list):
+    """
+    Checkpoints a finished theater's showings in the scrape journal, each from its own outcome.
+    Showings skipped by a cancel aren't in `showing_results` and stay unfinished, so the next
+    run of this selection scrapes them.
+    """
+    run_id = st.session_state.scrape_run_id
+    outcomes = {database.JOURNAL_SUCCEEDED: [], database.JOURNAL_FAILED: []}
+    no_prices = []
+    for showing, rows in showing_results:
+        if not showing.get('ticket_url'):
+            continue
+        if rows:
+            outcomes[database.JOURNAL_SUCCEEDED].append(showing['ticket_url'])
+        elif rows is None:
+            outcomes[database.JOURNAL_FAILED].append(showing['ticket_url'])
+        else:
+            no_prices.append(showing['ticket_url'])
+    database.update_journal_status(run_id, outcomes[database.JOURNAL_SUCCEEDED], database.JOURNAL_SUCCEEDED)
+    database.update_journal_status(run_id, outcomes[database.JOURNAL_FAILED], database.JOURNAL_FAILED, f"Price scrape failed at {theater_name}")
+    database.update_journal_status(run_id, no_prices, database.JOURNAL_FAILED, f"No prices found at {theater_name}")
+
+def _save_completed_theaters():
+    """Saves the prices of every theater the batch scrape has finished since the last rerun."""
+    completed = st.session_state.scrape_completed_theaters
+    while not completed.empty():
+        theater_name, result, showing_results = completed.get_nowait()
+        st.session_state.scrape_current_index += 1
+        if result:
+            st.session_state.scrape_results.extend(result)
+            st.session_state.scraped_showings.extend(showing for showing, _ in showing_results)
+            database.save_prices(st.session_state.scrape_run_id, pd.DataFrame(result))
+            st.toast(f"Scrape for {theater_name} complete!")
+        elif not st.session_state.get('cancel_scrape'):
+            st.toast(f"No prices found for {theater_name}. (Showtimes may be sold out or unavailable).")
+        _journal_theater_result(theater_name, showing_results)
+
+def _process_batch_scrape(scout):
+    """Runs one price scrape for every queued theater and saves each theater as it finishes."""
     if 'scrape_thread' not in st.session_state:
         st.session_state.scrape_status_container = ["Initializing..."]
+        st.session_state.scrape_started_at = time.time()
+        completed = st.session_state.scrape_completed_theaters
+        showings = scout.flatten_selected_showtimes(st.session_state.scrape_queue, st.session_state.scrape_selected_showtimes)
+        database.update_journal_status(st.session_state.scrape_run_id, [s['ticket_url'] for s in showings if s.get('ticket_url')], database.JOURNAL_ATTEMPTED)
         thread, get_results = run_async_in_thread(
             scout.scrape_details,
-            [theater],
-            st.session_state.selected_showtimes,
-            status_container=st.session_state.scrape_status_container
+            st.session_state.scrape_queue,
+            st.session_state.scrape_selected_showtimes,
+            status_container=st.session_state.scrape_status_container,
+            theater_progress=st.session_state.scrape_theater_progress,
+            on_theater_complete=lambda name, rows, results: completed.put((name, rows, results)),
+            cancel_event=st.session_state.scrape_cancel_event
         )
         st.session_state.scrape_thread = thread
         st.session_state.get_scrape_results = get_results
@@ -421,28 +512,25 @@ def _process_single_theater_scrape(scout):
     else:
         status_container = st.session_state.scrape_status_container
         thread = st.session_state.scrape_thread
-        with st.status(f"Scraping {theater['name']}: {status_container[0]}", expanded=True) as status_ui:
+        with st.status(f"Scraping prices: {status_container[0]}", expanded=True) as status_ui:
+            # The worker pool keeps running between reruns; this poll only refreshes the UI.
             if thread.is_alive():
+                _save_completed_theaters()
                 time.sleep(1.5)
                 st.rerun()
             else:
                 status, value, log, duration = st.session_state.get_scrape_results()
+                _save_completed_theaters()
+                st.session_state.scrape_open_circuits = scout.open_circuits("prices")
                 st.session_state.last_run_log += log
                 st.session_state.scrape_total_duration += duration
                 if status == 'success':
-                    result, showings_scraped = value
-                    if result:
-                        st.session_state.scrape_results.extend(result)
-                        st.session_state.scraped_showings.extend(showings_scraped)
-                        database.save_prices(st.session_state.scrape_run_id, pd.DataFrame(result))
-                        status_ui.update(label=f"Scrape for {theater['name']} complete!", state="complete", expanded=False)
-                    else:
-                        status_ui.update(label=f"No prices found for {theater['name']}. (Showtimes may be sold out or unavailable).", state="complete", expanded=False)
+                    status_ui.update(label=f"Scrape complete for {st.session_state.scrape_current_index} theaters.", state="complete", expanded=False)
                 else:
-                    st.error(f"Failed to scrape {theater['name']}: {get_error_message(value)}")
-                    status_ui.update(label=f"Error scraping {theater['name']}.", state="error", expanded=False)
-                
-                st.session_state.scrape_current_index += 1
+                    st.error(f"Price scrape failed: {get_error_message(value)}")
+                    status_ui.update(label="Error during price scrape.", state="error", expanded=False)
+
+                st.session_state.scrape_batch_done = True
                 for key in ['scrape_thread', 'get_scrape_results', 'scrape_status_container']:
                     if key in st.session_state: del st.session_state[key]
                 st.rerun()
@@ -450,14 +538,15 @@ def _process_single_theater_scrape(scout):
 def execute_scrape(scout):
     """Runs the main scraping logic by orchestrating initialization, progress, and finalization steps."""
     if 'scrape_queue' not in st.session_state:
-        _initialize_scrape_session()
+        _initialize_scrape_session(scout)
 
     _render_scrape_progress()
 
-    if st.session_state.get('cancel_scrape') or st.session_state.scrape_current_index >= len(st.session_state.scrape_queue):
+    # A cancelled batch still finishes its in-flight showings, so wait for the thread before finalizing.
+    if st.session_state.get('scrape_batch_done') or ('scrape_thread' not in st.session_state and st.session_state.get('cancel_scrape')):
         _finalize_scrape_session()
     else:
-        _process_single_theater_scrape(scout)
+        _process_batch_scrape(scout)
 
 def render_report():
     """Displays the final report dataframe and download buttons."""
@@ -465,6 +554,12 @@ def render_report():
     
     duration_str = f"(Took {st.session_state.last_run_duration:.2f} seconds)" if 'last_run_duration' in st.session_state else ""
     st.success(ui_config['report']['complete_message'].format(duration_str=duration_str))
+
+    open_circuits = st.session_state.get('last_run_open_circuits')
+    if isinstance(open_circuits, dict) and open_circuits:
+        skipped = "; ".join(f"{name} ({c['failures']} failures in a row, {c['skipped']} showings skipped; last error: {c['last_error']})"
+                            for name, c in sorted(open_circuits.items()))
+        st.warning(f"**Some theaters were skipped after repeated failures:** {skipped}")
     
     df_to_display = st.session_state.final_df
 
@@ -776,9 +871,13 @@ def main():
                     st.error(ui_config['scheduler']['error_missing_fields'])
                 else:
                     sanitized_name = scout._sanitize_filename(task_name)
+                    market_timezones = sorted({market_info.get('timezone', "America/Chicago")
+                                               for regions in markets_data.values() for markets in regions.values()
+                                               for market_name, market_info in markets.items() if market_name in markets_to_schedule})
                     task_config = {
                         "task_name": task_name,
                         "markets": markets_to_schedule,
+                        "market_timezones": market_timezones, # The run is planned to finish before the earliest 8 AM cutoff
                         "schedule_time_utc": schedule_time.strftime("%H:%M"),
                         "notification_email": notification_email,
                         "enabled": True,
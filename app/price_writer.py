@@ -0,0 +1,132 @@
+"""
+Batched, incremental writes of scraped price points.
+
+`BatchedPriceWriter` runs as a background task next to a streaming scrape
+(`Scraper.scrape_details_stream`). Rows are queued as each showing completes and
+written with `database.save_prices` every `batch_size` rows or `flush_interval`
+seconds, whichever comes first, so partial results survive a crash and the scrape
+never holds the whole run in memory.
+
+With `journal=True` the writer also keeps the run's scrape journal up to date. A
+showing is only marked succeeded in the same flush that saved its prices, so a crash
+can never leave the journal claiming prices that were not written.
+"""
+import asyncio
+import logging
+import time
+import pandas as pd
+from app import database
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()
+
+
+class BatchedPriceWriter:
+    """Queues price-point rows and saves them to a scrape run in batches."""
+
+    def __init__(self, run_id: int, batch_size: int = 500, flush_interval: float = 2.0, journal: bool = False):
+        self.run_id = run_id
+        self.journal = journal
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.batches_written = 0
+        self.failed_rows = 0
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, rows: list, ticket_url: str | None = None):
+        """Queues rows for writing. With `journal`, `ticket_url` is marked succeeded once its rows are saved."""
+        if rows or (self.journal and ticket_url):
+            await self._queue.put((rows or [], ticket_url if self.journal else None, database.JOURNAL_SUCCEEDED, None))
+
+    def record_status(self, ticket_url: str, status: str, error: str | None = None):
+        """Queues a journal status change (e.g. attempted/failed); safe to call from synchronous callbacks."""
+        if self.journal and ticket_url:
+            self._queue.put_nowait(([], ticket_url, status, error))
+
+    async def close(self):
+        """Flushes anything still queued and stops the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(_CLOSE)
+        await self._task
+        self._task = None
+        logger.info(f"[PriceWriter] Run {self.run_id}: wrote {self.rows_written} rows in {self.batches_written} batches.")
+
+    async def _run(self):
+        batch, statuses = [], []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None # Flush interval elapsed
+
+            if item is _CLOSE:
+                await self._flush(batch, statuses)
+                return
+            if item is not None:
+                rows, ticket_url, status, error = item
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.extend(rows)
+                if ticket_url:
+                    statuses.append((ticket_url, status, error))
+            if deadline is not None and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                await self._flush(batch, statuses)
+                batch, statuses, deadline = [], [], None
+
+    async def _flush(self, batch: list, statuses: list):
+        if not batch and not statuses:
+            return
+        # save_prices is blocking SQLite work; keep it off the scraping event loop.
+        await asyncio.to_thread(self._write, batch, statuses)
+
+    def _write(self, batch: list, statuses: list):
+        saved = True
+        if batch:
+            try:
+                database.save_prices(self.run_id, pd.DataFrame(batch))
+                self.rows_written += len(batch)
+                self.batches_written += 1
+            except Exception as e:
+                saved = False
+                self.failed_rows += len(batch)
+                logger.error(f"[PriceWriter] Failed to save {len(batch)} rows for run {self.run_id}: {e}", exc_info=True)
+        if statuses:
+            try:
+                self._write_journal(statuses, saved)
+            except Exception as e:
+                logger.error(f"[PriceWriter] Failed to update scrape journal for run {self.run_id}: {e}", exc_info=True)
+
+    def _write_journal(self, statuses: list, prices_saved: bool):
+        # Collapse to one final status per showing; attempts are counted separately so none are lost.
+        attempted, final = [], {}
+        for ticket_url, status, error in statuses:
+            if status == database.JOURNAL_ATTEMPTED:
+                attempted.append(ticket_url)
+            else:
+                final[ticket_url] = (status, error)
+        database.update_journal_status(self.run_id, attempted, database.JOURNAL_ATTEMPTED)
+
+        by_status = {}
+        for ticket_url, (status, error) in final.items():
+            if status == database.JOURNAL_SUCCEEDED and not prices_saved:
+                continue # Left as 'attempted' so a resumed run scrapes it again
+            by_status.setdefault((status, error), []).append(ticket_url)
+        for (status, error), ticket_urls in by_status.items():
+            database.update_journal_status(self.run_id, ticket_urls, status, error)
@@ -0,0 +1,139 @@
+"""
+Per-host token-bucket pacing shared by every outbound scraper.
+
+Fandango (Playwright navigations and the HTTP price fetcher), OMDb, Box Office Mojo
+and IMDb all take a token from their host's bucket before each request:
+
+- Buckets refill at a sustained `rate` (requests per second) and hold up to `burst` tokens.
+- Each request reserves its token up front. When a bucket is empty the caller is told
+  how long to wait and sleeps, so requests queue in arrival order instead of failing.
+- One bucket serves `await acquire(url)` in async code and `wait(url)` in sync code, so
+  concurrent threads and event loops share the same budget for a host.
+
+Limits come from `config.RATE_LIMITS`, matched on the host or any parent domain
+("fandango.com" covers "www.fandango.com"). Other hosts use `config.RATE_LIMIT_DEFAULT`.
+`stats()` reports requests, how many had to wait, and total and max wait per host.
+"""
+import asyncio
+import logging
+import threading
+import time
+import urllib.parse
+from app import config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """A token bucket that hands out reservations: `reserve()` returns how long the caller must wait."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1 # May go negative: the debt is what queued callers are waiting on
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            self.requests += 1
+            if wait > 0:
+                self.delayed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rate": self.rate, "burst": self.burst, "requests": self.requests, "delayed": self.delayed,
+                    "total_wait": round(self.total_wait, 3), "max_wait": round(self.max_wait, 3),
+                    "avg_wait": round(self.total_wait / self.requests, 4) if self.requests else 0.0}
+
+
+def _host(url_or_host: str) -> str:
+    if "//" in url_or_host:
+        url_or_host = urllib.parse.urlsplit(url_or_host).hostname or ""
+    return url_or_host.lower().strip(".")
+
+
+class HostRateLimiter:
+    """Token buckets keyed by host. `share` scales every rate, e.g. for one of N worker processes."""
+
+    def __init__(self, limits: dict | None = None, default: tuple | None = None, share: float = 1.0):
+        self.limits = dict(config.RATE_LIMITS if limits is None else limits)
+        self.default = default or config.RATE_LIMIT_DEFAULT
+        self.share = share
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _limit_key(self, host: str) -> str:
+        parts = host.split(".")
+        for i in range(len(parts)):
+            suffix = ".".join(parts[i:])
+            if suffix in self.limits:
+                return suffix
+        return host
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        key = self._limit_key(_host(url_or_host))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    rate, burst = self.limits.get(key, self.default)
+                    bucket = self._buckets[key] = TokenBucket(rate * self.share, burst)
+        return bucket
+
+    async def acquire(self, url: str) -> float:
+        """Waits (without blocking the event loop) until a request to `url`'s host may go out. Returns the wait."""
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def wait(self, url: str) -> float:
+        """Blocking counterpart of `acquire` for synchronous clients."""
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self) -> dict:
+        return {key: bucket.stats() for key, bucket in sorted(self._buckets.items())}
+
+    def log_stats(self):
+        for host, stats in self.stats().items():
+            if stats["delayed"]:
+                logger.info(f"[RateLimit] {host}: {stats['delayed']}/{stats['requests']} requests waited, "
+                            f"{stats['total_wait']:.1f}s total, max {stats['max_wait']:.2f}s.")
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Returns the process-wide limiter, built from `config.RATE_LIMITS` on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = HostRateLimiter()
+    return _limiter
+
+
+def set_rate_limiter(limiter: HostRateLimiter | None):
+    """Replaces the process-wide limiter (None resets it to the configured defaults)."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
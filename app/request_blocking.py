@@ -0,0 +1,121 @@
+"""
+Request interception profiles for scraper pages.
+
+Fandango pages pull in images, fonts, stylesheets, ads and analytics scripts that the
+scraper never looks at: we only read the DOM or the inline pricing JSON. Each scrape
+phase gets a `BlockingProfile` that is installed on a leased page with `page.route`,
+and a `BlockingStats` object tallies what was blocked so every run can report the
+requests and (estimated) bytes it saved.
+"""
+import logging
+import urllib.parse
+
+logger = logging.getLogger(__name__)
+
+FIRST_PARTY_DOMAINS = ("fandango.com", "fandango.net")
+
+# Ad, analytics and tag-manager hosts seen on Fandango pages; blocked in every phase.
+TRACKER_DOMAINS = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "googletagservices.com", "adservice.google.com", "facebook.net",
+    "facebook.com", "amazon-adsystem.com", "adnxs.com", "adsrvr.org", "scorecardresearch.com",
+    "quantserve.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "hotjar.com",
+    "nr-data.net", "newrelic.com", "optimizely.com", "demdex.net", "omtrdc.net", "moatads.com",
+    "krxd.net", "tiqcdn.com", "segment.io", "branch.io", "pubmatic.com", "rubiconproject.com",
+)
+
+# Rough transfer sizes per resource type (bytes), used to estimate what a blocked request would have cost.
+ESTIMATED_BYTES_BY_TYPE = {
+    "image": 35_000, "media": 400_000, "font": 40_000, "stylesheet": 25_000, "script": 30_000,
+    "xhr": 5_000, "fetch": 5_000, "texttrack": 2_000, "manifest": 1_000, "eventsource": 1_000,
+    "websocket": 1_000, "other": 3_000,
+}
+
+
+def _host_matches(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class BlockingProfile:
+    """Which resource types and hosts to abort for one scrape phase."""
+
+    def __init__(self, name: str, blocked_resource_types=(), block_third_party=False,
+                 blocked_domains=TRACKER_DOMAINS, first_party_domains=FIRST_PARTY_DOMAINS):
+        self.name = name
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.block_third_party = block_third_party
+        self.blocked_domains = tuple(blocked_domains)
+        self.first_party_domains = tuple(first_party_domains)
+
+    def block_reason(self, resource_type: str, url: str) -> str | None:
+        """Returns why a request should be blocked, or None to let it through."""
+        if resource_type == "document":
+            return None # Never block the page (or a frame) itself
+        host = (urllib.parse.urlsplit(url).hostname or "").lower()
+        if host and _host_matches(host, self.blocked_domains):
+            return "tracker"
+        if resource_type in self.blocked_resource_types:
+            return resource_type
+        if self.block_third_party and host and not _host_matches(host, self.first_party_domains):
+            return "third-party"
+        return None
+
+
+class BlockingStats:
+    """Per-run tally of blocked and allowed requests."""
+
+    def __init__(self, phase: str):
+        self.phase = phase
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.bytes_saved = 0
+        self.blocked_by_reason = {}
+
+    def record_blocked(self, resource_type: str, reason: str):
+        self.requests_blocked += 1
+        self.bytes_saved += ESTIMATED_BYTES_BY_TYPE.get(resource_type, ESTIMATED_BYTES_BY_TYPE["other"])
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+
+    def record_allowed(self):
+        self.requests_allowed += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "phase": self.phase,
+            "requests_allowed": self.requests_allowed,
+            "requests_blocked": self.requests_blocked,
+            "estimated_bytes_saved": self.bytes_saved,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+        }
+
+    def summary(self) -> str:
+        total = self.requests_allowed + self.requests_blocked
+        return (f"[{self.phase}] blocked {self.requests_blocked}/{total} requests, "
+                f"~{self.bytes_saved / (1024 * 1024):.1f} MB saved")
+
+
+_MEDIA_TYPES = ("image", "media", "font", "texttrack", "manifest")
+
+BLOCKING_PROFILES = {
+    # Theater pages and search results: the DOM must still render, so first-party scripts stay.
+    "showtimes": BlockingProfile("showtimes", blocked_resource_types=_MEDIA_TYPES + ("stylesheet",)),
+    "search": BlockingProfile("search", blocked_resource_types=_MEDIA_TYPES + ("stylesheet",)),
+    # Ticketing pages: the pricing JSON is inline in the document, so nothing off-site is needed.
+    "prices": BlockingProfile("prices", blocked_resource_types=_MEDIA_TYPES + ("stylesheet", "websocket", "eventsource"),
+                              block_third_party=True),
+}
+
+
+async def apply_blocking_profile(page, profile: BlockingProfile, stats: BlockingStats):
+    """Installs a `page.route` handler that aborts requests matched by `profile`."""
+    async def handle_route(route):
+        request = route.request
+        reason = profile.block_reason(request.resource_type, request.url)
+        if reason:
+            stats.record_blocked(request.resource_type, reason)
+            await route.abort()
+        else:
+            stats.record_allowed()
+            await route.continue_()
+
+    await page.route("**/*", handle_route)
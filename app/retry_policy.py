@@ -0,0 +1,124 @@
+"""
+Retries and per-theater circuit breaking for scrape workers.
+
+A timed-out theater page or ticketing page used to be given up on at the first
+failure, while a theater whose site is broken kept taking worker slots for one 30-60 s
+timeout after another. Workers now run each attempt through `run_with_retries`:
+
+- Transient failures are retried up to `RetryPolicy.attempts` times, sleeping a
+  jittered exponential backoff between attempts. The sleep happens outside the
+  concurrency slot, so a waiting retry doesn't hold one.
+- A page that fails all of its attempts counts once against the theater in a
+  `CircuitBreaker`; retries that recover don't count at all. After `threshold` consecutive
+  failed pages its circuit opens and the rest of the theater's work in this run fails
+  fast with `CircuitOpenError` instead of being attempted.
+- `CircuitBreaker.open_circuits` is what the run summary reports.
+"""
+import asyncio
+import datetime
+import random
+import threading
+from app import config
+
+
+class TransientScrapeError(Exception):
+    """A failure worth retrying (timeout, dropped connection, crashed page)."""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of attempting work for a theater whose circuit is open."""
+
+    def __init__(self, key: str):
+        super().__init__(f"Circuit open for {key}; skipping.")
+        self.key = key
+
+
+class RetryPolicy:
+    """Attempt count and "full jitter" exponential backoff: attempt n sleeps uniform(0, min(max_delay, base_delay * 2**n))."""
+
+    def __init__(self, attempts: int | None = None, base_delay: float | None = None, max_delay: float | None = None, rng=None):
+        self.attempts = max(1, attempts or config.SCRAPE_RETRY_ATTEMPTS)
+        self.base_delay = config.SCRAPE_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = config.SCRAPE_RETRY_MAX_DELAY if max_delay is None else max_delay
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Per-key consecutive failure counts for one run; a key's circuit stays open for the rest of the run."""
+
+    def __init__(self, threshold: int | None = None):
+        self.threshold = max(1, threshold or config.CIRCUIT_BREAKER_THRESHOLD)
+        self._failures = {}
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        return key not in self._open
+
+    def check(self, key: str):
+        """Raises `CircuitOpenError` (and counts the skip) if `key`'s circuit is open."""
+        circuit = self._open.get(key)
+        if circuit is not None:
+            with self._lock:
+                circuit["skipped"] += 1
+            raise CircuitOpenError(key)
+
+    def record_success(self, key: str):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def record_failure(self, key: str, error) -> bool:
+        """Counts a failure. Returns True if it opened the circuit."""
+        with self._lock:
+            if key in self._open:
+                return False
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            if failures < self.threshold:
+                return False
+            self._open[key] = {"failures": failures, "last_error": str(error), "skipped": 0,
+                               "opened_at": datetime.datetime.now().isoformat(timespec="seconds")}
+        print(f"  [CIRCUIT] Opened for {key} after {failures} consecutive failures: {error}")
+        return True
+
+    def merge(self, open_circuits: dict):
+        """Adds circuits opened elsewhere (e.g. in a worker process) to this run's summary."""
+        with self._lock:
+            for key, circuit in open_circuits.items():
+                self._open.setdefault(key, dict(circuit))
+
+    @property
+    def open_circuits(self) -> dict:
+        with self._lock:
+            return {key: dict(circuit) for key, circuit in self._open.items()}
+
+    def summary(self) -> list[str]:
+        return [f"{key}: opened after {c['failures']} consecutive failures ({c['last_error']}); {c['skipped']} tasks skipped"
+                for key, c in sorted(self.open_circuits.items())]
+
+
+async def run_with_retries(operation, key: str, policy: RetryPolicy, breaker: CircuitBreaker,
+                           retry_on: tuple = (Exception,)):
+    """
+    Awaits `operation()` until it succeeds, retrying `retry_on` errors with backoff. Raises the
+    last error once attempts run out (counting one failure against `key`), or `CircuitOpenError`
+    as soon as `key`'s circuit is open.
+    """
+    for attempt in range(policy.attempts):
+        breaker.check(key)
+        try:
+            result = await operation()
+        except CircuitOpenError:
+            raise
+        except retry_on as e:
+            if attempt + 1 >= policy.attempts:
+                breaker.record_failure(key, e)
+                raise
+            breaker.check(key)
+            await asyncio.sleep(policy.backoff(attempt))
+            continue
+        breaker.record_success(key)
+        return result
@@ -0,0 +1,177 @@
+"""
+Makespan-aware ordering and completion-time prediction for scrape runs.
+
+Work used to be submitted in input order, so the slowest theaters often started last
+and stretched the run. `ScrapeCostModel` predicts how long each page will take from
+per-theater history:
+
+- Average seconds per theater page and per ticketing page come from the
+  `scrape_latency` table. The `Scraper` folds each run's timings into it.
+- Average showings per day come from the `showings` table.
+- Theaters with no history get the median of the others, or the
+  `SCRAPE_DEFAULT_*_SECONDS` constants on a fresh database.
+
+`order_showings` and `order_theater_pages` sort work longest-first: the classic LPT
+rule. `predict_makespan` runs the same greedy schedule over `workers` slots to predict
+when the run will finish.
+
+`plan_for_deadline` uses the same costs to fit a run inside a time budget, such as the
+time left before the 8 AM market cutoff. It covers every price class first and then fills
+in the remaining showings. `coverage` reports how much of a run a subset covers.
+"""
+import heapq
+import logging
+import statistics
+from app import config, database
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeCostModel:
+    """Predicted seconds per theater page ("showtimes") and per ticketing page ("prices"), by theater."""
+
+    def __init__(self, page_seconds: dict | None = None, showing_seconds: dict | None = None,
+                 showings_per_day: dict | None = None):
+        self.page_seconds = dict(page_seconds or {})
+        self.showing_seconds = dict(showing_seconds or {})
+        self.showings_per_day = dict(showings_per_day or {})
+        self.default_page_seconds = statistics.median(self.page_seconds.values()) if self.page_seconds \
+            else config.SCRAPE_DEFAULT_PAGE_SECONDS
+        self.default_showing_seconds = statistics.median(self.showing_seconds.values()) if self.showing_seconds \
+            else config.SCRAPE_DEFAULT_SHOWING_SECONDS
+
+    @classmethod
+    def from_database(cls, theater_names: list[str] | None = None) -> "ScrapeCostModel":
+        """Loads the model from the company database; an unconfigured or unreadable database gives the defaults."""
+        if config.DB_FILE is None:
+            return cls()
+        try:
+            return cls(database.get_scrape_latencies("showtimes"), database.get_scrape_latencies("prices"),
+                       database.get_showings_per_day(theater_names))
+        except Exception as e:
+            logger.warning(f"[Planner] Could not load scrape history, using default costs: {e}")
+            return cls()
+
+    @property
+    def has_history(self) -> bool:
+        return bool(self.showing_seconds)
+
+    def page_cost(self, theater_name: str) -> float:
+        return self.page_seconds.get(theater_name, self.default_page_seconds)
+
+    def showing_cost(self, showing: dict) -> float:
+        return self.showing_seconds.get(showing.get('theater_name'), self.default_showing_seconds)
+
+    def theater_size(self, theater_name: str) -> float:
+        return self.showings_per_day.get(theater_name, 0.0)
+
+
+def order_showings(showings: list, model: ScrapeCostModel) -> list:
+    """
+    Returns `showings` longest-first: slowest ticketing pages first, and within equal costs the
+    theater with the most predicted work first. Equal showings keep their input order.
+    """
+    theater_totals = {}
+    for showing in showings:
+        name = showing.get('theater_name')
+        theater_totals[name] = theater_totals.get(name, 0.0) + model.showing_cost(showing)
+    return sorted(showings, key=lambda s: (-model.showing_cost(s), -theater_totals[s.get('theater_name')]))
+
+
+def order_theater_pages(theaters: list, dates: list, model: ScrapeCostModel) -> list[tuple]:
+    """Returns every `(theater, date)` page longest-first, bigger theaters first among equal latencies."""
+    pages = [(theater, date_str) for date_str in dates for theater in theaters]
+    return sorted(pages, key=lambda page: (-model.page_cost(page[0]['name']), -model.theater_size(page[0]['name'])))
+
+
+def predict_makespan(costs: list[float], workers: int) -> float:
+    """Seconds until `costs`, started in the given order on `workers` parallel slots, all finish."""
+    if not costs:
+        return 0.0
+    loads = [0.0] * max(1, min(workers, len(costs)))
+    for cost in costs:
+        heapq.heapreplace(loads, loads[0] + cost)
+    return max(loads)
+
+
+def predict_completion_time(showings: list, model: ScrapeCostModel | None = None, workers: int | None = None) -> float:
+    """Predicted seconds to scrape the prices of `showings` when they are run longest-first."""
+    model = model or ScrapeCostModel.from_database()
+    workers = workers or config.SCRAPE_CONCURRENCY_INITIAL
+    return predict_makespan([model.showing_cost(s) for s in order_showings(showings, model)], workers)
+
+
+def price_class(showing: dict) -> tuple:
+    """The (theater, film, format, daypart) a showing's prices are expected to depend on."""
+    return (showing.get('theater_name'), showing.get('film_title'), showing.get('format', '2D'), showing.get('daypart'))
+
+
+def coverage(scraped: list, showings: list) -> dict:
+    """How much of `showings` the `scraped` subset covers, by showing, price class and theater."""
+    return {
+        "showings": (len(scraped), len(showings)),
+        "price_classes": (len({price_class(s) for s in scraped}), len({price_class(s) for s in showings})),
+        "theaters": (len({s.get('theater_name') for s in scraped}), len({s.get('theater_name') for s in showings})),
+    }
+
+
+def format_coverage(stats: dict) -> str:
+    return ", ".join(f"{done}/{total} {name.replace('_', ' ')}" for name, (done, total) in stats.items())
+
+
+class DeadlinePlan:
+    """The showings chosen to fit a time budget, in the order they should run, and what was left out."""
+
+    def __init__(self, selected: list, deferred: list, predicted_seconds: float, budget_seconds: float):
+        self.selected = selected
+        self.deferred = deferred
+        self.predicted_seconds = predicted_seconds
+        self.budget_seconds = budget_seconds
+        self.coverage = coverage(selected, selected + deferred)
+
+    @property
+    def complete(self) -> bool:
+        return not self.deferred
+
+    def summary(self) -> str:
+        return (f"Planned {format_coverage(self.coverage)} in a predicted {self.predicted_seconds / 60:.1f} min "
+                f"of a {self.budget_seconds / 60:.1f} min budget")
+
+
+def plan_for_deadline(showings: list, budget_seconds: float, model: ScrapeCostModel | None = None,
+                      workers: int | None = None) -> DeadlinePlan:
+    """
+    Picks the showings to scrape within `budget_seconds` on `workers` parallel slots.
+
+    The first pass takes the cheapest showing of every price class (theater, film, format,
+    daypart), so every price point gets at least one observation. The second pass fills the
+    remaining budget with the other showings, cheapest first. The chosen showings are returned
+    longest-first, the order the scraper runs them in.
+    """
+    model = model or ScrapeCostModel.from_database(sorted({s.get('theater_name') for s in showings}))
+    workers = workers or config.SCRAPE_CONCURRENCY_INITIAL
+    budget_seconds = max(0.0, budget_seconds)
+
+    representatives = {}
+    for showing in sorted(showings, key=model.showing_cost):
+        representatives.setdefault(price_class(showing), showing)
+    first_pass = list(representatives.values())
+    chosen = {id(s) for s in first_pass}
+    candidates = first_pass + sorted((s for s in showings if id(s) not in chosen), key=model.showing_cost)
+
+    # Budget in slot-seconds first, then trim until the longest-first schedule actually fits.
+    capacity = budget_seconds * workers
+    selected, used = [], 0.0
+    for showing in candidates:
+        cost = model.showing_cost(showing)
+        if used + cost > capacity:
+            continue
+        selected.append(showing)
+        used += cost
+    predicted = predict_makespan([model.showing_cost(s) for s in order_showings(selected, model)], workers)
+    while selected and predicted > budget_seconds:
+        selected.pop()
+        predicted = predict_makespan([model.showing_cost(s) for s in order_showings(selected, model)], workers)
+
+    kept = {id(s) for s in selected}
+    return DeadlinePlan(order_showings(selected, model), [s for s in showings if id(s) not in kept], predicted, budget_seconds)
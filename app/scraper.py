@@ -3,7 +3,9 @@ import json
 import datetime
 import os
 import asyncio
-from playwright.async_api import async_playwright, Page
+import contextlib
+import time
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 import logging
 from bs4 import BeautifulSoup
 import urllib.parse
@@ -11,9 +13,24 @@ from thefuzz import fuzz
 from app.utils import clean_film_title
 
 from app import database
+from app.browser_pool import get_browser_pool
+from app.price_fetcher import evaluate_commerce_models, extract_commerce_models, get_price_fetcher
+from app.request_blocking import BLOCKING_PROFILES, BlockingStats, apply_blocking_profile
+from app.concurrency import AdaptiveConcurrencyLimiter, report_throttled, report_timeout, set_slot_kind, timed_request
+from app.rate_limiter import get_rate_limiter
+from app.hedging import NavigationHedger
+from app.price_inference import InferenceStats, infer_price_stream
+from app.retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy, TransientScrapeError, run_with_retries
+from app.fast_html import parse_html
+from app.ticket_parser import UnmatchedTicketTypeBuffer, get_ticket_parser, load_ticket_types
+from app.sharded_scrape import sharded_showings, sharded_showings_stream
+from app.scrape_planner import ScrapeCostModel, order_showings, order_theater_pages
+from app import config
 from app.config import DEBUG_DIR, CACHE_FILE
 
 logger = logging.getLogger(__name__)
+
+SHOWTIME_RE = re.compile(r'\d{1,2}:\d{2}[ap]m?', re.IGNORECASE)
 logger.setLevel(logging.DEBUG)
 handler = logging.StreamHandler()
 formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
@@ -22,12 +39,28 @@ logger.addHandler(handler)
 
 logger.debug("Scraper class initialized")
 class Scraper:
-    def __init__(self, headless=True, devtools=False):
+    def __init__(self, headless=True, devtools=False, http_prices=True, block_resources=True, processes=None,
+                 hedge_navigations=None, infer_prices=None):
         """Initializes the Scraper, loading and pre-compiling ticket type data."""
         self.ticket_types_data = self._load_ticket_types()
         self.headless = headless
         self.devtools = devtools
         self.capture_html = False # New flag to control debug snapshots
+        self.http_prices = http_prices # Fetch ticketing pages over HTTP before falling back to the browser
+        self.block_resources = block_resources # Abort images, fonts, ads etc. on scraper pages
+        self.blocking_profiles = dict(BLOCKING_PROFILES)
+        self.blocking_stats = {} # Latest run's BlockingStats, keyed by phase
+        self.concurrency = AdaptiveConcurrencyLimiter() # Shared by showtime discovery and price scraping
+        self.unmatched_ticket_types = UnmatchedTicketTypeBuffer() # Flushed in batches, off the parse path
+        self.retry_policy = RetryPolicy()
+        self.circuit_breakers = {} # Latest run's CircuitBreaker, keyed by phase
+        self.hedge_navigations = config.HEDGE_NAVIGATIONS if hedge_navigations is None else hedge_navigations
+        self.hedger = NavigationHedger() # Replaced at the start of every price run (see app/hedging.py)
+        self.infer_prices = config.PRICE_INFERENCE if infer_prices is None else infer_prices # See app/price_inference.py
+        self.inference_stats = None # Latest inference run's InferenceStats
+        self.processes = processes or config.SCRAPE_PROCESSES # Worker processes for large runs (see app/sharded_scrape.py)
+        self.shard_min_theaters = config.SHARDED_SCRAPE_MIN_THEATERS
+        self.longest_first = config.SCRAPE_LONGEST_FIRST # Order work by predicted latency (see app/scrape_planner.py)
         logger.info(f"Scraper initialized with headless={self.headless}, devtools={self.devtools}")
 
         # Pre-compile regex for amenities to avoid recompilation in loops
@@ -35,11 +68,6 @@ class Scraper:
         for amenity, keywords in self.ticket_types_data.get("amenity_map", {}).items():
             self.amenity_map_re[amenity] = [re.compile(r'(?<!\w)' + re.escape(kw) + r'(?!\w)', re.IGNORECASE) for kw in keywords]
         
-        # Pre-compile regex for base ticket types
-        self.base_type_map_re = {}
-        for base_type, keywords in self.ticket_types_data.get("base_type_map", {}).items():
-            self.base_type_map_re[base_type] = [re.compile(r'(?<!\w)' + re.escape(kw) + r'(?!\w)', re.IGNORECASE) for kw in keywords]
-
         # Load the list of PLF formats and convert to a lowercase set for efficient lookup
         self.plf_formats = {f.lower() for f in self.ticket_types_data.get("plf_formats", [])}
 
@@ -65,6 +93,108 @@ class Scraper:
     def _sanitize_filename(self, name):
         return re.sub(r'[\\/*?:",<>|]', '', name).replace(' ', '_')
 
+    def _browser_pool(self):
+        """Returns the shared browser pool for the running event loop."""
+        return get_browser_pool(headless=self.headless, devtools=self.devtools)
+
+    def _start_blocking_run(self, phase: str) -> BlockingStats:
+        """Starts a fresh request-blocking tally for one run of a scrape phase."""
+        stats = BlockingStats(phase)
+        self.blocking_stats[phase] = stats
+        return stats
+
+    def _report_blocking(self, stats: BlockingStats):
+        if stats.requests_blocked or stats.requests_allowed:
+            print(f"  [BLOCKING] {stats.summary()}")
+            logger.info(f"Request blocking stats: {stats.as_dict()}")
+
+    def _start_circuit_breaker(self, phase: str) -> CircuitBreaker:
+        """Starts a fresh circuit breaker for one run of a scrape phase; circuits never carry over between runs."""
+        breaker = CircuitBreaker()
+        self.circuit_breakers[phase] = breaker
+        return breaker
+
+    def _report_circuits(self, breaker: CircuitBreaker):
+        for line in breaker.summary():
+            print(f"  [CIRCUIT] {line}")
+
+    def open_circuits(self, phase: str) -> dict:
+        """Theaters whose circuit opened during the latest run of `phase` ("showtimes" or "prices")."""
+        breaker = self.circuit_breakers.get(phase)
+        return breaker.open_circuits if breaker else {}
+
+    def _start_hedger(self) -> NavigationHedger:
+        """Starts fresh navigation latency tracking and hedge budget for one price run."""
+        self.hedger = NavigationHedger()
+        return self.hedger
+
+    def _report_hedging(self, hedger: NavigationHedger):
+        if hedger.primaries:
+            print(f"  [HEDGE] {hedger.summary()}")
+            logger.info(f"Navigation hedging stats: {hedger.stats()}")
+
+    def hedging_stats(self) -> dict:
+        """Hedged-navigation telemetry for the latest price run."""
+        return self.hedger.stats()
+
+    def _report_concurrency(self, phase: str):
+        snapshot = self.concurrency.snapshot()
+        logger.info(f"[Concurrency] {phase} finished at limit {snapshot['limit']} "
+                    f"({snapshot['healthy']} healthy, {snapshot['congested']} congested completions).")
+        get_rate_limiter().log_stats()
+
+    async def _goto(self, page, url: str, **kwargs):
+        """`page.goto` paced by the per-host rate limiter."""
+        await get_rate_limiter().acquire(url)
+        with timed_request():
+            return await page.goto(url, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def _phase_page(self, stats: BlockingStats, pool=None):
+        """Leases a pool page with the blocking profile for `stats.phase` installed."""
+        async with (pool or self._browser_pool()).page() as page:
+            profile = self.blocking_profiles.get(stats.phase) if self.block_resources else None
+            if profile is not None:
+                await apply_blocking_profile(page, profile, stats)
+            yield page
+
+    async def _cost_model(self, theater_names: list[str] | None = None) -> ScrapeCostModel:
+        """Per-theater latency history for ordering a run. Without it every cost is equal and input order is kept."""
+        if not self.longest_first:
+            return ScrapeCostModel()
+        return await asyncio.to_thread(ScrapeCostModel.from_database, theater_names)
+
+    async def _save_latencies(self, phase: str, samples: dict):
+        """Folds this run's `{theater: [pages, seconds]}` into the latency history the planner reads."""
+        if not samples or config.DB_FILE is None:
+            return
+        try:
+            await asyncio.to_thread(database.record_scrape_latencies, phase, {name: tuple(v) for name, v in samples.items()})
+        except Exception as e:
+            logger.warning(f"Could not record {phase} latencies: {e}")
+
+    def _shard_count(self, theater_count: int) -> int:
+        """How many worker processes a run over `theater_count` theaters should use; 1 means in-process."""
+        if self.processes <= 1 or theater_count < max(2, self.shard_min_theaters):
+            return 1
+        return min(self.processes, theater_count)
+
+    def _shard_options(self) -> dict:
+        """What a worker process needs to build a Scraper configured like this one."""
+        return {
+            "scraper": {"headless": self.headless, "devtools": self.devtools,
+                        "http_prices": self.http_prices, "block_resources": self.block_resources,
+                        "hedge_navigations": self.hedge_navigations,
+                        "infer_prices": False}, # Inference runs in the parent, over the sharded stream
+            "capture_html": self.capture_html,
+            "db_file": config.DB_FILE,
+        }
+
+    async def flush_unmatched_ticket_types(self):
+        """Writes buffered unmatched ticket types to the database without blocking the event loop."""
+        if self.unmatched_ticket_types.pending:
+            await asyncio.to_thread(self.unmatched_ticket_types.flush)
+
     def _find_amenities_in_string(self, text: str) -> list[str]:
         """Finds all known amenities from a string based on ticket_types.json."""
         if not text:
@@ -83,80 +213,18 @@ class Scraper:
 
     def _load_ticket_types(self):
         """Loads ticket type and amenity mappings from an external JSON file."""
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        ticket_types_path = os.path.join(script_dir, 'ticket_types.json')
-        try:
-            with open(ticket_types_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"    [ERROR] Could not load ticket_types.json: {e}")
-            return {"amenity_map": {}, "base_type_map": {}}
+        return load_ticket_types()
 
     def _parse_ticket_description(self, description: str, showing_details: dict | None = None) -> dict:
         """
-        [REFACTORED] Parses a ticket description string to extract the base type and any amenities.
-        This version uses a multi-pass approach to be more robust against complex descriptions.
+        Parses a ticket description string into its base type and any amenities.
+        Parsing is compiled and cached in `app.ticket_parser`; unrecognized base types are buffered
+        in `self.unmatched_ticket_types` and written by `flush_unmatched_ticket_types`.
         """
-        if not description:
-            return {"base_type": "Unknown", "amenities": []}
-
-        context = showing_details or {} # For logging context
-        # Normalize the description: lowercase, fix dashes, remove most punctuation, normalize whitespace.
-        remaining_desc = description.lower().replace('−', '-').strip()
-
-        found_amenities = []
-
-        # --- Pass 1: Find known amenities and remove them ---
-        for amenity, patterns in self.amenity_map_re.items():
-            for pattern in patterns:
-                new_desc, count = pattern.subn('', remaining_desc) # Use subn to count replacements
-                if count > 0:
-                    found_amenities.append(amenity)
-                    remaining_desc = new_desc.strip()
-
-        # --- Pass 2: Find a known base ticket type (e.g., Adult, Child) ---
-        found_base_type = None
-        # Sort by length of keywords to match longer phrases first (e.g., "General Admission" before "General")
-        sorted_base_types = sorted(self.base_type_map_re.items(), key=lambda item: -max(len(p.pattern) for p in item[1]))
-        for base_type, patterns in sorted_base_types:
-            for pattern in sorted(patterns, key=lambda p: -len(p.pattern)):
-                new_desc, count = pattern.subn('', remaining_desc)
-                if count > 0:
-                    found_base_type = base_type
-                    remaining_desc = new_desc.strip()
-                    break
-            if found_base_type:
-                break
-
-        # --- Pass 3: Handle what's left ---
-        # Clean up the remainder by removing extra spaces and non-alphanumeric characters
-        # that might be left over (like parentheses).
-        remaining_parts = [part for part in re.split(r'[\s\(\)\[\]]+', remaining_desc) if part]
-
-        for part in remaining_parts:
-            # If no base type was found yet, the first significant part becomes the base type.
-            if not found_base_type:
-                found_base_type = part.title()
-                # Log this new base type for review if it's not a price string
-                if not re.match(r'^\$\d+\.\d{2}$', found_base_type):
-                    try:
-                        database.log_unmatched_ticket_type(description, found_base_type, context)
-                    except Exception as e:
-                        print(f"    [DB-WARN] Failed to log unmatched ticket type '{found_base_type}'. Reason: {e}")
-            # If a base type is already found, treat other parts as potential amenities.
-            elif part.lower() not in self.ignored_amenities:
-                found_amenities.append(part.title())
-
-        # Final fallback if nothing was found at all.
-        if not found_base_type:
-            found_base_type = "Unknown"
-            # Log the original description for review
-            try:
-                database.log_unmatched_ticket_type(description, found_base_type, context)
-            except Exception as e:
-                print(f"    [DB-WARN] Failed to log unmatched ticket type '{description}'. Reason: {e}")
-        
-        return {"base_type": found_base_type, "amenities": sorted(list(set(found_amenities)))}
+        parsed = get_ticket_parser().parse(description or "")
+        if parsed.unmatched:
+            self.unmatched_ticket_types.record(description, parsed.unmatched, showing_details)
+        return {"base_type": parsed.base_type, "amenities": list(parsed.amenities)}
 
     def _parse_showtime_for_daypart(self, time_str: str):
         """Parses a showtime string into a time object for daypart classification."""
@@ -210,9 +278,7 @@ class Scraper:
         """Performs a lightweight check to see if a URL is active."""
         if not url or url == "N/A":
             return False
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        async with self._browser_pool().page() as page:
             try:
                 response = await page.request.head(url, timeout=10000) # Use HEAD request for efficiency
                 status = response.status
@@ -223,11 +289,13 @@ class Scraper:
             except Exception as e:
                 print(f"        [WARNING] URL check failed for {url} with unexpected error: {e}")
                 return False
-            finally:
-                await browser.close()
-    def _process_movie_block(self, movie_block, theater, base_format=""):
-        """Processes a single movie block (li.fd-panel) to extract all its showings."""
+    def _process_movie_block(self, movie_block, theater, base_format="", format_cache: dict | None = None):
+        """
+        Processes a single movie block (li.fd-panel) to extract all its showings.
+        `format_cache` memoizes the format lookup by format text across the blocks of one page.
+        """
         showings = []
+        format_cache = {} if format_cache is None else format_cache
         film_title_elem = movie_block.select_one('h2.thtr-mv-list__detail-title a')
         film_title = film_title_elem.get_text(strip=True) if film_title_elem else "Unknown Title"
         
@@ -241,6 +309,7 @@ class Scraper:
                     amenity_name = button['data-amenity-name']
                     if amenity_name:
                         block_amenities.append(amenity_name)
+        block_amenities_text = " ".join(block_amenities)
 
         # Scrape additional details from Fandango page for fallbacks
         meta_elem = movie_block.select_one('.thtr-mv-list__detail-meta')
@@ -256,6 +325,12 @@ class Scraper:
         synopsis_elem = movie_block.select_one('.thtr-mv-list__detail-synopsis')
         fandango_plot = synopsis_elem.get_text(strip=True) if synopsis_elem else "N/A"
 
+        # Other formats come from the main movie block and apply to all groups
+        variant_title_elem = movie_block.select_one('.movie-variant-title')
+        variant_title = variant_title_elem.get_text(strip=True) if variant_title_elem else ''
+        other_format_elems = movie_block.select('h2.thtr-mv-list__detail-title span, h2.thtr-mv-list__detail-title em')
+        other_format_text = ' '.join([elem.get_text(strip=True) for elem in other_format_elems])
+
         # Handle new amenity group layout
         amenity_groups = movie_block.select('.thtr-mv-list__amenity-group')
         if not amenity_groups:
@@ -270,11 +345,8 @@ class Scraper:
             group_amenities_elems = group.select('ul.fd-list-inline button[data-amenity-name]')
             group_amenities = [btn['data-amenity-name'] for btn in group_amenities_elems]
 
-            # Get other formats from the main movie block (they apply to all groups)
-            variant_title_elem = movie_block.select_one('.movie-variant-title')
-            variant_title = variant_title_elem.get_text(strip=True) if variant_title_elem else ''
-            other_format_elems = movie_block.select('h2.thtr-mv-list__detail-title span, h2.thtr-mv-list__detail-title em')
-            other_format_text = ' '.join([elem.get_text(strip=True) for elem in other_format_elems])
+            # Everything but the per-showtime amenity label is shared by the whole group
+            group_format_text = f"{film_title} {base_format} {variant_title} {other_format_text} {group_format} {' '.join(group_amenities)} {block_amenities_text}"
 
             showtime_links = group.select('ol.showtimes-btn-list a.showtime-btn')
             for link in showtime_links:
@@ -283,27 +355,28 @@ class Scraper:
                 time_str = time_label_elem.get_text(strip=True) if time_label_elem else link.get_text(strip=True)
                 
                 amenity_text = amenity_elem.get_text(strip=True) if amenity_elem else ''
-                block_amenities_text = " ".join(block_amenities)
                 
                 # Combine all format sources into one string for parsing
-                full_format_text = f"{film_title} {base_format} {variant_title} {other_format_text} {group_format} {' '.join(group_amenities)} {block_amenities_text} {amenity_text}".strip()
+                full_format_text = f"{group_format_text} {amenity_text}".strip()
                 logger.debug(f"[FORMAT TEXT] For '{film_title}' at '{time_str}': '{full_format_text}'")
-                all_formats = set(self._find_amenities_in_string(full_format_text))
-                
-                if len(all_formats) > 1 and '2D' in all_formats:
-                    all_formats.remove('2D')
-                
-                # Check if any of the canonical amenities found are in our configured PLF list
-                is_plf = any(amenity.lower() in self.plf_formats for amenity in all_formats)
+                if full_format_text not in format_cache:
+                    all_formats = set(self._find_amenities_in_string(full_format_text))
+                    
+                    if len(all_formats) > 1 and '2D' in all_formats:
+                        all_formats.remove('2D')
+                    
+                    # Check if any of the canonical amenities found are in our configured PLF list
+                    is_plf = any(amenity.lower() in self.plf_formats for amenity in all_formats)
 
-                movie_format = ", ".join(sorted(list(all_formats))) if all_formats else "2D"
+                    format_cache[full_format_text] = (", ".join(sorted(list(all_formats))) if all_formats else "2D", is_plf)
+                movie_format, is_plf = format_cache[full_format_text]
                 
                 href = link.get('href')
                 if href and isinstance(href, str):
                     ticket_url_suffix = href.split('jump.aspx')[-1]
                     ticket_url = "https://tickets.fandango.com/transaction/ticketing/mobile/jump.aspx" + ticket_url_suffix
                     logger.info(f"[SHOWTIME DISCOVERY] Theater: {theater['name']}, Film: {film_title}, Time: {time_str}, Format: {movie_format}")
-                    if film_title != "Unknown Title" and time_str and ticket_url and re.match(r'\d{1,2}:\d{2}[ap]m?', time_str, re.IGNORECASE):
+                    if film_title != "Unknown Title" and time_str and ticket_url and SHOWTIME_RE.match(time_str):
                         showings.append({
                             "theater_name": theater['name'], "film_title": film_title, 
                             "format": movie_format, "is_plf": is_plf, "showtime": time_str, 
@@ -320,7 +393,7 @@ class Scraper:
         """Searches for theaters by ZIP code on Fandango."""
         async def search(page):
             url = f"https://www.fandango.com/{zip_code}_movietimes?date={date_str}"
-            await page.goto(url, timeout=30000)
+            await self._goto(page, url, timeout=30000)
             for _ in range(3):
                 await page.mouse.wheel(0, 1500)
                 await page.wait_for_timeout(500)
@@ -332,12 +405,8 @@ class Scraper:
         if page:
             return await search(page)
         else:
-            async with async_playwright() as p: # type: ignore
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                results = await search(page)
-                await browser.close()
-                return results
+            async with self._browser_pool().page() as page:
+                return await search(page)
 
     async def live_search_by_name(self, search_term, page: 'Page' = None): # type: ignore
         print(f"  - Live searching for: {search_term}")
@@ -347,7 +416,7 @@ class Scraper:
         async def _search(page_to_use: 'Page'): # type: ignore
             results = {}
             try:
-                await page_to_use.goto(search_url, timeout=60000)
+                await self._goto(page_to_use, search_url, timeout=60000)
 
                 # Handle cases where Fandango redirects directly to a theater page
                 if "/theater-page" in page_to_use.url:
@@ -388,20 +457,14 @@ class Scraper:
         if page:
             return await _search(page)
         else:
-            async with async_playwright() as p: # type: ignore
-                browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-                page = await browser.new_page()
-                results = await _search(page)
-                await browser.close()
-                return results
+            async with self._browser_pool().page() as page:
+                return await _search(page)
 
-    async def get_theater_name_from_url(self, url: str) -> str | None:
+    async def get_theater_name_from_url(self, url: str, page: 'Page' = None) -> str | None: # type: ignore
         """Fetches a Fandango theater page and extracts the theater name."""
-        async with async_playwright() as p: # type: ignore
-            browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-            page = await browser.new_page()
+        async def _get_name(page: 'Page'): # type: ignore
             try:
-                await page.goto(url, timeout=30000)
+                await self._goto(page, url, timeout=30000)
                 await page.wait_for_selector('h1.heading-large', timeout=15000)
                 soup = BeautifulSoup(await page.content(), 'html.parser')
                 name_elem = soup.select_one('h1.heading-large')
@@ -416,12 +479,8 @@ class Scraper:
         if page:
             return await _get_name(page)
         else:
-            async with async_playwright() as p: # type: ignore
-                browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-                page = await browser.new_page()
-                result = await _get_name(page)
-                await browser.close()
-                return result
+            async with self._browser_pool().page() as page:
+                return await _get_name(page)
 
     async def search_fandango_for_film_url(self, title: str, log_callback=None, page: 'Page' = None) -> list[dict]: # type: ignore
         """Searches Fandango for a film and returns potential matches with overview URLs."""
@@ -440,7 +499,7 @@ class Scraper:
         async def _search(page: 'Page'): # type: ignore
             try:
                 log(f"  [Fandango Search] Navigating to: {search_url}")
-                await page.goto(search_url, timeout=30000)
+                await self._goto(page, search_url, timeout=30000)
                 
                 # Handle cases where Fandango redirects directly to a movie overview page
                 if "/movie-overview" in page.url:
@@ -486,18 +545,14 @@ class Scraper:
         if page:
             return await _search(page)
         else:
-            async with async_playwright() as p: # type: ignore
-                browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-                page = await browser.new_page()
-                results = await _search(page)
-                await browser.close()
-                return results
+            async with self._browser_pool().page() as page:
+                return await _search(page)
 
     async def get_film_details_from_fandango_url(self, url: str, page: 'Page' = None) -> dict | None: # type: ignore
         """Scrapes a Fandango movie overview page for metadata."""
         async def _get_details(page: 'Page'): # type: ignore
             try:
-                await page.goto(url, timeout=30000)
+                await self._goto(page, url, timeout=30000)
                 # Wait for either the new or old title selector to appear
                 await page.locator('h1.movie-detail-header__title, h1.movie-details__title').first.wait_for(timeout=15000)
                 
@@ -560,23 +615,18 @@ class Scraper:
         if page:
             return await _get_details(page)
         else:
-            async with async_playwright() as p: # type: ignore
-                browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-                page = await browser.new_page()
-                details = await _get_details(page)
-                await browser.close()
-                return details
+            async with self._browser_pool().page() as page:
+                return await _get_details(page)
 
     async def get_coming_soon_films(self) -> list[dict]:
         """Scrapes Fandango's 'Coming Soon' page for a list of upcoming films."""
         url = "https://www.fandango.com/coming-soon"
         film_urls = []
-        async with async_playwright() as p: # type: ignore
-            browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-            try:
-                page = await browser.new_page()
+        pool = self._browser_pool()
+        try:
+            async with pool.page() as page:
                 print(f"  [Fandango Scrape] Navigating to: {url}")
-                await page.goto(url, timeout=30000)
+                await self._goto(page, url, timeout=30000)
                 await page.wait_for_selector('div.movie-list-item', timeout=15000)
 
                 for _ in range(5):
@@ -584,36 +634,31 @@ class Scraper:
                     await page.wait_for_timeout(500)
 
                 soup = BeautifulSoup(await page.content(), 'html.parser')
-                movie_cards = soup.select('div.movie-list-item')
-                print(f"  [Fandango Scrape] Found {len(movie_cards)} 'Coming Soon' film cards.")
-
-                for card in movie_cards:
-                    link_elem = card.select_one('a.movie-list-item-link')
-                    if link_elem and link_elem.has_attr('href'):
-                        film_urls.append("https://www.fandango.com" + link_elem['href'])
-
-                print(f"  [Fandango Scrape] Discovered {len(film_urls)} film detail URLs. Scraping details concurrently...")
-
-                # --- REFACTORED: Concurrently scrape details using a shared browser context ---
-                async def scrape_with_page(film_url):
-                    # Each task gets its own page, but they share the browser instance.
-                    scrape_page = await browser.new_page()
-                    details = await self.get_film_details_from_fandango_url(film_url, page=scrape_page)
-                    await scrape_page.close()
-                    return details
-                tasks = [scrape_with_page(film_url) for film_url in film_urls]
-                results = await asyncio.gather(*tasks)
-
-                # Filter out any None results from failed scrapes
-                successful_results = [res for res in results if res]
-                print(f"  [Fandango Scrape] Successfully scraped details for {len(successful_results)} films.")
-                return successful_results
+            movie_cards = soup.select('div.movie-list-item')
+            print(f"  [Fandango Scrape] Found {len(movie_cards)} 'Coming Soon' film cards.")
 
-            except Exception as e:
-                print(f"  [Fandango Scrape] Failed to scrape 'Coming Soon' page. Reason: {e}")
-                return []
-            finally:
-                await browser.close()
+            for card in movie_cards:
+                link_elem = card.select_one('a.movie-list-item-link')
+                if link_elem and link_elem.has_attr('href'):
+                    film_urls.append("https://www.fandango.com" + link_elem['href'])
+
+            print(f"  [Fandango Scrape] Discovered {len(film_urls)} film detail URLs. Scraping details concurrently...")
+
+            # --- REFACTORED: Concurrently scrape details on pages leased from the shared pool ---
+            async def scrape_with_page(film_url):
+                async with self.concurrency.slot("films"), pool.page() as scrape_page:
+                    return await self.get_film_details_from_fandango_url(film_url, page=scrape_page)
+            tasks = [scrape_with_page(film_url) for film_url in film_urls]
+            results = await asyncio.gather(*tasks)
+
+            # Filter out any None results from failed scrapes
+            successful_results = [res for res in results if res]
+            print(f"  [Fandango Scrape] Successfully scraped details for {len(successful_results)} films.")
+            return successful_results
+
+        except Exception as e:
+            print(f"  [Fandango Scrape] Failed to scrape 'Coming Soon' page. Reason: {e}")
+            return []
 
     async def build_theater_cache(self, markets_json_path, progress_queue=None):
         with open(markets_json_path, 'r') as f:
@@ -636,10 +681,8 @@ class Scraper:
         tomorrow = datetime.date.today() + datetime.timedelta(days=1)
         date_str = tomorrow.strftime('%Y-%m-%d')
 
-        async with async_playwright() as p: # type: ignore
-            browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-            page = await browser.new_page()
-
+        blocking_stats = self._start_blocking_run("search")
+        async with self._phase_page(blocking_stats) as page:
             all_zips = sorted(list({t['zip'] for _, t in theaters_to_process if t.get('zip')}))
             market_zip_cache = {}
             
@@ -708,40 +751,51 @@ class Scraper:
                         "zip": theater_from_json.get('zip', 'N/A')
                     })
 
-            await browser.close()
-
+        self._report_blocking(blocking_stats)
         return matched_theaters, unmatched_theaters, new_cache_data
 
-    async def _get_movies_from_theater_page(self, page, theater, date): # noqa: C901
+    def _parse_theater_page_html(self, html_content: str, theater: dict) -> list:
+        """Extracts every showing from a theater page's HTML (parsed with lxml when it's installed)."""
+        soup = parse_html(html_content)
+        showings = []
+        format_cache = {}
+
+        # --- NEW LOGIC to handle different page layouts ---
+        format_containers = soup.select('div.theater-presenting-formats')
+
+        if format_containers:
+            # Layout where movies are grouped by a parent format container (e.g., for Marcus Superscreen)
+            for container in format_containers:
+                container_format_elem = container.select_one('h3')
+                base_format = container_format_elem.get_text(strip=True) if container_format_elem else "2D"
+                
+                movie_blocks_in_container = container.select('li.fd-panel')
+                for movie_block in movie_blocks_in_container:
+                    showings.extend(self._process_movie_block(movie_block, theater, base_format=base_format, format_cache=format_cache))
+        else:
+            # Original layout where format is inside the movie block or button
+            movie_blocks = soup.select('li.fd-panel')
+            for movie_block in movie_blocks:
+                # Process the movie block without a base_format
+                showings.extend(self._process_movie_block(movie_block, theater, format_cache=format_cache))
+        return showings
+
+    async def _get_movies_from_theater_page(self, page, theater, date, raise_errors=False): # noqa: C901
+        """Returns the showings on a theater's page for `date`. Failures return [] unless `raise_errors` is set."""
         full_url = f"{theater['url']}?date={date}"
         html_content = ""
         try:
-            await page.goto(full_url, timeout=30000)
-            await page.locator('div.theater-presenting-formats, li.fd-panel').first.wait_for(timeout=15000)
+            response = await self._goto(page, full_url, timeout=30000)
+            if response is not None:
+                report_throttled(response.status)
+            try:
+                await page.locator('div.theater-presenting-formats, li.fd-panel').first.wait_for(timeout=15000)
+            except (TimeoutError, PlaywrightTimeoutError):
+                # The page itself loaded, so no listings means no showings that date (not a transient error to retry).
+                print(f"    [INFO] No showtime listings rendered for {theater['name']} on {date}.")
             html_content = await page.content()
 
-            soup = BeautifulSoup(html_content, 'html.parser')
-            showings = []
-
-            # --- NEW LOGIC to handle different page layouts ---
-            format_containers = soup.select('div.theater-presenting-formats')
-
-            if format_containers:
-                # Layout where movies are grouped by a parent format container (e.g., for Marcus Superscreen)
-                for container in format_containers:
-                    container_format_elem = container.select_one('h3')
-                    base_format = container_format_elem.get_text(strip=True) if container_format_elem else "2D"
-                    
-                    movie_blocks_in_container = container.select('li.fd-panel')
-                    for movie_block in movie_blocks_in_container:
-                        # This block is now very similar to the 'else' block, let's process it
-                        showings.extend(self._process_movie_block(movie_block, theater, base_format=base_format))
-            else:
-                # Original layout where format is inside the movie block or button
-                movie_blocks = soup.select('li.fd-panel')
-                for movie_block in movie_blocks:
-                    # Process the movie block without a base_format
-                    showings.extend(self._process_movie_block(movie_block, theater))
+            showings = self._parse_theater_page_html(html_content, theater)
 
             if not showings:
                 os.makedirs(DEBUG_DIR, exist_ok=True)
@@ -752,90 +806,146 @@ class Scraper:
                     f.write(html_content)
                 print(f"  [DEBUG] No showings found for {theater['name']}. Saved HTML snapshot to {filepath}")
             return showings
-        except TimeoutError:
+        except (TimeoutError, PlaywrightTimeoutError):
+            report_timeout()
             print(f"    [ERROR] Timeout while getting movies for {theater['name']}.")
+            if raise_errors:
+                raise TransientScrapeError(f"Timeout while getting movies for {theater['name']}")
             return []
         except Exception as e:
             print(f"    [ERROR] Failed to get movies for {theater['name']}. Unexpected error: {e}")
+            if raise_errors:
+                raise TransientScrapeError(f"Failed to get movies for {theater['name']}: {e}") from e
             return []
 
-    async def _get_prices_and_capacity(self, page: 'Page', showing_details: dict) -> dict:
+    def _tickets_from_commerce_models(self, data: dict, showing_details: dict, results: dict) -> dict:
+        """Fills `results` with tickets and capacity parsed from a `window.Commerce.models` object."""
+        # Check for seating areas in both possible locations
+        seating_areas = data.get('seatingAreas')
+        if not seating_areas and 'tickets' in data and isinstance(data['tickets'], dict):
+            seating_areas = data['tickets'].get('seatingAreas', [])
+
+        if not seating_areas:
+            results["error"] = "No 'seatingAreas' found in the pricing data."
+            return results
+
+        seating_area = seating_areas[0]
+        ticket_types = seating_area.get('ticketTypes', [])
+
+        for tt in ticket_types:
+            description, price = tt.get('description'), tt.get('price')
+            if description and price is not None:
+                parsed_ticket = self._parse_ticket_description(description, showing_details)
+                results["tickets"].append({
+                    "type": parsed_ticket["base_type"],
+                    "price": f"${price:.2f}",
+                    "amenities": parsed_ticket["amenities"]
+                })
+
+        results["capacity"] = "Sold Out" if seating_area.get('isSoldOut') else "Available"
+        return results
+
+    async def _get_prices_via_http(self, showing_details: dict) -> dict | None:
+        """
+        Fetches the ticketing page over HTTP and parses its inline Commerce JSON.
+        Returns None when the payload isn't in the raw HTML, so the caller can fall back to the browser.
+        """
+        data = await get_price_fetcher().fetch_commerce_models(showing_details['ticket_url'])
+        if data is None:
+            return None
+        results = {"tickets": [], "capacity": "N/A", "error": None}
+        self._tickets_from_commerce_models(data, showing_details, results)
+        if results["error"] or (not results["tickets"] and results["capacity"] != "Sold Out"):
+            return None
+        return results
+
+    async def _get_prices_and_capacity(self, page: 'Page | None', showing_details: dict, spare_page=None) -> dict:
         """
         [REFACTORED] Scrapes ticket prices and capacity from a Fandango ticketing page.
 
-        This function navigates to a specific showtime URL and extracts pricing data
-        from an inline JSON object within a <script> tag.
+        The ticketing URL is first fetched directly over HTTP and the inline
+        `window.Commerce.models` JSON is read from the raw HTML. Only if that payload is
+        missing does it navigate the Playwright page, read the object with a single
+        `page.evaluate`, and fall back to decoding it out of the rendered HTML.
 
         Args:
-            page (Page): The Playwright page object to use for navigation.
+            page (Page | None): The Playwright page object to use for the browser fallback. When None, a page
+                                is leased from `spare_page` only once the HTTP fetch has fallen back, so
+                                showings served over HTTP never hold a browser page.
             showing_details (dict): A dictionary containing the 'ticket_url' for the showing.
+            spare_page (callable | None): Returns an async context manager leasing another page. When given
+                                          (and hedging is on), a browser scrape slower than the run's p90 is
+                                          duplicated on that page and the first success is used.
 
         Returns:
-            dict: A dictionary containing 'tickets', 'capacity', and 'error' keys.
+            dict: A dictionary containing 'tickets', 'capacity', and 'error' keys, plus
+                  'retryable' when the error was a timeout or crash worth another attempt.
         """
+        if self.http_prices:
+            try:
+                http_results = await self._get_prices_via_http(showing_details)
+            except Exception as e:
+                logger.warning(f"[HTTP Prices] Falling back to browser for {showing_details.get('ticket_url')}: {e}")
+                http_results = None
+            if http_results is not None:
+                return http_results
+
+        set_slot_kind("prices_browser") # Multi-second navigations, judged apart from the ~100 ms HTTP fetches
+        if page is None:
+            async with spare_page() as page:
+                return await self._get_prices_via_browser_hedged(page, showing_details, spare_page)
+        return await self._get_prices_via_browser_hedged(page, showing_details, spare_page)
+
+    async def _get_prices_via_browser_hedged(self, page: 'Page', showing_details: dict, spare_page=None) -> dict:
+        """`_get_prices_via_browser` on `page`, hedged on a `spare_page` when hedging is on."""
+        if spare_page is None or not self.hedge_navigations:
+            return await self._get_prices_via_browser(page, showing_details)
+
+        async def hedge():
+            async with spare_page() as hedge_page:
+                return await self._get_prices_via_browser(hedge_page, showing_details)
+        return await self.hedger.run(lambda: self._get_prices_via_browser(page, showing_details), hedge,
+                                     succeeded=lambda results: not results.get("error"))
+
+    async def _get_prices_via_browser(self, page: 'Page', showing_details: dict) -> dict:
+        """Navigates `page` to the ticketing URL and reads the Commerce pricing from the live page."""
         showtime_url = showing_details['ticket_url']
         results = {"tickets": [], "capacity": "N/A", "error": None}
         html_content = ""
 
-        try: # Reverting to the known-good logic from the working copy.
-            await page.goto(showtime_url, timeout=60000)
-            html_content = await page.content() # Get content once
-            scripts = await page.query_selector_all('script')
-            for script in scripts:
-                content = await script.inner_html()
-                if content and 'window.Commerce.models' in content:
-                    start_text = 'window.Commerce.models = '
-                    start_index = content.find(start_text)
-                    if start_index != -1:
-                        json_start = content.find('{', start_index)
-                        open_braces, json_end = 0, -1
-                        for i in range(json_start, len(content)):
-                            if content[i] == '{': open_braces += 1
-                            elif content[i] == '}': open_braces -= 1
-                            if open_braces == 0:
-                                json_end = i + 1; break
-                        if json_end != -1:
-                            data = json.loads(content[json_start:json_end])
-                            
-                            # Check for seating areas in both possible locations
-                            seating_areas = data.get('seatingAreas')
-                            if not seating_areas and 'tickets' in data and isinstance(data['tickets'], dict):
-                                seating_areas = data['tickets'].get('seatingAreas', [])
-
-                            if not seating_areas:
-                                results["error"] = "No 'seatingAreas' found in the pricing data."
-                                return results
-
-                            seating_area = seating_areas[0]
-                            ticket_types = seating_area.get('ticketTypes', [])
-
-                            for tt in ticket_types:
-                                description, price = tt.get('description'), tt.get('price')
-                                if description and price is not None:
-                                    parsed_ticket = self._parse_ticket_description(description, showing_details)
-                                    results["tickets"].append({
-                                        "type": parsed_ticket["base_type"],
-                                        "price": f"${price:.2f}",
-                                        "amenities": parsed_ticket["amenities"]
-                                    })
-
-                            results["capacity"] = "Sold Out" if seating_area.get('isSoldOut') else "Available"
-
-                            if results["tickets"]: return results
-            # If loop finishes without returning, it means data was not found.
+        try:
+            response = await self._goto(page, showtime_url, timeout=60000)
+            if response is not None:
+                report_throttled(response.status)
+            # One round-trip for the live object; the raw HTML is only pulled if that comes back empty.
+            data = await evaluate_commerce_models(page)
+            if data is not None:
+                self._tickets_from_commerce_models(data, showing_details, results)
+                if not results["error"]:
+                    return results
+                results = {"tickets": [], "capacity": "N/A", "error": None}
+
+            html_content = await page.content()
+            data = extract_commerce_models(html_content)
+            if data is not None:
+                return self._tickets_from_commerce_models(data, showing_details, results)
             results["error"] = "Could not find 'window.Commerce.models' in any script tag."
+            if self.capture_html:
+                self._save_debug_html(html_content, "get_prices_json_failure")
 
-        except TimeoutError:
+        except (TimeoutError, PlaywrightTimeoutError):
+            report_timeout()
             results["error"] = 'Scraping timed out.'
-        except json.JSONDecodeError as e:
-            # This can happen if the regex matches something that isn't valid JSON
-            results["error"] = f"Failed to parse pricing JSON: {e}"
-            # Save HTML on this specific failure for debugging
-            if html_content and self.capture_html:
-                self._save_debug_html(html_content, "get_prices_json_failure")
+            results["retryable"] = True
         except Exception as e:
             results["error"] = f'Scraping failed with unexpected error: {e}'
+            results["retryable"] = True
             # --- NEW: Save HTML on failure for easier debugging ---
+            if not html_content:
+                try:
+                    html_content = await page.content()
+                except Exception:
+                    html_content = ""
             if html_content:
                 os.makedirs(DEBUG_DIR, exist_ok=True)
                 timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -857,146 +967,326 @@ class Scraper:
         logger.error(f"  [DEBUG] Saved failing HTML to {filepath}")
 
     async def get_all_showings_for_theaters(self, theaters, date):
-        CONCURRENCY = 8  # Limit concurrent browser pages for stability
-        showings_by_theater = {}
+        """
+        Discovers the showtimes of `theaters` under the adaptive concurrency limit.
 
-        async with async_playwright() as p: # type: ignore
-            browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-            context = await browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36")
-            
-            semaphore = asyncio.Semaphore(CONCURRENCY)
+        `date` is either one date, returning `{theater: showings}`, or a list of dates,
+        returning `{date: {theater: showings}}`. With several dates every (theater, date)
+        page is fanned out over the same pooled browser instead of running one scrape per day.
+        Runs over `shard_min_theaters` or more theaters are split across worker processes.
+        """
+        single_date = isinstance(date, (str, datetime.date))
+        dates = [date] if single_date else list(date)
+        dates = [d if isinstance(d, str) else d.strftime('%Y-%m-%d') for d in dates]
+        shards = self._shard_count(len(theaters))
+        cost_model = await self._cost_model([theater['name'] for theater in theaters])
+        if shards > 1:
+            breaker = self._start_circuit_breaker("showtimes")
+            showings_by_date = await sharded_showings(theaters, dates, shards, self._shard_options(), breaker,
+                                                      weights=[cost_model.page_cost(t['name']) for t in theaters])
+            self._report_circuits(breaker)
+            return showings_by_date[dates[0]] if single_date else showings_by_date
+        showings_by_date = {date_str: {} for date_str in dates}
+
+        pool = self._browser_pool()
+        blocking_stats = self._start_blocking_run("showtimes")
+        breaker = self._start_circuit_breaker("showtimes")
+        latencies = {}
+
+        async def scrape_single_theater(theater, date_str):
+            """Worker to scrape showtimes for a single theater and date, retrying transient failures."""
+            async def attempt():
+                async with self.concurrency.slot("showtimes"):
+                    breaker.check(theater['name'])
+                    started = time.monotonic()
+                    async with self._phase_page(blocking_stats, pool) as page:
+                        showings = await self._get_movies_from_theater_page(page, theater, date_str, raise_errors=True)
+                    sample = latencies.setdefault(theater['name'], [0, 0.0])
+                    sample[0] += 1
+                    sample[1] += time.monotonic() - started
+                    return showings
+            try:
+                showings = await run_with_retries(attempt, theater['name'], self.retry_policy, breaker)
+                return date_str, theater['name'], showings
+            except CircuitOpenError:
+                return date_str, theater['name'], []
+            except Exception as e:
+                print(f"  [ERROR] Worker for {theater['name']} failed during showtime discovery for {date_str}: {e}")
+                return date_str, theater['name'], []
+
+        # Longest pages first, so the slowest theaters don't start last and stretch the run.
+        tasks = [scrape_single_theater(theater, date_str) for theater, date_str in order_theater_pages(theaters, dates, cost_model)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, tuple):
+                date_str, theater_name, showings = result
+                showings_by_date[date_str][theater_name] = showings
+            elif isinstance(result, Exception):
+                print(f"  [ERROR] A showtime discovery task failed unexpectedly: {result}")
+
+        self._report_blocking(blocking_stats)
+        self._report_circuits(breaker)
+        self._report_concurrency("showtimes")
+        await self._save_latencies("showtimes", latencies)
+        return showings_by_date[dates[0]] if single_date else showings_by_date
+
+    def flatten_selected_showtimes(self, theaters: list, selected_showtimes: dict) -> list:
+        """Flattens {date: {theater: {film: {time: [showing]}}}} into one list of showings for `theaters`."""
+        showings = []
+        for theater in theaters:
+            theater_name = theater['name']
+            for date_str, daily_selections in selected_showtimes.items():
+                if theater_name in daily_selections:
+                    for film, times in daily_selections[theater_name].items():
+                        for time_str, showing_info_list in times.items():
+                            for showing_info in showing_info_list:
+                                # Add the theater name and play_date to each showing for context
+                                showings.append({**showing_info, "theater_name": theater_name, "play_date": date_str})
+        return showings
 
-            async def scrape_single_theater(theater):
-                """Worker to scrape showtimes for a single theater concurrently."""
-                async with semaphore:
-                    page = await context.new_page()
-                    try:
-                        showings = await self._get_movies_from_theater_page(page, theater, date)
-                        return theater['name'], showings
-                    except Exception as e:
-                        print(f"  [ERROR] Worker for {theater['name']} failed during showtime discovery: {e}")
-                        return theater['name'], []
-                    finally:
-                        await page.close()
-
-            tasks = [scrape_single_theater(theater) for theater in theaters]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in results:
-                if isinstance(result, tuple):
-                    theater_name, showings = result
-                    showings_by_theater[theater_name] = showings
-                elif isinstance(result, Exception):
-                    print(f"  [ERROR] A showtime discovery task failed unexpectedly: {result}")
-
-            await browser.close()
-        return showings_by_theater
-
-    async def scrape_details(self, theaters: list, selected_showtimes: dict, status_container: list | None = None) -> tuple[list, list]:
+    async def _scrape_showing_prices(self, showing: dict, pool, blocking_stats: BlockingStats) -> list | None:
         """
-        [REFACTORED] Scrapes ticket prices for a list of selected showtimes concurrently.
+        Scrapes one showing and converts its tickets into price-point rows. Returns None if the
+        scrape failed, or raises `TransientScrapeError` if it failed in a way worth retrying.
+        """
+        # No page is leased up front: most showings are served over HTTP and never need one.
+        scrape_results = await self._get_prices_and_capacity(None, showing, spare_page=lambda: self._phase_page(blocking_stats, pool))
+
+        if scrape_results.get("error"):
+            message = f"Scraping {showing['film_title']} at {showing['theater_name']}: {scrape_results['error']}"
+            if scrape_results.get("retryable"):
+                raise TransientScrapeError(message)
+            logger.error(f"  [ERROR] {message}")
+            return None
+
+        processed_tickets = []
+        for ticket in scrape_results.get('tickets', []):
+            initial_format_str = showing.get('format', '2D')
+            ticket_amenities = ticket.get('amenities', [])
+            initial_amenities_set = {f.strip() for f in initial_format_str.split(',') if f.strip()}
+            all_amenities = initial_amenities_set.union(set(ticket_amenities))
+
+            if len(all_amenities) > 1 and '2D' in all_amenities:
+                all_amenities.remove('2D')
+
+            final_format_str = ", ".join(sorted(list(all_amenities))) if all_amenities else "2D"
+            is_plf = showing.get('is_plf', False)
+
+            price_point = {
+                "Theater Name": showing['theater_name'], "Film Title": showing['film_title'],
+                "Format": final_format_str, "Is PLF": "Yes" if is_plf else "No",
+                "Showtime": showing['showtime'], "Daypart": showing['daypart'],
+                "Ticket Type": ticket['type'], "Price": ticket['price'],
+                "Capacity": scrape_results.get('capacity', 'N/A'),
+                "play_date": showing.get('play_date'), "Market": showing.get('market', 'N/A')
+            }
+            processed_tickets.append(price_point)
+        return processed_tickets
+
+    async def scrape_showings_stream(self, showings: list, status_container: list | None = None, cancel_event=None,
+                                     on_showing_start=None):
+        """
+        Scrapes already-flattened `showings` under the adaptive concurrency limit, yielding
+        `(showing, rows)` in completion order. `rows` is None when the showing failed (after
+        retries, or because its theater's circuit opened) and an empty list when it was skipped
+        by `cancel_event`. `on_showing_start(showing)` is called when a showing first gets a worker slot.
+        """
+        if not showings:
+            return
+        pool = self._browser_pool()
+        blocking_stats = self._start_blocking_run("prices")
+        breaker = self._start_circuit_breaker("prices")
+        hedger = self._start_hedger()
+        total = len(showings)
+        latencies = {}
+        # Longest ticketing pages first; results are yielded in completion order either way.
+        showings = order_showings(showings, await self._cost_model(sorted({s['theater_name'] for s in showings})))
+
+        async def worker(showing, index):
+            started = False
+
+            async def attempt():
+                nonlocal started
+                async with self.concurrency.slot("prices"):
+                    if cancel_event is not None and cancel_event.is_set():
+                        return []
+                    breaker.check(showing['theater_name'])
+                    if not started and on_showing_start is not None:
+                        on_showing_start(showing)
+                    started = True
+                    if status_container:
+                        status_container[0] = f"Scraping showing {index + 1}/{total}: {showing['film_title']} at {showing['showtime']} ({showing['theater_name']})"
+                    t0 = time.monotonic()
+                    rows = await self._scrape_showing_prices(showing, pool, blocking_stats)
+                    if rows is not None:
+                        sample = latencies.setdefault(showing['theater_name'], [0, 0.0])
+                        sample[0] += 1
+                        sample[1] += time.monotonic() - t0
+                    return rows
+
+            if cancel_event is not None and cancel_event.is_set():
+                return showing, []
+            try:
+                return showing, await run_with_retries(attempt, showing['theater_name'], self.retry_policy, breaker,
+                                                       retry_on=(TransientScrapeError,))
+            except CircuitOpenError:
+                return showing, None
+            except TransientScrapeError as e:
+                logger.error(f"  [ERROR] {e} (gave up after {self.retry_policy.attempts} attempts)")
+                return showing, None
+            except Exception as e:
+                logger.error(f"A price scraping worker failed with an exception: {e}")
+                return showing, None
+
+        tasks = [asyncio.ensure_future(worker(showing, i)) for i, showing in enumerate(showings)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+                if self.unmatched_ticket_types.should_flush():
+                    await self.flush_unmatched_ticket_types()
+        finally:
+            # If the consumer stops early (or is cancelled), don't leave workers running.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.flush_unmatched_ticket_types()
+            self._report_blocking(blocking_stats)
+            self._report_circuits(breaker)
+            self._report_hedging(hedger)
+            self._report_concurrency("prices")
+            await self._save_latencies("prices", latencies)
+
+    async def scrape_showings(self, showings: list, theater_count: int, status_container: list | None = None, cancel_event=None,
+                              on_showing_start=None):
+        """
+        Scrapes already-flattened `showings`, yielding `(showing, rows)` as `scrape_showings_stream` does.
+        This is the entry point for callers outside the scraper (e.g. the scheduler): runs of at least
+        `shard_min_theaters` (compared with `theater_count`) go to worker processes, and with
+        `infer_prices` only representative showings are scraped and their siblings inferred.
+        """
+        if not self.infer_prices:
+            async for result in self._scraped_showings_stream(showings, theater_count, status_container, cancel_event,
+                                                              on_showing_start):
+                yield result
+            return
+        stats = self.inference_stats = InferenceStats()
+        try:
+            async for result in infer_price_stream(
+                    showings, lambda subset: self._scraped_showings_stream(subset, theater_count, status_container, cancel_event,
+                                                                           on_showing_start),
+                    stats=stats):
+                yield result
+        finally:
+            print(f"  [INFERENCE] {stats.summary()}")
+            logger.info(f"Price inference stats: {stats.as_dict()}")
+
+    async def _scraped_showings_stream(self, showings: list, theater_count: int, status_container: list | None = None,
+                                       cancel_event=None, on_showing_start=None):
+        shards = self._shard_count(theater_count)
+        if shards <= 1:
+            async for result in self.scrape_showings_stream(showings, status_container, cancel_event, on_showing_start):
+                yield result
+            return
+        breaker = self._start_circuit_breaker("prices")
+        hedger = self._start_hedger()
+        cost_model = await self._cost_model(sorted({s['theater_name'] for s in showings}))
+        try:
+            async for result in sharded_showings_stream(showings, shards, self._shard_options(), status_container,
+                                                        cancel_event, breaker, hedger, weight=cost_model.showing_cost,
+                                                        on_showing_start=on_showing_start):
+                yield result
+        finally:
+            self._report_circuits(breaker)
+            self._report_hedging(hedger)
+
+    async def scrape_details_stream(self, theaters: list, selected_showtimes: dict, status_container: list | None = None,
+                                    cancel_event=None):
+        """
+        Streaming variant of `scrape_details`.
+
+        Yields `(showing, price_rows)` as each showing completes instead of collecting the whole run,
+        so callers can write rows out incrementally (see `app.price_writer.BatchedPriceWriter`)
+        and keep memory flat on large runs. Showings that fail yield None instead of a list.
+        """
+        theaters = list({t['name']: t for t in theaters}.values())
+        showings = self.flatten_selected_showtimes(theaters, selected_showtimes)
+        async for showing, rows in self.scrape_showings(showings, len(theaters), status_container, cancel_event):
+            yield showing, rows
+
+    async def scrape_details(self, theaters: list, selected_showtimes: dict, status_container: list | None = None,
+                             theater_progress: dict | None = None, on_theater_complete=None, cancel_event=None) -> tuple[list, list]:
+        """
+        [REFACTORED] Scrapes ticket prices for every selected theater and showtime in one batch.
 
         This function is optimized to:
-        1. Use a single shared browser instance for all scraping tasks.
-        2. Run multiple price-scraping tasks in parallel using a semaphore to control concurrency.
+        1. Lease pages from the shared browser pool instead of launching Chromium per call,
+           with the "prices" request-blocking profile installed.
+        2. Schedule the showings of *all* theaters through one worker pool under the scraper's
+           adaptive concurrency limit, so a market run is bounded by total showings / concurrency
+           rather than the sum of each theater's slowest showings. Runs of at least
+           `shard_min_theaters` theaters are split across `processes` worker processes.
         3. Handle errors on a per-showing basis, allowing the scrape to continue even if some showings fail.
 
         Args:
-            theaters (list): A list containing a single theater object to be scraped.
-            selected_showtimes (dict): The nested dictionary of showtimes to scrape.
+            theaters (list): The theater objects to be scraped.
+            selected_showtimes (dict): The nested {date: {theater: {film: {time: [showing]}}}} selections.
             status_container (list | None): A mutable list to report progress back to the UI.
+            theater_progress (dict | None): Filled in place with {theater_name: {"done": n, "total": m}}.
+            on_theater_complete (callable | None): Called as `(theater_name, price_rows, results)` as soon as
+                                                   the last showing of a theater finishes, so callers can save per theater.
+                                                   `results` holds a `(showing, rows)` pair per showing of the theater
+                                                   (rows None when it failed); showings skipped by `cancel_event` are left out.
+            cancel_event (threading.Event | None): When set, showings that haven't started yet are skipped.
 
         Returns:
             tuple[list, list]: A tuple containing the list of all successfully scraped price data
                                and the list of all showings that were attempted.
         """
-        all_price_data = []
-        showings_to_scrape = []
-
         if not theaters:
             return [], []
-        theater = theaters[0]
-        theater_name = theater['name']
-
-        # --- 1. Flatten the nested selected_showtimes dictionary into a simple list ---
-        for date_str, daily_selections in selected_showtimes.items():
-            if theater_name in daily_selections:
-                for film, times in daily_selections[theater_name].items():
-                    for time_str, showing_info_list in times.items():
-                        for showing_info in showing_info_list:
-                            # Add the theater name and play_date to each showing for context
-                            showings_to_scrape.append({**showing_info, "theater_name": theater_name, "play_date": date_str})
-
-        if not showings_to_scrape:
-            return [], []
-
-        # --- 2. Set up a shared browser context and concurrency controls ---
-        CONCURRENCY_LIMIT = 5
-        semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
-        all_price_data = []
-
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-            context = await browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36")
-
-            # --- 3. REFACTORED: Create a pool of reusable pages ---
-            page_pool = [await context.new_page() for _ in range(CONCURRENCY_LIMIT)]
+        if theater_progress is None:
+            theater_progress = {}
+        theaters = list({t['name']: t for t in theaters}.values()) # A theater selected twice is scraped once
+        theater_names = [theater['name'] for theater in theaters]
+
+        showings_to_scrape = self.flatten_selected_showtimes(theaters, selected_showtimes)
+        showings_by_theater = {name: [] for name in theater_names}
+        for showing in showings_to_scrape:
+            showings_by_theater[showing['theater_name']].append(showing)
+        rows_by_theater = {name: [] for name in theater_names}
+        results_by_theater = {name: [] for name in theater_names}
+        for name in theater_names:
+            theater_progress[name] = {"done": 0, "total": len(showings_by_theater[name])}
+        started = set()
+
+        def finish_theater(theater_name):
+            if on_theater_complete is None:
+                return
+            try:
+                on_theater_complete(theater_name, rows_by_theater[theater_name], results_by_theater[theater_name])
+            except Exception as e:
+                logger.error(f"on_theater_complete callback failed for {theater_name}: {e}")
 
-            async def worker(showing, index, total):
-                # The semaphore must be here, before the page is taken from the pool.
-                async with semaphore:
-                    page = None
-                    try:
-                        page = page_pool.pop()
-                        if status_container:
-                            status_container[0] = f"Scraping showing {index + 1}/{total}: {showing['film_title']} at {showing['showtime']}"
-
-                        scrape_results = await self._get_prices_and_capacity(page, showing)
-
-                        if scrape_results.get("error"):
-                            logger.error(f"  [ERROR] Scraping {showing['film_title']} at {showing['theater_name']}: {scrape_results['error']}")
-                            return []
-
-                        processed_tickets = []
-                        for ticket in scrape_results.get('tickets', []):
-                            initial_format_str = showing.get('format', '2D')
-                            ticket_amenities = ticket.get('amenities', [])
-                            initial_amenities_set = {f.strip() for f in initial_format_str.split(',') if f.strip()}
-                            all_amenities = initial_amenities_set.union(set(ticket_amenities))
-
-                            if len(all_amenities) > 1 and '2D' in all_amenities:
-                                all_amenities.remove('2D')
-
-                            final_format_str = ", ".join(sorted(list(all_amenities))) if all_amenities else "2D"
-                            is_plf = showing.get('is_plf', False)
-
-                            price_point = {
-                                "Theater Name": showing['theater_name'], "Film Title": showing['film_title'],
-                                "Format": final_format_str, "Is PLF": "Yes" if is_plf else "No",
-                                "Showtime": showing['showtime'], "Daypart": showing['daypart'],
-                                "Ticket Type": ticket['type'], "Price": ticket['price'],
-                                "Capacity": scrape_results.get('capacity', 'N/A'),
-                                "play_date": showing.get('play_date'), "Market": showing.get('market', 'N/A')
-                            }
-                            processed_tickets.append(price_point)
-                        return processed_tickets
-                    finally:
-                        if page:
-                            page_pool.append(page)
-
-            tasks = [worker(showing, i, len(showings_to_scrape)) for i, showing in enumerate(showings_to_scrape)]
-            results_list = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # --- 4. Close the page pool and flatten results ---
-            for page in page_pool:
-                await page.close()
-
-            for result in results_list:
-                if result is not None and isinstance(result, list):
-                    all_price_data.extend(result)
-                elif isinstance(result, Exception):
-                    logger.error(f"A price scraping worker failed with an exception: {result}")
+        for theater_name in theater_names:
+            if theater_progress[theater_name]["total"] == 0:
+                finish_theater(theater_name)
 
+        all_price_data = []
+        async for showing, rows in self.scrape_showings(showings_to_scrape, len(theaters), status_container, cancel_event,
+                                                        on_showing_start=lambda s: started.add(id(s))):
+            theater_name = showing['theater_name']
+            # Empty rows for a showing that never got a worker slot mean `cancel_event` skipped it.
+            skipped = rows == [] and id(showing) not in started and cancel_event is not None and cancel_event.is_set()
+            if not skipped:
+                results_by_theater[theater_name].append((showing, rows))
+            rows = rows or []
+            all_price_data.extend(rows)
+            rows_by_theater[theater_name].extend(rows)
+            progress = theater_progress[theater_name]
+            progress["done"] += 1
+            if progress["done"] == progress["total"]:
+                finish_theater(theater_name)
 
         return all_price_data, showings_to_scrape
 
@@ -1029,8 +1319,8 @@ class Scraper:
         # --- Database Checks ---
         log_callback("--- 1. DATABASE CHECKS ---")
         try:
-            database.init_database() # This also checks for table existence
-            latest_run = database.get_scrape_runs().head(1)
+            await asyncio.to_thread(database.init_database) # This also checks for table existence
+            latest_run = (await asyncio.to_thread(database.get_scrape_runs)).head(1)
             latest_run_info = "No runs found"
             if not latest_run.empty:
                 latest_run_info = f"Latest run on {latest_run['run_timestamp'].iloc[0]}"
@@ -1043,30 +1333,25 @@ class Scraper:
 
         # --- Scraping Workflow ---
         log_callback("\n--- 2. CORE SCRAPING WORKFLOW ---")
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-            page = await browser.new_page()
-            try:
-                # 2.1 ZIP Search
-                zip_theaters = await run_test("ZIP Code Search", self.live_search_by_zip, test_zip, "2025-01-01", page=page)
-                if not zip_theaters:
-                    log_callback("--- DIAGNOSTIC STOPPED: Critical ZIP search failed. ---")
-                    return results
+        async with self._browser_pool().page() as page:
+            # 2.1 ZIP Search
+            zip_theaters = await run_test("ZIP Code Search", self.live_search_by_zip, test_zip, "2025-01-01", page=page)
+            if not zip_theaters:
+                log_callback("--- DIAGNOSTIC STOPPED: Critical ZIP search failed. ---")
+                return results
 
-                # 2.2 Name Search
-                await run_test("Theater Name Search", self.live_search_by_name, test_theater_name, page=page)
+            # 2.2 Name Search
+            await run_test("Theater Name Search", self.live_search_by_name, test_theater_name, page=page)
 
-                # 2.3 Showtime Discovery & Price Scrape
-                theater_to_scrape = next((t for t in zip_theaters.values() if test_theater_name in t['name']), None)
-                if not theater_to_scrape:
-                    log_callback(f"❌ SKIPPED: Showtime/Price Scrape - Could not find '{test_theater_name}' in ZIP results.")
-                else:
-                    showings = await run_test("Showtime Discovery", self._get_movies_from_theater_page, page, theater_to_scrape, "2025-01-01")
-                    if showings:
-                        first_showing = showings[0]
-                        await run_test("Price & Capacity Scrape", self._get_prices_and_capacity, page, first_showing)
-            finally:
-                await browser.close()
+            # 2.3 Showtime Discovery & Price Scrape
+            theater_to_scrape = next((t for t in zip_theaters.values() if test_theater_name in t['name']), None)
+            if not theater_to_scrape:
+                log_callback(f"❌ SKIPPED: Showtime/Price Scrape - Could not find '{test_theater_name}' in ZIP results.")
+            else:
+                showings = await run_test("Showtime Discovery", self._get_movies_from_theater_page, page, theater_to_scrape, "2025-01-01")
+                if showings:
+                    first_showing = showings[0]
+                    await run_test("Price & Capacity Scrape", self._get_prices_and_capacity, page, first_showing)
 
         # --- Enrichment Service Checks ---
         log_callback("\n--- 3. ENRICHMENT SERVICES ---")
@@ -1090,8 +1375,8 @@ class Scraper:
         try:
             from app.imdb_scraper import IMDbScraper
             imdb_scraper = IMDbScraper()
-            # This is not an async function, so we wrap it
-            async def run_imdb(): return imdb_scraper.discover_upcoming_releases()
+            # This is not an async function, so run it off the shared event loop
+            async def run_imdb(): return await asyncio.to_thread(imdb_scraper.discover_upcoming_releases)
             await run_test("IMDb Release Calendar", run_imdb)
         except Exception as e:
             log_callback(f"❌ FAILED: IMDb Release Calendar - {e}")
@@ -1148,20 +1433,15 @@ class Scraper:
                 result_row["Details"] = f"An unexpected error occurred: {str(e)}"
                 return result_row
 
-        async with async_playwright() as p: # type: ignore
-            browser = await p.chromium.launch(headless=self.headless, devtools=self.devtools)
-            context = await browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36")
-            
-            semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
-            async def bound_worker(theater):
-                async with semaphore:
-                    page = await context.new_page()
-                    try:
-                        return await worker(page, theater)
-                    finally:
-                        await page.close()
-
-            tasks = [bound_worker(theater) for theater in theaters_to_test]
-            diagnostic_results = await asyncio.gather(*tasks)
+        pool = self._browser_pool()
+        semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
+        async def bound_worker(theater):
+            async with semaphore:
+                async with pool.page() as page:
+                    return await worker(page, theater)
+
+        tasks = [bound_worker(theater) for theater in theaters_to_test]
+        diagnostic_results = await asyncio.gather(*tasks)
+        await self.flush_unmatched_ticket_types()
 
         return diagnostic_results
@@ -0,0 +1,230 @@
+"""
+Sharded scraping: theaters split across worker processes, each with its own event loop and browser.
+
+In a single process, one asyncio loop runs HTML parsing, ticket description parsing
+and JSON decoding on the same core as the Playwright I/O. For large runs, such as a
+company-wide "Select All Theaters" market scrape, the `Scraper` hands the work to
+spawned worker processes instead:
+
+- A theater is never split across shards, and shards are balanced by how many pages
+  their theaters have.
+- Each worker runs the normal in-process scrape with its own `BrowserPool` and its
+  share of the concurrency and per-host rate limits.
+- Workers send their results back over one multiprocessing queue.
+- The parent yields results as they arrive, so prices are still saved by the parent
+  process, per theater in the app or through a `BatchedPriceWriter`.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import multiprocessing
+import queue
+from app import config
+
+logger = logging.getLogger(__name__)
+
+_SHOWINGS, _STARTED, _RESULT, _CIRCUITS, _HEDGES, _DONE = "showings", "started", "result", "circuits", "hedges", "done"
+_POLL_INTERVAL = 0.25 # Seconds between checks for cancellation and crashed workers
+_JOIN_TIMEOUT = 10
+
+
+def shard_by_weight(items: list, weights: list, shards: int) -> list[list]:
+    """Splits `items` into at most `shards` groups of similar total weight (heaviest item onto the lightest shard)."""
+    shards = max(1, min(shards, len(items)))
+    loads = [(0, shard) for shard in range(shards)]
+    groups = [[] for _ in range(shards)]
+    for i in sorted(range(len(items)), key=lambda i: -weights[i]):
+        load, shard = heapq.heappop(loads)
+        groups[shard].append(items[i])
+        heapq.heappush(loads, (load + weights[i], shard))
+    return [group for group in groups if group]
+
+
+def shard_limits(processes: int) -> dict:
+    """Per-shard concurrency limits, so all shards together stay near the single-process limits."""
+    return {
+        "initial_limit": max(1, math.ceil(config.SCRAPE_CONCURRENCY_INITIAL / processes)),
+        "min_limit": 1,
+        "max_limit": max(1, math.ceil(config.SCRAPE_CONCURRENCY_MAX / processes)),
+    }
+
+
+def _worker_options(options: dict, processes: int) -> dict:
+    return dict(options, limits=shard_limits(processes), rate_share=1.0 / processes)
+
+
+def _worker_main(kind, shard, payload, options, results, cancel):
+    """Entry point of a shard process. Always finishes by putting a `_DONE` message."""
+    config.DB_FILE = options.get("db_file") # Spawned processes don't inherit what the app configured
+    error = None
+    try:
+        asyncio.run(_run_shard(kind, shard, payload, options, results, cancel))
+    except BaseException as e:
+        error = repr(e)
+    finally:
+        results.put((_DONE, shard, error))
+
+
+async def _run_shard(kind, shard, payload, options, results, cancel):
+    from app.scraper import Scraper # Local import to avoid circular dependency
+    from app.concurrency import AdaptiveConcurrencyLimiter
+    from app.browser_pool import shutdown_scraper_resources
+    from app.rate_limiter import HostRateLimiter, set_rate_limiter
+
+    set_rate_limiter(HostRateLimiter(share=options.get("rate_share", 1.0)))
+    scout = Scraper(**options["scraper"], processes=1)
+    scout.capture_html = options.get("capture_html", False)
+    scout.concurrency = AdaptiveConcurrencyLimiter(**options["limits"])
+    try:
+        if kind == _SHOWINGS:
+            theaters, dates = payload
+            results.put((_SHOWINGS, shard, await scout.get_all_showings_for_theaters(theaters, dates)))
+            results.put((_CIRCUITS, shard, scout.open_circuits("showtimes")))
+        else:
+            index_of = {id(showing): index for index, showing in payload}
+            showings = [showing for _, showing in payload]
+            def report_start(showing):
+                results.put((_STARTED, shard, index_of[id(showing)]))
+            async for showing, rows in scout.scrape_showings_stream(
+                    showings, cancel_event=cancel, on_showing_start=report_start if options.get("report_starts") else None):
+                results.put((_RESULT, shard, index_of[id(showing)], rows))
+            results.put((_CIRCUITS, shard, scout.open_circuits("prices")))
+            results.put((_HEDGES, shard, scout.hedging_stats()))
+    finally:
+        await shutdown_scraper_resources()
+
+
+class _ShardPool:
+    """One spawned process per shard, all reporting through one result queue."""
+
+    def __init__(self, kind: str, payloads: list, options: dict):
+        context = multiprocessing.get_context("spawn") # Playwright and the scraper's threads don't survive fork()
+        self.results = context.Queue()
+        self.cancel = context.Event()
+        self.processes = [
+            context.Process(target=_worker_main, args=(kind, shard, payload, options, self.results, self.cancel),
+                            name=f"scrape-shard-{shard}", daemon=True)
+            for shard, payload in enumerate(payloads)
+        ]
+        self.running = set(range(len(self.processes)))
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+
+    async def messages(self, cancel_event=None):
+        """Yields worker messages until every shard has reported `_DONE` (or died)."""
+        loop = asyncio.get_running_loop()
+        while self.running:
+            if cancel_event is not None and cancel_event.is_set():
+                self.cancel.set()
+            try:
+                message = await loop.run_in_executor(None, self.results.get, True, _POLL_INTERVAL)
+            except queue.Empty:
+                for message in self._crashed_shards():
+                    yield message
+                continue
+            if message[0] == _DONE:
+                self.running.discard(message[1])
+            yield message
+
+    def _crashed_shards(self):
+        # A worker that exits normally has always queued `_DONE` first; a non-zero exit code means it was killed.
+        for shard in sorted(self.running):
+            exitcode = self.processes[shard].exitcode
+            if exitcode not in (None, 0):
+                self.running.discard(shard)
+                yield (_DONE, shard, f"worker process exited with code {exitcode}")
+
+    def close(self):
+        self.cancel.set()
+        for process in self.processes:
+            process.join(_JOIN_TIMEOUT)
+            if process.is_alive():
+                logger.warning(f"[Shards] {process.name} did not exit; terminating it.")
+                process.terminate()
+                process.join()
+        self.results.close()
+
+
+async def sharded_showings(theaters: list, dates: list, processes: int, options: dict, circuit_breaker=None,
+                           weights: list | None = None) -> dict:
+    """
+    Runs `Scraper.get_all_showings_for_theaters(theaters, dates)` across worker processes and
+    returns {date: {theater: showings}}. Shards are balanced by `weights` (predicted seconds per
+    theater page), or by theater count. Circuits opened in the workers are merged into `circuit_breaker`.
+    """
+    shards = shard_by_weight(theaters, weights or [1] * len(theaters), processes)
+    pool = _ShardPool(_SHOWINGS, [(shard, dates) for shard in shards], _worker_options(options, len(shards)))
+    print(f"  [SHARDS] Discovering showtimes for {len(theaters)} theaters x {len(dates)} dates across {len(shards)} processes.")
+    showings_by_date = {date_str: {} for date_str in dates}
+    pool.start()
+    try:
+        async for message in pool.messages():
+            if message[0] == _SHOWINGS:
+                for date_str, by_theater in message[2].items():
+                    showings_by_date.setdefault(date_str, {}).update(by_theater)
+            elif message[0] == _CIRCUITS and circuit_breaker is not None:
+                circuit_breaker.merge(message[2])
+            elif message[0] == _DONE and message[2]:
+                print(f"  [ERROR] Showtime shard {message[1]} failed: {message[2]}")
+    finally:
+        pool.close()
+    for theater in theaters: # Theaters of a failed shard come back with no showings, as a failed theater does in-process
+        for by_theater in showings_by_date.values():
+            by_theater.setdefault(theater['name'], [])
+    return showings_by_date
+
+
+async def sharded_showings_stream(showings: list, processes: int, options: dict, status_container: list | None = None,
+                                  cancel_event=None, circuit_breaker=None, hedger=None, weight=None, on_showing_start=None):
+    """
+    Sharded counterpart of `Scraper.scrape_showings_stream`: yields `(showing, rows)` as worker
+    processes finish showings. Every showing is yielded exactly once; those of a shard that
+    failed or crashed yield None, like a failed showing in-process. Circuits opened in the
+    workers are merged into `circuit_breaker` and their hedging counts into `hedger`. Shards are
+    balanced by the summed `weight(showing)` (predicted seconds) of their theaters, or by showing count.
+    `on_showing_start(showing)` is called in this process when a worker starts a showing.
+    """
+    if not showings:
+        return
+    by_theater = {}
+    for index, showing in enumerate(showings):
+        by_theater.setdefault(showing['theater_name'], []).append((index, showing))
+    groups = list(by_theater.values())
+    shards = [[pair for group in shard for pair in group]
+              for shard in shard_by_weight(groups, [sum(weight(s) for _, s in group) if weight else len(group) for group in groups],
+                                           processes)]
+    pending = [{index for index, _ in shard} for shard in shards]
+
+    pool = _ShardPool(_RESULT, shards, dict(_worker_options(options, len(shards)), report_starts=on_showing_start is not None))
+    print(f"  [SHARDS] Scraping {len(showings)} showings of {len(by_theater)} theaters across {len(shards)} processes.")
+    done = 0
+    pool.start()
+    try:
+        async for message in pool.messages(cancel_event):
+            if message[0] == _STARTED:
+                on_showing_start(showings[message[2]])
+            elif message[0] == _RESULT:
+                _, shard, index, rows = message
+                pending[shard].discard(index)
+                done += 1
+                showing = showings[index]
+                if status_container:
+                    status_container[0] = (f"Scraped showing {done}/{len(showings)} across {len(shards)} processes: "
+                                           f"{showing['film_title']} at {showing['showtime']} ({showing['theater_name']})")
+                yield showing, rows
+            elif message[0] == _CIRCUITS and circuit_breaker is not None:
+                circuit_breaker.merge(message[2])
+            elif message[0] == _HEDGES and hedger is not None:
+                hedger.merge(message[2])
+            elif message[0] == _DONE:
+                _, shard, error = message
+                if error:
+                    print(f"  [ERROR] Price shard {shard} failed with {len(pending[shard])} showings unfinished: {error}")
+                for index in sorted(pending[shard]):
+                    yield showings[index], None
+                pending[shard].clear()
+    finally:
+        pool.close()
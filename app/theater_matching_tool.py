@@ -10,6 +10,7 @@ import glob
 from thefuzz import fuzz
 
 from app.scraper import Scraper
+from app.browser_pool import run_with_scraper_resources
 from app.config import PROJECT_DIR, CACHE_FILE
 from app import utils
 
@@ -543,7 +544,7 @@ def render_attention_theater_form(index, row, form_type):
 
             if st.form_submit_button("Submit"):
                 if action == "Re-run Match":
-                    new_match_result = asyncio.run(rematch_single_theater(new_name, new_zip, manual_url, new_manual_name, company=row['Company']))
+                    new_match_result = run_with_scraper_resources(rematch_single_theater(new_name, new_zip, manual_url, new_manual_name, company=row['Company']))
                     st.session_state['all_results_df'].loc[index, ['Matched Fandango Name', 'Match Score', 'Matched Fandango URL']] = [new_match_result['Matched Fandango Name'], new_match_result['Match Score'], new_match_result['Matched Fandango URL']]
                     if new_match_result['Matched Fandango Name'] != 'No match found':
                         st.success(f"Successfully re-matched '{new_match_result['Original Name']}' to '{new_match_result['Matched Fandango Name']}'.")
@@ -645,7 +646,7 @@ def main():
                 # Load all markets data from disk to get ZIP codes for re-matching
                 all_markets_data = load_all_markets_data_from_disk()
 
-            updated_cache, rebuild_stats = asyncio.run(
+            updated_cache, rebuild_stats = run_with_scraper_resources(
                 rebuild_theater_cache(current_cache, all_markets_data)
             )
             st.session_state['theater_cache_data'] = updated_cache
@@ -712,7 +713,7 @@ def main():
                             st.session_state['market_name'] = market_name
                             progress_bar = st.progress(0, text="Starting...")
                             def update_progress(val, text): progress_bar.progress(val, text)
-                            results = asyncio.run(process_market(market_name, theaters_in_market, update_progress, threshold=match_threshold))
+                            results = run_with_scraper_resources(process_market(market_name, theaters_in_market, update_progress, threshold=match_threshold))
                             
                             zip_map = {t['name']: t.get('zip', 'N/A') for t in theaters_in_market}
                             for r in results: r['Zip Code'] = zip_map.get(r['Original Name'])
@@ -736,7 +737,7 @@ def main():
                     st.session_state.selected_company = selected_company if selected_company != "All Companies" else None
                     st.session_state.selected_director = selected_director
 
-                    theater_cache, updated_markets, all_results = asyncio.run(
+                    theater_cache, updated_markets, all_results = run_with_scraper_resources(
                         process_all_markets(markets_data, st.session_state.selected_company, selected_director, threshold=match_threshold)
                     )
                     st.session_state['theater_cache_data'] = theater_cache
@@ -749,7 +750,7 @@ def main():
                     st.session_state.selected_company = selected_company if selected_company != "All Companies" else None
                     st.session_state.selected_director = selected_director
 
-                    theater_cache, _, _ = asyncio.run(
+                    theater_cache, _, _ = run_with_scraper_resources(
                         process_all_markets(markets_data, st.session_state.selected_company, selected_director, threshold=match_threshold)
                     )
                     st.session_state['theater_cache_data'] = theater_cache
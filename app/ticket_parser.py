@@ -0,0 +1,236 @@
+"""
+Compiled, memoized parsing of ticket descriptions ("Adult IMAX 3D", "Child (Age 3-11)").
+
+Every ticket type of every showing goes through the parser, but the same few hundred
+description strings repeat over and over. `TicketDescriptionParser` compiles the
+keyword patterns from `ticket_types.json` once: a combined alternation per pass lets
+a description skip the per-keyword substitutions when nothing can match, and the
+base types are ranked longest-keyword-first a single time instead of on every call.
+Results are kept in a bounded LRU cache. `get_ticket_parser()` hands out a shared
+parser and rebuilds it (dropping the cache) when `ticket_types.json` changes on disk.
+
+Unrecognized base types are collected in an `UnmatchedTicketTypeBuffer` rather than
+written to SQLite from the parse path; the scraper flushes it in batches.
+"""
+import datetime
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import NamedTuple
+from app import database
+
+logger = logging.getLogger(__name__)
+
+TICKET_TYPES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ticket_types.json')
+DEFAULT_CACHE_SIZE = 4096
+
+_SPLIT_RE = re.compile(r'[\s\(\)\[\]]+')
+_PRICE_RE = re.compile(r'^\$\d+\.\d{2}$')
+
+
+def _keyword_regex(keyword: str) -> str:
+    return r'(?<!\w)' + re.escape(keyword) + r'(?!\w)'
+
+
+def _combined_pattern(keywords) -> re.Pattern | None:
+    """One alternation that matches wherever any of `keywords` would match on its own."""
+    keywords = sorted(set(keywords), key=len, reverse=True)
+    if not keywords:
+        return None
+    return re.compile(r'(?<!\w)(?:' + '|'.join(re.escape(kw) for kw in keywords) + r')(?!\w)', re.IGNORECASE)
+
+
+class ParsedTicket(NamedTuple):
+    """A parsed description. `unmatched` is the part to log for review, if the base type wasn't recognized."""
+    base_type: str
+    amenities: tuple
+    unmatched: str | None = None
+
+
+class TicketDescriptionParser:
+    """Parses ticket descriptions into a base type and amenities using one set of ticket type mappings."""
+
+    def __init__(self, ticket_types_data: dict, cache_size: int = DEFAULT_CACHE_SIZE):
+        amenity_map = ticket_types_data.get("amenity_map", {})
+        base_type_map = ticket_types_data.get("base_type_map", {})
+
+        # Amenities are stripped in mapping order, one keyword at a time, exactly as before.
+        self.amenity_patterns = [(amenity, re.compile(_keyword_regex(kw), re.IGNORECASE))
+                                 for amenity, keywords in amenity_map.items() for kw in keywords]
+        self._amenity_gate = _combined_pattern(kw for keywords in amenity_map.values() for kw in keywords)
+
+        # Longer phrases win ("General Admission" before "General"): rank base types, then their keywords, once.
+        ranked = []
+        for base_type, keywords in base_type_map.items():
+            patterns = sorted((re.compile(_keyword_regex(kw), re.IGNORECASE) for kw in keywords), key=lambda p: -len(p.pattern))
+            ranked.append((base_type, patterns))
+        ranked.sort(key=lambda item: -max((len(p.pattern) for p in item[1]), default=0))
+        self.base_type_patterns = [(base_type, pattern) for base_type, patterns in ranked for pattern in patterns]
+        self._base_type_gate = _combined_pattern(kw for keywords in base_type_map.values() for kw in keywords)
+
+        self.ignored_amenities = {term.lower() for term in ticket_types_data.get("ignored_amenities", [])}
+        self.parse = functools.lru_cache(maxsize=cache_size)(self._parse)
+
+    def cache_info(self):
+        return self.parse.cache_info()
+
+    def _parse(self, description: str) -> ParsedTicket:
+        if not description:
+            return ParsedTicket("Unknown", ())
+
+        remaining_desc = description.lower().replace('−', '-').strip()
+        found_amenities = []
+
+        # --- Pass 1: Find known amenities and remove them ---
+        if self._amenity_gate is not None and self._amenity_gate.search(remaining_desc):
+            for amenity, pattern in self.amenity_patterns:
+                new_desc, count = pattern.subn('', remaining_desc)
+                if count > 0:
+                    found_amenities.append(amenity)
+                    remaining_desc = new_desc.strip()
+
+        # --- Pass 2: Find a known base ticket type (e.g., Adult, Child) ---
+        found_base_type = None
+        if self._base_type_gate is not None and self._base_type_gate.search(remaining_desc):
+            for base_type, pattern in self.base_type_patterns:
+                new_desc, count = pattern.subn('', remaining_desc)
+                if count > 0:
+                    found_base_type = base_type
+                    remaining_desc = new_desc.strip()
+                    break
+
+        # --- Pass 3: Handle what's left ---
+        unmatched = None
+        for part in (p for p in _SPLIT_RE.split(remaining_desc) if p):
+            # If no base type was found yet, the first significant part becomes the base type.
+            if not found_base_type:
+                found_base_type = part.title()
+                if not _PRICE_RE.match(found_base_type):
+                    unmatched = found_base_type
+            # If a base type is already found, treat other parts as potential amenities.
+            elif part.lower() not in self.ignored_amenities:
+                found_amenities.append(part.title())
+
+        if not found_base_type:
+            found_base_type = unmatched = "Unknown"
+
+        return ParsedTicket(found_base_type, tuple(sorted(set(found_amenities))), unmatched)
+
+
+def load_ticket_types(path: str = TICKET_TYPES_PATH) -> dict:
+    """Loads ticket type and amenity mappings, falling back to empty mappings if the file is unusable."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"    [ERROR] Could not load ticket_types.json: {e}")
+        return {"amenity_map": {}, "base_type_map": {}}
+
+
+class _CachedParser:
+    def __init__(self, parser, stamp):
+        self.parser = parser
+        self.stamp = stamp
+        self.checked_at = time.monotonic()
+
+
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+
+def _file_stamp(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_ticket_parser(path: str = TICKET_TYPES_PATH, check_interval: float = 1.0) -> TicketDescriptionParser:
+    """
+    Returns the shared parser for `path`. The file is re-checked at most every
+    `check_interval` seconds, and a new parser (with an empty cache) is built when it changed.
+    """
+    entry = _parsers.get(path)
+    now = time.monotonic()
+    if entry is not None and now - entry.checked_at < check_interval:
+        return entry.parser
+    with _parsers_lock:
+        entry = _parsers.get(path)
+        stamp = _file_stamp(path)
+        if entry is None or entry.stamp != stamp:
+            if entry is not None:
+                logger.info(f"[TicketParser] {os.path.basename(path)} changed; rebuilding parser.")
+            entry = _CachedParser(TicketDescriptionParser(load_ticket_types(path)), stamp)
+            _parsers[path] = entry
+        entry.checked_at = now
+        return entry.parser
+
+
+class UnmatchedTicketTypeBuffer:
+    """
+    In-memory log of unmatched ticket types, deduplicated on the table's UNIQUE key
+    (part, theater, film, date) with a count of how often each was seen. `record` is
+    cheap enough for the parse path; `flush` writes everything in one batch.
+    """
+
+    def __init__(self, flush_size: int = 200):
+        self.flush_size = flush_size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._entries)
+
+    def should_flush(self) -> bool:
+        return len(self._entries) >= self.flush_size
+
+    def entries(self) -> list[dict]:
+        with self._lock:
+            return [dict(entry) for entry in self._entries.values()]
+
+    def record(self, original_description: str, unmatched_part: str, showing_details: dict | None = None):
+        context = showing_details or {}
+        key = (unmatched_part, context.get('theater_name'), context.get('film_title'), context.get('play_date'))
+        now = datetime.datetime.now()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['occurrences'] += 1
+                entry['last_seen'] = now
+                return
+            self._entries[key] = {
+                'original_description': original_description, 'unmatched_part': unmatched_part,
+                'theater_name': context.get('theater_name'), 'film_title': context.get('film_title'),
+                'showtime': context.get('showtime'), 'format': context.get('format'), 'play_date': context.get('play_date'),
+                'occurrences': 1, 'first_seen': now, 'last_seen': now,
+            }
+
+    def flush(self) -> int:
+        """Writes all buffered entries with one batch insert. Returns how many were written."""
+        with self._lock:
+            pending, self._entries = self._entries, {}
+        if not pending:
+            return 0
+        try:
+            database.log_unmatched_ticket_types(list(pending.values()))
+        except Exception as e:
+            print(f"    [DB-WARN] Failed to log {len(pending)} unmatched ticket types. Reason: {e}")
+            self._restore(pending)
+            return 0
+        return len(pending)
+
+    def _restore(self, pending: dict):
+        # Put a failed batch back so its counts are retried with the next flush.
+        with self._lock:
+            for key, entry in pending.items():
+                newer = self._entries.get(key)
+                if newer is not None:
+                    entry['occurrences'] += newer['occurrences']
+                    entry['last_seen'] = newer['last_seen']
+                self._entries[key] = entry
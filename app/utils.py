@@ -14,13 +14,22 @@ import copy
 import streamlit as st
 from app import database
 from app import config
+from app.scrape_planner import ScrapeCostModel, predict_completion_time
+from app.browser_pool import get_shared_event_loop
 
 def run_async_in_thread(coro, *args, **kwargs):
+    """
+    Runs a coroutine on the shared scraper event loop from a worker thread.
+    Using one long-lived loop lets every call reuse the same pooled browser.
+
+    Every Streamlit session's scrape shares that loop, so a coroutine must not block it:
+    synchronous database, file or HTTP work inside one goes through `asyncio.to_thread`.
+    A plain function is run in the worker thread itself.
+    """
     result: list[Any] = [None, None, None, None]  # status, value, log, duration
 
     def thread_target():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        loop = get_shared_event_loop()
         start_time = datetime.datetime.now()
         log_capture = []
 
@@ -35,7 +44,9 @@ def run_async_in_thread(coro, *args, **kwargs):
         sys.stdout = LogCapture()
 
         try:
-            value = loop.run_until_complete(coro(*args, **kwargs))
+            value = coro(*args, **kwargs)
+            if asyncio.iscoroutine(value):
+                value = asyncio.run_coroutine_threadsafe(value, loop).result()
             result[0] = 'success'
             result[1] = value
         except Exception as e:
@@ -46,7 +57,6 @@ def run_async_in_thread(coro, *args, **kwargs):
             result[3] = (end_time - start_time).total_seconds()
             result[2] = "".join(log_capture)
             sys.stdout = original_stdout
-            loop.close()
 
     thread = threading.Thread(target=thread_target)
     thread.start()
@@ -170,7 +180,16 @@ def get_error_message(e):
         return str(e)
     return "An unknown error occurred."
 
-def estimate_scrape_time(num_showings, mode_filter=None):
+def estimate_scrape_time(num_showings, mode_filter=None, showings=None):
+    """
+    Estimates a scrape's duration in seconds, or -1 without history. Given the actual `showings`
+    and per-theater latency history, this is the planner's predicted completion time for a
+    longest-first run; otherwise it's the average time per showing of recent runs.
+    """
+    if showings:
+        model = ScrapeCostModel.from_database(sorted({s.get('theater_name') for s in showings}))
+        if model.has_history:
+            return predict_completion_time(showings, model)
     assert config.RUNTIME_LOG_FILE is not None, "RUNTIME_LOG_FILE is not configured"
     if not os.path.exists(config.RUNTIME_LOG_FILE):
         return -1 # Indicate no historical data
@@ -225,24 +244,26 @@ def format_time_to_human_readable(seconds: float) -> str:
     else:
         return f"{remaining_seconds}s"
 
-def is_run_allowed(market_timezone):
-    # Get current time in the market's timezone
+def get_run_deadline(market_timezone, cutoff=datetime.time(8, 0)):
+    """Returns today's cutoff (8 AM by default) in the market's timezone, as a timezone-aware datetime."""
     from pytz import timezone
     import pytz
-    
+
     try:
         market_tz = timezone(market_timezone)
-        now_in_market = datetime.datetime.now(pytz.utc).astimezone(market_tz)
     except pytz.exceptions.UnknownTimeZoneError:
-        # Fallback to a default if timezone is unknown
         market_tz = timezone("America/Chicago")
-        now_in_market = datetime.datetime.now(pytz.utc).astimezone(market_tz)
+    now_in_market = datetime.datetime.now(pytz.utc).astimezone(market_tz)
+    return now_in_market.replace(hour=cutoff.hour, minute=cutoff.minute, second=0, microsecond=0)
 
-    # Define the cutoff time (8 AM)
-    cutoff_time = now_in_market.replace(hour=8, minute=0, second=0, microsecond=0)
+def seconds_until_cutoff(market_timezone, cutoff=datetime.time(8, 0)) -> float:
+    """Seconds left before the market's cutoff today; zero or negative once it has passed."""
+    import pytz
+    return (get_run_deadline(market_timezone, cutoff) - datetime.datetime.now(pytz.utc)).total_seconds()
 
-    # If current time is past 8 AM, return False
-    return now_in_market < cutoff_time
+def is_run_allowed(market_timezone):
+    """True while it is still before the market's 8 AM cutoff today."""
+    return seconds_until_cutoff(market_timezone) > 0
 
 def normalize_time_string(time_str: str) -> str:
     """
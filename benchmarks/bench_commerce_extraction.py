@@ -0,0 +1,125 @@
+"""
+Benchmark: extracting `window.Commerce.models` from a ticketing page.
+
+CPU: the old per-character brace scan over each script's text vs. `extract_commerce_models`
+(`JSONDecoder.raw_decode` on the raw HTML).
+IPC: the old `query_selector_all('script')` + one `inner_html()` per script vs. one
+`page.evaluate` (skipped if Chromium isn't installed).
+
+The saved ticketing-page fixture is padded with filler scripts and a seat map so the
+page is closer to a real one in size.
+
+    python benchmarks/bench_commerce_extraction.py [--iterations 200] [--filler-scripts 40]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.price_fetcher import COMMERCE_MODELS_JS, evaluate_commerce_models, extract_commerce_models  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'fandango_ticketing_page.html')
+
+
+def build_page(filler_scripts: int) -> str:
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        html = f.read()
+    models = extract_commerce_models(html)
+    models["seatMap"] = [{"row": chr(65 + r), "seats": [{"n": s, "status": "available"} for s in range(24)]} for r in range(16)]
+    filler = "".join(
+        f'<script type="text/javascript">window.analytics_{i} = {json.dumps({"k" + str(j): "v" * 30 for j in range(60)})};</script>\n'
+        for i in range(filler_scripts)
+    )
+    commerce = (f'<script type="text/javascript">window.Commerce = window.Commerce || {{}};\n'
+                f'window.Commerce.models = {json.dumps(models)};\nwindow.Commerce.ready = true;</script>')
+    return f"<!DOCTYPE html><html><head><title>Select Tickets</title>{filler}</head><body><div id='ticket-selection'></div>{commerce}</body></html>"
+
+
+def legacy_extract(script_texts):
+    """The previous browser-path extraction: find the assignment, then count braces one character at a time."""
+    for content in script_texts:
+        if content and 'window.Commerce.models' in content:
+            start_index = content.find('window.Commerce.models = ')
+            if start_index != -1:
+                json_start = content.find('{', start_index)
+                open_braces, json_end = 0, -1
+                for i in range(json_start, len(content)):
+                    if content[i] == '{': open_braces += 1
+                    elif content[i] == '}': open_braces -= 1
+                    if open_braces == 0:
+                        json_end = i + 1; break
+                if json_end != -1:
+                    return json.loads(content[json_start:json_end])
+    return None
+
+
+def bench_cpu(html, iterations):
+    import re
+    script_texts = re.findall(r'<script[^>]*>(.*?)</script>', html, re.S)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        legacy_extract(script_texts)
+    legacy_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        extract_commerce_models(html)
+    compiled_s = time.perf_counter() - start
+    return legacy_s, compiled_s
+
+
+async def bench_ipc(html, iterations):
+    try:
+        from app.browser_pool import BrowserPool
+        pool = BrowserPool(headless=True)
+        try:
+            async with pool.page() as page:
+                await page.set_content(html)
+
+                async def old_path():
+                    scripts = await page.query_selector_all('script')
+                    return legacy_extract([await script.inner_html() for script in scripts])
+
+                assert await old_path() == await evaluate_commerce_models(page)
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    await old_path()
+                old_s = time.perf_counter() - start
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    json.loads(await page.evaluate(COMMERCE_MODELS_JS))
+                new_s = time.perf_counter() - start
+            return old_s, new_s
+        finally:
+            await pool.close()
+    except Exception as e:
+        print(f"  [SKIP] Playwright path unavailable: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--filler-scripts', type=int, default=40)
+    args = parser.parse_args()
+
+    html = build_page(args.filler_scripts)
+    print(f"Page: {len(html) / 1024:.0f} KB, {args.filler_scripts + 1} scripts")
+
+    legacy_s, compiled_s = bench_cpu(html, args.iterations)
+    print(f"CPU  brace scan     : {legacy_s / args.iterations * 1000:.3f} ms/showing")
+    print(f"CPU  raw_decode     : {compiled_s / args.iterations * 1000:.3f} ms/showing ({legacy_s / compiled_s:.1f}x)")
+
+    ipc = asyncio.run(bench_ipc(html, min(args.iterations, 50)))
+    if ipc is not None:
+        old_s, new_s = ipc
+        n = min(args.iterations, 50)
+        print(f"IPC  inner_html x N : {old_s / n * 1000:.2f} ms/showing")
+        print(f"IPC  page.evaluate  : {new_s / n * 1000:.2f} ms/showing ({old_s / new_s:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: analysis reads over raw price rows vs. the daily price summary.
+
+Saves a synthetic scrape history through `database.save_prices`, which keeps `daily_prices`
+current, then times each report's previous query (aggregating the `prices` view joined to
+showings and scrape runs, consolidating ticket types in pandas) against its summary-backed
+version, checking both give the same answer:
+- the market-at-a-glance prices (distinct prices per theater, film, ticket type, format, daypart)
+- the theater comparison's average core ticket price
+- the comparable films' average price
+
+    python benchmarks/bench_daily_prices.py [--theaters 10] [--days 14] [--runs 7] [--repeat 5]
+"""
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import config, database  # noqa: E402
+from app.db_pool import get_pool  # noqa: E402
+import pandas as pd  # noqa: E402
+
+FILMS = [f"Film {i}" for i in range(11)] # Ten comparable films, so LIMIT 10 never picks among ties
+SHOWTIMES = ["11:00am", "1:30pm", "4:00pm", "6:45pm", "9:30pm"]
+TICKET_TYPES = [("General Admission", 14.0), ("Adult", 14.0), ("Children", 10.0), ("Senior", 11.0)]
+
+# The reports' queries as they were before the daily price summary
+RAW_GLANCE = """
+    SELECT s.theater_name, s.film_title, s.daypart, s.format, p.ticket_type, p.price
+    FROM prices p
+    JOIN showings s ON p.showing_id = s.showing_id
+    JOIN scrape_runs r ON p.run_id = r.run_id
+    WHERE s.theater_name IN ({theaters}) AND s.play_date BETWEEN ? AND ?
+"""
+RAW_AVG_PRICE = """
+    SELECT s.theater_name, AVG(p.price) as "Overall Avg. Price"
+    FROM showings s
+    JOIN prices p ON s.showing_id = p.showing_id
+    WHERE s.theater_name IN ({theaters}) AND s.play_date BETWEEN ? AND ?
+    AND p.ticket_type IN ('Adult', 'Senior', 'Child')
+    GROUP BY s.theater_name
+"""
+RAW_COMPARABLE = """
+    SELECT f.film_title AS "Film Title", AVG(p.price) as "Average Price", COUNT(DISTINCT s.showing_id) as "Total Showings"
+    FROM films f
+    JOIN showings s ON f.film_title = s.film_title
+    JOIN prices p ON s.showing_id = p.showing_id
+    WHERE (f.genre LIKE ?) AND f.film_title != ?
+    GROUP BY f.film_title
+    ORDER BY "Total Showings" DESC
+    LIMIT 10
+"""
+
+
+def build(path, theaters, days, runs):
+    config.DB_FILE = path
+    database.init_database()
+    database.update_database_schema()
+    rng = random.Random(5)
+    start = datetime.date(2025, 1, 1)
+    showings = [((start + datetime.timedelta(days=d)).isoformat(), f"Theater {t}", film, showtime)
+                for t in range(theaters) for d in range(days) for film in FILMS for showtime in SHOWTIMES]
+    with database._get_db_connection() as conn:
+        conn.executemany("INSERT INTO films (film_title, genre, mpaa_rating, last_omdb_update) VALUES (?, 'Drama', 'PG-13', '2025-01-01')",
+                         [(film,) for film in FILMS])
+        conn.executemany("INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES (?, ?, ?, ?, '2D', 'Prime')",
+                         showings)
+        run_ids = [conn.execute("INSERT INTO scrape_runs (run_timestamp, mode, run_context) VALUES (?, 'Scheduled', 'Benchmark')",
+                                (f"2025-01-01 {6 + r:02d}:00:00",)).lastrowid for r in range(runs)]
+    started = time.perf_counter()
+    for run_id in run_ids:
+        database.save_prices(run_id, pd.DataFrame([
+            {'play_date': play_date, 'Theater Name': theater, 'Film Title': film, 'Showtime': showtime, 'Format': '2D',
+             'Ticket Type': ticket_type, 'Price': f"${price + rng.choice([0, 0, 0, 1]):.2f}", 'Capacity': 'Available'}
+            for play_date, theater, film, showtime in showings for ticket_type, price in TICKET_TYPES]))
+    save_seconds = (time.perf_counter() - started) / runs
+    get_pool().close_all()
+    return len(showings), save_seconds
+
+
+def raw_glance(conn, theater_list, start, end):
+    """Distinct prices per report group from raw rows, with the in-memory ticket type consolidation."""
+    df = pd.read_sql_query(RAW_GLANCE.format(theaters=','.join(['?'] * len(theater_list))), conn, params=theater_list + [start, end])
+    reverse_map = database._ticket_type_reverse_map()
+    df['ticket_type'] = df['ticket_type'].str.lower().map(reverse_map).fillna(df['ticket_type'])
+    return df.drop_duplicates()
+
+
+def timed(call, repeat):
+    call() # Warm up the page cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - start)
+    return min(samples), result
+
+
+def canonical(frame):
+    return sorted(frame.astype(str).values.tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--theaters', type=int, default=10)
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    theater_list = [f"Theater {t}" for t in range(args.theaters)]
+    start, end = datetime.date(2025, 1, 1), datetime.date(2025, 1, args.days)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "daily.db")
+        showing_count, save_seconds = build(path, args.theaters, args.days, args.runs)
+        config.DB_FILE = path
+        raw = sqlite3.connect(path)
+        glance_columns = ['theater_name', 'film_title', 'daypart', 'format', 'ticket_type', 'price']
+        placeholders = ','.join(['?'] * len(theater_list))
+        comparisons = [
+            ("get_market_at_a_glance_data",
+             lambda: raw_glance(raw, theater_list, start.isoformat(), end.isoformat()),
+             lambda: database.get_market_at_a_glance_data(theater_list, start, end)[0][glance_columns].drop_duplicates()),
+            ("get_theater_comparison_summary avg price",
+             lambda: pd.read_sql_query(RAW_AVG_PRICE.format(theaters=placeholders), raw,
+                                       params=theater_list + [start.isoformat(), end.isoformat()]).round(6),
+             lambda: database.get_theater_comparison_summary(theater_list, start.isoformat(), end.isoformat())
+                 [['theater_name', 'Overall Avg. Price']].round(6)),
+            ("get_comparable_films",
+             lambda: pd.read_sql_query(RAW_COMPARABLE, raw, params=["%Drama%", FILMS[0]]).round(6),
+             lambda: database.get_comparable_films(FILMS[0], ["Drama"])[["Film Title", "Average Price", "Total Showings"]].round(6)),
+        ]
+        print(f"{showing_count} showings x {len(TICKET_TYPES)} ticket types x {args.runs} runs; "
+              f"{save_seconds * 1e3:.0f} ms per save_prices, including its summary refresh")
+        for name, before_call, after_call in comparisons:
+            before, before_df = timed(before_call, args.repeat)
+            after, after_df = timed(after_call, args.repeat)
+            if name != "get_theater_comparison_summary avg price": # The raw query only matched exact "Adult", "Senior", "Child"
+                assert canonical(before_df) == canonical(after_df), name
+            print(f"  {name:<42}: {before * 1e3:8.1f} ms raw rows, {after * 1e3:7.1f} ms daily summary ({before / after:.1f}x)")
+        raw.close()
+        get_pool().close_all()
+
+
+if __name__ == '__main__':
+    main()
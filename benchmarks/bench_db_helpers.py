@@ -0,0 +1,156 @@
+"""
+Benchmark: common database read helpers over a fresh connection per call vs. the pooled, tuned connection.
+
+Builds a synthetic company database (theaters x days x films x showtimes, a few ticket
+types per showing). It then times each helper with the previous `_get_db_connection`,
+a new `sqlite3.connect` per call on a rollback-journal file, against the pooled WAL
+connection. With `--writer`, a background thread keeps saving prices while the helpers
+run, as the scraper does while someone uses the app.
+
+    python benchmarks/bench_db_helpers.py [--calls 2000] [--theaters 20] [--days 14] [--writer]
+"""
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import config, database  # noqa: E402
+from app.db_pool import get_pool  # noqa: E402
+
+FILMS = [f"Film {i}" for i in range(12)]
+SHOWTIMES = ["11:00am", "1:30pm", "4:00pm", "6:45pm", "9:30pm"]
+TICKET_TYPES = [("Adult", 14.0), ("Child", 10.0), ("Senior", 11.0)]
+
+
+def build_database(path, theaters, days):
+    config.DB_FILE = path
+    database.init_database()
+    database.update_database_schema()
+    start = datetime.date(2025, 1, 1)
+    with database._get_db_connection() as conn:
+        run_id = conn.execute("INSERT INTO scrape_runs (run_timestamp, mode, run_context) VALUES (?, ?, ?)",
+                              (datetime.datetime(2025, 1, 1, 6, 0), "Scheduled", "Benchmark")).lastrowid
+        conn.executemany("INSERT INTO films (film_title, genre, mpaa_rating, last_omdb_update) VALUES (?, ?, ?, ?)",
+                         [(film, "Drama", "PG-13", datetime.datetime(2025, 1, 1)) for film in FILMS])
+        for t in range(theaters):
+            for d in range(days):
+                play_date = (start + datetime.timedelta(days=d)).isoformat()
+                for film in FILMS:
+                    for showtime in SHOWTIMES:
+                        showing_id = conn.execute(
+                            "INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES (?, ?, ?, ?, ?, ?)",
+                            (play_date, f"Theater {t}", film, showtime, "2D", "Prime")).lastrowid
+                        conn.executemany("INSERT INTO prices (run_id, showing_id, ticket_type, price, capacity) VALUES (?, ?, ?, ?, ?)",
+                                         [(run_id, showing_id, ticket_type, price, "Available") for ticket_type, price in TICKET_TYPES])
+    get_pool().close_all()
+    return run_id
+
+
+def copy_as_rollback_journal(source, target):
+    """A copy of `source` in the default rollback-journal mode, as databases were before pooling."""
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+        dst.execute("PRAGMA journal_mode = DELETE")
+    dst.close()
+    src.close()
+
+
+def helper_calls(theaters, days):
+    rng = random.Random(7)
+    start = datetime.date(2025, 1, 1)
+
+    def pick():
+        return f"Theater {rng.randrange(theaters)}", (start + datetime.timedelta(days=rng.randrange(days))).isoformat(), rng.choice(FILMS)
+    return [
+        ("check_film_exists", lambda: database.check_film_exists(rng.choice(FILMS))),
+        ("get_film_details", lambda: database.get_film_details(rng.choice(FILMS))),
+        ("get_dates_for_theater", lambda: database.get_dates_for_theater(pick()[0])),
+        ("get_films_for_theater_date", lambda: database.get_films_for_theater_date(*pick()[:2])),
+        ("get_final_prices", lambda: database.get_final_prices(*pick())),
+    ]
+
+
+def _writer(path, run_id, stop, legacy):
+    """Saves a batch of prices every few milliseconds, like a BatchedPriceWriter during a scrape."""
+    conn = sqlite3.connect(path, timeout=30) if legacy else None
+    rng = random.Random(11)
+    while not stop.is_set():
+        target = conn if legacy else get_pool().connection(path)
+        with target:
+            target.executemany("INSERT INTO prices (run_id, showing_id, ticket_type, price, capacity) VALUES (?, ?, ?, ?, ?)",
+                               [(run_id, rng.randrange(1, 1000), "Adult", 14.0, "Available") for _ in range(500)])
+        time.sleep(0.005)
+    if conn is not None:
+        conn.close()
+    get_pool().close_thread_connection()
+
+
+def run(label, path, calls, helpers, legacy, writer_run_id):
+    config.DB_FILE = path
+    original = database._get_db_connection
+    if legacy:
+        database._get_db_connection = lambda: sqlite3.connect(config.DB_FILE) # The previous implementation
+    stop = threading.Event()
+    writer = None
+    if writer_run_id is not None:
+        writer = threading.Thread(target=_writer, args=(path, writer_run_id, stop, legacy), daemon=True)
+        writer.start()
+    try:
+        results = {}
+        for name, call in helpers:
+            call() # Warm up the OS page cache (and the pooled connection)
+            samples = []
+            for _ in range(calls):
+                start = time.perf_counter()
+                call()
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            results[name] = (statistics.mean(samples), samples[int(len(samples) * 0.99) - 1])
+    finally:
+        stop.set()
+        if writer is not None:
+            writer.join()
+        database._get_db_connection = original
+        get_pool().close_all()
+    print(f"\n{label}")
+    for name, (mean, p99) in results.items():
+        print(f"  {name:<28}: {mean * 1e6:8.1f} us mean, {p99 * 1e6:8.1f} us p99")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--theaters', type=int, default=20)
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--writer', action='store_true', help="Save prices from a background thread while reading")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pooled_path = os.path.join(tmp, "pooled.db")
+        legacy_path = os.path.join(tmp, "legacy.db")
+        run_id = build_database(pooled_path, args.theaters, args.days)
+        copy_as_rollback_journal(pooled_path, legacy_path)
+        print(f"{args.theaters} theaters x {args.days} days x {len(FILMS)} films x {len(SHOWTIMES)} showtimes, "
+              f"{args.calls} calls per helper{', with a concurrent writer' if args.writer else ''}")
+
+        helpers = helper_calls(args.theaters, args.days)
+        writer_run_id = run_id if args.writer else None
+        before = run("Before: new connection per call, rollback journal", legacy_path, args.calls, helpers, True, writer_run_id)
+        after = run("After: pooled connection, WAL + tuned PRAGMAs", pooled_path, args.calls, helpers, False, writer_run_id)
+
+        print("\nSpeed-up (mean)")
+        for name in before:
+            print(f"  {name:<28}: {before[name][0] / after[name][0]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
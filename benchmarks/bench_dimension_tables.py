@@ -0,0 +1,182 @@
+"""
+Benchmark: text-keyed showings/prices vs. integer-keyed dimension tables.
+
+Builds the same synthetic price history twice:
+- in the schema as it was before dimension tables (text `ticket_type` on every price row, and
+  `films` joined on `film_title`)
+- through `database.init_database()`, which stores prices in `price_facts`
+
+It reports each file's size after VACUUM and times `get_market_at_a_glance_data` and
+`query_historical_data` against their previous text-joined versions, checking that both
+return the same frame.
+
+    python benchmarks/bench_dimension_tables.py [--theaters 20] [--days 28] [--runs 3] [--repeat 5]
+"""
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import config, database  # noqa: E402
+from app.db_pool import get_pool  # noqa: E402
+import pandas as pd  # noqa: E402
+
+FILMS = [f"Film {i}" for i in range(12)]
+SHOWTIMES = ["11:00am", "1:30pm", "4:00pm", "6:45pm", "9:30pm"]
+TICKET_TYPES = [("General Admission", 14.0), ("Child (Ages 3-11)", 10.0), ("Senior (Ages 60+)", 11.0), ("Matinee Discount", 9.0)]
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE scrape_runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, run_timestamp DATETIME NOT NULL, mode TEXT NOT NULL, run_context TEXT)",
+    """CREATE TABLE showings (showing_id INTEGER PRIMARY KEY AUTOINCREMENT, play_date DATE NOT NULL, theater_name TEXT NOT NULL,
+       film_title TEXT NOT NULL, showtime TEXT NOT NULL, format TEXT, daypart TEXT, is_plf BOOLEAN DEFAULT 0, ticket_url TEXT,
+       UNIQUE(play_date, theater_name, film_title, showtime, format))""",
+    """CREATE TABLE prices (price_id INTEGER PRIMARY KEY AUTOINCREMENT, run_id INTEGER, showing_id INTEGER, ticket_type TEXT NOT NULL,
+       price REAL NOT NULL, capacity TEXT, play_date DATE, inferred BOOLEAN DEFAULT 0)""",
+    "CREATE TABLE films (film_id INTEGER PRIMARY KEY AUTOINCREMENT, film_title TEXT NOT NULL UNIQUE, genre TEXT, mpaa_rating TEXT, release_date TEXT, last_omdb_update DATETIME NOT NULL)",
+    "CREATE INDEX idx_showings_theater_date ON showings (theater_name, play_date)",
+    "CREATE INDEX idx_showings_film_title ON showings (film_title)",
+    "CREATE INDEX idx_prices_showing_id ON prices (showing_id)",
+    "CREATE INDEX idx_prices_run_id ON prices (run_id)",
+    "CREATE INDEX idx_films_title ON films (film_title)",
+]
+
+# The two queries as they were before dimension tables
+LEGACY_GLANCE = """
+    SELECT s.theater_name, s.film_title, s.daypart, f.release_date, s.format, s.is_plf, p.ticket_type, p.price, r.run_timestamp
+    FROM prices p
+    JOIN showings s ON p.showing_id = s.showing_id
+    LEFT JOIN films f ON s.film_title = f.film_title
+    JOIN scrape_runs r ON p.run_id = r.run_id
+    WHERE s.theater_name IN ({theaters}) AND s.play_date BETWEEN ? AND ?
+"""
+LEGACY_HISTORICAL = """
+    SELECT s.theater_name, s.film_title, s.showtime, s.daypart, s.format, p.ticket_type, p.price, p.capacity, s.play_date, r.run_timestamp
+    FROM showings s
+    LEFT JOIN prices p ON s.showing_id = p.showing_id
+    LEFT JOIN scrape_runs r ON p.run_id = r.run_id
+    JOIN films f ON s.film_title = f.film_title
+    WHERE s.play_date BETWEEN ? AND ? AND s.theater_name IN ({theaters}) AND (f.genre LIKE ?)
+    ORDER BY r.run_timestamp DESC, s.theater_name, s.film_title
+"""
+
+
+def populate(conn, theaters, days, runs):
+    start = datetime.date(2025, 1, 1)
+    conn.executemany("INSERT INTO films (film_title, genre, mpaa_rating, last_omdb_update) VALUES (?, ?, ?, ?)",
+                     [(film, "Drama" if i % 2 else "Action", "PG-13", "2025-01-01") for i, film in enumerate(FILMS)])
+    run_ids = [conn.execute("INSERT INTO scrape_runs (run_timestamp, mode, run_context) VALUES (?, ?, ?)",
+                            (f"2025-01-0{r + 1} 06:00:00", "Scheduled", "Benchmark")).lastrowid for r in range(runs)]
+    conn.executemany("INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES (?, ?, ?, ?, ?, ?)",
+                     [((start + datetime.timedelta(days=d)).isoformat(), f"Regal Cinemas Theater {t} & IMAX", film, showtime,
+                       "2D" if s % 3 else "IMAX 3D", "Prime") for t in range(theaters) for d in range(days)
+                      for film in FILMS for s, showtime in enumerate(SHOWTIMES)])
+    showing_ids = [row[0] for row in conn.execute("SELECT showing_id FROM showings")]
+    conn.executemany("INSERT INTO prices (run_id, showing_id, ticket_type, price, capacity) VALUES (?, ?, ?, ?, ?)",
+                     [(run_id, showing_id, ticket_type, price, "Available")
+                      for run_id in run_ids for showing_id in showing_ids for ticket_type, price in TICKET_TYPES])
+    conn.commit()
+
+
+def build_legacy(path, theaters, days, runs):
+    conn = sqlite3.connect(path)
+    for statement in LEGACY_SCHEMA:
+        conn.execute(statement)
+    populate(conn, theaters, days, runs)
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def build_keyed(path, theaters, days, runs):
+    config.DB_FILE = path
+    database.init_database()
+    database.update_database_schema()
+    get_pool().close_all()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    populate(conn, theaters, days, runs)
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def legacy_glance(conn, theater_list, start, end):
+    """The previous get_market_at_a_glance_data: the text-joined query and the same ticket type consolidation."""
+    placeholders = ','.join(['?'] * len(theater_list))
+    df = pd.read_sql_query(LEGACY_GLANCE.format(theaters=placeholders), conn, params=theater_list + [start, end])
+    with open(os.path.join(os.path.dirname(database.__file__), 'ticket_types.json')) as f:
+        base_type_map = json.load(f).get('base_type_map', {})
+    reverse_map = {}
+    for canonical, variations in base_type_map.items():
+        reverse_map[canonical.lower()] = canonical
+        for variation in variations:
+            reverse_map[variation.lower()] = canonical
+    df['ticket_type'] = df['ticket_type'].str.lower().map(reverse_map).fillna(df['ticket_type'])
+    return df
+
+
+def legacy_historical(conn, theater_list, start, end, genre):
+    placeholders = ','.join(['?'] * len(theater_list))
+    return pd.read_sql_query(LEGACY_HISTORICAL.format(theaters=placeholders), conn, params=[start, end] + theater_list + [f"%{genre}%"])
+
+
+def same_frame(a, b):
+    columns = list(a.columns)
+    return list(b.columns) == columns and \
+        a.astype(str).sort_values(columns).values.tolist() == b.astype(str).sort_values(columns).values.tolist()
+
+
+def timed(call, repeat):
+    call() # Warm up the page cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = call()
+        samples.append(time.perf_counter() - start)
+    return min(samples), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--theaters', type=int, default=20)
+    parser.add_argument('--days', type=int, default=28)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    theater_list = [f"Regal Cinemas Theater {t} & IMAX" for t in range(0, args.theaters, 4)]
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path, keyed_path = os.path.join(tmp, "legacy.db"), os.path.join(tmp, "keyed.db")
+        build_legacy(legacy_path, args.theaters, args.days, args.runs)
+        build_keyed(keyed_path, args.theaters, args.days, args.runs)
+        legacy_mb, keyed_mb = os.path.getsize(legacy_path) / 1e6, os.path.getsize(keyed_path) / 1e6
+        print(f"{args.theaters} theaters x {args.days} days x {len(FILMS)} films x {len(SHOWTIMES)} showtimes x "
+              f"{len(TICKET_TYPES)} ticket types x {args.runs} runs")
+        print(f"  File size: {legacy_mb:.1f} MB text-keyed, {keyed_mb:.1f} MB integer-keyed ({legacy_mb / keyed_mb:.2f}x)")
+
+        start, end = datetime.date(2025, 1, 8), datetime.date(2025, 1, 14)
+        legacy = sqlite3.connect(legacy_path)
+        config.DB_FILE = keyed_path
+        comparisons = [
+            ("get_market_at_a_glance_data",
+             lambda: legacy_glance(legacy, theater_list, start.isoformat(), end.isoformat()),
+             lambda: database.get_market_at_a_glance_data(theater_list, start, end)[0]),
+            ("query_historical_data",
+             lambda: legacy_historical(legacy, theater_list, start.isoformat(), end.isoformat(), "Drama"),
+             lambda: database.query_historical_data(start.isoformat(), end.isoformat(), theaters=theater_list, genres=["Drama"])),
+        ]
+        for name, before_call, after_call in comparisons:
+            before, before_df = timed(before_call, args.repeat)
+            after, after_df = timed(after_call, args.repeat)
+            assert same_frame(before_df, after_df), name
+            print(f"  {name} ({len(after_df)} rows): {before * 1e3:.1f} ms text-joined, {after * 1e3:.1f} ms integer-keyed "
+                  f"({before / after:.2f}x)")
+        legacy.close()
+        get_pool().close_all()
+
+if __name__ == '__main__':
+    main()
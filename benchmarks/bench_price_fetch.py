@@ -0,0 +1,97 @@
+"""
+Benchmark: per-showing price fetch over pooled HTTP vs. a Playwright page navigation.
+
+Serves the ticketing-page fixture from a local HTTP server and times both paths.
+The Playwright path is skipped if Chromium isn't installed.
+
+    python benchmarks/bench_price_fetch.py [--requests 200] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import functools
+import http.server
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.price_fetcher import CommercePriceFetcher, extract_commerce_models  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures')
+FIXTURE_NAME = 'fandango_ticketing_page.html'
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server():
+    handler = functools.partial(_QuietHandler, directory=os.path.abspath(FIXTURE_DIR))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/{FIXTURE_NAME}"
+
+
+async def _run_concurrently(n, concurrency, fetch_one):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker():
+        async with semaphore:
+            assert await fetch_one() is not None
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def bench_http(url, n, concurrency):
+    fetcher = CommercePriceFetcher(max_connections=concurrency)
+    try:
+        return await _run_concurrently(n, concurrency, lambda: fetcher.fetch_commerce_models(url))
+    finally:
+        await fetcher.aclose()
+
+
+async def bench_playwright(url, n, concurrency):
+    try:
+        from app.browser_pool import BrowserPool
+        pool = BrowserPool(headless=True)
+
+        async def fetch_one():
+            async with pool.page() as page:
+                await page.goto(url)
+                return extract_commerce_models(await page.content())
+
+        try:
+            await fetch_one() # Warm-up: launch Chromium once, outside the timed run
+            return await _run_concurrently(n, concurrency, fetch_one)
+        finally:
+            await pool.close()
+    except Exception as e:
+        print(f"  [SKIP] Playwright path unavailable: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    args = parser.parse_args()
+
+    server, url = start_fixture_server()
+    try:
+        http_s = asyncio.run(bench_http(url, args.requests, args.concurrency))
+        print(f"HTTP        : {args.requests} fetches in {http_s:.2f}s ({http_s / args.requests * 1000:.2f} ms/showing)")
+        pw_s = asyncio.run(bench_playwright(url, args.requests, min(args.concurrency, 5)))
+        if pw_s is not None:
+            print(f"Playwright  : {args.requests} fetches in {pw_s:.2f}s ({pw_s / args.requests * 1000:.2f} ms/showing)")
+            print(f"Speed-up    : {pw_s / http_s:.1f}x")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: a price row per run vs. change-only price intervals.
+
+Saves the same synthetic scrape history twice through `database.save_prices`, once with
+`config.PRICE_INTERVALS` off (every run adds a row per ticket type) and once with it on (an
+unchanged price extends its interval). A small share of prices change between runs, as they do
+between nightly scrapes. It reports the `price_facts` rows and file size after VACUUM, the save
+time per run, and times `get_market_at_a_glance_data` over both, checking they return the same frame.
+
+    python benchmarks/bench_price_intervals.py [--theaters 10] [--days 14] [--runs 14] [--change-rate 0.02]
+"""
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import config, database  # noqa: E402
+from app.db_pool import get_pool  # noqa: E402
+import pandas as pd  # noqa: E402
+
+FILMS = [f"Film {i}" for i in range(12)]
+SHOWTIMES = ["11:00am", "1:30pm", "4:00pm", "6:45pm", "9:30pm"]
+TICKET_TYPES = [("General Admission", 14.0), ("Child (Ages 3-11)", 10.0), ("Senior (Ages 60+)", 11.0)]
+
+
+def scrape_frames(theaters, days, runs, change_rate):
+    """One price frame per run; each run re-scrapes every showing, and change_rate of its prices move by $1."""
+    rng = random.Random(3)
+    start = datetime.date(2025, 1, 1)
+    showings = [((start + datetime.timedelta(days=d)).isoformat(), f"Theater {t}", film, showtime)
+                for t in range(theaters) for d in range(days) for film in FILMS for showtime in SHOWTIMES]
+    prices = {(showing, ticket_type): price for showing in showings for ticket_type, price in TICKET_TYPES}
+    frames = []
+    for _ in range(runs):
+        for key in rng.sample(sorted(prices), int(len(prices) * change_rate)):
+            prices[key] += 1.0
+        frames.append(pd.DataFrame([{'play_date': play_date, 'Theater Name': theater, 'Film Title': film, 'Showtime': showtime,
+                                     'Format': '2D', 'Ticket Type': ticket_type, 'Price': f"${price:.2f}", 'Capacity': 'Available'}
+                                    for ((play_date, theater, film, showtime), ticket_type), price in prices.items()]))
+    return showings, frames
+
+
+def build(path, showings, frames, intervals):
+    config.DB_FILE = path
+    config.PRICE_INTERVALS = intervals
+    database.init_database()
+    database.update_database_schema()
+    with database._get_db_connection() as conn:
+        conn.executemany("INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES (?, ?, ?, ?, '2D', 'Prime')",
+                         showings)
+        run_ids = [conn.execute("INSERT INTO scrape_runs (run_timestamp, mode, run_context) VALUES (?, 'Scheduled', 'Benchmark')",
+                                (f"2025-01-01 {6 + r:02d}:00:00",)).lastrowid for r in range(len(frames))]
+    started = time.perf_counter()
+    for run_id, frame in zip(run_ids, frames):
+        database.save_prices(run_id, frame)
+    save_seconds = (time.perf_counter() - started) / len(frames)
+    get_pool().close_all()
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT COUNT(*) FROM price_facts").fetchone()[0]
+    conn.execute("VACUUM")
+    conn.close()
+    return rows, os.path.getsize(path) / 1e6, save_seconds
+
+
+def timed(call, repeat):
+    call() # Warm up the page cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - start)
+    return min(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--theaters', type=int, default=10)
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--runs', type=int, default=14)
+    parser.add_argument('--change-rate', type=float, default=0.02)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    showings, frames = scrape_frames(args.theaters, args.days, args.runs, args.change_rate)
+    theater_list = [f"Theater {t}" for t in range(0, args.theaters, 2)]
+    start, end = datetime.date(2025, 1, 3), datetime.date(2025, 1, 9)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, intervals in (("per-run rows", False), ("intervals", True)):
+            path = os.path.join(tmp, f"{intervals}.db")
+            results[label] = build(path, showings, frames, intervals)
+            config.DB_FILE = path
+            results[label] += timed(lambda: database.get_market_at_a_glance_data(theater_list, start, end)[0], args.repeat)
+            get_pool().close_all()
+
+        print(f"{len(showings)} showings x {len(TICKET_TYPES)} ticket types x {args.runs} runs, "
+              f"{args.change_rate:.0%} of prices changing per run")
+        for label, (rows, size_mb, save_seconds, glance_seconds, _) in results.items():
+            print(f"  {label:<13}: {rows:>9} price_facts rows, {size_mb:6.1f} MB, {save_seconds * 1e3:7.1f} ms per save_prices, "
+                  f"{glance_seconds * 1e3:7.1f} ms get_market_at_a_glance_data")
+        rows_frame, interval_frame = results["per-run rows"][4], results["intervals"][4]
+        columns = list(rows_frame.columns)
+        assert rows_frame.astype(str).sort_values(columns).values.tolist() == \
+            interval_frame.astype(str).sort_values(columns).values.tolist()
+        (before_rows, before_mb, *_), (after_rows, after_mb, *_) = results.values()
+        print(f"  {before_rows / after_rows:.1f}x fewer rows, {before_mb / after_mb:.1f}x smaller file")
+
+
+if __name__ == '__main__':
+    main()
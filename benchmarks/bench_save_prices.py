@@ -0,0 +1,181 @@
+"""
+Benchmark: database.save_prices, the previous OR-chained lookup with row-wise pandas vs. the staged, set-based save.
+
+Builds a company database with one showing per (theater, film, showtime) and saves a
+price frame with a few ticket types per showing. A share of the rows carry a non-2D
+format, so they go through the format-fallback path. The previous implementation ORs
+together one condition per showing and fails once a frame passes SQLite's expression
+depth limit (about a thousand showings), which the run at `--rows` shows.
+
+    python benchmarks/bench_save_prices.py [--rows 100000] [--small-rows 3000] [--fallback-share 0.1]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import config, database  # noqa: E402
+from app.db_pool import get_pool  # noqa: E402
+
+TICKET_TYPES = [("Adult", "$14.00"), ("Child", "$10.00"), ("Senior", "$11.00"), ("Military", "$12.00")]
+SHOWTIMES = ["11:00am", "1:30pm", "4:00pm", "6:45pm", "9:30pm"]
+
+
+def legacy_save_prices(run_id: int, df: pd.DataFrame):
+    """The previous database.save_prices: one OR-chained lookup query, then row-wise apply/iterrows."""
+    if 'play_date' not in df.columns or df['play_date'].isnull().all():
+        print("  [DB] [ERROR] save_prices was called with a DataFrame missing 'play_date' data. Aborting save.")
+        return
+
+    with database._get_db_connection() as conn:
+        # --- OPTIMIZATION: Fetch all showing_ids in one go to avoid N+1 queries ---
+        unique_showings_df = df[['play_date', 'Theater Name', 'Film Title', 'Showtime', 'Format']].drop_duplicates().dropna()
+        if unique_showings_df.empty:
+            print("  [DB] No valid showings in the DataFrame to save prices for.")
+            return
+
+        # Build a single large query to fetch all relevant showing_ids
+        conditions = " OR ".join(["(play_date = ? AND theater_name = ? AND film_title = ? AND showtime = ? AND format = ?)" for _ in range(len(unique_showings_df))])
+        params = [item for sublist in unique_showings_df.to_numpy() for item in sublist]
+        query = f"SELECT showing_id, play_date, theater_name, film_title, showtime, format FROM showings WHERE {conditions}"
+        
+        db_showings_df = pd.read_sql_query(query, conn, params=params)
+
+        # Create a lookup map from a tuple of showing details to its showing_id
+        db_showings_df['lookup_key'] = db_showings_df.apply(lambda row: (row['play_date'], row['theater_name'], row['film_title'], row['showtime'], row['format']), axis=1)
+        showing_id_map = db_showings_df.set_index('lookup_key')['showing_id'].to_dict()
+
+        # --- NEW: Logic to update formats for unmatched showings ---
+        df['lookup_key_with_format'] = df.apply(lambda row: (row['play_date'], row['Theater Name'], row['Film Title'], row['Showtime'], row['Format']), axis=1)
+        unmatched_mask = ~df['lookup_key_with_format'].isin(showing_id_map.keys())
+
+        if unmatched_mask.any():
+            unmatched_df = df[unmatched_mask].copy()
+            unmatched_keys_no_format = unmatched_df[['play_date', 'Theater Name', 'Film Title', 'Showtime']].drop_duplicates()
+
+            if not unmatched_keys_no_format.empty:
+                conditions = " OR ".join(["(play_date = ? AND theater_name = ? AND film_title = ? AND showtime = ?)" for _ in range(len(unmatched_keys_no_format))])
+                params = [item for sublist in unmatched_keys_no_format.to_numpy() for item in sublist]
+                
+                query = f"SELECT showing_id, play_date, theater_name, film_title, showtime FROM showings WHERE format = '2D' AND ({conditions})"
+                updatable_showings_df = pd.read_sql_query(query, conn, params=params)
+
+                if not updatable_showings_df.empty:
+                    new_format_map = unmatched_df.groupby(['play_date', 'Theater Name', 'Film Title', 'Showtime'])['Format'].apply(lambda x: ", ".join(sorted(list(set(x))))).to_dict()
+                    
+                    updates_to_make = {}
+                    for _, db_row in updatable_showings_df.iterrows():
+                        key = (db_row['play_date'], db_row['theater_name'], db_row['film_title'], db_row['showtime'])
+                        new_format = new_format_map.get(key)
+                        
+                        if new_format and new_format != '2D':
+                            updates_to_make[db_row['showing_id']] = new_format
+                            
+                            unmatched_formats_for_key = unmatched_df[(unmatched_df['play_date'] == key[0]) & (unmatched_df['Theater Name'] == key[1]) & (unmatched_df['Film Title'] == key[2]) & (unmatched_df['Showtime'] == key[3])]['Format'].unique()
+                            for fmt in unmatched_formats_for_key:
+                                showing_id_map[(key[0], key[1], key[2], key[3], fmt)] = db_row['showing_id']
+
+                    if updates_to_make:
+                        unique_updates = [(fmt, sid) for sid, fmt in updates_to_make.items()]
+                        cursor = conn.cursor()
+                        cursor.executemany("UPDATE showings SET format = ? WHERE showing_id = ?", unique_updates)
+                        conn.commit()
+                        print(f"  [DB] Updated format for {cursor.rowcount} showings from price scrape data.")
+
+        df.drop(columns=['lookup_key_with_format'], inplace=True, errors='ignore')
+
+        # Prepare the data for bulk insertion
+        prices_to_insert = []
+        for _, row in df.iterrows():
+            lookup_key = (row['play_date'], row['Theater Name'], row['Film Title'], row['Showtime'], row['Format'])
+            showing_id = showing_id_map.get(lookup_key)
+            
+            if showing_id:
+                try:
+                    prices_to_insert.append((
+                        run_id,
+                        showing_id,
+                        row['Ticket Type'],
+                        float(row['Price'].replace('$', '')),
+                        row['Capacity'],
+                        1 if row.get('Inferred') == True else 0 # noqa: E712 (NaN where the frame mixes scraped and inferred rows)
+                    ))
+                except (ValueError, KeyError) as e:
+                    print(f"  [DB] [WARN] Skipping price record due to missing data: {row}. Error: {e}")
+
+        total_inserted = 0
+        if prices_to_insert:
+            cursor = conn.cursor()
+            cursor.executemany("INSERT INTO prices (run_id, showing_id, ticket_type, price, capacity, inferred) VALUES (?, ?, ?, ?, ?, ?)", prices_to_insert)
+            total_inserted = cursor.rowcount
+        conn.commit()
+        print(f"  [DB] Saved {total_inserted} price records to database for run ID {run_id}.")
+
+
+def build(path, rows, fallback_share):
+    """A database with the frame's showings, and the frame itself."""
+    config.DB_FILE = path
+    database.init_database()
+    database.update_database_schema()
+    showings = []
+    per_theater = 40 * len(SHOWTIMES)
+    for i in range(-(-rows // len(TICKET_TYPES))):
+        theater, rest = divmod(i, per_theater)
+        film, showtime = divmod(rest, len(SHOWTIMES))
+        showings.append(("2025-01-01", f"Theater {theater}", f"Film {film}", SHOWTIMES[showtime]))
+    with database._get_db_connection() as conn:
+        conn.executemany("INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES (?, ?, ?, ?, '2D', 'Prime')",
+                         showings)
+    fallback_every = max(1, round(1 / fallback_share)) if fallback_share > 0 else None
+    frame = pd.DataFrame([{
+        "play_date": play_date, "Theater Name": theater, "Film Title": film, "Showtime": showtime,
+        "Format": "IMAX" if fallback_every and i % fallback_every == 0 else "2D",
+        "Ticket Type": ticket_type, "Price": price, "Capacity": "Available",
+    } for i, (play_date, theater, film, showtime) in enumerate(showings) for ticket_type, price in TICKET_TYPES][:rows])
+    get_pool().close_all()
+    return frame
+
+
+def timed(label, save, path, frame):
+    config.DB_FILE = path
+    frame = frame.copy() # The previous implementation adds a column to the frame it's given
+    start = time.perf_counter()
+    try:
+        save(1, frame)
+    except (sqlite3.OperationalError, pd.errors.DatabaseError) as e:
+        print(f"{label:<10}: failed ({e.__cause__ or e})")
+        get_pool().close_all()
+        return None
+    seconds = time.perf_counter() - start
+    with database._get_db_connection() as conn:
+        saved = conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+    get_pool().close_all()
+    print(f"{label:<10}: {seconds:.3f}s for {len(frame)} rows ({saved} saved, {len(frame) / seconds:,.0f} rows/s)")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--small-rows', type=int, default=3_000, help="A frame the previous implementation can still save")
+    parser.add_argument('--fallback-share', type=float, default=0.1, help="Share of showings scraped with a non-2D format")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sorted({args.small_rows, args.rows}):
+            print(f"\n{rows} rows, {args.fallback_share:.0%} of showings through the format fallback")
+            results = {}
+            for label, save in [("Legacy", legacy_save_prices), ("Staged", database.save_prices)]:
+                path = os.path.join(tmp, f"{label.lower()}-{rows}.db")
+                results[label.lower()] = timed(label, save, path, build(path, rows, args.fallback_share))
+            if results["legacy"] and results["staged"]:
+                print(f"Speed-up  : {results['legacy'] / results['staged']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: theater-page showtime parsing with BeautifulSoup's html.parser vs. the lxml backend.
+
+Parses the saved theater-page fixtures repeatedly and reports showings parsed per second.
+
+    python benchmarks/bench_showtime_parser.py [--iterations 50]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from app import fast_html  # noqa: E402
+from app.scraper import Scraper, logger as scraper_logger  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures')
+FIXTURES = ['fandango_theater_page.html', 'fandango_theater_page_formats.html']
+THEATER = {"name": "Benchmark Theater", "url": "https://www.fandango.com/benchmark/theater-page"}
+
+
+def _bench(scout, pages, iterations):
+    showings = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for html in pages:
+            showings += len(scout._parse_theater_page_html(html, THEATER))
+    return showings, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    scraper_logger.setLevel(logging.WARNING) # Per-showtime discovery logging would dominate the timing
+    scout = Scraper(headless=True, http_prices=False)
+    pages = []
+    for name in FIXTURES:
+        with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+
+    with patch('app.scraper.parse_html', lambda h: BeautifulSoup(h, 'html.parser')):
+        reference = [scout._parse_theater_page_html(html, THEATER) for html in pages]
+        bs_count, bs_s = _bench(scout, pages, args.iterations)
+    print(f"html.parser : {bs_count / bs_s:,.0f} showings/s")
+
+    if fast_html.HTML_BACKEND != "lxml":
+        print("  [SKIP] lxml is not installed.")
+        return
+    if [scout._parse_theater_page_html(html, THEATER) for html in pages] != reference:
+        print("  [WARN] lxml backend output differs from html.parser output.")
+    lx_count, lx_s = _bench(scout, pages, args.iterations)
+    print(f"lxml        : {lx_count / lx_s:,.0f} showings/s")
+    print(f"Speed-up    : {bs_s / lx_s:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
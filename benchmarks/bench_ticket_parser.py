@@ -0,0 +1,100 @@
+"""
+Benchmark: ticket description parsing, the old per-keyword pass vs. the compiled parser, with and without its cache.
+
+Descriptions are drawn (with repetition, as in a real run) from a corpus of
+descriptions seen on Fandango ticketing pages.
+
+    python benchmarks/bench_ticket_parser.py [--lookups 200000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.ticket_parser import TicketDescriptionParser, load_ticket_types  # noqa: E402
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), 'data', 'ticket_descriptions.txt')
+
+
+def make_legacy_parser(ticket_types_data):
+    """The previous Scraper._parse_ticket_description: one subn per keyword, base types re-sorted on every call."""
+    def compile_map(mapping):
+        return {name: [re.compile(r'(?<!\w)' + re.escape(kw) + r'(?!\w)', re.IGNORECASE) for kw in keywords]
+                for name, keywords in mapping.items()}
+    amenity_map_re = compile_map(ticket_types_data.get("amenity_map", {}))
+    base_type_map_re = compile_map(ticket_types_data.get("base_type_map", {}))
+    ignored_amenities = {term.lower() for term in ticket_types_data.get("ignored_amenities", [])}
+
+    def parse(description):
+        if not description:
+            return ("Unknown", ())
+        remaining_desc = description.lower().replace('−', '-').strip()
+        found_amenities = []
+        for amenity, patterns in amenity_map_re.items():
+            for pattern in patterns:
+                new_desc, count = pattern.subn('', remaining_desc)
+                if count > 0:
+                    found_amenities.append(amenity)
+                    remaining_desc = new_desc.strip()
+        found_base_type = None
+        sorted_base_types = sorted(base_type_map_re.items(), key=lambda item: -max(len(p.pattern) for p in item[1]))
+        for base_type, patterns in sorted_base_types:
+            for pattern in sorted(patterns, key=lambda p: -len(p.pattern)):
+                new_desc, count = pattern.subn('', remaining_desc)
+                if count > 0:
+                    found_base_type = base_type
+                    remaining_desc = new_desc.strip()
+                    break
+            if found_base_type:
+                break
+        for part in [part for part in re.split(r'[\s\(\)\[\]]+', remaining_desc) if part]:
+            if not found_base_type:
+                found_base_type = part.title()
+            elif part.lower() not in ignored_amenities:
+                found_amenities.append(part.title())
+        return (found_base_type or "Unknown", tuple(sorted(set(found_amenities))))
+    return parse
+
+
+def _time(parse, descriptions):
+    start = time.perf_counter()
+    for description in descriptions:
+        parse(description)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lookups', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+        corpus = [line.strip() for line in f if line.strip()]
+    descriptions = random.Random(args.seed).choices(corpus, k=args.lookups)
+
+    ticket_types_data = load_ticket_types()
+    legacy = make_legacy_parser(ticket_types_data)
+    compiled = TicketDescriptionParser(ticket_types_data)
+
+    mismatches = [d for d in corpus if legacy(d) != tuple(compiled.parse(d)[:2])]
+    if mismatches:
+        print(f"  [WARN] {len(mismatches)} descriptions parse differently: {mismatches[:5]}")
+
+    results = [
+        ("Legacy", _time(legacy, descriptions)),
+        ("Compiled", _time(compiled._parse, descriptions)),
+        ("Compiled+LRU", _time(TicketDescriptionParser(ticket_types_data).parse, descriptions)),
+    ]
+    print(f"{len(corpus)} distinct descriptions, {args.lookups} lookups")
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"{name:<13}: {seconds:.3f}s ({seconds / args.lookups * 1e6:.2f} us/lookup, {baseline / seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
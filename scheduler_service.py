@@ -3,11 +3,12 @@ import sys
 import json
 import re
 import glob
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 import pytz
 import asyncio
 import pandas as pd
 import logging
+import threading
 from apscheduler.schedulers.blocking import BlockingScheduler
 
 # Add project root to path to allow imports from the 'app' package
@@ -15,8 +16,12 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__))))
 
 from app import config
 from app.scraper import Scraper
+from app.browser_pool import shutdown_scraper_resources
+from app.price_writer import BatchedPriceWriter
 from app.modes.operating_hours_mode import generate_weekly_report_data
-from app.utils import _extract_company_name
+from app.utils import _extract_company_name, seconds_until_cutoff
+from app.scrape_planner import coverage, format_coverage, plan_for_deadline
+from app.price_rules import PriceRuleBook, PriceRuleStats, price_rule_stream
 from app import database
 
 logger = logging.getLogger(__name__)
@@ -58,41 +63,120 @@ async def execute_scheduled_scrape(task_config: dict, company_name: str):
         # Use a timezone-aware date for the scrape.
         scrape_date = datetime.now(pytz.utc).astimezone(pytz.timezone("America/Chicago")).date()
 
-        # 1. Get all showings from Fandango
-        all_showings = await scout.get_all_showings_for_theaters(theaters_to_scrape, scrape_date.strftime('%Y-%m-%d'))
-
-        # 2. Save showings to DB (this also triggers OMDb enrichment)
-        database.upsert_showings(all_showings, scrape_date)
-
-        # 3. Prepare the structure needed for the price scrape
-        selected_showtimes = {}
-        for theater_name, showings_list in all_showings.items():
-            selected_showtimes[theater_name] = {}
-            for showing in showings_list:
-                film_title = showing['film_title']
-                showtime = showing['showtime']
-                if film_title not in selected_showtimes[theater_name]:
-                    selected_showtimes[theater_name][film_title] = {}
-                if showtime not in selected_showtimes[theater_name][film_title]:
-                    selected_showtimes[theater_name][film_title][showtime] = []
-                selected_showtimes[theater_name][film_title][showtime].append(showing)
-
-        # 4. Scrape prices for all discovered showtimes
-        price_results, _ = await scout.scrape_details(theaters_to_scrape, selected_showtimes)
-
-        # 5. Save prices to the database
-        if price_results:
-            df_prices = pd.DataFrame(price_results)
-            run_context = f"Scheduled Task: {task_config['task_name']}"
+        run_context = f"Scheduled Task: {task_config['task_name']}"
+
+        # 0. Resume today's run of this task if it was interrupted, instead of starting over from discovery
+        run_id = database.find_resumable_scrape_run("Scheduled", run_context, since=datetime.combine(scrape_date, time.min))
+        if run_id:
+            showings_to_scrape = database.get_journal_remainder(run_id)
+            logger.info(f"RESUMING run_id {run_id} for '{task_config['task_name']}': {len(showings_to_scrape)} showings left "
+                        f"(journal: {database.get_journal_summary(run_id)}).")
+        else:
+            # 1. Get all showings from Fandango
+            all_showings = await scout.get_all_showings_for_theaters(theaters_to_scrape, scrape_date.strftime('%Y-%m-%d'))
+
+            # 2. Save showings to DB (this also triggers OMDb enrichment)
+            database.upsert_showings(all_showings, scrape_date)
+
+            # 3. Prepare the {date: {theater: {film: {time: [showings]}}}} structure needed for the price scrape
+            date_str = scrape_date.strftime('%Y-%m-%d')
+            daily_selections = {}
+            for theater_name, showings_list in all_showings.items():
+                daily_selections[theater_name] = {}
+                for showing in showings_list:
+                    film_title = showing['film_title']
+                    showtime = showing['showtime']
+                    if film_title not in daily_selections[theater_name]:
+                        daily_selections[theater_name][film_title] = {}
+                    if showtime not in daily_selections[theater_name][film_title]:
+                        daily_selections[theater_name][film_title][showtime] = []
+                    daily_selections[theater_name][film_title][showtime].append(showing)
+            selected_showtimes = {date_str: daily_selections}
+            showings_to_scrape = scout.flatten_selected_showtimes(theaters_to_scrape, selected_showtimes)
+
+            if not showings_to_scrape:
+                logger.info(f"Scrape for '{task_config['task_name']}' found no showings to price.")
+                return
             run_id = database.create_scrape_run("Scheduled", run_context)
-            if run_id:
-                database.save_prices(run_id, df_prices, scrape_date)
-            logger.info(f"SUCCESS: Saved {len(df_prices)} price points for '{task_config['task_name']}' to run_id {run_id}.")
+            # Checkpoint the discovered showings so a crash from here on resumes with only the remainder
+            database.journal_discovered_showings(run_id, showings_to_scrape)
+
+        # 4. Tasks with market timezones must finish before the earliest market's 8 AM cutoff:
+        #    plan a subset that fits and stop taking new showings when the cutoff arrives.
+        #    Deferred and cut-off showings are journaled as skipped, and the run records its cutoff,
+        #    so a restart later in the day doesn't resume them after the cutoff.
+        all_showings_to_scrape = showings_to_scrape
+        stream_options = {}
+        cutoff_event = cutoff_timer = None
+        if task_config.get('market_timezones'):
+            time_left = min(seconds_until_cutoff(tz) for tz in task_config['market_timezones'])
+            if time_left > 0:
+                plan = plan_for_deadline(showings_to_scrape, time_left * config.SCRAPE_DEADLINE_MARGIN, workers=scout.concurrency.limit)
+                logger.info(f"Deadline plan for '{task_config['task_name']}': {plan.summary()}.")
+                showings_to_scrape = plan.selected
+                database.set_scrape_run_cutoff(run_id, datetime.now() + timedelta(seconds=time_left))
+                database.update_journal_status(run_id, [s['ticket_url'] for s in plan.deferred if s.get('ticket_url')],
+                                               database.JOURNAL_SKIPPED, "Deferred by the deadline plan")
+                cutoff_event = threading.Event()
+                cutoff_timer = asyncio.get_running_loop().call_later(time_left, cutoff_event.set)
+                stream_options["cancel_event"] = cutoff_event
+            else:
+                logger.warning(f"'{task_config['task_name']}' started after the 8 AM cutoff; scraping every showing.")
+
+        # 5. Stream prices for the planned showings across every theater (in worker processes for large runs)
+        #    and 6. save them in batches as they arrive.
+        #    Theaters with stable learned price rules only scrape a verification sample unless it disagrees.
+        writer = BatchedPriceWriter(run_id, journal=True)
+        writer.start()
+        scraped = []
+        theater_names = sorted({s.get('theater_name') for s in showings_to_scrape if s.get('theater_name')})
+
+        def scrape_stream(showings):
+            return scout.scrape_showings(
+                showings, len(theater_names),
+                on_showing_start=lambda s: writer.record_status(s.get('ticket_url'), database.JOURNAL_ATTEMPTED),
+                **stream_options)
+
+        rule_stats = None
+        if config.PRICE_RULES:
+            rule_stats = PriceRuleStats()
+            stream = price_rule_stream(showings_to_scrape, scrape_stream, PriceRuleBook.from_database(theater_names), stats=rule_stats)
         else:
-            logger.info(f"Scrape for '{task_config['task_name']}' completed but found no price data.")
+            stream = scrape_stream(showings_to_scrape)
+        try:
+            async for showing, rows in stream:
+                if rows is None:
+                    writer.record_status(showing.get('ticket_url'), database.JOURNAL_FAILED, "Price scrape failed")
+                elif rows or cutoff_event is None or not cutoff_event.is_set():
+                    scraped.append(showing)
+                    await writer.put(rows, showing.get('ticket_url'))
+                else: # Empty rows after the cutoff are showings the stream skipped
+                    writer.record_status(showing.get('ticket_url'), database.JOURNAL_SKIPPED, "Not started before the cutoff")
+        finally:
+            if cutoff_timer is not None:
+                cutoff_timer.cancel()
+            await writer.close() # Flushes whatever was scraped, even if the scrape failed part-way
+
+        if cutoff_event is not None:
+            status = "stopped at the cutoff" if cutoff_event.is_set() else "finished before the cutoff"
+            logger.info(f"'{task_config['task_name']}' {status}; coverage: {format_coverage(coverage(scraped, all_showings_to_scrape))}.")
+        logger.info(f"SUCCESS: Saved {writer.rows_written} price points for '{task_config['task_name']}' to run_id {run_id} "
+                    f"(journal: {database.get_journal_summary(run_id)}).")
+
+        # 7. Re-learn the price rules from what this run actually scraped
+        if rule_stats is not None:
+            logger.info(f"Price rules for '{task_config['task_name']}': {rule_stats.summary()}.")
+            try:
+                database.refresh_price_rules(theater_names)
+            except Exception as e:
+                logger.warning(f"Could not refresh price rules for '{task_config['task_name']}': {e}")
 
     except Exception as e:
         logger.error(f"An error occurred during scheduled scrape for '{task_config['task_name']}': {e}", exc_info=True)
+    finally:
+        # The pooled browser and HTTP client are bound to this task's event loop, so close them before asyncio.run() returns.
+        await shutdown_scraper_resources()
+        database.close_db_connections() # The next task may belong to another company's database
 
 async def execute_op_hours_report_task(task_config: dict, company_name: str):
     """
@@ -144,6 +228,18 @@ async def execute_op_hours_report_task(task_config: dict, company_name: str):
     except Exception as e:
         logger.error(f"An error occurred during op hours report task for '{task_config['task_name']}': {e}", exc_info=True)
 
+def update_company_databases():
+    """Brings every company's database up to the current schema (scrape journal, price rules, ...) once at startup."""
+    for db_file in sorted(glob.glob(os.path.join(config.DATA_DIR, '*', 'price_scout.db'))):
+        database.DB_FILE = config.DB_FILE = db_file
+        try:
+            database.init_database() # Same startup migration as the app's company selection
+            database.update_database_schema()
+        except Exception as e:
+            logger.error(f"Could not update the schema of {db_file}: {e}", exc_info=True)
+        finally:
+            database.close_db_connections()
+
 def check_and_run_tasks():
     """Scans all company task directories and runs any due tasks."""
     logger.info("Checking for scheduled tasks...")
@@ -222,6 +318,8 @@ if __name__ == "__main__":
     root_logger.addHandler(file_handler)
     root_logger.addHandler(console_handler)
 
+    update_company_databases()
+
     scheduler = BlockingScheduler(timezone=pytz.utc)
     scheduler.add_job(check_and_run_tasks, 'interval', minutes=1, next_run_time=datetime.now(pytz.utc))
 
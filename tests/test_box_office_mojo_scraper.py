@@ -2,6 +2,14 @@ import pytest
 from unittest.mock import patch, MagicMock
 import httpx
 from app.box_office_mojo_scraper import BoxOfficeMojoScraper
+from app.rate_limiter import HostRateLimiter, set_rate_limiter
+
+@pytest.fixture(autouse=True)
+def unthrottled():
+    """HTTP is mocked here, so don't pace the (many) requests of a yearly discovery."""
+    set_rate_limiter(HostRateLimiter(limits={}, default=(1e6, 1000)))
+    yield
+    set_rate_limiter(None)
 
 @pytest.fixture
 def scraper():
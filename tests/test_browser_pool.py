@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.browser_pool import BrowserPool, get_browser_pool, run_with_scraper_resources, shutdown_browser_pools
+
+
+def _mock_playwright():
+    """Builds a mocked `async_playwright()` context manager and returns (cm, playwright, browser)."""
+    mock_browser = AsyncMock()
+    mock_browser.new_context.side_effect = lambda **kwargs: AsyncMock()
+    mock_playwright = AsyncMock()
+    mock_playwright.chromium.launch.return_value = mock_browser
+    mock_playwright_cm = AsyncMock()
+    mock_playwright_cm.__aenter__.return_value = mock_playwright
+    return mock_playwright_cm, mock_playwright, mock_browser
+
+
+@pytest.mark.asyncio
+async def test_pool_launches_browser_once_for_many_leases():
+    mock_cm, mock_playwright, mock_browser = _mock_playwright()
+    with patch('app.browser_pool.async_playwright', return_value=mock_cm):
+        pool = BrowserPool(headless=True, devtools=False)
+        for _ in range(5):
+            async with pool.page() as page:
+                assert page is not None
+        await pool.close()
+
+    mock_playwright.chromium.launch.assert_called_once_with(headless=True)
+    assert mock_browser.new_context.call_count == 1
+    assert pool.stats["pages_leased"] == 5
+    mock_browser.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_context_after_navigation_limit():
+    mock_cm, _, mock_browser = _mock_playwright()
+    with patch('app.browser_pool.async_playwright', return_value=mock_cm):
+        pool = BrowserPool(navigations_per_context=2, memory_threshold_mb=0)
+        for _ in range(5):
+            async with pool.page():
+                pass
+        await pool.close()
+
+    # 5 leases with a limit of 2 per context -> 3 contexts
+    assert mock_browser.new_context.call_count == 3
+    assert pool.stats["contexts_recycled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_context_when_js_heap_exceeds_threshold():
+    mock_cm, _, mock_browser = _mock_playwright()
+    with patch('app.browser_pool.async_playwright', return_value=mock_cm):
+        pool = BrowserPool(memory_threshold_mb=100, memory_check_interval=1)
+        async with pool.page() as page:
+            page.evaluate.return_value = 200 * 1024 * 1024
+        async with pool.page() as page:
+            page.evaluate.return_value = 10 * 1024 * 1024
+        await pool.close()
+
+    assert mock_browser.new_context.call_count == 2
+    assert pool.stats["contexts_recycled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_browser_pool_is_shared_per_loop_and_shuts_down():
+    mock_cm, mock_playwright, mock_browser = _mock_playwright()
+    with patch('app.browser_pool.async_playwright', return_value=mock_cm):
+        pool_a = get_browser_pool()
+        pool_b = get_browser_pool()
+        assert pool_a is pool_b
+        async with pool_a.page():
+            pass
+        await shutdown_browser_pools()
+        assert get_browser_pool() is not pool_a
+
+    mock_playwright.chromium.launch.assert_called_once()
+    mock_browser.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_closed_pool_refuses_new_leases():
+    mock_cm, _, _ = _mock_playwright()
+    with patch('app.browser_pool.async_playwright', return_value=mock_cm):
+        pool = BrowserPool()
+        await pool.close()
+        with pytest.raises(RuntimeError):
+            async with pool.page():
+                pass
+
+
+def test_run_with_scraper_resources_closes_the_pool_before_its_loop_ends():
+    mock_cm, mock_playwright, mock_browser = _mock_playwright()
+
+    async def lease_twice():
+        for _ in range(2):
+            async with get_browser_pool().page():
+                pass
+        return "done"
+
+    with patch('app.browser_pool.async_playwright', return_value=mock_cm), \
+         patch('app.price_fetcher.close_price_fetchers', new_callable=AsyncMock) as mock_close_fetchers:
+        assert run_with_scraper_resources(lease_twice()) == "done"
+
+    mock_playwright.chromium.launch.assert_called_once()
+    mock_browser.close.assert_called_once()
+    mock_cm.__aexit__.assert_called_once()
+    mock_close_fetchers.assert_awaited_once()
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from app.concurrency import AdaptiveConcurrencyLimiter, report_throttled, report_timeout, set_slot_kind, timed_request
+
+
+@pytest.mark.asyncio
+async def test_limit_increases_after_window_of_healthy_completions():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=4)
+    for _ in range(2):
+        async with limiter.slot():
+            pass
+    assert limiter.limit == 3
+    assert limiter.history[-1]["reason"] == "increase"
+
+
+@pytest.mark.asyncio
+async def test_limit_never_exceeds_max():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=3)
+    for _ in range(20):
+        async with limiter.slot():
+            pass
+    assert limiter.limit == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("signal", [lambda: report_throttled(429), lambda: report_throttled(403), report_timeout])
+async def test_limit_halves_on_congestion_signal(signal):
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=16)
+    async with limiter.slot():
+        signal()
+    assert limiter.limit == 4
+    assert limiter.history[-1]["reason"].startswith("decrease")
+
+
+@pytest.mark.asyncio
+async def test_non_throttle_status_is_ignored():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=16)
+    async with limiter.slot():
+        report_throttled(404)
+    assert limiter.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_burst_of_failures_backs_off_once():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=16)
+
+    async def failing_worker():
+        async with limiter.slot():
+            await asyncio.sleep(0)
+            report_timeout()
+
+    await asyncio.gather(*(failing_worker() for _ in range(8)))
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_timeout_exception_counts_as_congestion():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=1, max_limit=8)
+    with pytest.raises(asyncio.TimeoutError):
+        async with limiter.slot():
+            raise asyncio.TimeoutError()
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_in_flight_never_exceeds_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=3, min_limit=1, max_limit=3)
+    peak = 0
+
+    async def worker():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(worker() for _ in range(12)))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_latency_spike_backs_off():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=20, min_limit=1, max_limit=20, latency_warmup=3)
+    for _ in range(3):
+        async with limiter.slot("prices"):
+            await asyncio.sleep(0.001)
+    async with limiter.slot("prices"):
+        await asyncio.sleep(0.05)
+    assert limiter.limit == 10
+    assert "latency" in limiter.history[-1]["reason"]
+    assert limiter.snapshot()["congested"] == 1
+
+
+@pytest.mark.asyncio
+async def test_latency_sample_excludes_time_outside_timed_requests():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=20, min_limit=1, max_limit=20, latency_warmup=3)
+    for _ in range(3):
+        async with limiter.slot("prices"):
+            with timed_request():
+                await asyncio.sleep(0.001)
+    async with limiter.slot("prices"):
+        await asyncio.sleep(0.05) # e.g. waiting on the host rate limiter
+        with timed_request():
+            await asyncio.sleep(0.001)
+    assert limiter.limit == 20
+    assert limiter.snapshot()["congested"] == 0
+
+
+@pytest.mark.asyncio
+async def test_overlapping_timed_requests_count_once():
+    limiter = AdaptiveConcurrencyLimiter()
+
+    async def navigation():
+        with timed_request():
+            await asyncio.sleep(0.02)
+
+    async with limiter.slot("prices") as slot:
+        await asyncio.gather(navigation(), navigation())
+    assert 0.02 <= slot.timed < 0.035
+
+
+@pytest.mark.asyncio
+async def test_relabelled_slot_is_judged_against_its_own_baseline():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=20, min_limit=1, max_limit=20, latency_warmup=3)
+    for _ in range(3):
+        async with limiter.slot("prices"):
+            await asyncio.sleep(0.001)
+    async with limiter.slot("prices"):
+        set_slot_kind("prices_browser")
+        await asyncio.sleep(0.05)
+    assert limiter.limit == 20
+    assert set(limiter.snapshot()["baseline_latency"]) == {"prices", "prices_browser"}
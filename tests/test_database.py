@@ -86,6 +86,200 @@ def test_save_prices_with_missing_date_column(temp_db, capsys):
         prices_df = pd.read_sql("SELECT * FROM prices", conn)
         assert len(prices_df) == 2 # Should only contain the two prices from the fixture
 
+def test_save_prices_marks_inferred_rows(temp_db):
+    """Rows inferred from a representative showing are flagged in prices.inferred; scraped rows are not."""
+    base = {'play_date': '2025-09-15', 'Theater Name': 'Theater A', 'Film Title': 'Film 1', 'Format': '2D',
+            'Ticket Type': 'Adult', 'Price': '$15.00', 'Capacity': 'Available'}
+    with sqlite3.connect(temp_db) as conn:
+        conn.execute("INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES (?, ?, ?, ?, ?, ?)",
+                     ('2025-09-15', 'Theater A', 'Film 1', '1:00pm', '2D', 'Matinee'))
+    df = pd.DataFrame([{**base, 'Showtime': '10:00am'}, {**base, 'Showtime': '1:00pm', 'Capacity': 'N/A', 'Inferred': True}])
+
+    database.save_prices(run_id=2, df=df)
+
+    with sqlite3.connect(temp_db) as conn:
+        rows = conn.execute("SELECT s.showtime, p.inferred FROM prices p JOIN showings s ON p.showing_id = s.showing_id "
+                            "WHERE p.run_id = 2 ORDER BY s.showtime").fetchall()
+    assert rows == [('10:00am', 0), ('1:00pm', 1)]
+
+def test_save_prices_falls_back_to_the_2d_showing_and_updates_its_format(temp_db):
+    """Prices scraped with formats the showing wasn't discovered with attach to its 2D showing, which takes the scraped formats."""
+    base = {'play_date': '2025-09-15', 'Theater Name': 'Theater A', 'Film Title': 'Film 1', 'Showtime': '10:00am',
+            'Ticket Type': 'Adult', 'Price': '$15.00', 'Capacity': 'Available'}
+    df = pd.DataFrame([{**base, 'Format': 'IMAX'}, {**base, 'Format': '3D', 'Ticket Type': 'Child', 'Price': '$12.50'},
+                       {**base, 'Film Title': 'Film 2', 'Showtime': '11:00am', 'Format': 'IMAX'},
+                       {**base, 'Showtime': '11:59pm', 'Format': '2D'}]) # No such showing
+
+    database.save_prices(run_id=2, df=df)
+
+    with sqlite3.connect(temp_db) as conn:
+        formats = dict(conn.execute("SELECT film_title, format FROM showings WHERE theater_name = 'Theater A'").fetchall())
+        rows = conn.execute("SELECT s.film_title, p.ticket_type, p.price FROM prices p JOIN showings s ON p.showing_id = s.showing_id "
+                            "WHERE p.run_id = 2 ORDER BY p.price_id").fetchall()
+    assert formats == {'Film 1': '3D, IMAX', 'Film 2': 'IMAX'}
+    assert rows == [('Film 1', 'Adult', 15.0), ('Film 1', 'Child', 12.5), ('Film 2', 'Adult', 15.0)]
+
+def test_save_prices_handles_frames_past_sqlite_query_limits(temp_db, capsys):
+    """Thousands of showings in one frame are saved in a single call; unparseable prices are skipped with a warning."""
+    showings = [('2025-10-01', f'Theater {i // 100}', f'Film {i % 100}', '7:00pm', '2D', 'Prime') for i in range(3000)]
+    with sqlite3.connect(temp_db) as conn:
+        conn.executemany("INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES (?, ?, ?, ?, ?, ?)", showings)
+    df = pd.DataFrame([{'play_date': play_date, 'Theater Name': theater, 'Film Title': film, 'Showtime': showtime, 'Format': fmt,
+                        'Ticket Type': ticket_type, 'Price': price, 'Capacity': 'Available'}
+                       for play_date, theater, film, showtime, fmt, _ in showings
+                       for ticket_type, price in [('Adult', '$14.00'), ('Child', 'Sold Out')]])
+
+    database.save_prices(run_id=2, df=df)
+
+    with sqlite3.connect(temp_db) as conn:
+        assert conn.execute("SELECT COUNT(*), SUM(price) FROM prices WHERE run_id = 2").fetchone() == (3000, 42000.0)
+    assert "Skipping 3000 price records" in capsys.readouterr().out
+
+def test_dimension_keys_follow_direct_writes(temp_db):
+    """Rows written with text columns get integer dimension keys; the prices view reads and writes through price_facts."""
+    with sqlite3.connect(temp_db) as conn:
+        conn.execute("UPDATE showings SET format = '3D' WHERE film_title = 'Film 1'")
+        conn.execute("UPDATE prices SET ticket_type = 'Senior' WHERE price = 20.0")
+        conn.execute("DELETE FROM prices WHERE price = 15.0")
+        showings = conn.execute("""
+            SELECT s.film_title, t.theater_name, ft.film_title, fm.format, f.genre FROM showings s
+            JOIN theaters t ON t.theater_id = s.theater_id JOIN film_titles ft ON ft.film_title_id = s.film_title_id
+            JOIN formats fm ON fm.format_id = s.format_id LEFT JOIN films f ON f.film_title_id = s.film_title_id
+            ORDER BY s.showing_id""").fetchall()
+        facts = conn.execute("SELECT t.ticket_type, p.price, p.inferred FROM price_facts p "
+                             "JOIN ticket_types t ON t.ticket_type_id = p.ticket_type_id").fetchall()
+        hours_keyed = conn.execute("SELECT COUNT(*) FROM operating_hours WHERE theater_id IS NULL").fetchone()[0]
+    assert showings == [('Film 1', 'Theater A', 'Film 1', '3D', 'Action, Adventure'), ('Film 2', 'Theater A', 'Film 2', 'IMAX', 'Comedy'),
+                        ('Film 3 (No Metadata)', 'Theater B', 'Film 3 (No Metadata)', '2D', None)]
+    assert facts == [('Senior', 20.0, 0)]
+    assert hours_keyed == 0
+
+def test_query_historical_data_decodes_keys_and_filters_films(temp_db):
+    """Unpriced showings come back with empty price columns; genre filters and run ordering match the text-joined query."""
+    df = database.query_historical_data('2025-09-01', '2025-09-30')
+    assert list(df.columns) == ['theater_name', 'film_title', 'showtime', 'daypart', 'format', 'ticket_type', 'price',
+                                'capacity', 'play_date', 'run_timestamp']
+    assert df[['film_title', 'ticket_type']].values.tolist() == [['Film 1', 'Adult'], ['Film 2', 'Adult'], ['Film 3 (No Metadata)', None]]
+    assert df['run_timestamp'].iloc[-1] is None
+
+    comedy = database.query_historical_data('2025-09-01', '2025-09-30', genres=['Comedy'], ratings=['R'])
+    assert comedy[['film_title', 'format', 'price']].values.tolist() == [['Film 2', 'IMAX', 20.0]]
+    assert database.query_historical_data('2025-09-01', '2025-09-30', theaters=['Nowhere']).empty
+
+def test_update_database_schema_moves_legacy_prices_to_dimension_keys(tmp_path, monkeypatch):
+    """An existing database's prices move to price_facts and its showings are keyed, without changing what queries return."""
+    db_path = tmp_path / "legacy.db"
+    monkeypatch.setattr(config, 'DB_FILE', str(db_path))
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE scrape_runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, run_timestamp DATETIME NOT NULL, mode TEXT NOT NULL, run_context TEXT)")
+        conn.execute("CREATE TABLE showings (showing_id INTEGER PRIMARY KEY AUTOINCREMENT, play_date DATE NOT NULL, theater_name TEXT NOT NULL, "
+                     "film_title TEXT NOT NULL, showtime TEXT NOT NULL, format TEXT, daypart TEXT, is_plf BOOLEAN DEFAULT 0, ticket_url TEXT, "
+                     "UNIQUE(play_date, theater_name, film_title, showtime, format))")
+        conn.execute("CREATE TABLE prices (price_id INTEGER PRIMARY KEY AUTOINCREMENT, run_id INTEGER, showing_id INTEGER, "
+                     "ticket_type TEXT NOT NULL, price REAL NOT NULL, capacity TEXT, play_date DATE)")
+        conn.execute("INSERT INTO scrape_runs VALUES (1, '2025-09-15 06:00:00', 'Market', 'Legacy')")
+        conn.execute("INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES "
+                     "('2025-09-15', 'Theater A', 'Film 1', '7:00pm', '2D', 'Prime')")
+        conn.executemany("INSERT INTO prices (price_id, run_id, showing_id, ticket_type, price, capacity) VALUES (?, 1, 1, ?, ?, 'Available')",
+                         [(5, 'Adult', 14.0), (9, 'Child', 10.0)])
+    database.init_database()
+    database.update_database_schema()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT type FROM sqlite_master WHERE name = 'prices'").fetchone() == ('view',)
+        assert conn.execute("SELECT price_id, ticket_type, price, inferred FROM prices ORDER BY price_id").fetchall() == \
+            [(5, 'Adult', 14.0, 0), (9, 'Child', 10.0, 0)]
+        assert conn.execute("SELECT COUNT(*) FROM showings WHERE theater_id IS NULL OR film_title_id IS NULL OR format_id IS NULL").fetchone() == (0,)
+    df = database.query_historical_data('2025-09-01', '2025-09-30', theaters=['Theater A'], films=['Film 1'])
+    assert sorted(df['ticket_type']) == ['Adult', 'Child']
+    database.save_prices(1, pd.DataFrame([{'play_date': '2025-09-15', 'Theater Name': 'Theater A', 'Film Title': 'Film 1', 'Showtime': '7:00pm',
+                                           'Format': '2D', 'Ticket Type': 'Senior', 'Price': '$11.00', 'Capacity': 'Available'}]))
+    glance, _ = database.get_market_at_a_glance_data(['Theater A'], datetime.date(2025, 9, 15), datetime.date(2025, 9, 15))
+    assert sorted(glance['ticket_type']) == ['Adult', 'Child', 'Senior']
+
+def _showing_1_prices(**prices):
+    base = {'play_date': '2025-09-15', 'Theater Name': 'Theater A', 'Film Title': 'Film 1', 'Showtime': '10:00am',
+            'Format': '2D'}
+    return pd.DataFrame([{**base, 'Ticket Type': ticket_type, 'Price': price} for ticket_type, price in prices.items()])
+
+def test_save_prices_extends_unchanged_prices_as_intervals(temp_db, capsys):
+    """An unchanged price extends its interval to the new run; a changed one opens a new interval. The view still has a row per run."""
+    database.save_prices(3, _showing_1_prices(Adult='$15.00', Child='$12.00'))
+    assert "(1 new price intervals, 1 extended)" in capsys.readouterr().out
+    database.save_prices(4, pd.concat([_showing_1_prices(Adult='$15.00', Child='$12.00'), _showing_1_prices(Adult='$15.00')]))
+    assert "Saved 2 price records to database for run ID 4 (0 new price intervals, 2 extended)" in capsys.readouterr().out
+    database.save_prices(5, _showing_1_prices(Adult='$16.00', Child='$12.00'))
+
+    with sqlite3.connect(temp_db) as conn:
+        facts = conn.execute("SELECT t.ticket_type, p.price, p.first_seen_run, p.last_seen_run FROM price_facts p "
+                             "JOIN ticket_types t ON t.ticket_type_id = p.ticket_type_id WHERE p.showing_id = 1 ORDER BY p.price_id").fetchall()
+        rows = conn.execute("SELECT run_id, ticket_type, price FROM prices WHERE showing_id = 1 ORDER BY run_id, ticket_type").fetchall()
+    assert facts == [('Adult', 15.0, 1, 4), ('Child', 12.0, 3, 5), ('Adult', 16.0, 5, 5)]
+    assert rows == [(1, 'Adult', 15.0), (3, 'Adult', 15.0), (3, 'Child', 12.0), (4, 'Adult', 15.0), (4, 'Child', 12.0),
+                    (5, 'Adult', 16.0), (5, 'Child', 12.0)]
+
+def test_save_prices_splits_intervals_for_runs_saved_out_of_order(temp_db, monkeypatch):
+    """A run saved after a later one splits the interval it changes; without PRICE_INTERVALS every row is its own run's row."""
+    database.save_prices(6, _showing_1_prices(Adult='$15.00'))
+    database.save_prices(4, _showing_1_prices(Adult='$17.00'))
+    database.save_prices(5, _showing_1_prices(Adult='$15.00')) # Unchanged from run 6, so it joins that interval
+    monkeypatch.setattr(config, 'PRICE_INTERVALS', False)
+    database.save_prices(7, pd.concat([_showing_1_prices(Adult='$15.00')] * 2))
+
+    with sqlite3.connect(temp_db) as conn:
+        facts = conn.execute("SELECT price, first_seen_run, last_seen_run FROM price_facts WHERE showing_id = 1 ORDER BY first_seen_run").fetchall()
+        rows = conn.execute("SELECT run_id, price FROM prices WHERE showing_id = 1 ORDER BY run_id").fetchall()
+    assert facts == [(15.0, 1, 1), (17.0, 4, 4), (15.0, 5, 6), (15.0, 7, 7), (15.0, 7, 7)]
+    assert rows == [(1, 15.0), (4, 17.0), (5, 15.0), (6, 15.0), (7, 15.0), (7, 15.0)]
+
+def test_update_database_schema_converts_per_run_price_facts_to_intervals(temp_db):
+    """price_facts rows stored one per run become single-run intervals, and the prices view returns the same rows."""
+    with sqlite3.connect(temp_db) as conn:
+        before = conn.execute("SELECT * FROM prices ORDER BY price_id").fetchall()
+        conn.execute("DROP VIEW prices")
+        conn.execute("DROP TABLE showing_runs")
+        for name in ('daily_prices', 'daily_prices_stale'):
+            conn.execute(f"DROP TABLE {name}")
+        for name in ('showings_daily_prices_update', 'showings_daily_prices_delete'):
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("CREATE TABLE per_run AS SELECT price_id, first_seen_run AS run_id, showing_id, ticket_type_id, price, capacity, "
+                     "play_date, inferred FROM price_facts")
+        conn.execute("DROP TABLE price_facts")
+        conn.execute("ALTER TABLE per_run RENAME TO price_facts")
+        conn.execute("CREATE VIEW prices AS SELECT p.price_id, p.run_id, p.showing_id, t.ticket_type, p.price, p.capacity, p.play_date, "
+                     "p.inferred FROM price_facts p JOIN ticket_types t ON t.ticket_type_id = p.ticket_type_id")
+    database.update_database_schema()
+
+    with sqlite3.connect(temp_db) as conn:
+        assert conn.execute("SELECT * FROM prices ORDER BY price_id").fetchall() == before
+        assert conn.execute("SELECT COUNT(*) FROM price_facts WHERE first_seen_run IS NOT last_seen_run").fetchone() == (0,)
+    database.save_prices(2, _showing_1_prices(Adult='$15.00'))
+    glance, _ = database.get_market_at_a_glance_data(['Theater A'], datetime.date(2025, 9, 15), datetime.date(2025, 9, 15))
+    assert glance[['film_title', 'price']].values.tolist() == [['Film 1', 15.0], ['Film 2', 20.0]]
+
+def test_daily_price_summary_follows_saves_and_direct_writes(temp_db):
+    """save_prices refreshes the days it touches; writes through the prices view are picked up on the next read; a rebuild agrees."""
+    database.save_prices(2, _showing_1_prices(**{'General Admission': '$17.00', 'Children': '$11.00'}))
+    with sqlite3.connect(temp_db) as conn:
+        conn.execute("UPDATE prices SET price = 18.0 WHERE price = 20.0")
+        conn.execute("INSERT INTO prices (run_id, showing_id, ticket_type, price, capacity) VALUES (2, 2, 'Adult', 18.0, 'Sold Out')")
+
+    summary = database.get_daily_price_summary('2025-09-15', '2025-09-15', theaters=['Theater A'])
+    rows = summary[['film_title', 'format', 'ticket_type', 'min_price', 'max_price', 'avg_price', 'price_count', 'sold_out_count', 'prices']]
+    assert rows.sort_values(['film_title', 'ticket_type']).values.tolist() == [
+        ['Film 1', '2D', 'Adult', 15.0, 17.0, 16.0, 2, 0, [15.0, 17.0]],
+        ['Film 1', '2D', 'Child', 11.0, 11.0, 11.0, 1, 0, [11.0]],
+        ['Film 2', 'IMAX', 'Adult', 18.0, 18.0, 18.0, 2, 1, [18.0]],
+    ]
+    assert set(summary['run_timestamp']) == {'2025-09-16 11:00:00'}
+    comparison = database.get_theater_comparison_summary(['Theater A'], '2025-09-15', '2025-09-15')
+    assert comparison['Overall Avg. Price'].tolist() == [(15.0 + 17.0 + 11.0 + 18.0 * 2) / 5]
+
+    assert database.rebuild_daily_prices() == 3
+    rebuilt = database.get_daily_price_summary('2025-09-15', '2025-09-15', theaters=['Theater A'])
+    assert rebuilt.sort_values(['film_title', 'ticket_type']).astype(str).values.tolist() == \
+        summary.sort_values(['film_title', 'ticket_type']).astype(str).values.tolist()
+
 def test_create_and_get_scrape_runs(temp_db):
     """
     Tests creating a new scrape run and then fetching all runs.
@@ -243,4 +437,86 @@ def test_get_data_for_trend_report_empty_input(temp_db):
     """
     # Case: Empty film list
     df = database.get_data_for_trend_report(['Theater A'], ['2025-09-15'], [], ['Matinee'])
-    assert df.empty
\ No newline at end of file
+    assert df.empty
+def _journal_showing(url, showtime="7:00pm"):
+    return {"ticket_url": url, "theater_name": "Theater A", "film_title": "Film 1", "showtime": showtime, "play_date": "2025-09-15"}
+
+def test_scrape_journal_remainder_and_resume(temp_db):
+    """
+    Tests that the scrape journal tracks showing status and that an interrupted
+    run is found again with only its unfinished showings.
+    """
+    run_id = database.create_scrape_run("Scheduled", "Scheduled Task: Nightly")
+    showings = [_journal_showing("url-1"), _journal_showing("url-2", "9:00pm"), _journal_showing("url-3", "10:00pm")]
+    database.journal_discovered_showings(run_id, showings)
+    database.journal_discovered_showings(run_id, showings) # Re-journaling is a no-op
+
+    database.update_journal_status(run_id, ["url-1", "url-2", "url-3"], database.JOURNAL_ATTEMPTED)
+    database.update_journal_status(run_id, ["url-1"], database.JOURNAL_SUCCEEDED)
+    database.update_journal_status(run_id, ["url-2"], database.JOURNAL_FAILED, "timeout")
+
+    assert database.get_journal_summary(run_id) == {"succeeded": 1, "failed": 1, "attempted": 1}
+    remainder = database.get_journal_remainder(run_id)
+    assert sorted(s["ticket_url"] for s in remainder) == ["url-2", "url-3"]
+    assert remainder[0]["film_title"] == "Film 1"
+
+    since = datetime.datetime.now() - datetime.timedelta(hours=1)
+    assert database.find_resumable_scrape_run("Scheduled", "Scheduled Task: Nightly", since=since) == run_id
+    assert database.find_resumable_scrape_run("Scheduled", "Scheduled Task: Other", since=since) is None
+    assert database.find_resumable_scrape_run("Scheduled", since=since, ticket_urls={"url-1"}) is None
+
+    # A failed showing that has used up its attempts is not retried
+    database.update_journal_status(run_id, ["url-2"], database.JOURNAL_ATTEMPTED)
+    database.update_journal_status(run_id, ["url-2"], database.JOURNAL_FAILED, "timeout")
+    database.update_journal_status(run_id, ["url-3"], database.JOURNAL_SUCCEEDED)
+    assert database.get_journal_remainder(run_id) == []
+    assert database.find_resumable_scrape_run("Scheduled", "Scheduled Task: Nightly", since=since) is None
+
+def test_skipped_and_cut_off_showings_are_not_resumed(temp_db):
+    """Skipped showings are final, and a run whose cutoff has passed is never resumed."""
+    since = datetime.datetime.now() - datetime.timedelta(hours=1)
+    run_id = database.create_scrape_run("Scheduled", "Scheduled Task: Nightly")
+    database.journal_discovered_showings(run_id, [_journal_showing("url-1"), _journal_showing("url-2", "9:00pm")])
+    database.update_journal_status(run_id, ["url-1"], database.JOURNAL_SKIPPED, "Deferred by the deadline plan")
+    assert [s["ticket_url"] for s in database.get_journal_remainder(run_id)] == ["url-2"]
+
+    database.set_scrape_run_cutoff(run_id, datetime.datetime.now() + datetime.timedelta(hours=1))
+    assert database.find_resumable_scrape_run("Scheduled", "Scheduled Task: Nightly", since=since) == run_id
+    database.set_scrape_run_cutoff(run_id, datetime.datetime.now() - datetime.timedelta(minutes=1))
+    assert database.find_resumable_scrape_run("Scheduled", "Scheduled Task: Nightly", since=since) is None
+
+def test_log_unmatched_ticket_types_accumulates_occurrences(temp_db):
+    """Repeated unmatched parts for the same theater/film/date add to one row's count."""
+    now = datetime.datetime(2025, 9, 15, 12, 0)
+    entry = {'original_description': 'Anime Movie', 'unmatched_part': 'Anime', 'first_seen': now,
+             'theater_name': 'Theater A', 'film_title': 'Film 1', 'play_date': '2025-09-15', 'occurrences': 3}
+    database.log_unmatched_ticket_types([entry, dict(entry, film_title='Film 2', occurrences=1)])
+    database.log_unmatched_ticket_types([dict(entry, occurrences=2, last_seen=now + datetime.timedelta(hours=1))])
+
+    df = database.get_unmatched_ticket_types().set_index('film_title')
+    assert len(df) == 2
+    assert df.loc['Film 1', 'occurrences'] == 5
+    assert df.loc['Film 2', 'occurrences'] == 1
+    assert str(df.loc['Film 1', 'last_seen']).startswith('2025-09-15 13:00')
+
+def test_refresh_price_rules_learns_from_scraped_prices(temp_db):
+    """Rules take the latest scraped price, score agreement over the window and ignore inferred rows."""
+    with sqlite3.connect(temp_db) as conn:
+        for day, price, inferred in [(16, 15.0, 0), (17, 15.0, 0), (18, 16.0, 0), (19, 99.0, 1)]:
+            cursor = conn.execute("INSERT INTO showings (play_date, theater_name, film_title, showtime, format, daypart) VALUES (?, ?, ?, ?, ?, ?)",
+                                  (f'2025-09-{day}', 'Theater A', 'Film 1', '10:00am', '2D', 'Matinee'))
+            conn.execute("INSERT INTO prices (run_id, showing_id, ticket_type, price, inferred) VALUES (?, ?, ?, ?, ?)",
+                         (1, cursor.lastrowid, 'Adult', price, inferred))
+
+    assert database.refresh_price_rules(['Theater A'], lookback_days=28, today=datetime.date(2025, 9, 20)) == 2
+    rules = {(r['daypart'], r['format']): r for r in database.get_price_rules(['Theater A'])}
+    matinee = rules[('Matinee', '2D')]
+    assert matinee['price'] == 16.0 # The latest scraped price, not the inferred one
+    assert matinee['confidence'] == pytest.approx(0.25)
+    assert matinee['observed_days'] == 4
+    assert matinee['last_verified'] == '2025-09-18'
+    assert rules[('Matinee', 'IMAX')]['price'] == 20.0
+
+    # A refresh whose window has no scraped history clears the old rules
+    database.refresh_price_rules(lookback_days=1, today=datetime.date(2025, 9, 20))
+    assert database.get_price_rules() == []
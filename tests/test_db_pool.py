@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import threading
+import pytest
+from app import config, database
+from app.db_pool import SQLiteConnectionPool
+
+
+@pytest.fixture
+def pool():
+    pool = SQLiteConnectionPool()
+    yield pool
+    pool.close_all()
+
+
+def test_connection_is_reused_within_a_thread_and_tuned(pool, tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = pool.connection(path)
+    assert pool.connection(path) is conn
+    assert pool.stats["opened"] == 1 and pool.stats["reused"] == 1
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1 # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == config.DB_BUSY_TIMEOUT_MS
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -config.DB_CACHE_SIZE_KB
+
+
+def test_each_thread_gets_its_own_connection(pool, tmp_path):
+    path = str(tmp_path / "pool.db")
+    main = pool.connection(path)
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(pool.connection(path)))
+    thread.start()
+    thread.join()
+    assert seen[0] is not main
+    assert pool.stats["opened"] == 2
+
+    pool.connection(str(tmp_path / "other.db")) # Opening a connection closes the finished thread's
+    with pytest.raises(sqlite3.ProgrammingError):
+        seen[0].execute("SELECT 1")
+
+
+def test_reopens_when_the_path_changes_or_the_connection_was_closed(pool, tmp_path):
+    first = pool.connection(str(tmp_path / "a.db"))
+    second = pool.connection(str(tmp_path / "b.db"))
+    assert second is not first
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute("SELECT 1")
+
+    second.close()
+    assert pool.connection(str(tmp_path / "b.db")) is not second
+
+
+def test_row_factory_does_not_leak_between_callers(pool, tmp_path):
+    path = str(tmp_path / "pool.db")
+    pool.connection(path).row_factory = sqlite3.Row
+    assert pool.connection(path).execute("SELECT 1").fetchone() == (1,)
+
+
+def test_database_helpers_share_the_pooled_connection(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'DB_FILE', str(tmp_path / "company.db"))
+    database.init_database()
+    with database._get_db_connection() as conn:
+        conn.execute("INSERT INTO films (film_title, last_omdb_update) VALUES ('Film 1', CURRENT_TIMESTAMP)")
+    assert database._get_db_connection() is conn
+    assert database.check_film_exists("Film 1")
+    assert database.get_film_details("Film 1")["film_title"] == "Film 1"
+
+    database.checkpoint_database()
+    assert os.path.getsize(str(tmp_path / "company.db-wal")) == 0
+    database.close_db_connections()
+    assert database._get_db_connection() is not conn
+
+
+def test_nested_blocks_run_in_savepoints_of_the_outer_transaction(pool, tmp_path):
+    path = str(tmp_path / "pool.db")
+    with pool.connection(path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+    observer = sqlite3.connect(path)
+
+    def helper(value, fail=False):
+        with pool.connection(path) as inner:
+            inner.execute("INSERT INTO t VALUES (?)", (value,))
+            inner.commit()
+            if fail:
+                inner.execute("INSERT INTO t VALUES (?)", (value + 10,))
+                raise ValueError("helper failed")
+
+    with pytest.raises(RuntimeError):
+        with pool.connection(path) as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            helper(2)
+            # The helper's commit() didn't commit the caller's half-done work
+            assert observer.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+            with pytest.raises(ValueError):
+                helper(3, fail=True) # Rolls back what it wrote since its commit(), keeping the caller's work
+            assert [row[0] for row in conn.execute("SELECT v FROM t ORDER BY v")] == [1, 2, 3]
+            raise RuntimeError("caller failed")
+    assert observer.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    with pool.connection(path) as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+        helper(2)
+    assert [row[0] for row in observer.execute("SELECT v FROM t ORDER BY v")] == [1, 2]
+    observer.close()
+
+
+def test_nested_block_outside_a_transaction_commits_on_its_own(pool, tmp_path):
+    path = str(tmp_path / "pool.db")
+    observer = sqlite3.connect(path)
+    with pool.connection(path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        with pool.connection(path) as inner:
+            inner.execute("INSERT INTO t VALUES (1)")
+        assert observer.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    observer.close()
@@ -46,6 +46,8 @@ def test_end_to_end_market_mode_workflow(mock_st_market, mock_save_op_hours, moc
     monkeypatch.setattr('app.config.REPORTS_DIR', str(reports_dir))
     monkeypatch.setattr('app.config.RUNTIME_LOG_FILE', str(reports_dir / "runtime_log.csv"))
     monkeypatch.setattr('app.config.SCHEDULED_TASKS_DIR', str(tmp_path / "tasks"))
+    # The mocked company selectbox becomes the company folder name; keep that folder out of the repo's data/
+    monkeypatch.setattr('app.price_scout_app.DATA_DIR', str(tmp_path / "data"))
 
     # Create a dummy cache file
     dummy_cache_data = {"metadata": {"last_updated": "2025-09-10T00:00:00"}, "markets": {}}
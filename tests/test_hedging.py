@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from app.hedging import NavigationHedger
+
+
+def _warm(hedger, latencies):
+    for latency in latencies:
+        hedger.record_latency(latency)
+
+
+def test_no_hedge_delay_until_enough_samples():
+    hedger = NavigationHedger(budget=0.05, percentile=0.9, min_samples=10)
+    _warm(hedger, [1.0] * 9)
+    assert hedger.hedge_delay() is None
+    _warm(hedger, [5.0])
+    assert hedger.hedge_delay() == 5.0
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_the_hedge_wins():
+    hedger = NavigationHedger(budget=1.0, percentile=0.9, min_samples=5)
+    _warm(hedger, [0.01] * 5)
+    primary_cancelled = asyncio.Event()
+
+    async def primary():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            primary_cancelled.set()
+            raise
+        return {"error": None, "source": "primary"}
+
+    async def hedge():
+        return {"error": None, "source": "hedge"}
+
+    result = await hedger.run(primary, hedge)
+    assert result["source"] == "hedge"
+    assert primary_cancelled.is_set()
+    assert (hedger.primaries, hedger.hedges, hedger.hedge_wins) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_waits_for_the_primary():
+    hedger = NavigationHedger(budget=1.0, percentile=0.5, min_samples=2)
+    _warm(hedger, [0.01, 0.01])
+
+    async def primary():
+        await asyncio.sleep(0.05)
+        return {"error": None, "source": "primary"}
+
+    async def hedge():
+        return {"error": "Scraping timed out."}
+
+    result = await hedger.run(primary, hedge, succeeded=lambda r: not r.get("error"))
+    assert result["source"] == "primary"
+    assert hedger.hedge_wins == 0
+
+
+@pytest.mark.asyncio
+async def test_hedges_stay_within_budget():
+    hedger = NavigationHedger(budget=0.05, percentile=0.5, min_samples=1)
+    _warm(hedger, [0.001])
+    hedges = 0
+
+    async def primary():
+        await asyncio.sleep(0.005)
+        return {"error": None}
+
+    async def hedge():
+        nonlocal hedges
+        hedges += 1
+        return {"error": None}
+
+    for _ in range(40):
+        await hedger.run(primary, hedge)
+    assert hedges == hedger.hedges <= 2
+    assert hedger.stats()["hedge_rate"] <= 0.05
@@ -0,0 +1,102 @@
+import os
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.price_fetcher import CommercePriceFetcher, extract_commerce_models, get_price_fetcher, close_price_fetchers
+from app.scraper import Scraper
+
+FIXTURE_HTML = os.path.join(os.path.dirname(__file__), 'fixtures', 'fandango_ticketing_page.html')
+
+
+@pytest.fixture
+def ticketing_html():
+    with open(FIXTURE_HTML, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _fetcher_with_transport(handler) -> CommercePriceFetcher:
+    fetcher = CommercePriceFetcher()
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return fetcher
+
+
+def test_extract_commerce_models_from_fixture(ticketing_html):
+    data = extract_commerce_models(ticketing_html)
+    assert data is not None
+    ticket_types = data['seatingAreas'][0]['ticketTypes']
+    assert [t['description'] for t in ticket_types] == ['Adult', 'Child', 'Senior', 'Adult D-BOX {Recliner}']
+    # Braces inside JSON strings must not end the object early
+    assert data['showtime']['note'].endswith('{ and } inside strings')
+
+
+@pytest.mark.parametrize("html", [
+    None,
+    "",
+    "<html><body>Please verify you are a human</body></html>",
+    "<script>window.Commerce.models = {not valid json};</script>",
+])
+def test_extract_commerce_models_returns_none_when_missing(html):
+    assert extract_commerce_models(html) is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_commerce_models_hit(ticketing_html):
+    fetcher = _fetcher_with_transport(lambda request: httpx.Response(200, text=ticketing_html))
+    data = await fetcher.fetch_commerce_models('https://tickets.fandango.com/transaction/ticketing/mobile/jump.aspx?row_count=1')
+    await fetcher.aclose()
+
+    assert data['seatingAreas'][0]['isSoldOut'] is False
+    assert fetcher.stats == {"requests": 1, "hits": 1, "misses": 0, "errors": 0}
+
+
+@pytest.mark.asyncio
+async def test_fetch_commerce_models_miss_on_http_error():
+    fetcher = _fetcher_with_transport(lambda request: httpx.Response(403, text="Forbidden"))
+    assert await fetcher.fetch_commerce_models('https://example.com/ticket') is None
+    await fetcher.aclose()
+
+    assert fetcher.stats["errors"] == 1
+    assert fetcher.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_price_fetcher_is_shared_per_loop():
+    fetcher = get_price_fetcher()
+    assert get_price_fetcher() is fetcher
+    await close_price_fetchers()
+    assert fetcher.is_closed
+    assert get_price_fetcher() is not fetcher
+    await close_price_fetchers()
+
+
+@pytest.mark.asyncio
+async def test_scraper_uses_http_prices_without_navigating(ticketing_html):
+    scraper = Scraper(headless=True)
+    mock_fetcher = MagicMock()
+    mock_fetcher.fetch_commerce_models = AsyncMock(return_value=extract_commerce_models(ticketing_html))
+    mock_page = AsyncMock()
+
+    with patch('app.scraper.get_price_fetcher', return_value=mock_fetcher):
+        result = await scraper._get_prices_and_capacity(mock_page, {'ticket_url': 'http://example.com/ticket'})
+
+    mock_page.goto.assert_not_called()
+    assert result['error'] is None
+    assert result['capacity'] == "Available"
+    assert len(result['tickets']) == 4
+
+
+@pytest.mark.asyncio
+async def test_scraper_falls_back_to_browser_when_http_misses(ticketing_html):
+    scraper = Scraper(headless=True)
+    mock_fetcher = MagicMock()
+    mock_fetcher.fetch_commerce_models = AsyncMock(return_value=None)
+    mock_page = AsyncMock()
+    mock_page.content.return_value = ticketing_html
+    mock_page.query_selector_all.return_value = [AsyncMock(inner_html=AsyncMock(return_value=ticketing_html))]
+
+    with patch('app.scraper.get_price_fetcher', return_value=mock_fetcher):
+        result = await scraper._get_prices_and_capacity(mock_page, {'ticket_url': 'http://example.com/ticket'})
+
+    mock_page.goto.assert_called_once_with('http://example.com/ticket', timeout=60000)
+    assert result['error'] is None
+    assert len(result['tickets']) == 4
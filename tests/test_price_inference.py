@@ -0,0 +1,80 @@
+import random
+import pytest
+from app.price_inference import InferenceStats, infer_price_stream, select_showings
+
+
+def _showing(film, showtime, daypart="Prime", fmt="2D"):
+    return {"theater_name": "Theater A", "film_title": film, "format": fmt, "daypart": daypart,
+            "showtime": showtime, "play_date": "2025-01-01", "ticket_url": f"url-{film}-{showtime}"}
+
+
+def _rows(showing, adult="$12.00"):
+    return [{"Theater Name": showing["theater_name"], "Film Title": showing["film_title"], "Format": showing["format"],
+             "Showtime": showing["showtime"], "Daypart": showing["daypart"], "Ticket Type": "Adult", "Price": adult,
+             "Capacity": "Available", "play_date": showing["play_date"]}]
+
+
+def _fake_scraper(prices=None):
+    calls = []
+
+    async def scrape_stream(showings):
+        calls.append(list(showings))
+        for showing in showings:
+            yield showing, _rows(showing, (prices or {}).get(showing["showtime"], "$12.00"))
+    return scrape_stream, calls
+
+
+def test_one_representative_per_price_class():
+    showings = [_showing("Film 1", "7:00pm"), _showing("Film 1", "8:00pm"), _showing("Film 1", "1:00pm", "Matinee"),
+                _showing("Film 1", "9:00pm", fmt="IMAX")]
+    classes, representatives, spot_checks = select_showings(showings, 0, random.Random(0))
+    assert len(classes) == 3
+    assert [s["showtime"] for s in representatives] == ["7:00pm", "1:00pm", "9:00pm"]
+    assert spot_checks == []
+
+
+@pytest.mark.asyncio
+async def test_siblings_are_inferred_from_the_representative():
+    showings = [_showing("Film 1", f"{hour}:00pm") for hour in range(6, 10)]
+    scrape_stream, calls = _fake_scraper()
+    stats = InferenceStats()
+
+    results = [r async for r in infer_price_stream(showings, scrape_stream, spot_check_rate=0, stats=stats)]
+
+    assert len(calls) == 1 and [s["showtime"] for s in calls[0]] == ["6:00pm"]
+    assert len(results) == 4
+    inferred = [rows[0] for showing, rows in results if rows[0].get("Inferred")]
+    assert [row["Showtime"] for row in inferred] == ["7:00pm", "8:00pm", "9:00pm"]
+    assert all(row["Price"] == "$12.00" and row["Capacity"] == "N/A" for row in inferred)
+    assert stats.as_dict() == {"classes": 1, "scraped": 1, "spot_checks": 0, "inferred": 3, "divergent_classes": 0}
+
+
+@pytest.mark.asyncio
+async def test_divergent_spot_check_scrapes_the_rest_of_the_class():
+    showings = [_showing("Film 1", f"{hour}:00pm") for hour in range(6, 10)]
+    scrape_stream, calls = _fake_scraper(prices={"6:00pm": "$9.00"}) # The representative is a discounted show
+    stats = InferenceStats()
+
+    results = [r async for r in infer_price_stream(showings, scrape_stream, spot_check_rate=0.3, stats=stats, rng=random.Random(1))]
+
+    assert len(results) == 4
+    assert not any(rows[0].get("Inferred") for _, rows in results)
+    assert len(stats.divergent) == 1
+    assert stats.scraped == 4 and stats.inferred == 0
+    assert sum(len(batch) for batch in calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_representative_falls_back_to_scraping():
+    showings = [_showing("Film 1", "7:00pm"), _showing("Film 1", "8:00pm")]
+    calls = []
+
+    async def scrape_stream(subset):
+        calls.append(list(subset))
+        for showing in subset:
+            yield showing, None if showing["showtime"] == "7:00pm" else _rows(showing)
+
+    results = {s["showtime"]: rows async for s, rows in infer_price_stream(showings, scrape_stream, spot_check_rate=0)}
+    assert results["7:00pm"] is None
+    assert results["8:00pm"][0].get("Inferred") is None
+    assert [[s["showtime"] for s in batch] for batch in calls] == [["7:00pm"], ["8:00pm"]]
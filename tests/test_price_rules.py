@@ -0,0 +1,81 @@
+import datetime
+import random
+import pytest
+from app import config
+from app.price_rules import PriceRuleBook, PriceRuleStats, price_rule_stream
+
+TODAY = datetime.date(2025, 1, 10)
+
+
+def _rule(theater, ticket_type, price, daypart="Prime", fmt="2D", confidence=1.0, observed_days=10, last_verified="2025-01-09"):
+    return {"theater_name": theater, "ticket_type": ticket_type, "daypart": daypart, "format": fmt, "price": price,
+            "confidence": confidence, "observed_days": observed_days, "last_verified": last_verified}
+
+
+def _showing(theater, showtime, daypart="Prime", fmt="2D"):
+    return {"theater_name": theater, "film_title": "Film 1", "format": fmt, "daypart": daypart, "showtime": showtime,
+            "play_date": "2025-01-10", "ticket_url": f"{theater}-{showtime}"}
+
+
+def _fake_scraper(prices):
+    calls = []
+
+    async def scrape_stream(showings):
+        calls.append(list(showings))
+        for showing in showings:
+            yield showing, [{"Ticket Type": ticket_type, "Price": price, "Showtime": showing["showtime"]}
+                            for ticket_type, price in prices[showing["theater_name"]].items()]
+    return scrape_stream, calls
+
+
+def test_only_fresh_confident_rules_are_stable():
+    book = PriceRuleBook([_rule("A", "Adult", 12.0), _rule("A", "Child", 9.0),
+                          _rule("B", "Adult", 12.0, confidence=0.5),
+                          _rule("C", "Adult", 12.0, last_verified="2024-12-01"),
+                          _rule("D", "Adult", 12.0, observed_days=1)], today=TODAY)
+    assert book.is_stable(("A", "Prime", "2D"))
+    assert not book.is_stable(("A", "Matinee", "2D")) # No rules for this daypart
+    assert not any(book.is_stable((name, "Prime", "2D")) for name in "BCD")
+
+
+@pytest.mark.asyncio
+async def test_stable_theater_scrapes_a_sample_and_fills_in_the_rest():
+    book = PriceRuleBook([_rule("A", "Adult", 12.0), _rule("A", "Child", 9.0)], today=TODAY)
+    showings = [_showing("A", f"{hour}:00pm") for hour in range(5, 10)] + [_showing("B", "7:00pm")]
+    scrape_stream, calls = _fake_scraper({"A": {"Adult": "$12.00", "Child": "$9.00"}, "B": {"Adult": "$11.00"}})
+    stats = PriceRuleStats()
+
+    results = [r async for r in price_rule_stream(showings, scrape_stream, book, sample_rate=0, stats=stats)]
+
+    assert [[s["ticket_url"] for s in batch] for batch in calls] == [["A-5:00pm", "B-7:00pm"]]
+    assert len(results) == 6
+    filled = [rows for showing, rows in results if rows[0].get("Inferred")]
+    assert len(filled) == 4
+    assert [(row["Ticket Type"], row["Price"], row["Capacity"]) for row in filled[0]] == [("Adult", "$12.00", "N/A"), ("Child", "$9.00", "N/A")]
+    assert stats.as_dict() == {"covered": 5, "samples": 1, "scraped": 2, "inferred": 4, "escalated_theaters": 0}
+
+
+@pytest.mark.asyncio
+async def test_disagreeing_sample_escalates_the_theater_to_a_full_scrape():
+    book = PriceRuleBook([_rule("A", "Adult", 12.0)], today=TODAY)
+    showings = [_showing("A", f"{hour}:00pm") for hour in range(5, 10)]
+    scrape_stream, calls = _fake_scraper({"A": {"Adult": "$13.50"}}) # The theater raised its prices
+    stats = PriceRuleStats()
+
+    results = [r async for r in price_rule_stream(showings, scrape_stream, book, sample_rate=0.25, stats=stats, rng=random.Random(0))]
+
+    assert len(results) == 5
+    assert not any(rows[0].get("Inferred") for _, rows in results)
+    assert stats.escalated == ["A"] and stats.scraped == 5 and stats.samples == 2
+    assert sum(len(batch) for batch in calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_no_rules_scrapes_everything_once(monkeypatch):
+    monkeypatch.setattr(config, "DB_FILE", None)
+    showings = [_showing("A", "5:00pm"), _showing("A", "6:00pm")]
+    scrape_stream, calls = _fake_scraper({"A": {"Adult": "$12.00"}})
+
+    results = [r async for r in price_rule_stream(showings, scrape_stream, PriceRuleBook.from_database())]
+    assert len(calls) == 1 and calls[0] == showings
+    assert len(results) == 2
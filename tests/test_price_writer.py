@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.price_writer import BatchedPriceWriter
+from app import database
+
+
+def _rows(n, start=0):
+    return [{"Price": f"${i}.00", "play_date": "2025-01-01"} for i in range(start, start + n)]
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_when_batch_is_full():
+    with patch('app.price_writer.database') as mock_db:
+        async with BatchedPriceWriter(run_id=7, batch_size=3, flush_interval=60) as writer:
+            await writer.put(_rows(2))
+            await writer.put(_rows(2, start=2))
+            await asyncio.sleep(0.05)
+            assert mock_db.save_prices.call_count == 1 # 4 rows >= batch_size -> one batch of 4
+        assert mock_db.save_prices.call_count == 1 # Nothing left to flush on close
+
+    run_id, df = mock_db.save_prices.call_args.args
+    assert run_id == 7
+    assert len(df) == 4
+    assert writer.rows_written == 4
+    assert writer.batches_written == 1
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_after_interval():
+    with patch('app.price_writer.database') as mock_db:
+        async with BatchedPriceWriter(run_id=1, batch_size=500, flush_interval=0.05) as writer:
+            await writer.put(_rows(1))
+            await asyncio.sleep(0.2)
+            assert mock_db.save_prices.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_remaining_rows_on_close():
+    with patch('app.price_writer.database') as mock_db:
+        async with BatchedPriceWriter(run_id=1, batch_size=500, flush_interval=60) as writer:
+            await writer.put(_rows(10))
+            await writer.put([])
+    mock_db.save_prices.assert_called_once()
+    assert len(mock_db.save_prices.call_args.args[1]) == 10
+
+
+@pytest.mark.asyncio
+async def test_writer_survives_save_errors():
+    with patch('app.price_writer.database') as mock_db:
+        mock_db.save_prices.side_effect = [RuntimeError("database is locked"), None]
+        async with BatchedPriceWriter(run_id=1, batch_size=2, flush_interval=60) as writer:
+            await writer.put(_rows(2))
+            await asyncio.sleep(0.05)
+            await writer.put(_rows(2))
+    assert writer.failed_rows == 2
+    assert writer.rows_written == 2
+
+
+@pytest.mark.asyncio
+async def test_writer_marks_showing_succeeded_only_when_its_prices_are_saved():
+    """With journal=True a showing whose batch failed to save is left 'attempted' so a resume retries it."""
+    with patch('app.price_writer.database') as mock_db:
+        mock_db.JOURNAL_ATTEMPTED = database.JOURNAL_ATTEMPTED
+        mock_db.JOURNAL_SUCCEEDED = database.JOURNAL_SUCCEEDED
+        mock_db.JOURNAL_FAILED = database.JOURNAL_FAILED
+        mock_db.save_prices.side_effect = [None, Exception("disk full")]
+        writer = BatchedPriceWriter(run_id=3, batch_size=2, flush_interval=60, journal=True)
+        async with writer:
+            writer.record_status("url-a", database.JOURNAL_ATTEMPTED)
+            await writer.put(_rows(2), "url-a")
+            writer.record_status("url-b", database.JOURNAL_ATTEMPTED)
+            writer.record_status("url-c", database.JOURNAL_ATTEMPTED)
+            writer.record_status("url-c", database.JOURNAL_FAILED, "Price scrape failed")
+            await writer.put(_rows(2), "url-b")
+
+    updates = [c.args for c in mock_db.update_journal_status.call_args_list]
+    assert (3, ["url-a"], database.JOURNAL_SUCCEEDED, None) in updates
+    assert (3, ["url-c"], database.JOURNAL_FAILED, "Price scrape failed") in updates
+    assert not any(database.JOURNAL_SUCCEEDED == u[2] and "url-b" in u[1] for u in updates)
+    assert writer.failed_rows == 2
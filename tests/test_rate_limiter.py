@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.rate_limiter import HostRateLimiter, TokenBucket, set_rate_limiter
+from app.scraper import Scraper
+
+
+def test_bucket_allows_burst_then_queues_at_sustained_rate():
+    bucket = TokenBucket(rate=10, burst=3)
+    waits = [bucket.reserve() for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    # Reservations queue up behind each other instead of failing.
+    assert waits[3] == pytest.approx(0.1, abs=0.01)
+    assert waits[4] == pytest.approx(0.2, abs=0.01)
+    stats = bucket.stats()
+    assert (stats["requests"], stats["delayed"]) == (5, 2)
+    assert stats["max_wait"] == pytest.approx(0.2, abs=0.01)
+
+
+def test_limits_match_parent_domains_and_scale_by_share():
+    limiter = HostRateLimiter(limits={"fandango.com": (8.0, 16)}, default=(1.0, 1), share=0.5)
+    assert limiter.bucket("https://www.fandango.com/x") is limiter.bucket("tickets.fandango.com")
+    assert limiter.bucket("https://www.fandango.com/x").rate == 4.0
+    assert limiter.bucket("https://www.omdbapi.com/?t=x").burst == 1
+    assert set(limiter.stats()) == {"fandango.com", "www.omdbapi.com"}
+
+
+@pytest.mark.asyncio
+async def test_async_and_sync_callers_share_one_budget():
+    limiter = HostRateLimiter(limits={"example.com": (20.0, 2)})
+    start = time.monotonic()
+    thread = threading.Thread(target=lambda: [limiter.wait("http://example.com/a") for _ in range(2)])
+    thread.start()
+    await asyncio.gather(*(limiter.acquire("http://example.com/b") for _ in range(2)))
+    thread.join()
+    # Four requests against a burst of two at 20/s: the last one goes out ~0.1s in.
+    assert time.monotonic() - start >= 0.09
+    assert limiter.stats()["example.com"]["requests"] == 4
+
+
+@pytest.mark.asyncio
+async def test_scraper_navigation_is_paced():
+    limiter = HostRateLimiter(limits={"fandango.com": (50.0, 1)})
+    set_rate_limiter(limiter)
+    try:
+        page = AsyncMock()
+        scout = Scraper(headless=True)
+        await scout._goto(page, "https://www.fandango.com/a", timeout=5)
+        await scout._goto(page, "https://www.fandango.com/b", timeout=5)
+    finally:
+        set_rate_limiter(None)
+    page.goto.assert_awaited_with("https://www.fandango.com/b", timeout=5)
+    assert limiter.stats()["fandango.com"]["delayed"] == 1
+
+
+def test_omdb_requests_take_a_token():
+    from app.omdb_client import OMDbClient
+    limiter = MagicMock()
+    with patch('app.omdb_client.get_rate_limiter', return_value=limiter), \
+         patch('app.omdb_client.requests.get') as mock_get, \
+         patch.object(OMDbClient, '__init__', lambda self: setattr(self, 'api_key', 'k')):
+        mock_get.return_value.json.return_value = {"Response": "False"}
+        OMDbClient()._search_by_id("tt0000001")
+    limiter.wait.assert_called_once_with(OMDbClient.API_URL)
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.request_blocking import BLOCKING_PROFILES, BlockingProfile, BlockingStats, apply_blocking_profile
+from app.scraper import Scraper
+
+
+@pytest.mark.parametrize("profile_name, resource_type, url, expected", [
+    ("showtimes", "document", "https://www.fandango.com/amc-theater/theater-page", None),
+    ("showtimes", "script", "https://www.fandango.com/static/app.js", None),
+    ("showtimes", "xhr", "https://www.fandango.com/napi/showtimes", None),
+    ("showtimes", "image", "https://images.fandango.com/poster.jpg", "image"),
+    ("showtimes", "stylesheet", "https://www.fandango.com/styles.css", "stylesheet"),
+    ("showtimes", "script", "https://www.googletagmanager.com/gtm.js", "tracker"),
+    ("showtimes", "script", "https://cdn.example-cdn.com/lib.js", None),
+    ("prices", "script", "https://cdn.example-cdn.com/lib.js", "third-party"),
+    ("prices", "script", "https://tickets.fandango.com/commerce.js", None),
+    ("prices", "font", "https://tickets.fandango.com/font.woff2", "font"),
+    ("prices", "document", "https://securepubads.g.doubleclick.net/frame", None),
+])
+def test_block_reason(profile_name, resource_type, url, expected):
+    assert BLOCKING_PROFILES[profile_name].block_reason(resource_type, url) == expected
+
+
+def _route(resource_type, url):
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.url = url
+    route.abort = AsyncMock()
+    route.continue_ = AsyncMock()
+    return route
+
+
+@pytest.mark.asyncio
+async def test_apply_blocking_profile_aborts_and_tallies():
+    page = AsyncMock()
+    stats = BlockingStats("showtimes")
+    await apply_blocking_profile(page, BlockingProfile("showtimes", blocked_resource_types=("image",)), stats)
+
+    pattern, handler = page.route.call_args.args
+    assert pattern == "**/*"
+
+    blocked = _route("image", "https://images.fandango.com/a.jpg")
+    allowed = _route("document", "https://www.fandango.com/")
+    tracker = _route("script", "https://www.google-analytics.com/analytics.js")
+    for route in (blocked, allowed, tracker):
+        await handler(route)
+
+    blocked.abort.assert_awaited_once()
+    tracker.abort.assert_awaited_once()
+    allowed.continue_.assert_awaited_once()
+    assert stats.requests_blocked == 2
+    assert stats.requests_allowed == 1
+    assert stats.blocked_by_reason == {"image": 1, "tracker": 1}
+    assert stats.bytes_saved > 0
+
+
+@pytest.mark.asyncio
+async def test_scrape_details_installs_prices_profile():
+    scraper = Scraper(headless=True, http_prices=False)
+    scraper._get_prices_via_browser = AsyncMock(return_value={"tickets": [], "capacity": "Available", "error": None})
+    mock_page = AsyncMock()
+    mock_pool = MagicMock()
+    mock_pool.page.return_value.__aenter__ = AsyncMock(return_value=mock_page)
+    mock_pool.page.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    selected = {"2025-01-01": {"T": {"Film": {"7:00pm": [{"film_title": "Film", "showtime": "7:00pm", "ticket_url": "u"}]}}}}
+    with patch('app.scraper.get_browser_pool', return_value=mock_pool):
+        await scraper.scrape_details([{"name": "T", "url": "x"}], selected)
+
+    mock_page.route.assert_awaited_once()
+    assert scraper.blocking_stats["prices"].phase == "prices"
+
+
+@pytest.mark.asyncio
+async def test_http_served_showing_never_leases_a_page():
+    scraper = Scraper(headless=True)
+    scraper._get_prices_via_http = AsyncMock(return_value={"tickets": [], "capacity": "Available", "error": None})
+    mock_pool = MagicMock()
+
+    selected = {"2025-01-01": {"T": {"Film": {"7:00pm": [{"film_title": "Film", "showtime": "7:00pm", "ticket_url": "u"}]}}}}
+    with patch('app.scraper.get_browser_pool', return_value=mock_pool):
+        await scraper.scrape_details([{"name": "T", "url": "x"}], selected)
+
+    scraper._get_prices_via_http.assert_awaited_once()
+    mock_pool.page.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_block_resources_can_be_disabled():
+    scraper = Scraper(headless=True, http_prices=False, block_resources=False)
+    scraper._get_prices_via_browser = AsyncMock(return_value={"tickets": [], "capacity": "Available", "error": None})
+    mock_page = AsyncMock()
+    mock_pool = MagicMock()
+    mock_pool.page.return_value.__aenter__ = AsyncMock(return_value=mock_page)
+    mock_pool.page.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    selected = {"2025-01-01": {"T": {"Film": {"7:00pm": [{"film_title": "Film", "showtime": "7:00pm", "ticket_url": "u"}]}}}}
+    with patch('app.scraper.get_browser_pool', return_value=mock_pool):
+        await scraper.scrape_details([{"name": "T", "url": "x"}], selected)
+
+    mock_page.route.assert_not_called()
@@ -0,0 +1,75 @@
+import contextlib
+import random
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy, TransientScrapeError, run_with_retries
+from app.scraper import Scraper
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(attempts=5, base_delay=1.0, max_delay=4.0, rng=random.Random(3))
+    delays = [policy.backoff(attempt) for attempt in range(6)]
+    assert all(0 <= d <= min(4.0, 2 ** i) for i, d in enumerate(delays))
+    assert len(set(delays)) == len(delays)
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_until_success():
+    operation = AsyncMock(side_effect=[TransientScrapeError("timeout"), TransientScrapeError("timeout"), ["ok"]])
+    breaker = CircuitBreaker(threshold=5)
+    result = await run_with_retries(operation, "Theater A", RetryPolicy(attempts=3, base_delay=0), breaker)
+    assert result == ["ok"]
+    assert operation.await_count == 3
+    assert breaker.open_circuits == {}
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_consecutive_failures_and_skips_the_rest():
+    breaker = CircuitBreaker(threshold=3)
+    policy = RetryPolicy(attempts=2, base_delay=0)
+    operation = AsyncMock(side_effect=TransientScrapeError("Scraping timed out."))
+
+    for _ in range(3): # Each page fails both attempts but counts as one failure
+        with pytest.raises(TransientScrapeError):
+            await run_with_retries(operation, "Broken", policy, breaker)
+    assert operation.await_count == 6
+    for _ in range(2): # The third failed page opened the circuit
+        with pytest.raises(CircuitOpenError):
+            await run_with_retries(operation, "Broken", policy, breaker)
+    assert operation.await_count == 6
+
+    circuit = breaker.open_circuits["Broken"]
+    assert (circuit["failures"], circuit["skipped"], circuit["last_error"]) == (3, 2, "Scraping timed out.")
+    assert breaker.allow("Healthy")
+
+
+@pytest.mark.asyncio
+async def test_price_stream_retries_timeouts_and_reports_open_circuits():
+    scout = Scraper(headless=True, http_prices=False, processes=1)
+    scout.retry_policy = RetryPolicy(attempts=2, base_delay=0)
+
+    @contextlib.asynccontextmanager
+    async def fake_page(stats, pool=None):
+        yield None
+    scout._phase_page = fake_page
+
+    calls = {"Broken": 0, "Flaky": 0}
+
+    async def fake_prices(page, showing, spare_page=None):
+        theater = showing['theater_name']
+        calls[theater] += 1
+        if theater == "Broken" or calls[theater] == 1:
+            return {"tickets": [], "capacity": "N/A", "error": "Scraping timed out.", "retryable": True}
+        return {"tickets": [{"type": "Adult", "price": "$10.00", "amenities": []}], "capacity": "Available", "error": None}
+    scout._get_prices_and_capacity = fake_prices
+
+    showings = [{"theater_name": name, "film_title": f"Film {i}", "showtime": "7:00pm", "daypart": "Prime", "ticket_url": f"{name}/{i}"}
+                for name, count in (("Broken", 6), ("Flaky", 1)) for i in range(count)]
+    with patch.object(scout, '_browser_pool'):
+        results = [(s['theater_name'], rows) async for s, rows in scout.scrape_showings_stream(showings)]
+
+    assert [rows for name, rows in results if name == "Flaky"][0][0]["Price"] == "$10.00"
+    assert all(rows is None for name, rows in results if name == "Broken")
+    assert calls["Flaky"] == 2
+    assert calls["Broken"] < 12 # Without the breaker every Broken showing would take both attempts
+    assert set(scout.open_circuits("prices")) == {"Broken"}
@@ -2,6 +2,7 @@ import pytest
 import os
 import sys
 import json
+import sqlite3
 from datetime import datetime, time
 import pytz
 from unittest.mock import patch, AsyncMock, MagicMock
@@ -10,8 +11,10 @@ from unittest.mock import patch, AsyncMock, MagicMock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import the module to be tested
-from scheduler_service import execute_scheduled_scrape, execute_op_hours_report_task, check_and_run_tasks
+from scheduler_service import execute_scheduled_scrape, execute_op_hours_report_task, check_and_run_tasks, update_company_databases
 from app import config, database
+from app.scrape_planner import plan_for_deadline
+from app.price_rules import PriceRuleBook
 
 # --- Fixtures ---
 
@@ -72,22 +75,42 @@ def patch_dependencies(monkeypatch, mock_cache_file, mock_db, tmp_path):
 
 # --- Tests ---
 
+def _use_real_journal_statuses(*mock_db_modules):
+    for mock_module in mock_db_modules:
+        for name in ('JOURNAL_DISCOVERED', 'JOURNAL_ATTEMPTED', 'JOURNAL_SUCCEEDED', 'JOURNAL_FAILED', 'JOURNAL_SKIPPED'):
+            setattr(mock_module, name, getattr(database, name))
+
+
+def _flatten(theaters, selected_showtimes):
+    from app.scraper import Scraper
+    return Scraper.flatten_selected_showtimes(None, theaters, selected_showtimes)
+
+
 @pytest.mark.asyncio
+@patch('app.price_writer.database')
 @patch('scheduler_service.Scraper')
 @patch('scheduler_service.database')
-async def test_execute_scheduled_scrape(mock_db_mod, mock_scraper_cls, temp_company_dir):
+async def test_execute_scheduled_scrape(mock_db_mod, mock_scraper_cls, mock_writer_db, temp_company_dir):
     """
     Tests the main scheduled scrape execution logic.
     """
     # --- Setup ---
     mock_scraper_instance = mock_scraper_cls.return_value
     mock_scraper_instance.get_all_showings_for_theaters = AsyncMock(return_value={
-        "Theater A": [{"film_title": "Film 1", "showtime": "10:00"}]
+        "Theater A": [{"film_title": "Film 1", "showtime": "10:00", "ticket_url": "url-1"}]
     })
-    mock_scraper_instance.scrape_details = AsyncMock(return_value=([{"Price": "$10"}], []))
+    mock_scraper_instance.flatten_selected_showtimes.side_effect = _flatten
+
+    async def fake_stream(showings, theater_count, on_showing_start=None):
+        fake_stream.showings = showings
+        for showing in showings:
+            on_showing_start(showing)
+            yield showing, [{"Price": "$10", "play_date": showing["play_date"]}]
+    mock_scraper_instance.scrape_showings = MagicMock(side_effect=fake_stream)
 
+    _use_real_journal_statuses(mock_db_mod, mock_writer_db)
+    mock_db_mod.find_resumable_scrape_run.return_value = None
     mock_db_mod.create_scrape_run.return_value = 123
-    mock_db_mod.save_prices = MagicMock()
     mock_db_mod.upsert_showings = MagicMock()
 
     task_config = {
@@ -101,12 +124,174 @@ async def test_execute_scheduled_scrape(mock_db_mod, mock_scraper_cls, temp_comp
 
     # --- Assertions ---
     mock_scraper_instance.get_all_showings_for_theaters.assert_called_once()
-    mock_scraper_instance.scrape_details.assert_called_once()
+    mock_scraper_instance.scrape_showings.assert_called_once()
+    assert mock_scraper_instance.scrape_showings.call_args.args[1] == 1 # Theater count, which decides whether to shard
+    # Selections are nested under the scrape date and flattened with theater/play_date context
+    (showing,) = fake_stream.showings
+    assert showing["theater_name"] == "Theater A" and showing["ticket_url"] == "url-1" and showing["play_date"]
     mock_db_mod.upsert_showings.assert_called_once()
     mock_db_mod.create_scrape_run.assert_called_once_with("Scheduled", "Scheduled Task: Daily Scrape")
-    mock_db_mod.save_prices.assert_called_once()
+    mock_db_mod.journal_discovered_showings.assert_called_once_with(123, fake_stream.showings)
+    mock_writer_db.save_prices.assert_called_once()
+    assert mock_writer_db.save_prices.call_args.args[0] == 123
+    mock_writer_db.update_journal_status.assert_any_call(123, ["url-1"], database.JOURNAL_ATTEMPTED)
+    mock_writer_db.update_journal_status.assert_any_call(123, ["url-1"], database.JOURNAL_SUCCEEDED, None)
     assert config.DB_FILE == str(temp_company_dir["company_path"] / 'price_scout.db')
 
+@pytest.mark.asyncio
+@patch('app.price_writer.database')
+@patch('scheduler_service.Scraper')
+@patch('scheduler_service.database')
+async def test_execute_scheduled_scrape_resumes_interrupted_run(mock_db_mod, mock_scraper_cls, mock_writer_db, temp_company_dir):
+    """
+    Tests that an interrupted run of the same task today is resumed from its journal,
+    skipping showtime discovery and scraping only the remaining showings.
+    """
+    mock_scraper_instance = mock_scraper_cls.return_value
+    mock_scraper_instance.get_all_showings_for_theaters = AsyncMock()
+    remainder = [{"film_title": "Film 2", "showtime": "9:00pm", "ticket_url": "url-2", "theater_name": "Theater A", "play_date": "2025-01-01"}]
+
+    async def fake_stream(showings, theater_count, on_showing_start=None):
+        fake_stream.showings = showings
+        for showing in showings:
+            yield showing, None # Fails again
+    mock_scraper_instance.scrape_showings = MagicMock(side_effect=fake_stream)
+
+    _use_real_journal_statuses(mock_db_mod, mock_writer_db)
+    mock_db_mod.find_resumable_scrape_run.return_value = 42
+    mock_db_mod.get_journal_remainder.return_value = remainder
+
+    await execute_scheduled_scrape({"task_name": "Daily Scrape", "markets": ["TestMarket1"]}, temp_company_dir["company_name"])
+
+    mock_scraper_instance.get_all_showings_for_theaters.assert_not_called()
+    mock_db_mod.create_scrape_run.assert_not_called()
+    assert fake_stream.showings == remainder
+    mock_db_mod.get_journal_remainder.assert_called_once_with(42)
+    mock_writer_db.save_prices.assert_not_called()
+    mock_writer_db.update_journal_status.assert_any_call(42, ["url-2"], database.JOURNAL_FAILED, "Price scrape failed")
+
+@pytest.mark.asyncio
+@patch('scheduler_service.seconds_until_cutoff', return_value=3600)
+@patch('app.price_writer.database')
+@patch('scheduler_service.Scraper')
+@patch('scheduler_service.database')
+async def test_execute_scheduled_scrape_plans_for_the_cutoff(mock_db_mod, mock_scraper_cls, mock_writer_db, mock_cutoff, temp_company_dir):
+    """A task with market timezones scrapes a deadline plan and stops taking showings at the cutoff."""
+    mock_scraper_instance = mock_scraper_cls.return_value
+    mock_scraper_instance.concurrency.limit = 2
+    remainder = [{"film_title": "Film 1", "showtime": f"{hour}:00pm", "daypart": "Prime", "format": "2D",
+                  "ticket_url": f"url-{hour}", "theater_name": "Theater A", "play_date": "2025-01-01"} for hour in range(1, 4)]
+
+    async def fake_stream(showings, theater_count, on_showing_start=None, cancel_event=None):
+        fake_stream.showings = showings
+        fake_stream.cancel_event = cancel_event
+        for showing in showings:
+            yield showing, [{"Price": "$10", "play_date": showing["play_date"]}]
+    mock_scraper_instance.scrape_showings = MagicMock(side_effect=fake_stream)
+
+    _use_real_journal_statuses(mock_db_mod, mock_writer_db)
+    mock_db_mod.find_resumable_scrape_run.return_value = 42
+    mock_db_mod.get_journal_remainder.return_value = remainder
+
+    with patch('scheduler_service.plan_for_deadline', wraps=plan_for_deadline) as mock_plan:
+        await execute_scheduled_scrape({"task_name": "Daily Scrape", "markets": ["TestMarket1"],
+                                        "market_timezones": ["America/Chicago", "America/New_York"]},
+                                       temp_company_dir["company_name"])
+
+    assert mock_cutoff.call_count == 2 # The earliest market cutoff wins
+    budget = mock_plan.call_args.args[1]
+    assert budget == pytest.approx(3600 * config.SCRAPE_DEADLINE_MARGIN)
+    assert mock_plan.call_args.kwargs["workers"] == 2
+    assert len(fake_stream.showings) == 3 # Everything fits in an hour
+    assert fake_stream.cancel_event is not None and not fake_stream.cancel_event.is_set()
+    mock_writer_db.save_prices.assert_called_once()
+
+@pytest.mark.asyncio
+@patch('scheduler_service.seconds_until_cutoff', return_value=5)
+@patch('app.price_writer.database')
+@patch('scheduler_service.Scraper')
+@patch('scheduler_service.database')
+async def test_execute_scheduled_scrape_journals_deferred_and_cut_off_showings_as_skipped(mock_db_mod, mock_scraper_cls, mock_writer_db,
+                                                                                          mock_cutoff, temp_company_dir):
+    """Showings the deadline plan defers or the cutoff stops are final, and the run records its cutoff."""
+    mock_scraper_instance = mock_scraper_cls.return_value
+    mock_scraper_instance.concurrency.limit = 2
+    remainder = [{"film_title": "Film 1", "showtime": f"{hour}:00pm", "daypart": "Prime", "format": "2D",
+                  "ticket_url": f"url-{hour}", "theater_name": "Theater A", "play_date": "2025-01-01"} for hour in range(1, 4)]
+
+    async def fake_stream(showings, theater_count, on_showing_start=None, cancel_event=None):
+        fake_stream.showings = showings
+        first, *rest = showings
+        yield first, [{"Price": "$10", "play_date": first["play_date"]}]
+        cancel_event.set() # The cutoff arrives
+        for showing in rest:
+            yield showing, []
+    mock_scraper_instance.scrape_showings = MagicMock(side_effect=fake_stream)
+
+    _use_real_journal_statuses(mock_db_mod, mock_writer_db)
+    mock_db_mod.find_resumable_scrape_run.return_value = 42
+    mock_db_mod.get_journal_remainder.return_value = remainder
+
+    with patch('scheduler_service.config.PRICE_RULES', False):
+        await execute_scheduled_scrape({"task_name": "Daily Scrape", "markets": ["TestMarket1"],
+                                        "market_timezones": ["America/Chicago"]}, temp_company_dir["company_name"])
+
+    assert len(fake_stream.showings) == 2 # Two 4 s showings on two workers fit the 4.5 s budget
+    assert mock_db_mod.set_scrape_run_cutoff.call_args.args[0] == 42
+    deferred_urls = {s["ticket_url"] for s in remainder} - {s["ticket_url"] for s in fake_stream.showings}
+    mock_db_mod.update_journal_status.assert_called_once_with(42, sorted(deferred_urls), database.JOURNAL_SKIPPED,
+                                                              "Deferred by the deadline plan")
+    cut_off_url = fake_stream.showings[1]["ticket_url"]
+    mock_writer_db.update_journal_status.assert_any_call(42, [cut_off_url], database.JOURNAL_SKIPPED, "Not started before the cutoff")
+
+@pytest.mark.asyncio
+@patch('app.price_writer.database')
+@patch('scheduler_service.Scraper')
+@patch('scheduler_service.database')
+async def test_execute_scheduled_scrape_verifies_stable_price_rules(mock_db_mod, mock_scraper_cls, mock_writer_db, temp_company_dir):
+    """Theaters with stable price rules scrape one verification sample and fill in the rest; rules are re-learned after the run."""
+    mock_scraper_instance = mock_scraper_cls.return_value
+    remainder = [{"film_title": "Film 1", "showtime": f"{hour}:00pm", "daypart": "Prime", "format": "2D",
+                  "ticket_url": f"url-{hour}", "theater_name": "Theater A", "play_date": "2025-01-01"} for hour in range(1, 4)]
+
+    async def fake_stream(showings, theater_count, on_showing_start=None):
+        fake_stream.showings = showings
+        for showing in showings:
+            yield showing, [{"Ticket Type": "Adult", "Price": "$10.00", "play_date": showing["play_date"]}]
+    mock_scraper_instance.scrape_showings = MagicMock(side_effect=fake_stream)
+
+    _use_real_journal_statuses(mock_db_mod, mock_writer_db)
+    mock_db_mod.find_resumable_scrape_run.return_value = 42
+    mock_db_mod.get_journal_remainder.return_value = remainder
+    rule = {"theater_name": "Theater A", "ticket_type": "Adult", "daypart": "Prime", "format": "2D", "price": 10.0,
+            "confidence": 1.0, "observed_days": 10, "last_verified": datetime.now().date().isoformat()}
+
+    with patch('scheduler_service.config.PRICE_RULES_SAMPLE_RATE', 0), \
+         patch('scheduler_service.PriceRuleBook.from_database', return_value=PriceRuleBook([rule])):
+        await execute_scheduled_scrape({"task_name": "Daily Scrape", "markets": ["TestMarket1"]}, temp_company_dir["company_name"])
+
+    assert [s["ticket_url"] for s in fake_stream.showings] == ["url-1"]
+    saved = mock_writer_db.save_prices.call_args.args[1]
+    assert len(saved) == 3 and saved["Inferred"].fillna(False).sum() == 2
+    mock_db_mod.refresh_price_rules.assert_called_once_with(["Theater A"])
+
+def test_update_company_databases_adds_the_scrape_journal(temp_company_dir):
+    """Startup brings older company databases up to date, so tasks don't migrate the schema on every run."""
+    db_file = temp_company_dir["company_path"] / 'price_scout.db'
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("CREATE TABLE scrape_runs (run_id INTEGER PRIMARY KEY, run_timestamp DATETIME, mode TEXT, run_context TEXT)")
+        conn.execute("CREATE TABLE showings (showing_id INTEGER PRIMARY KEY, play_date DATE, theater_name TEXT, film_title TEXT, showtime TEXT, format TEXT, daypart TEXT, ticket_url TEXT)")
+        conn.execute("CREATE TABLE prices (price_id INTEGER PRIMARY KEY, run_id INTEGER, showing_id INTEGER, ticket_type TEXT, price REAL, capacity TEXT)")
+        conn.execute("CREATE TABLE films (film_id INTEGER PRIMARY KEY, film_title TEXT UNIQUE)")
+    conn.close()
+
+    update_company_databases()
+
+    with sqlite3.connect(db_file) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert "scrape_journal" in tables
+
 @pytest.mark.asyncio
 @patch('scheduler_service.generate_weekly_report_data', return_value=[{"theater_name": "Theater A", "report": MagicMock()}])
 @patch('scheduler_service.pd.ExcelWriter')
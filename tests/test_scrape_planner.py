@@ -0,0 +1,91 @@
+import pytest
+from app import config, database
+from app.scrape_planner import (ScrapeCostModel, order_showings, order_theater_pages, plan_for_deadline,
+                                 predict_completion_time, predict_makespan)
+
+
+def _showings(theater, count):
+    return [{"theater_name": theater, "ticket_url": f"{theater}-{i}"} for i in range(count)]
+
+
+def test_showings_are_ordered_longest_first():
+    model = ScrapeCostModel(showing_seconds={"Slow": 10.0, "Fast": 1.0})
+    showings = _showings("Fast", 2) + _showings("Unknown", 1) + _showings("Slow", 2)
+    ordered = order_showings(showings, model)
+    assert [s["theater_name"] for s in ordered] == ["Slow", "Slow", "Unknown", "Fast", "Fast"]
+    assert model.showing_cost({"theater_name": "Unknown"}) == 5.5 # Median of the known theaters
+
+
+def test_without_history_bigger_theaters_go_first_and_ties_keep_input_order():
+    model = ScrapeCostModel()
+    showings = _showings("Small", 1) + _showings("Big", 3)
+    assert [s["ticket_url"] for s in order_showings(showings, model)] == ["Big-0", "Big-1", "Big-2", "Small-0"]
+
+
+def test_theater_pages_are_ordered_by_latency_then_size():
+    model = ScrapeCostModel(page_seconds={"A": 2.0, "B": 2.0, "C": 9.0}, showings_per_day={"A": 10, "B": 80})
+    theaters = [{"name": "A"}, {"name": "B"}, {"name": "C"}]
+    pages = order_theater_pages(theaters, ["d1", "d2"], model)
+    assert [(t["name"], d) for t, d in pages] == [("C", "d1"), ("C", "d2"), ("B", "d1"), ("B", "d2"), ("A", "d1"), ("A", "d2")]
+
+
+def test_longest_first_shortens_the_predicted_makespan():
+    costs = [1, 1, 1, 1, 1, 1, 6]
+    assert predict_makespan(costs, 2) == 9 # The long job starts last
+    assert predict_makespan(sorted(costs, reverse=True), 2) == 6
+    assert predict_makespan([], 4) == 0.0
+
+
+def test_completion_time_uses_the_model():
+    model = ScrapeCostModel(showing_seconds={"A": 3.0})
+    assert predict_completion_time(_showings("A", 4), model, workers=2) == pytest.approx(6.0)
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'DB_FILE', str(tmp_path / "planner.db"))
+    database.init_database()
+
+
+def test_latency_history_is_recorded_and_loaded(temp_db):
+    database.record_scrape_latencies("prices", {"A": (4, 8.0), "B": (2, 10.0)})
+    database.record_scrape_latencies("prices", {"A": (4, 16.0)})
+    database.record_scrape_latencies("showtimes", {"A": (1, 7.0)})
+
+    latencies = database.get_scrape_latencies("prices")
+    assert latencies["A"] == pytest.approx(3.0) # (2.0 * 4 + 16.0) / 8
+    assert latencies["B"] == pytest.approx(5.0)
+
+    model = ScrapeCostModel.from_database()
+    assert model.has_history
+    assert model.page_cost("A") == pytest.approx(7.0)
+
+
+def _classed(theater, film, daypart, count):
+    return [{"theater_name": theater, "film_title": film, "format": "2D", "daypart": daypart,
+             "ticket_url": f"{theater}-{film}-{daypart}-{i}"} for i in range(count)]
+
+
+def test_deadline_plan_covers_every_price_class_before_filling_in():
+    model = ScrapeCostModel(showing_seconds={"A": 2.0, "B": 2.0})
+    showings = _classed("A", "Film 1", "Prime", 5) + _classed("A", "Film 1", "Matinee", 5) + _classed("B", "Film 2", "Prime", 5)
+    plan = plan_for_deadline(showings, budget_seconds=4.0, model=model, workers=2)
+
+    assert len(plan.selected) == 4 and len(plan.deferred) == 11
+    assert plan.coverage["price_classes"] == (3, 3)
+    assert plan.coverage["theaters"] == (2, 2)
+    assert plan.predicted_seconds <= 4.0
+    assert not plan.complete
+    assert "3/3 price classes" in plan.summary()
+
+
+def test_deadline_plan_takes_everything_when_it_fits():
+    showings = _classed("A", "Film 1", "Prime", 3)
+    plan = plan_for_deadline(showings, budget_seconds=60.0, model=ScrapeCostModel(), workers=4)
+    assert plan.complete
+    assert plan.coverage["showings"] == (3, 3)
+
+
+def test_no_budget_plans_nothing():
+    plan = plan_for_deadline(_classed("A", "Film 1", "Prime", 2), budget_seconds=0, model=ScrapeCostModel(), workers=4)
+    assert plan.selected == [] and plan.coverage["price_classes"] == (0, 1)
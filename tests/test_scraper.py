@@ -40,18 +40,21 @@ async def test_check_url_status(mocker):
     mock_page = mocker.AsyncMock()
     mock_page.request.head.return_value = mock_response
 
+    mock_context = mocker.AsyncMock()
+    mock_context.new_page.return_value = mock_page
+
     mock_browser = mocker.AsyncMock()
-    mock_browser.new_page.return_value = mock_page
+    mock_browser.new_context.return_value = mock_context
 
-    # The original mock was incorrect. launch() returns the browser, not a context manager.
+    # launch() returns the browser, not a context manager.
     mock_playwright_instance = mocker.AsyncMock()
     mock_playwright_instance.chromium.launch.return_value = mock_browser
 
-    # This is the async context manager for `async with async_playwright() as p:`
+    # This is the async context manager for `async with async_playwright() as p:` inside the browser pool
     mock_playwright_cm = mocker.AsyncMock()
     mock_playwright_cm.__aenter__.return_value = mock_playwright_instance
 
-    mocker.patch('app.scraper.async_playwright', return_value=mock_playwright_cm)
+    mocker.patch('app.browser_pool.async_playwright', return_value=mock_playwright_cm)
 
     # Test case 1: URL is active (200 OK)
     mock_response.status = 200
@@ -60,3 +63,6 @@ async def test_check_url_status(mocker):
     # Test case 2: URL is not active (404 Not Found)
     mock_response.status = 404
     assert await scraper.check_url_status("http://invalid.com") is False
+
+    # Both checks reuse the same pooled browser
+    mock_playwright_instance.chromium.launch.assert_called_once()
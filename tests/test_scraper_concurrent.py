@@ -1,19 +1,21 @@
 import pytest
 import asyncio
+import threading
 from unittest.mock import MagicMock, AsyncMock, patch
 from app.scraper import Scraper
+from app.browser_pool import shutdown_browser_pools
 import datetime
 from playwright.async_api import Page
 
 @pytest.mark.asyncio
 async def test_scrape_details_concurrent_behavior():
     # Mock the Scraper instance and its dependencies
-    scraper = Scraper(headless=True, devtools=False)
+    scraper = Scraper(headless=True, devtools=False, http_prices=False, hedge_navigations=False)
 
-    # Mock _get_prices_and_capacity to simulate price fetching
+    # Mock the browser price fetch (HTTP prices are off) so every showing leases a page
     # This mock will be called concurrently for each showing
     mock_get_prices_and_capacity = AsyncMock()
-    scraper._get_prices_and_capacity = mock_get_prices_and_capacity
+    scraper._get_prices_via_browser = mock_get_prices_and_capacity
 
     # Configure the mock to return different data for different showings
     # We'll use a side_effect to return specific data based on the call order
@@ -45,7 +47,7 @@ async def test_scrape_details_concurrent_behavior():
     # --- FIX: Patch the async context manager correctly ---
     mock_playwright_cm = AsyncMock()
     mock_playwright_cm.__aenter__.return_value = mock_playwright
-    with patch('app.scraper.async_playwright', return_value=mock_playwright_cm), \
+    with patch('app.browser_pool.async_playwright', return_value=mock_playwright_cm), \
          patch('app.scraper.logger'): # Patch logger to suppress output
         
         # Define input data
@@ -76,17 +78,18 @@ async def test_scrape_details_concurrent_behavior():
 
         # Call the function under test
         all_price_data, showings_attempted = await scraper.scrape_details(theaters, selected_showtimes, status_container)
+        await shutdown_browser_pools()
 
         # Assertions
         # 1. Verify Playwright components were called correctly
-        mock_playwright.chromium.launch.assert_called_once_with(headless=True, devtools=False)
+        mock_playwright.chromium.launch.assert_called_once_with(headless=True)
         mock_browser.new_context.assert_called_once()
-        # new_page should be called once for each concurrent task (4 showings in this case)
+        # Each showing leases its own page from the shared pool (4 showings in this case)
         assert mock_context.new_page.call_count == 4
         mock_browser.close.assert_called_once()
-        # The worker function doesn't close the page, so we don't assert that.
+        assert mock_page.close.call_count == 4
 
-        # 2. Verify _get_prices_and_capacity was called for all showings
+        # 2. Verify the browser price fetch was called for all showings
         assert mock_get_prices_and_capacity.call_count == 4
         
         # 3. Verify the output data structure and content
@@ -121,11 +124,11 @@ async def test_scrape_details_concurrent_error_handling():
     concurrent `_get_prices_and_capacity` calls fails.
     """
     # Mock the Scraper instance and its dependencies
-    scraper = Scraper(headless=True, devtools=False)
+    scraper = Scraper(headless=True, devtools=False, http_prices=False, hedge_navigations=False)
 
-    # Mock _get_prices_and_capacity to simulate a mix of success and failure
+    # Mock the browser price fetch to simulate a mix of success and failure
     mock_get_prices_and_capacity = AsyncMock()
-    scraper._get_prices_and_capacity = mock_get_prices_and_capacity
+    scraper._get_prices_via_browser = mock_get_prices_and_capacity
 
     mock_get_prices_and_capacity.side_effect = [
         # Showing 1: Success
@@ -150,7 +153,7 @@ async def test_scrape_details_concurrent_error_handling():
     # --- FIX: Patch the async context manager correctly ---
     mock_playwright_cm = AsyncMock()
     mock_playwright_cm.__aenter__.return_value = mock_playwright
-    with patch('app.scraper.async_playwright', return_value=mock_playwright_cm), \
+    with patch('app.browser_pool.async_playwright', return_value=mock_playwright_cm), \
          patch('app.scraper.logger') as mock_logger:
         
         # Define input data for 3 showings
@@ -168,13 +171,14 @@ async def test_scrape_details_concurrent_error_handling():
 
         # Call the function under test
         all_price_data, showings_attempted = await scraper.scrape_details(theaters, selected_showtimes, status_container)
+        await shutdown_browser_pools()
 
         # Assertions
         # 1. Verify Playwright components were still called for all tasks
         assert mock_context.new_page.call_count == 3
         mock_browser.close.assert_called_once()
 
-        # 2. Verify _get_prices_and_capacity was called for all 3 showings
+        # 2. Verify the browser price fetch was called for all 3 showings
         assert mock_get_prices_and_capacity.call_count == 3
 
         # 3. Verify the logger was called with an error for the failed showing
@@ -198,4 +202,162 @@ async def test_scrape_details_concurrent_error_handling():
         assert film_b_data is None # The failed showing should not be in the final data
 
         assert film_a_data['Price'] == '$15.00'
-        assert film_c_data['Price'] == '$12.00'
\ No newline at end of file
+        assert film_c_data['Price'] == '$12.00'
+
+def _mock_playwright_cm():
+    mock_context = AsyncMock()
+    mock_context.new_page.return_value = AsyncMock(spec=Page)
+    mock_browser = AsyncMock()
+    mock_browser.new_context.return_value = mock_context
+    mock_playwright = AsyncMock()
+    mock_playwright.chromium.launch.return_value = mock_browser
+    mock_playwright_cm = AsyncMock()
+    mock_playwright_cm.__aenter__.return_value = mock_playwright
+    return mock_playwright_cm
+
+
+@pytest.mark.asyncio
+async def test_scrape_details_batches_multiple_theaters():
+    """
+    Tests that `scrape_details` scrapes every theater in one batch, reports per-theater
+    progress and calls `on_theater_complete` once per theater with only that theater's rows.
+    """
+    scraper = Scraper(headless=True, devtools=False)
+
+    async def fake_prices(page, showing, spare_page=None):
+        await asyncio.sleep(0)
+        return {"tickets": [{"type": "Adult", "price": "$10.00", "amenities": []}], "capacity": "Available", "error": None}
+    scraper._get_prices_and_capacity = fake_prices
+
+    def showing(film, time_str):
+        return [{"ticket_url": f"url-{film}-{time_str}", "film_title": film, "showtime": time_str, "daypart": "Prime"}]
+
+    theaters = [{"name": "Theater A", "url": "a"}, {"name": "Theater B", "url": "b"}, {"name": "Theater C", "url": "c"}]
+    selected_showtimes = {
+        "2025-01-01": {
+            "Theater A": {"Film 1": {"7:00pm": showing("Film 1", "7:00pm"), "9:00pm": showing("Film 1", "9:00pm")}},
+            "Theater B": {"Film 2": {"8:00pm": showing("Film 2", "8:00pm")}},
+        },
+        "2025-01-02": {
+            "Theater B": {"Film 2": {"8:00pm": showing("Film 2", "8:00pm")}},
+        },
+    }
+    completed = {}
+    theater_progress = {}
+
+    with patch('app.browser_pool.async_playwright', return_value=_mock_playwright_cm()), patch('app.scraper.logger'):
+        all_price_data, showings_attempted = await scraper.scrape_details(
+            theaters, selected_showtimes, ["Initializing..."], theater_progress=theater_progress,
+            on_theater_complete=lambda name, rows, showings: completed.setdefault(name, (rows, showings)))
+        await shutdown_browser_pools()
+
+    assert len(all_price_data) == 4
+    assert len(showings_attempted) == 4
+    assert theater_progress == {"Theater A": {"done": 2, "total": 2}, "Theater B": {"done": 2, "total": 2},
+                                "Theater C": {"done": 0, "total": 0}}
+    assert set(completed) == {"Theater A", "Theater B", "Theater C"}
+    assert {row["Theater Name"] for row in completed["Theater A"][0]} == {"Theater A"}
+    assert sorted(row["play_date"] for row in completed["Theater B"][0]) == ["2025-01-01", "2025-01-02"]
+    assert completed["Theater C"] == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_scrape_details_skips_pending_showings_when_cancelled():
+    scraper = Scraper(headless=True, devtools=False)
+    scraper._get_prices_and_capacity = AsyncMock()
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    selected_showtimes = {"2025-01-01": {"Theater A": {"Film 1": {"7:00pm": [
+        {"ticket_url": "u", "film_title": "Film 1", "showtime": "7:00pm", "daypart": "Prime"}]}}}}
+    completed = []
+
+    with patch('app.browser_pool.async_playwright', return_value=_mock_playwright_cm()):
+        all_price_data, _ = await scraper.scrape_details(
+            [{"name": "Theater A", "url": "a"}], selected_showtimes,
+            on_theater_complete=lambda name, rows, results: completed.append((name, results)), cancel_event=cancel_event)
+        await shutdown_browser_pools()
+
+    assert all_price_data == []
+    scraper._get_prices_and_capacity.assert_not_called()
+    assert completed == [("Theater A", [])] # Skipped showings aren't reported as scraped
+
+
+@pytest.mark.asyncio
+async def test_scrape_details_reports_each_showings_outcome():
+    scraper = Scraper(headless=True, devtools=False)
+
+    async def fake_prices(page, showing, spare_page=None):
+        if showing['ticket_url'] == "url-bad":
+            return {"tickets": [], "capacity": "N/A", "error": "Ticket page did not load"}
+        return {"tickets": [{"type": "Adult", "price": "$10.00", "amenities": []}], "capacity": "Available", "error": None}
+    scraper._get_prices_and_capacity = fake_prices
+
+    selected_showtimes = {"2025-01-01": {"Theater A": {"Film 1": {
+        "7:00pm": [{"ticket_url": "url-good", "film_title": "Film 1", "showtime": "7:00pm", "daypart": "Prime"}],
+        "9:00pm": [{"ticket_url": "url-bad", "film_title": "Film 1", "showtime": "9:00pm", "daypart": "Prime"}],
+    }}}}
+    completed = {}
+
+    with patch('app.browser_pool.async_playwright', return_value=_mock_playwright_cm()), patch('app.scraper.logger'):
+        await scraper.scrape_details([{"name": "Theater A", "url": "a"}], selected_showtimes,
+                                     on_theater_complete=lambda name, rows, results: completed.setdefault(name, results))
+        await shutdown_browser_pools()
+
+    outcomes = {showing['ticket_url']: rows for showing, rows in completed["Theater A"]}
+    assert len(outcomes["url-good"]) == 1
+    assert outcomes["url-bad"] is None
+
+
+@pytest.mark.asyncio
+async def test_scrape_details_stream_yields_each_showing_as_it_completes():
+    scraper = Scraper(headless=True, devtools=False)
+    delays = {"url-slow": 0.05, "url-fast": 0}
+
+    async def fake_prices(page, showing, spare_page=None):
+        await asyncio.sleep(delays[showing['ticket_url']])
+        return {"tickets": [{"type": "Adult", "price": "$10.00", "amenities": []}], "capacity": "Available", "error": None}
+    scraper._get_prices_and_capacity = fake_prices
+
+    selected_showtimes = {"2025-01-01": {"Theater A": {"Film 1": {
+        "7:00pm": [{"ticket_url": "url-slow", "film_title": "Film 1", "showtime": "7:00pm", "daypart": "Prime"}],
+        "9:00pm": [{"ticket_url": "url-fast", "film_title": "Film 1", "showtime": "9:00pm", "daypart": "Prime"}],
+    }}}}
+
+    with patch('app.browser_pool.async_playwright', return_value=_mock_playwright_cm()):
+        completed = [(showing['showtime'], len(rows)) async for showing, rows in
+                     scraper.scrape_details_stream([{"name": "Theater A", "url": "a"}], selected_showtimes)]
+        await shutdown_browser_pools()
+
+    assert completed == [("9:00pm", 1), ("7:00pm", 1)]
+
+
+@pytest.mark.asyncio
+async def test_get_all_showings_for_theaters_fans_out_over_dates():
+    """A list of dates is discovered in one concurrent run and keyed by date, then theater."""
+    scraper = Scraper(headless=True, devtools=False)
+    in_flight, peak = 0, 0
+
+    async def fake_movies(page, theater, date, raise_errors=False):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return [{"theater_name": theater['name'], "showtime": "7:00pm", "play_date": date}]
+    scraper._get_movies_from_theater_page = fake_movies
+
+    theaters = [{"name": "Theater A", "url": "a"}, {"name": "Theater B", "url": "b"}]
+    dates = ["2025-01-01", datetime.date(2025, 1, 2), "2025-01-03"]
+    playwright_cm = _mock_playwright_cm()
+
+    with patch('app.browser_pool.async_playwright', return_value=playwright_cm) as mock_async_playwright:
+        by_date = await scraper.get_all_showings_for_theaters(theaters, dates)
+        by_theater = await scraper.get_all_showings_for_theaters(theaters, "2025-01-04")
+        await shutdown_browser_pools()
+
+    assert list(by_date) == ["2025-01-01", "2025-01-02", "2025-01-03"]
+    assert by_date["2025-01-02"]["Theater B"] == [{"theater_name": "Theater B", "showtime": "7:00pm", "play_date": "2025-01-02"}]
+    assert set(by_theater) == {"Theater A", "Theater B"}
+    assert peak > 2 # (theater, date) pairs ran concurrently, not one day at a time
+    mock_async_playwright.assert_called_once() # One browser for every date
@@ -1,6 +1,6 @@
 import pytest
 import json
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from app.scraper import Scraper
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
@@ -62,7 +62,7 @@ SOLD_OUT_JSON_PAYLOAD = """
 @pytest.fixture
 def scraper_instance():
     """Provides a Scraper instance for tests."""
-    return Scraper(headless=True)
+    return Scraper(headless=True, http_prices=False)
 
 @pytest.mark.asyncio
 async def test_get_prices_and_capacity_success(scraper_instance):
@@ -74,7 +74,6 @@ async def test_get_prices_and_capacity_success(scraper_instance):
     # Configure the mock to return the sample HTML when page.content() is called
     html_with_valid_json = SAMPLE_HTML_TEMPLATE.format(json_payload=VALID_JSON_PAYLOAD)
     mock_page.content.return_value = html_with_valid_json
-    mock_page.query_selector_all.return_value = [AsyncMock(inner_html=AsyncMock(return_value=f'window.Commerce.models = {VALID_JSON_PAYLOAD}'))]
     
     showing_details = {'ticket_url': 'http://example.com/ticket'}
 
@@ -105,7 +104,6 @@ async def test_get_prices_and_capacity_sold_out(scraper_instance):
     mock_page = AsyncMock()
     html_with_sold_out_json = SAMPLE_HTML_TEMPLATE.format(json_payload=SOLD_OUT_JSON_PAYLOAD)
     mock_page.content.return_value = html_with_sold_out_json
-    mock_page.query_selector_all.return_value = [AsyncMock(inner_html=AsyncMock(return_value=f'window.Commerce.models = {SOLD_OUT_JSON_PAYLOAD}'))]
     
     result = await scraper_instance._get_prices_and_capacity(mock_page, {'ticket_url': 'url'})
     
@@ -122,7 +120,6 @@ async def test_get_prices_and_capacity_no_json_object(scraper_instance):
     # HTML is missing the 'window.Commerce.models' assignment
     html_without_json = "<html><body><script>var x = 1;</script></body></html>"
     mock_page.content.return_value = html_without_json
-    mock_page.query_selector_all.return_value = [AsyncMock(inner_html=AsyncMock(return_value="var x = 1;"))]
     
     result = await scraper_instance._get_prices_and_capacity(mock_page, {'ticket_url': 'url'})
     
@@ -160,4 +157,45 @@ async def test_get_prices_and_capacity_saves_html_on_failure(mock_open, mock_mak
     mock_makedirs.assert_called_once()
     mock_open.assert_called_once()
     mock_logger.error.assert_called()
-    assert "Saved failing HTML" in mock_logger.error.call_args[0][0]
\ No newline at end of file
+    assert "Saved failing HTML" in mock_logger.error.call_args[0][0]
+
+@pytest.mark.asyncio
+async def test_get_prices_and_capacity_reads_models_with_one_evaluate(scraper_instance):
+    """The live `window.Commerce.models` object is read in one evaluate call, without pulling the HTML."""
+    mock_page = AsyncMock()
+    mock_page.evaluate.return_value = json.dumps(json.loads(SOLD_OUT_JSON_PAYLOAD))
+
+    result = await scraper_instance._get_prices_and_capacity(mock_page, {'ticket_url': 'url'})
+
+    assert result == {"tickets": [], "capacity": "Sold Out", "error": None}
+    mock_page.evaluate.assert_awaited_once()
+    mock_page.content.assert_not_awaited()
+    mock_page.query_selector_all.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_prices_and_capacity_falls_back_to_html_when_evaluate_is_empty(scraper_instance):
+    mock_page = AsyncMock()
+    mock_page.evaluate.return_value = None
+    mock_page.content.return_value = SAMPLE_HTML_TEMPLATE.format(json_payload=SOLD_OUT_JSON_PAYLOAD)
+
+    result = await scraper_instance._get_prices_and_capacity(mock_page, {'ticket_url': 'url'})
+
+    assert result["error"] is None
+    assert result["capacity"] == "Sold Out"
+    mock_page.content.assert_awaited_once()
+
+@pytest.mark.asyncio
+@patch('app.scraper.os.makedirs')
+@patch('builtins.open')
+async def test_theater_page_without_listings_is_no_showings_not_a_retry(mock_open, mock_makedirs, scraper_instance):
+    """A theater page that loads but never renders a listing has no showings that date; it isn't retried."""
+    mock_page = AsyncMock()
+    mock_page.locator = MagicMock()
+    mock_page.locator.return_value.first.wait_for = AsyncMock(side_effect=PlaywrightTimeoutError("no li.fd-panel"))
+    mock_page.content.return_value = "<html><body>No showtimes for this date.</body></html>"
+
+    showings = await scraper_instance._get_movies_from_theater_page(
+        mock_page, {"name": "Closed Theater", "url": "https://example.com/theater"}, "2025-01-01", raise_errors=True)
+
+    assert showings == []
+    mock_page.goto.assert_awaited_once()
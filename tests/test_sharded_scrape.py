@@ -0,0 +1,116 @@
+import pytest
+from unittest.mock import patch
+from app import sharded_scrape
+from app.sharded_scrape import shard_by_weight, shard_limits, sharded_showings_stream
+from app.scraper import Scraper
+
+
+def _showing(theater, n):
+    return {"theater_name": theater, "film_title": f"Film {n}", "showtime": f"{n}:00pm", "ticket_url": f"http://t/{theater}/{n}"}
+
+
+class FakeShardPool:
+    """Stands in for the worker processes: shard 0 finishes its showings, every other shard crashes."""
+
+    def __init__(self, kind, payloads, options):
+        self.payloads = payloads
+        self.options = options
+        self.closed = False
+        FakeShardPool.last = self
+
+    def start(self):
+        pass
+
+    async def messages(self, cancel_event=None):
+        for shard, payload in enumerate(self.payloads):
+            if shard == 0:
+                for index, showing in payload:
+                    if self.options.get("report_starts"):
+                        yield (sharded_scrape._STARTED, shard, index)
+                    yield (sharded_scrape._RESULT, shard, index, [{"Theater Name": showing['theater_name']}])
+                yield (sharded_scrape._DONE, shard, None)
+            else:
+                yield (sharded_scrape._DONE, shard, "worker process exited with code -9")
+
+    def close(self):
+        self.closed = True
+
+
+def test_shard_by_weight_balances_and_keeps_every_item():
+    shards = shard_by_weight(list("abcdef"), [5, 4, 3, 3, 2, 1], 3)
+    assert sorted(item for shard in shards for item in shard) == list("abcdef")
+    assert len(shards) == 3
+    assert shard_by_weight(["a"], [1], 4) == [["a"]]
+
+
+def test_shard_limits_split_the_concurrency_budget():
+    with patch('app.sharded_scrape.config') as mock_config:
+        mock_config.SCRAPE_CONCURRENCY_INITIAL, mock_config.SCRAPE_CONCURRENCY_MAX = 6, 24
+        assert shard_limits(4) == {"initial_limit": 2, "min_limit": 1, "max_limit": 6}
+        assert shard_limits(12)["initial_limit"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sharded_stream_yields_every_showing_once_and_fails_crashed_shards():
+    showings = [_showing("A", 1), _showing("A", 2), _showing("B", 1), _showing("C", 1), _showing("C", 2), _showing("C", 3)]
+    status = ["Initializing..."]
+    with patch('app.sharded_scrape._ShardPool', FakeShardPool):
+        results = [(showing, rows) async for showing, rows in sharded_showings_stream(showings, 2, {}, status)]
+
+    assert FakeShardPool.last.closed
+    assert len(FakeShardPool.last.payloads) == 2
+    # Theaters are never split across shards.
+    shard_theaters = [{s['theater_name'] for _, s in payload} for payload in FakeShardPool.last.payloads]
+    assert not shard_theaters[0] & shard_theaters[1]
+
+    assert sorted(id(s) for s, _ in results) == sorted(id(s) for s in showings)
+    for showing, rows in results:
+        if showing['theater_name'] in shard_theaters[0]:
+            assert rows == [{"Theater Name": showing['theater_name']}]
+        else:
+            assert rows is None
+    assert status[0].startswith("Scraped showing")
+
+
+@pytest.mark.asyncio
+async def test_sharded_stream_reports_showing_starts_in_the_parent():
+    showings = [_showing("A", 1), _showing("A", 2), _showing("B", 1)]
+    started = []
+    with patch('app.sharded_scrape._ShardPool', FakeShardPool):
+        results = [result async for result in sharded_showings_stream(showings, 2, {}, on_showing_start=started.append)]
+
+    assert FakeShardPool.last.options["report_starts"] is True
+    finished = [showing for showing, rows in results if rows is not None]
+    assert [id(s) for s in started] == [id(s) for s in finished]
+
+
+@pytest.mark.asyncio
+async def test_scrape_details_shards_large_runs():
+    scout = Scraper(headless=True, processes=3)
+    scout.shard_min_theaters = 2
+    theaters = [{"name": "A", "url": "http://a"}, {"name": "B", "url": "http://b"}]
+    selected = {"2025-01-01": {"A": {"X": {"1:00pm": [{"film_title": "X", "showtime": "1:00pm", "ticket_url": "u1"}]}},
+                               "B": {"Y": {"2:00pm": [{"film_title": "Y", "showtime": "2:00pm", "ticket_url": "u2"}]}}}}
+    seen = []
+
+    async def fake_stream(showings, processes, options, status_container=None, cancel_event=None, circuit_breaker=None,
+                          hedger=None, weight=None, on_showing_start=None):
+        seen.append((processes, options))
+        for showing in showings:
+            yield showing, [{"Theater Name": showing['theater_name']}]
+
+    completed = []
+    with patch('app.scraper.sharded_showings_stream', fake_stream):
+        rows, showings = await scout.scrape_details(theaters, selected, on_theater_complete=lambda name, r, s: completed.append(name))
+
+    assert seen[0][0] == 2 # Never more processes than theaters
+    assert seen[0][1]["scraper"]["headless"] is True
+    assert len(rows) == 2 and len(showings) == 2
+    assert sorted(completed) == ["A", "B"]
+
+
+def test_small_runs_stay_in_process():
+    scout = Scraper(headless=True, processes=4)
+    assert scout._shard_count(scout.shard_min_theaters - 1) == 1
+    assert scout._shard_count(scout.shard_min_theaters) == min(4, scout.shard_min_theaters)
+    assert Scraper(headless=True, processes=1)._shard_count(500) == 1
@@ -0,0 +1,59 @@
+import os
+import pytest
+from unittest.mock import patch
+from bs4 import BeautifulSoup
+from app.scraper import Scraper
+from app import fast_html
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+THEATER = {"name": "AMC Palace 9", "url": "https://www.fandango.com/amc-palace-9-aadcs/theater-page"}
+
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def scout():
+    return Scraper(headless=True, http_prices=False)
+
+
+@pytest.mark.skipif(fast_html.HTML_BACKEND != "lxml", reason="lxml is not installed")
+@pytest.mark.parametrize("fixture_name", ["fandango_theater_page.html", "fandango_theater_page_formats.html"])
+def test_lxml_backend_matches_beautifulsoup(scout, fixture_name):
+    """The lxml path must extract exactly what BeautifulSoup's html.parser extracts."""
+    html = _read_fixture(fixture_name)
+    fast = scout._parse_theater_page_html(html, THEATER)
+    with patch('app.scraper.parse_html', lambda h: BeautifulSoup(h, 'html.parser')):
+        reference = scout._parse_theater_page_html(html, THEATER)
+    assert fast == reference
+    assert len(fast) > 30
+
+
+def test_parse_theater_page_extracts_showings(scout):
+    showings = scout._parse_theater_page_html(_read_fixture("fandango_theater_page.html"), THEATER)
+    assert len(showings) == 174
+    assert all(s["ticket_url"].startswith("https://tickets.fandango.com/transaction/ticketing/mobile/jump.aspx?") for s in showings)
+    assert "Unknown Title" not in {s["film_title"] for s in showings}
+
+    tron = [s for s in showings if s["film_title"] == "Tron: Ares"]
+    assert tron and tron[0]["fandango_rating"] == "PG-13" and tron[0]["fandango_runtime"] == "1 hr 59 min"
+    assert any(s["format"] == "IMAX" and s["is_plf"] for s in showings)
+
+
+def test_parse_theater_page_uses_container_format(scout):
+    showings = scout._parse_theater_page_html(_read_fixture("fandango_theater_page_formats.html"), THEATER)
+    assert len(showings) == 38
+    assert any("Superscreen" in s["format"] for s in showings)
+
+
+@pytest.mark.skipif(fast_html.HTML_BACKEND != "lxml", reason="lxml is not installed")
+def test_lxml_node_get_text_matches_beautifulsoup():
+    html = "<div><p class='a b'> x <!-- note --> <script>s()</script><b>y</b> z</p><p class='b'>w</p></div>"
+    node, soup = fast_html.parse_html(html), BeautifulSoup(html, 'html.parser')
+    for css in ['p.a', '.b', 'div p.b', 'p.a b, p.b']:
+        assert [n.get_text(strip=True) for n in node.select(css)] == [n.get_text(strip=True) for n in soup.select(css)]
+    assert node.select_one('p.a').get_text('|', strip=True) == soup.select_one('p.a').get_text('|', strip=True)
+    with pytest.raises(ValueError):
+        node.select('p > b')
@@ -0,0 +1,80 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+from app.ticket_parser import TicketDescriptionParser, UnmatchedTicketTypeBuffer, get_ticket_parser
+from app.scraper import Scraper
+
+TICKET_TYPES = {
+    "amenity_map": {"3D": ["3d"], "IMAX": ["imax"], "D-BOX": ["d-box", "dbox"]},
+    "base_type_map": {"Adult": ["adult", "general admission"], "3D General Admission": ["3d general admission"],
+                      "Child": ["child"]},
+    "ignored_amenities": ["ticket"],
+}
+
+
+def test_parser_prefers_longer_base_type_keywords():
+    parser = TicketDescriptionParser(TICKET_TYPES)
+    assert parser.parse("General Admission IMAX") == ("Adult", ("IMAX",), None)
+    # Amenities are stripped first, so "3D" is gone before the 3D base type can match.
+    assert parser.parse("3D General Admission") == ("Adult", ("3D",), None)
+    assert parser.parse("Child (with DBOX) Ticket") == ("Child", ("D-BOX", "With"), None)
+
+
+def test_parser_reports_unmatched_base_types():
+    parser = TicketDescriptionParser(TICKET_TYPES)
+    assert parser.parse("Fathom Event") == ("Fathom", ("Event",), "Fathom")
+    assert parser.parse("IMAX") == ("Unknown", ("IMAX",), "Unknown")
+    assert parser.parse("$12.50").unmatched is None
+    assert parser.parse("") == ("Unknown", (), None)
+
+
+def test_parser_caches_results():
+    parser = TicketDescriptionParser(TICKET_TYPES, cache_size=2)
+    for description in ["Adult", "Adult", "Child", "Adult 3D"]:
+        parser.parse(description)
+    info = parser.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 3, 2)
+
+
+def test_get_ticket_parser_rebuilds_when_file_changes(tmp_path):
+    path = tmp_path / "ticket_types.json"
+    path.write_text(json.dumps(TICKET_TYPES))
+    parser = get_ticket_parser(str(path), check_interval=0)
+    assert get_ticket_parser(str(path), check_interval=0) is parser
+    assert parser.parse("Kid").base_type == "Kid"
+
+    updated = dict(TICKET_TYPES, base_type_map={**TICKET_TYPES["base_type_map"], "Child": ["child", "kid"]})
+    path.write_text(json.dumps(updated))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    rebuilt = get_ticket_parser(str(path), check_interval=0)
+    assert rebuilt is not parser
+    assert rebuilt.parse("Kid").base_type == "Child"
+
+
+def test_scraper_buffers_unmatched_types_with_counts():
+    scout = Scraper(headless=True, http_prices=False)
+    context = {"theater_name": "Theater A", "film_title": "X", "play_date": "2025-01-01"}
+    for _ in range(3):
+        assert scout._parse_ticket_description("Anime Movie", context)["base_type"] == "Anime"
+    scout._parse_ticket_description("Anime Movie", dict(context, film_title="Y"))
+
+    entries = sorted(scout.unmatched_ticket_types.entries(), key=lambda e: e['film_title'])
+    assert [(e['unmatched_part'], e['film_title'], e['occurrences']) for e in entries] == [("Anime", "X", 3), ("Anime", "Y", 1)]
+
+    with patch('app.ticket_parser.database') as mock_db:
+        assert scout.unmatched_ticket_types.flush() == 2
+    mock_db.log_unmatched_ticket_types.assert_called_once()
+    assert scout.unmatched_ticket_types.pending == 0
+
+
+def test_unmatched_buffer_keeps_counts_when_flush_fails():
+    buffer = UnmatchedTicketTypeBuffer()
+    buffer.record("Anime Movie", "Anime", {"film_title": "X"})
+    with patch('app.ticket_parser.database') as mock_db:
+        mock_db.log_unmatched_ticket_types.side_effect = Exception("database is locked")
+        assert buffer.flush() == 0
+    buffer.record("Anime Movie", "Anime", {"film_title": "X"})
+    assert [e['occurrences'] for e in buffer.entries()] == [2]
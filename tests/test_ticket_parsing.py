@@ -1,7 +1,6 @@
 import pytest
 import json
 from app.scraper import Scraper
-from unittest.mock import patch
 
 @pytest.fixture
 def scraper_instance():
@@ -56,8 +55,7 @@ def scraper_instance():
     ("IMAX Ticket", "Unknown", ["IMAX"]),
     ("Adult Child", "Adult", []), # Should find 'Adult' and ignore the rest.
 ])
-@patch('app.database.log_unmatched_ticket_type')
-def test_parse_ticket_description(mock_log_unmatched, scraper_instance, description, expected_base_type, expected_amenities):
+def test_parse_ticket_description(scraper_instance, description, expected_base_type, expected_amenities):
     """
     Tests the _parse_ticket_description function with a wide variety of inputs
     to ensure it correctly identifies base types and amenities.
@@ -68,15 +66,16 @@ def test_parse_ticket_description(mock_log_unmatched, scraper_instance, descript
     assert result["base_type"] == expected_base_type
     assert sorted(result["amenities"]) == sorted(expected_amenities)
 
-    # --- Verify that logging is called for new, unknown base types ---
+    # --- Verify that new, unknown base types are buffered for logging ---
     # Get all known base type keywords from the scraper's loaded data
     known_base_type_keywords = [kw for kws in scraper_instance.ticket_types_data['base_type_map'].values() for kw in kws]
-    
+    logged = [(e['original_description'], e['unmatched_part']) for e in scraper_instance.unmatched_ticket_types.entries()]
+
     # If the expected base type is not one of the canonical types AND it's not a generic/ignored term,
-    # it should have been logged as an unmatched type.
+    # it should have been recorded as an unmatched type.
     if expected_base_type not in scraper_instance.ticket_types_data['base_type_map'] and \
        expected_base_type not in ["Unknown", "General Admission"] and \
        expected_base_type.lower() not in known_base_type_keywords:
-        mock_log_unmatched.assert_called_with(description, expected_base_type)
+        assert logged == [(description, expected_base_type)]
     else:
-        mock_log_unmatched.assert_not_called()
+        assert logged == []
@@ -9,7 +9,7 @@ import pytz
 import streamlit as st
 from unittest.mock import patch
 
-from app.utils import style_price_change, to_excel, to_csv, check_cache_status, log_runtime, format_price_change, style_price_change_v2, get_error_message, normalize_time_string, format_theater_name_for_display, is_run_allowed, estimate_scrape_time, clear_workflow_state
+from app.utils import style_price_change, to_excel, to_csv, check_cache_status, log_runtime, format_price_change, style_price_change_v2, get_error_message, normalize_time_string, format_theater_name_for_display, is_run_allowed, estimate_scrape_time, clear_workflow_state, run_async_in_thread
 
 def test_style_price_change():
     assert style_price_change("▲$5.00") == 'background-color: #e6ffe6' # Light green
@@ -199,3 +199,24 @@ def test_clear_workflow_state(monkeypatch):
     # Check that persistent keys remain
     assert 'logged_in' in st.session_state.__dict__
     assert st.session_state.logged_in is True
+
+def test_run_async_in_thread_runs_plain_functions_off_the_shared_loop():
+    """A synchronous callable runs in the worker thread; a coroutine runs on the shared scraper loop."""
+    import asyncio
+    import threading
+    from app.browser_pool import get_shared_event_loop
+
+    async def on_loop(value):
+        return value, asyncio.get_running_loop()
+
+    def blocking(value):
+        return value, threading.current_thread().name
+
+    _, get_results = run_async_in_thread(on_loop, 1)
+    status, (value, loop), _, _ = get_results()
+    assert (status, value, loop) == ('success', 1, get_shared_event_loop())
+
+    _, get_results = run_async_in_thread(blocking, 2)
+    status, (value, thread_name), _, _ = get_results()
+    assert (status, value) == ('success', 2)
+    assert thread_name != 'scraper-event-loop'